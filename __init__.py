@@ -13,6 +13,40 @@ r"""
         Unauthorized copying of this file, via any medium is strictly prohibited
         Proprietary and confidential
 """
+# 属性として参照された時点で読み込まれるサブモジュール。
+LazyModules = (
+    'node', 'mayaCmds', 'func', 'lib', 'core', 'uilib', 'rigScripts',
+    'constructors', 'factoryModules', 'grisNode', 'system', 'tools',
+    'gadgets',
+)
+
+
+def __getattr__(name):
+    r"""
+        LazyModulesに含まれるサブモジュールを参照された時点で読み込んで返す。
+        Python3.7以降でのみ機能する。
+        
+        Args:
+            name (str):
+            
+        Returns:
+            module:
+    """
+    if name in LazyModules:
+        from . import lazyLoader
+        return lazyLoader.importModule('%s.%s' % (__name__, name))
+    raise AttributeError(
+        'module %r has no attribute %r' % (__name__, name)
+    )
+
+
+def importReport():
+    r"""
+        遅延読み込みされたモジュールの読み込み時間のレポートを出力する。
+    """
+    from . import lazyLoader
+    lazyLoader.printImportReport()
+
 
 
 def showFactory(
@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    MFnSkinCluster.setWeightsやMFnMesh.setUVsのようにアンドゥに対応して
+    いないAPIの編集を、Mayaのアンドゥキューに登録する機能を提供するモジュール。
+    
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import os
+from maya import cmds
+
+PluginName = 'grisApiUndo'
+PluginPath = os.path.join(
+    os.path.dirname(__file__), 'plugins', PluginName + '.py'
+)
+__PENDING__ = []
+
+
+def loadPlugin():
+    r"""
+        アンドゥ登録用のプラグインがロードされていなければロードする。
+    """
+    if not cmds.pluginInfo(PluginName, q=True, l=True):
+        cmds.loadPlugin(PluginPath, quiet=True)
+
+
+def popPending():
+    r"""
+        保留中のアンドゥ、リドゥ用関数のペアを取り出す。
+        プラグインのコマンドから呼ばれる。
+        
+        Returns:
+            tuple:(アンドゥ用関数, リドゥ用関数)
+    """
+    if not __PENDING__:
+        return (None, None)
+    return __PENDING__.pop(0)
+
+
+def commit(undo, redo):
+    r"""
+        実行済みの編集をアンドゥキューに登録する。
+        undoは編集前の状態に戻す関数、redoは編集を再度適用する関数で、
+        どちらも引数なしで呼び出される。
+        
+        Args:
+            undo (function):アンドゥ用関数
+            redo (function):リドゥ用関数
+    """
+    loadPlugin()
+    __PENDING__.append((undo, redo))
+    getattr(cmds, PluginName)()
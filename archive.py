@@ -13,35 +13,177 @@ r"""
         Unauthorized copying of this file, via any medium is strictly prohibited
         Proprietary and confidential
 """
-import zipfile, os, datetime, re
+import zipfile, os, datetime, re, json, time, zlib, hashlib
+from .fileUtil import fileLinker
 
+# 圧縮済みの形式のため、再圧縮せずにそのまま格納するファイルの拡張子。
+StoredExtensions = (
+    '.png', '.jpg', '.jpeg', '.gif', '.zip', '.gz', '.bz2', '.7z', '.npz',
+    '.mp4', '.mov',
+)
+# これより大きなファイルはメモリに読み込まず、ストリームで書き込む。
+LargeFileSize = 256 * 1024 * 1024
+# ハッシュ計算時に一度に読み込むバイト数。
+ReadChunkSize = 4 * 1024 * 1024
+# マニフェストファイルのバージョンと、ファイル名の接尾辞。
+ManifestVersion = 1
+ManifestSuffix = 'manifest.json'
 
-class ZipWriter(object):
+
+def compressType(filepath):
+    r"""
+        ファイルの拡張子から、zipへ格納する際の圧縮形式を返す。
+        
+        Args:
+            filepath (str):
+            
+        Returns:
+            int:zipfile.ZIP_STOREDまたはzipfile.ZIP_DEFLATED
+    """
+    if os.path.splitext(filepath)[-1].lower() in StoredExtensions:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def fileHash(filepath):
     r"""
-        コンテキスト制御型のzip書き込み制御クラス。
+        ファイルの内容のsha1ハッシュを返す。
+        
+        Args:
+            filepath (str):
+            
+        Returns:
+            str:
     """
+    h = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        data = f.read(ReadChunkSize)
+        while data:
+            h.update(data)
+            data = f.read(ReadChunkSize)
+    return h.hexdigest()
+
+
+def _readFile(task):
+    r"""
+        ワーカースレッド上でファイルを読み込み、ハッシュを計算する。
+        ファイルの読み込みとsha1の計算はGILを解放するため、スレッドで
+        並列に処理できる。
+        前回のハッシュと一致した場合や巨大なファイルの場合はデータを
+        保持せず、データはNoneとなる。
+        
+        Args:
+            task (tuple):
+                (ファイルパス, 格納名, os.stat_result, 前回のハッシュ)
+            
+        Returns:
+            tuple:(task, ハッシュ, zipfile.ZipInfo, データ)
+    """
+    filepath, arcname, stat, previousHash = task
+    if stat.st_size > LargeFileSize:
+        return task, fileHash(filepath), None, None
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == previousHash:
+        return task, digest, None, None
+
+    date_time = max(
+        time.localtime(stat.st_mtime)[0:6], (1980, 1, 1, 0, 0, 0)
+    )
+    zinfo = zipfile.ZipInfo(arcname, date_time)
+    zinfo.external_attr = (stat.st_mode & 0xFFFF) << 16
+    zinfo.compress_type = compressType(filepath)
+    return task, digest, zinfo, data
+
+
+def loadManifest(filepath):
+    r"""
+        前回のアーカイブ時に保存したマニフェストを読み込む。
+        ファイルが存在しないか、読み込めない場合はNoneを返す。
+        
+        Args:
+            filepath (str):
+            
+        Returns:
+            dict:
+    """
+    if not os.path.isfile(filepath):
+        return None
+    try:
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+    except ValueError:
+        return None
+    if data.get('version') != ManifestVersion:
+        return None
+    return data
+
+
+def saveManifest(filepath, manifest):
+    r"""
+        マニフェストをjson形式で保存する。
+        
+        Args:
+            filepath (str):
+            manifest (dict):
+    """
+    with open(filepath, 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+
+class ArchiveWriter(object):
+    r"""
+        ルートディレクトリ以下のファイルをzipへアーカイブする
+        コンテキスト制御型のクラス。
+        ファイルの読み込みとハッシュの計算はスレッドプールで並列に行い、
+        圧縮とzipへの書き込みはzipfileの公開APIを用いてメインスレッドで
+        順番に行う。
+        カレントディレクトリは変更せず、格納名はルートからの相対パスとなる。
+        
+        前回のマニフェストを渡すとインクリメンタルアーカイブとなり、
+        サイズ、更新日時、ハッシュのいずれかが変化したファイルのみを格納する。
+        同じファイルが複数回渡された場合は最初の１回のみ格納する。
+    """
+    Added, Skipped = range(2)
+
     def __init__(
-        self, zipPath, archivedPath, fileMode='w', option=zipfile.ZIP_DEFLATED
+        self, zipPath, rootPath, manifest=None, threads=0,
+        level=zlib.Z_DEFAULT_COMPRESSION
     ):
         r"""
             Args:
-                zipPath (str):
-                archivedPath (str):
-                fileMode (str):
-                option (int):
+                zipPath (str):作成するzipファイルのパス
+                rootPath (str):アーカイブ対象のルートディレクトリ
+                manifest (dict):前回のマニフェスト
+                threads (int):圧縮に使用するスレッド数。0の場合はCPU数
+                level (int):圧縮レベル
         """
-        self.current = None
-        self.archived_path = archivedPath
-        self.options = (zipPath, fileMode, option)
+        self.zip_path = zipPath
+        self.root_path = os.path.abspath(rootPath)
+        self.level = level
+        self.threads = threads
         self.zip = None
+        previous = manifest['files'] if manifest else {}
+        self.__previous = previous
+        self.__files = {}
+        self.__num_added = 0
 
     def __enter__(self):
-        self.zip = zipfile.ZipFile(
-            self.options[0], self.options[1], self.options[2]
-        )
-        self.current = os.getcwd()
-        os.chdir(self.archived_path)
-        return self.zip
+        kwargs = {}
+        if self.level != zlib.Z_DEFAULT_COMPRESSION:
+            kwargs['compresslevel'] = self.level
+        try:
+            self.zip = zipfile.ZipFile(
+                self.zip_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True,
+                **kwargs
+            )
+        except TypeError:
+            # Python3.7未満のzipfileは圧縮レベルを指定できない。
+            self.zip = zipfile.ZipFile(
+                self.zip_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True
+            )
+        return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         r"""
@@ -53,10 +195,147 @@ class ZipWriter(object):
             Returns:
                 bool:
         """
-        os.chdir(self.current)
-        self.zip.close()
+        self.close()
         return False
 
+    def close(self):
+        r"""
+            zipファイルを閉じる。
+        """
+        if self.zip:
+            self.zip.close()
+            self.zip = None
+
+    def numberOfAddedFiles(self):
+        r"""
+            zipへ格納したファイルの数を返す。
+            
+            Returns:
+                int:
+        """
+        return self.__num_added
+
+    def manifest(self):
+        r"""
+            これまでに処理した全ファイルのサイズ、更新日時、ハッシュを持つ
+            マニフェストを返す。
+            
+            Returns:
+                dict:
+        """
+        return {
+            'version': ManifestVersion,
+            'archive': os.path.basename(self.zip_path),
+            'files': dict(self.__files),
+        }
+
+    def arcname(self, filepath):
+        r"""
+            ファイルパスからzip内での格納名を返す。
+            
+            Args:
+                filepath (str):絶対パス、またはルートからの相対パス
+                
+            Returns:
+                str:
+        """
+        filepath = os.path.join(self.root_path, filepath)
+        return os.path.relpath(filepath, self.root_path).replace(os.sep, '/')
+
+    def __tasks(self, filelist):
+        r"""
+            読み込みを行う対象のタスクを作成するジェネレータ。
+            前回とサイズと更新日時が同じファイルはマニフェストへの記録のみ
+            行い、(格納名, None)を返す。
+            
+            Args:
+                filelist (list):
+                
+            Returns:
+                generator:
+        """
+        for filepath in filelist:
+            arcname = self.arcname(filepath)
+            if arcname in self.__files:
+                continue
+            filepath = os.path.join(self.root_path, arcname)
+            stat = os.stat(filepath)
+            prev = self.__previous.get(arcname, {})
+            self.__files[arcname] = {
+                'size': stat.st_size, 'mtime': stat.st_mtime,
+                'hash': prev.get('hash'),
+            }
+            if (
+                prev.get('size') == stat.st_size and
+                prev.get('mtime') == stat.st_mtime
+            ):
+                yield arcname, None
+                continue
+            yield arcname, (filepath, arcname, stat, prev.get('hash'))
+
+    def iterWrite(self, filelist):
+        r"""
+            ファイルリストをzipへ書き込み、ファイル毎に
+            (格納名, AddedまたはSkipped)を返すジェネレータ。
+            途中でイテレートを止めると残りのファイルの処理は中止される。
+            
+            Args:
+                filelist (list):絶対パス、またはルートからの相対パスのリスト
+                
+            Returns:
+                generator:
+        """
+        tasks = []
+        for arcname, task in self.__tasks(filelist):
+            if task is None:
+                yield arcname, self.Skipped
+            else:
+                tasks.append(task)
+        if not tasks:
+            return
+
+        from multiprocessing.pool import ThreadPool
+        threads = self.threads
+        if threads < 1:
+            import multiprocessing
+            threads = multiprocessing.cpu_count()
+        # 読み込んだデータがメモリに溜まり過ぎないよう、一定数ずつ処理する。
+        num = threads * 4
+        pool = ThreadPool(threads)
+        try:
+            for i in range(0, len(tasks), num):
+                for task, digest, zinfo, data in pool.imap(
+                    _readFile, tasks[i:i+num]
+                ):
+                    filepath, arcname = task[0], task[1]
+                    self.__files[arcname]['hash'] = digest
+                    if digest == task[3]:
+                        yield arcname, self.Skipped
+                        continue
+                    if zinfo is None:
+                        self.zip.write(
+                            filepath, arcname, compressType(filepath)
+                        )
+                    else:
+                        self.zip.writestr(zinfo, data)
+                    self.__num_added += 1
+                    yield arcname, self.Added
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def write(self, filelist, indent=1):
+        r"""
+            ファイルリストをzipへ書き込み、進捗をメッセージとして出力する。
+            
+            Args:
+                filelist (list):絶対パス、またはルートからの相対パスのリスト
+                indent (int):
+        """
+        for arcname, state in self.iterWrite(filelist):
+            if state == self.Added:
+                message('Write as zip : %s' % arcname, indent=indent)
+
 
 def message(msg, output=True, indent=0):
     r"""
@@ -123,49 +402,167 @@ def writeToZip(dirname, zip, filter):
             zip.write(writefile)
 
 
-def archiveProject():
+def currentFilter(rootpath, namelist):
+    r"""
+        curファイルと、その名前の最新バージョンのファイルを検出する
+        フィルタ関数。
+        curファイルがリンカーの場合はリンク先のファイルを収集する。
+        
+        Args:
+            rootpath (str):探索ルートパス
+            namelist (list):フィルタリングするファイル名のリスト
+            
+        Returns:
+            list:
+    """
+    filtered = defaultFilter(rootpath, namelist)
+    filtered.sort()
+    if not filtered:
+        return filtered
+    # カレントファイルの収集。=================================================
+    cur_ptn = re.compile(
+        r'(^.*?\.)cur(\.\w+(|{})$)'.format(fileLinker.FileLinker.Extension)
+    )
+    linkers, filelist, patterns, targets = [], [], [], []
+    for f in filtered:
+        if not cur_ptn.search(f):
+            targets.append(f)
+            continue
+        filelist.append(f)
+        fl = fileLinker.getFileLinker(os.path.join(rootpath, f))
+        if fl:
+            linkers.append(fl)
+        else:
+            patterns.append(re.compile(cur_ptn.sub(r'\1v(\\d+)\2', f)))
+    # =========================================================================
+
+    # カレントファイルに属する最新バージョンのファイルを収集。=================
+    for fl in linkers:
+        # カレントファイルがリンカーの場合、リンク先を取得する。
+        linked = fl.linkedPath(True)
+        if linked:
+            filelist.append(linked)
+    for ptn in patterns:
+        filtered = {}
+        for tgt in targets:
+            mobj = ptn.search(tgt)
+            if not mobj:
+                continue
+            filtered.setdefault(mobj.group(1), []).append(tgt)
+        if not filtered:
+            continue
+        key = sorted(filtered.keys())[-1]
+        filelist.append(filtered[key][-1])
+    # =========================================================================
+    return filelist
+
+
+def collectFiles(rootpath, dirname, filter):
+    r"""
+        rootpath下のdirname以下から、filterで取捨選択したファイルの
+        絶対パスのリストを返す。
+        filterの書式はwriteToZipと同じ。
+        
+        Args:
+            rootpath (str):
+            dirname (str):rootpathからの相対パス
+            filter (function):
+            
+        Returns:
+            list:
+    """
+    result = []
+    for root, dirs, files in os.walk(os.path.join(rootpath, dirname)):
+        for f in filter(root, files):
+            result.append(os.path.normpath(os.path.join(root, f)))
+    return result
+
+
+def collectProjectFiles(settings):
+    r"""
+        プロジェクト内のアーカイブ対象となるファイルを収集し、
+        (説明, ファイルパスのリスト)のリストとして返す。
+        
+        Args:
+            settings (factoryModules.FactorySettings):
+            
+        Returns:
+            list:
+    """
+    rootpath = settings.rootPath()
+    # スクリプトの収集。=======================================================
+    results = [
+        (
+            'Archive a script files.',
+            collectFiles(rootpath, settings.assetPrefix(), defaultFilter)
+        )
+    ]
+    # =========================================================================
+
+    # モジュールに関連するファイルの収集。=====================================
+    filelist = []
+    for ilist in settings.listModulesAsDict().values():
+        for m in ilist:
+            if m.moduleName() == 'workspace':
+                continue
+            filelist.extend(collectFiles(rootpath, m.name(), currentFilter))
+    results.append(('Archive files related an earch modules.', filelist))
+    # =========================================================================
+
+    # その他のファイルの収集。=================================================
+    filelist = []
+    for file in defaultFilter(rootpath, os.listdir(rootpath)):
+        path = os.path.join(rootpath, file)
+        if os.path.isfile(path):
+            filelist.append(path)
+    results.append(('Archive an other files.', filelist))
+    # =========================================================================
+    return results
+
+
+def archivePaths(settings, incremental=False):
+    r"""
+        アーカイブ先のzipファイルのパスとマニフェストのパスを返す。
+        アーカイブ用のディレクトリがない場合は作成する。
+        
+        Args:
+            settings (factoryModules.FactorySettings):
+            incremental (bool):インクリメンタルアーカイブかどうか
+            
+        Returns:
+            tuple(str, str):
+    """
+    archive_dir = os.path.join(settings.rootPath(), 'archives')
+    if not os.path.isdir(archive_dir):
+        os.makedirs(archive_dir)
+    base = '{}_{}{}_'.format(
+        settings.project(), settings.assetType(), settings.assetName()
+    )
+    zipname = base + datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    if incremental:
+        zipname += '_incremental'
+    return (
+        os.path.join(archive_dir, zipname + '.zip'),
+        os.path.join(archive_dir, base + ManifestSuffix)
+    )
+
+
+def archiveProject(incremental=False, threads=0):
     r"""
         プロジェクトデータをzipアーカイブする。
         どのプロジェクトをアーカイブするかは
             factoryModules:.FactorySettings
         による
+        incrementalがTrueの場合、前回のアーカイブ以降に変更されたファイル
+        のみをアーカイブする。
+        
+        Args:
+            incremental (bool):インクリメンタルアーカイブを行うかどうか
+            threads (int):圧縮に使用するスレッド数。0の場合はCPU数
+            
+        Returns:
+            str:作成したzipファイルのパス。変更がない場合はNone
     """
-    def currentFilter(rootpath, namelist):
-        r"""
-            Args:
-                rootpath (str):
-                namelist (list):
-        """
-        filtered = defaultFilter(rootpath, namelist)
-        filtered.sort()
-        if not filtered:
-            return filtered
-        # カレントファイルの収集。=============================================
-        cur_ptn = re.compile('(^.*?\.)cur(\.\w+$)')
-        filelist, patterns, targets = [], [], []
-        for f in filtered:
-            if not cur_ptn.search(f):
-                targets.append(f)
-                continue
-            filelist.append(f)
-            patterns.append(re.compile(cur_ptn.sub(r'\1v(\d+)\2', f)))
-        # =====================================================================
-
-        # カレントファイルに属する最新バージョンのファイルを収集。=============
-        for ptn in patterns:
-            filtered = {}
-            for tgt in targets:
-                mobj = ptn.search(tgt)
-                if not mobj:
-                    continue
-                filtered.setdefault(mobj.group(1), []).append(tgt)
-            if not filtered:
-                continue
-            key = sorted(filtered.keys())[-1]
-            filelist.append(filtered[key][-1])
-        # =====================================================================
-        return filelist
-
     from . import factoryModules
     st = factoryModules.FactorySettings()
     if not st.settingTest():
@@ -173,7 +570,6 @@ def archiveProject():
             message('The Project settings is not enough.', False)
         )
 
-    # ルートのzipファイルの作成。==============================================
     rootpath = st.rootPath()
     if not os.path.isdir(rootpath):
         raise IOError(
@@ -182,42 +578,20 @@ def archiveProject():
     print('#'.ljust(80, '='))
     print('Start archive in %s' % rootpath)
     print('#'.ljust(80, '='))
-    archive_dir = os.path.join(rootpath, 'archives')
-    if not os.path.isdir(archive_dir):
-        os.makedirs(archive_dir)
-    # =========================================================================
+    zip_path, manifest_path = archivePaths(st, incremental)
+    manifest = loadManifest(manifest_path) if incremental else None
+
+    with ArchiveWriter(zip_path, rootpath, manifest, threads) as writer:
+        for msg, filelist in collectProjectFiles(st):
+            message(msg)
+            writer.write(filelist)
+    if writer.numberOfAddedFiles() == 0 and manifest:
+        os.remove(zip_path)
+        zip_path = None
+        message('No files were changed since the last archive.')
+    saveManifest(manifest_path, writer.manifest())
 
-    base = '{}_{}{}_'.format(st.project(), st.assetType(), st.assetName())
-    with ZipWriter(
-        os.path.join(
-            archive_dir,
-            (base + datetime.datetime.now().strftime('%Y%m%d_%H%M%S.zip'))
-        ),
-        rootpath, 'w', zipfile.ZIP_DEFLATED
-    ) as zip:
-        # スクリプトの収集。===================================================
-        writeToZip(st.assetPrefix(), zip, defaultFilter)
-        # =====================================================================
-
-        # モジュールに関連するファイルの収集。=================================
-        others = []
-        for ilist in st.listModulesAsDict().values():
-            others.extend(
-                [x.name() for x in ilist if x.moduleName() != 'workspace']
-            )
-        for other in others:
-            writeToZip(other, zip, currentFilter)
-        # =====================================================================
-
-        # その他のファイルの収集。=============================================
-        files = os.listdir(rootpath)
-        for file in defaultFilter(rootpath, files):
-            if os.path.isdir(os.path.join(rootpath, file)):
-                continue
-            zip.write(file)
-            message('Write as zip : %s' % file, indent=1)
-        # =====================================================================
-    
     print('#'.ljust(80, '='))
     print('Done')
     print('#'.ljust(80, '='))
+    return zip_path
@@ -0,0 +1,662 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    Factoryのプロジェクトをmayapy上でまとめてビルドする機能を提供するモジュール。
+    各プロジェクトは個別のmayapyプロセスで実行され、同時に実行するプロセス数は
+    ワーカー数で制御される。１つのプロセス内では指定されたLODが順番に
+    ビルドされる。
+    ビルドごとのログ、BuildInfoManagerの情報、保存したシーンのパスは
+    出力ディレクトリ内のsummary.jsonにまとめられる。
+
+    コマンドラインからは以下のように使用する。
+        mayapy -m gris3.batch -o D:/batchOut -w 4 -l low -l high
+            D:/projects/assetA D:/projects/assetB
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import os
+import re
+import sys
+import json
+import time
+import datetime
+import subprocess
+import traceback
+
+# サマリーファイルの形式のバージョン。
+SummaryVersion = 1
+# プロジェクト内のビルド用スクリプトのファイル名のパターン。
+ScriptPattern = re.compile('^setup_([a-zA-Z\d]+)\.py$')
+# 保存するシーンの形式と拡張子。
+SceneTypes = {'mayaBinary': '.mb', 'mayaAscii': '.ma'}
+ResultFileName = 'result.json'
+LogFileName = 'build.log'
+SummaryFileName = 'summary.json'
+# -mで実行された場合でもワーカーを起動できるよう、モジュール名を保持する。
+ModuleName = '%s.%s' % (
+    __package__, os.path.splitext(os.path.basename(__file__))[0]
+)
+
+
+def listLods(projectDir):
+    r"""
+        プロジェクト内のビルド用スクリプト(setup_<LOD>.py)からLODの一覧を
+        返す。スクリプトのディレクトリはプロジェクトの設定から決定される。
+
+        Args:
+            projectDir (str):プロジェクトディレクトリ
+
+        Returns:
+            list:
+    """
+    from . import factory
+    data = factory.FactoryData()
+    data.setRootPath(projectDir)
+    script_dir = os.path.join(projectDir, data.assetPrefix())
+    if not os.path.isdir(script_dir):
+        return []
+    results = [ScriptPattern.search(x) for x in os.listdir(script_dir)]
+    return sorted([x.group(1) for x in results if x])
+
+
+def buildProject(
+    projectDir, lods=None, outputDir='', saveScene=True,
+    sceneType='mayaBinary', debugMode=None
+):
+    r"""
+        プロジェクトの指定されたLODを順番にビルドし、結果を辞書で返す。
+        mayapyなど、Mayaが初期化されたプロセス内で実行する必要がある。
+        lodsが省略された場合はプロジェクト内の全てのLODをビルドする。
+
+        Args:
+            projectDir (str):プロジェクトディレクトリ
+            lods (list):ビルドするLODのリスト
+            outputDir (str):シーンを保存するディレクトリ
+            saveScene (bool):ビルド後のシーンを保存するかどうか
+            sceneType (str):保存するシーンの形式
+            debugMode (str):デバッグモードの内容を表す文字列
+
+        Returns:
+            dict:
+    """
+    from maya import cmds
+    from . import factory
+
+    data = factory.FactoryData()
+    data.setRootPath(projectDir)
+    available = listLods(projectDir)
+    result = {
+        'project': projectDir, 'assetName': data.assetName(False),
+        'lods': [],
+    }
+    for lod in lods or available:
+        lod_result = {
+            'lod': lod, 'script': 'setup_%s' % lod, 'status': 'success',
+            'error': '', 'elapsed': 0.0, 'scene': '', 'buildInfo': None,
+        }
+        result['lods'].append(lod_result)
+        if lod not in available:
+            lod_result['status'] = 'missing'
+            lod_result['error'] = 'No build script : setup_%s.py' % lod
+            print('[Gris Batch] %s' % lod_result['error'])
+            continue
+
+        print('[Gris Batch] Start to build : %s [%s]' % (projectDir, lod))
+        start = time.time()
+        try:
+            data.execScript(lod_result['script'], debugMode)
+        except Exception:
+            lod_result['status'] = 'failed'
+            lod_result['error'] = traceback.format_exc()
+            print(lod_result['error'])
+        lod_result['elapsed'] = time.time() - start
+        if lod_result['status'] != 'success':
+            continue
+        lod_result['buildInfo'] = data.buildLogInfo().makeData().get(lod)
+        if not saveScene:
+            continue
+
+        scene = os.path.join(
+            outputDir or projectDir,
+            '%s_%s%s' % (
+                data.assetName(False) or os.path.basename(projectDir),
+                lod, SceneTypes[sceneType]
+            )
+        )
+        try:
+            cmds.file(rename=scene)
+            cmds.file(save=True, force=True, type=sceneType)
+        except Exception:
+            lod_result['status'] = 'failed'
+            lod_result['error'] = traceback.format_exc()
+            print(lod_result['error'])
+        else:
+            lod_result['scene'] = scene
+    return result
+
+
+class BuildJob(object):
+    r"""
+        １つのプロジェクトのビルドを、mayapyのワーカープロセスとして
+        実行するクラス。
+    """
+    def __init__(self, projectDir, lods=None, name=''):
+        r"""
+            Args:
+                projectDir (str):プロジェクトディレクトリ
+                lods (list):ビルドするLODのリスト(Noneの場合は全て)
+                name (str):出力ディレクトリ内で使用する名前
+        """
+        if not os.path.isdir(projectDir):
+            raise ValueError(
+                'The project directory does not exist : %s' % projectDir
+            )
+        self.__project = os.path.abspath(projectDir)
+        self.__lods = list(lods) if lods else None
+        self.__name = name or os.path.basename(self.__project)
+        self.__output_dir = ''
+
+    def project(self):
+        r"""
+            プロジェクトディレクトリを返す。
+
+            Returns:
+                str:
+        """
+        return self.__project
+
+    def lods(self):
+        r"""
+            ビルドするLODのリストを返す。Noneの場合は全てのLODを表す。
+
+            Returns:
+                list:
+        """
+        return self.__lods
+
+    def name(self):
+        r"""
+            出力ディレクトリ内で使用する名前を返す。
+
+            Returns:
+                str:
+        """
+        return self.__name
+
+    def setOutputDirectory(self, directory):
+        r"""
+            このジョブのログや結果を保存する親ディレクトリを設定する。
+
+            Args:
+                directory (str):
+        """
+        self.__output_dir = directory
+
+    def outputDirectory(self):
+        r"""
+            このジョブのログや結果を保存するディレクトリを返す。
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.__output_dir, self.__name)
+
+    def resultFile(self):
+        r"""
+            ワーカーが書き出す結果ファイルのパスを返す。
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.outputDirectory(), ResultFileName)
+
+    def logFile(self):
+        r"""
+            ワーカーの出力を記録するログファイルのパスを返す。
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.outputDirectory(), LogFileName)
+
+    def command(self, mayapy, options):
+        r"""
+            ワーカープロセスを起動するコマンドのリストを返す。
+
+            Args:
+                mayapy (str):mayapyの実行ファイルパス
+                options (list):ワーカーに渡す追加の引数
+
+            Returns:
+                list:
+        """
+        cmd = [
+            mayapy, '-m', ModuleName, '--worker',
+            '--output', self.outputDirectory(),
+        ]
+        for lod in self.__lods or []:
+            cmd.extend(['--lod', lod])
+        return cmd + list(options) + [self.__project]
+
+    def run(self, mayapy, options=(), timeout=None):
+        r"""
+            ワーカープロセスを実行し、終了後に結果を辞書で返す。
+
+            Args:
+                mayapy (str):mayapyの実行ファイルパス
+                options (list):ワーカーに渡す追加の引数
+                timeout (float):タイムアウトまでの秒数
+
+            Returns:
+                dict:
+        """
+        output_dir = self.outputDirectory()
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        result_file = self.resultFile()
+        if os.path.exists(result_file):
+            os.remove(result_file)
+
+        # ワーカーがこのパッケージをインポートできるようにする。
+        env = dict(os.environ)
+        package_root = os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))
+        )
+        env['PYTHONPATH'] = os.pathsep.join(
+            [package_root] + [
+                x for x in [env.get('PYTHONPATH')] if x
+            ]
+        )
+
+        start = time.time()
+        is_timeout = False
+        with open(self.logFile(), 'w') as log:
+            proc = subprocess.Popen(
+                self.command(mayapy, options), stdout=log,
+                stderr=subprocess.STDOUT, env=env
+            )
+            while proc.poll() is None:
+                if timeout and time.time() - start > timeout:
+                    proc.kill()
+                    proc.wait()
+                    is_timeout = True
+                    break
+                time.sleep(0.5)
+
+        result = {
+            'name': self.__name, 'project': self.__project, 'lods': [],
+            'returnCode': proc.returncode, 'log': self.logFile(),
+        }
+        if os.path.isfile(result_file):
+            with open(result_file, 'r') as f:
+                result.update(json.load(f))
+        if is_timeout:
+            result['status'] = 'timeout'
+        elif not os.path.isfile(result_file):
+            result['status'] = 'crashed'
+        elif result['lods'] and not result.get('error') and all(
+            [x['status'] == 'success' for x in result['lods']]
+        ):
+            result['status'] = 'success'
+        else:
+            result['status'] = 'failed'
+        result['elapsed'] = time.time() - start
+        return result
+
+
+class BatchBuilder(object):
+    r"""
+        複数のプロジェクトのビルドを、指定数のワーカープロセスで並列に
+        実行するクラス。
+    """
+    def __init__(self):
+        import multiprocessing
+        self.__jobs = []
+        self.__mayapy = sys.executable
+        self.__workers = max(1, multiprocessing.cpu_count() // 2)
+        self.__output_dir = os.path.join(os.getcwd(), 'grisBatchBuild')
+        self.__timeout = None
+        self.__save_scene = True
+        self.__scene_type = 'mayaBinary'
+        self.__debug_mode = None
+
+    def setMayapy(self, path):
+        r"""
+            ワーカーとして起動するmayapyのパスを設定する。
+
+            Args:
+                path (str):
+        """
+        self.__mayapy = path
+
+    def mayapy(self):
+        r"""
+            ワーカーとして起動するmayapyのパスを返す。
+
+            Returns:
+                str:
+        """
+        return self.__mayapy
+
+    def setNumberOfWorkers(self, number):
+        r"""
+            同時に実行するワーカープロセスの数を設定する。
+
+            Args:
+                number (int):
+        """
+        self.__workers = max(1, int(number))
+
+    def numberOfWorkers(self):
+        r"""
+            同時に実行するワーカープロセスの数を返す。
+
+            Returns:
+                int:
+        """
+        return self.__workers
+
+    def setOutputDirectory(self, directory):
+        r"""
+            ログ、シーン、サマリーを保存するディレクトリを設定する。
+
+            Args:
+                directory (str):
+        """
+        self.__output_dir = os.path.abspath(directory)
+
+    def outputDirectory(self):
+        r"""
+            ログ、シーン、サマリーを保存するディレクトリを返す。
+
+            Returns:
+                str:
+        """
+        return self.__output_dir
+
+    def setTimeout(self, seconds):
+        r"""
+            １つのプロジェクトのビルドのタイムアウトまでの秒数を設定する。
+            Noneの場合はタイムアウトしない。
+
+            Args:
+                seconds (float):
+        """
+        self.__timeout = seconds
+
+    def setSaveScene(self, state, sceneType='mayaBinary'):
+        r"""
+            ビルド後のシーンを保存するかどうかと、その形式を設定する。
+
+            Args:
+                state (bool):
+                sceneType (str):mayaBinaryまたはmayaAscii
+        """
+        if sceneType not in SceneTypes:
+            raise ValueError('Unsupported scene type : %s' % sceneType)
+        self.__save_scene = bool(state)
+        self.__scene_type = sceneType
+
+    def setDebugMode(self, debugMode):
+        r"""
+            ビルド時のデバッグモードを設定する。
+
+            Args:
+                debugMode (str):
+        """
+        self.__debug_mode = debugMode
+
+    def addJob(self, projectDir, lods=None):
+        r"""
+            ビルドするプロジェクトを追加する。
+            同名のプロジェクトディレクトリがある場合は名前に番号を付加する。
+
+            Args:
+                projectDir (str):プロジェクトディレクトリ
+                lods (list):ビルドするLODのリスト(Noneの場合は全て)
+
+            Returns:
+                BuildJob:
+        """
+        job = BuildJob(projectDir, lods)
+        names = set([x.name() for x in self.__jobs])
+        name = job.name()
+        index = 1
+        while name in names:
+            name = '%s_%s' % (job.name(), index)
+            index += 1
+        job = BuildJob(projectDir, lods, name)
+        self.__jobs.append(job)
+        return job
+
+    def jobs(self):
+        r"""
+            追加されたジョブのリストを返す。
+
+            Returns:
+                list:
+        """
+        return self.__jobs[:]
+
+    def workerOptions(self):
+        r"""
+            ワーカーに渡す追加の引数のリストを返す。
+
+            Returns:
+                list:
+        """
+        options = ['--scene-type', self.__scene_type]
+        if not self.__save_scene:
+            options.append('--no-save')
+        if self.__debug_mode is not None:
+            options.extend(['--debug-mode', self.__debug_mode])
+        return options
+
+    def run(self):
+        r"""
+            全てのジョブを実行し、サマリーを辞書で返す。
+            サマリーは出力ディレクトリにsummary.jsonとしても保存される。
+
+            Returns:
+                dict:
+        """
+        from multiprocessing.pool import ThreadPool
+        if not os.path.isdir(self.__output_dir):
+            os.makedirs(self.__output_dir)
+        for job in self.__jobs:
+            job.setOutputDirectory(self.__output_dir)
+        options = self.workerOptions()
+
+        start = time.time()
+        started_at = datetime.datetime.now().strftime('%Y/%m/%d-%H:%M:%S')
+        print('# '.ljust(80, '='))
+        print('# Start batch build : %s projects, %s workers' % (
+            len(self.__jobs), self.__workers
+        ))
+        pool = ThreadPool(self.__workers)
+        results = []
+        try:
+            for result in pool.imap_unordered(
+                lambda x: x.run(self.__mayapy, options, self.__timeout),
+                self.__jobs
+            ):
+                results.append(result)
+                print('    [%s/%s] %-40s : %s (%.1f sec)' % (
+                    len(results), len(self.__jobs), result['name'],
+                    result['status'], result['elapsed']
+                ))
+        finally:
+            pool.close()
+            pool.join()
+
+        order = [x.name() for x in self.__jobs]
+        results.sort(key=lambda x: order.index(x['name']))
+        summary = {
+            'version': SummaryVersion,
+            'startTime': started_at,
+            'elapsed': time.time() - start,
+            'workers': self.__workers,
+            'succeeded': len([x for x in results if x['status'] == 'success']),
+            'failed': len([x for x in results if x['status'] != 'success']),
+            'jobs': results,
+        }
+        summary_file = os.path.join(self.__output_dir, SummaryFileName)
+        with open(summary_file, 'w') as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+        print('# Done : %s succeeded, %s failed (%.1f sec)' % (
+            summary['succeeded'], summary['failed'], summary['elapsed']
+        ))
+        print('# Summary : %s' % summary_file)
+        print('# '.ljust(80, '='))
+        return summary
+
+
+def loadJobList(filepath):
+    r"""
+        ジョブのリストをJSONファイルから読み込む。
+        ファイルの内容はプロジェクトディレクトリの文字列、または
+        {"project": ディレクトリ, "lods": [LOD, ...]}のリスト。
+
+        Args:
+            filepath (str):
+
+        Returns:
+            list:(プロジェクトディレクトリ, LODのリスト)のリスト
+    """
+    with open(filepath, 'r') as f:
+        data = json.load(f)
+    results = []
+    for job in data:
+        if isinstance(job, dict):
+            results.append((job['project'], job.get('lods')))
+        else:
+            results.append((job, None))
+    return results
+
+
+def _runWorker(arguments):
+    r"""
+        Mayaを初期化し、ワーカーとしてプロジェクトをビルドする。
+        結果は出力ディレクトリのresult.jsonに書き出す。
+
+        Args:
+            arguments (argparse.Namespace):
+
+        Returns:
+            int:終了コード
+    """
+    from maya import standalone
+    standalone.initialize(name='python')
+    returncode = 0
+    try:
+        project = arguments.projects[0]
+        try:
+            result = buildProject(
+                project, arguments.lod, arguments.output,
+                not arguments.no_save, arguments.scene_type,
+                arguments.debug_mode
+            )
+        except Exception:
+            result = {
+                'project': project, 'lods': [],
+                'error': traceback.format_exc(),
+            }
+            print(result['error'])
+        if not result['lods'] or any(
+            [x['status'] != 'success' for x in result['lods']]
+        ):
+            returncode = 1
+        if not os.path.isdir(arguments.output):
+            os.makedirs(arguments.output)
+        with open(os.path.join(arguments.output, ResultFileName), 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+    finally:
+        try:
+            standalone.uninitialize()
+        except Exception:
+            pass
+    return returncode
+
+
+def main(argv=None):
+    r"""
+        コマンドラインのエントリ関数。
+
+        Args:
+            argv (list):引数のリスト(Noneの場合はsys.argvを使用する)
+
+        Returns:
+            int:終了コード
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='mayapy -m %s' % ModuleName,
+        description='Build factory projects in separate mayapy processes.'
+    )
+    parser.add_argument('projects', nargs='*', help='project directories')
+    parser.add_argument(
+        '-f', '--file', help='JSON file listing projects and their LODs'
+    )
+    parser.add_argument(
+        '-l', '--lod', action='append', help='LOD to build (repeatable)'
+    )
+    parser.add_argument(
+        '-o', '--output', default='grisBatchBuild',
+        help='directory for logs, scenes and summary.json'
+    )
+    parser.add_argument(
+        '-w', '--workers', type=int, default=0,
+        help='number of worker processes'
+    )
+    parser.add_argument(
+        '--mayapy', default=sys.executable, help='mayapy executable'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=None,
+        help='timeout in seconds per project'
+    )
+    parser.add_argument(
+        '--no-save', action='store_true', help='do not save built scenes'
+    )
+    parser.add_argument(
+        '--scene-type', default='mayaBinary', choices=sorted(SceneTypes)
+    )
+    parser.add_argument('--debug-mode', default=None)
+    parser.add_argument('--worker', action='store_true', help='(internal)')
+    arguments = parser.parse_args(argv)
+
+    if arguments.worker:
+        if len(arguments.projects) != 1:
+            parser.error('The worker takes exactly one project.')
+        return _runWorker(arguments)
+
+    jobs = [(x, arguments.lod) for x in arguments.projects]
+    if arguments.file:
+        jobs.extend(loadJobList(arguments.file))
+    if not jobs:
+        parser.error('No project was specified.')
+
+    builder = BatchBuilder()
+    builder.setMayapy(arguments.mayapy)
+    if arguments.workers:
+        builder.setNumberOfWorkers(arguments.workers)
+    builder.setOutputDirectory(arguments.output)
+    builder.setTimeout(arguments.timeout)
+    builder.setSaveScene(not arguments.no_save, arguments.scene_type)
+    builder.setDebugMode(arguments.debug_mode)
+    for project, lods in jobs:
+        builder.addJob(project, lods)
+    summary = builder.run()
+    return 0 if not summary['failed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    Constructorのインクリメンタルビルド用のキャッシュを提供するモジュール。
+    ProcessListの各プロセスで参照された入力ファイル(currentFilesの結果)と
+    その内容のハッシュをマニフェストとして記録し、指定されたプロセスの
+    終了時点のシーンをチェックポイントとして保存する。
+    次回のビルドでは入力ファイルとコードが変わっていない最後の
+    チェックポイントからビルドを再開する。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import os
+import json
+import hashlib
+
+# マニフェストの形式のバージョン。
+ManifestVersion = 1
+ManifestFileName = 'manifest.json'
+# チェックポイントとして保存するシーンの形式と拡張子。
+SceneType = 'mayaBinary'
+SceneExtension = '.mb'
+# ハッシュ計算時に一度に読み込むバイト数。
+ChunkSize = 4 * 1024 * 1024
+
+
+def fileHash(filepath):
+    r"""
+        ファイルの内容のSHA1ハッシュを返す。
+
+        Args:
+            filepath (str):
+
+        Returns:
+            str:
+    """
+    sha = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        while True:
+            data = f.read(ChunkSize)
+            if not data:
+                break
+            sha.update(data)
+    return sha.hexdigest()
+
+
+def codeHash(filelist):
+    r"""
+        ファイルのリストの内容をまとめたハッシュを返す。
+        存在しないファイルはパスのみがハッシュに含まれる。
+
+        Args:
+            filelist (list):
+
+        Returns:
+            str:
+    """
+    sha = hashlib.sha1()
+    for filepath in sorted(set(filelist)):
+        sha.update(filepath.encode('utf-8'))
+        if os.path.isfile(filepath):
+            sha.update(fileHash(filepath).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def fileStamp(filepath, previous=None):
+    r"""
+        ファイルの[更新時間, サイズ, ハッシュ]を返す。
+        previousの更新時間とサイズが一致する場合はハッシュを再計算しない。
+        ファイルが存在しない場合はNoneを返す。
+
+        Args:
+            filepath (str):
+            previous (list):以前のfileStampの戻り値
+
+        Returns:
+            list:
+    """
+    if not os.path.isfile(filepath):
+        return None
+    stat = os.stat(filepath)
+    if previous and previous[:2] == [stat.st_mtime, stat.st_size]:
+        return list(previous)
+    return [stat.st_mtime, stat.st_size, fileHash(filepath)]
+
+
+class ProcessRecord(object):
+    r"""
+        1つのプロセスで参照された入力ファイルを記録するクラス。
+    """
+    def __init__(self, name, data=None):
+        r"""
+            Args:
+                name (str):プロセス名
+                data (dict):マニフェストに保存されていた内容
+        """
+        data = data or {}
+        self.__name = name
+        self.__queries = [list(x) for x in data.get('queries', [])]
+        self.__files = dict(data.get('files', {}))
+        self.__checkpoint = data.get('checkpoint', '')
+        self.__state = data.get('state', {})
+
+    def name(self):
+        r"""
+            プロセス名を返す。
+
+            Returns:
+                str:
+        """
+        return self.__name
+
+    def addQuery(self, rootpath, isFullPath, matchChar, filelist):
+        r"""
+            currentFilesの呼び出しとその結果を記録する。
+
+            Args:
+                rootpath (str):検索したディレクトリ
+                isFullPath (bool):
+                matchChar (str):
+                filelist (list):currentFilesの戻り値
+        """
+        query = [rootpath, bool(isFullPath), matchChar, sorted(filelist)]
+        if query not in self.__queries:
+            self.__queries.append(query)
+        for filepath in filelist:
+            if not os.path.isabs(filepath):
+                filepath = os.path.join(rootpath, filepath)
+            if filepath not in self.__files:
+                self.__files[filepath] = None
+
+    def queries(self):
+        r"""
+            記録されたcurrentFilesの呼び出しのリストを返す。
+            各要素は[ディレクトリ, isFullPath, matchChar, 結果のリスト]。
+
+            Returns:
+                list:
+        """
+        return self.__queries
+
+    def files(self):
+        r"""
+            入力ファイルのパスと[更新時間, サイズ, ハッシュ]の辞書を返す。
+
+            Returns:
+                dict:
+        """
+        return self.__files
+
+    def updateHashes(self, previous=None):
+        r"""
+            入力ファイルのハッシュを計算する。
+            previousに同じファイルの更新時間とサイズが同じ情報がある場合は
+            そのハッシュを再利用する。
+
+            Args:
+                previous (dict):以前のfilesの戻り値
+        """
+        previous = previous or {}
+        for filepath in list(self.__files):
+            self.__files[filepath] = fileStamp(
+                filepath, previous.get(filepath)
+            )
+
+    def setCheckpoint(self, scene, state):
+        r"""
+            チェックポイントのシーンと、その時点のコンストラクタの状態を
+            設定する。
+
+            Args:
+                scene (str):保存したシーンのパス
+                state (dict):Constructor.checkpointStateの戻り値
+        """
+        self.__checkpoint = scene
+        self.__state = state
+
+    def checkpoint(self):
+        r"""
+            チェックポイントのシーンのパスを返す。無い場合は空文字を返す。
+
+            Returns:
+                str:
+        """
+        return self.__checkpoint
+
+    def state(self):
+        r"""
+            チェックポイントの時点のコンストラクタの状態を返す。
+
+            Returns:
+                dict:
+        """
+        return self.__state
+
+    def toData(self):
+        r"""
+            マニフェストに保存するための辞書を返す。
+
+            Returns:
+                dict:
+        """
+        return {
+            'name': self.__name, 'queries': self.__queries,
+            'files': self.__files, 'checkpoint': self.__checkpoint,
+            'state': self.__state,
+        }
+
+
+class BuildCache(object):
+    r"""
+        インクリメンタルビルドのマニフェストとチェックポイントのシーンを
+        管理するクラス。
+    """
+    def __init__(self, directory, processNames, codeFiles, fileLister):
+        r"""
+            Args:
+                directory (str):キャッシュを保存するディレクトリ
+                processNames (list):ProcessListのプロセス名のリスト
+                codeFiles (list):ビルドに使用するスクリプトファイルのリスト
+                fileLister (function):currentFilesと同じ引数を取る関数
+        """
+        self.__directory = directory
+        self.__process_names = list(processNames)
+        self.__code_hash = codeHash(codeFiles)
+        self.__file_lister = fileLister
+        self.__previous = self.__loadManifest()
+        self.__records = []
+        self.__current = None
+
+    def directory(self):
+        r"""
+            キャッシュを保存するディレクトリを返す。
+
+            Returns:
+                str:
+        """
+        return self.__directory
+
+    def manifestFile(self):
+        r"""
+            マニフェストファイルのパスを返す。
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.__directory, ManifestFileName)
+
+    def checkpointFile(self, processName):
+        r"""
+            プロセスのチェックポイントのシーンのパスを返す。
+
+            Args:
+                processName (str):
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.__directory, processName + SceneExtension)
+
+    def __loadManifest(self):
+        r"""
+            マニフェストを読み込み、ProcessRecordのリストを返す。
+            コードやプロセスの構成が変わっている場合は空のリストを返す。
+
+            Returns:
+                list:
+        """
+        path = self.manifestFile()
+        if not os.path.isfile(path):
+            return []
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return []
+        if (
+            data.get('version') != ManifestVersion or
+            data.get('codeHash') != self.__code_hash or
+            data.get('processNames') != self.__process_names
+        ):
+            return []
+        return [
+            ProcessRecord(x['name'], x) for x in data.get('processes', [])
+        ]
+
+    def saveManifest(self):
+        r"""
+            現在までに記録したプロセスの情報をマニフェストとして保存する。
+        """
+        if not os.path.isdir(self.__directory):
+            os.makedirs(self.__directory)
+        data = {
+            'version': ManifestVersion, 'codeHash': self.__code_hash,
+            'processNames': self.__process_names,
+            'processes': [x.toData() for x in self.__records],
+        }
+        with open(self.manifestFile(), 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def __isUnchanged(self, record):
+        r"""
+            記録されたプロセスの入力が現在も同じかどうかを返す。
+
+            Args:
+                record (ProcessRecord):
+
+            Returns:
+                bool:
+        """
+        for rootpath, isfullpath, matchchar, filelist in record.queries():
+            current = self.__file_lister(rootpath, isfullpath, matchchar)
+            if sorted(current) != filelist:
+                return False
+        for filepath, stamp in record.files().items():
+            if stamp is None:
+                if os.path.exists(filepath):
+                    return False
+                continue
+            if fileStamp(filepath, stamp) != stamp:
+                return False
+        return True
+
+    def resumeIndex(self):
+        r"""
+            ビルドを再開できるProcessListのインデックスを返す。
+            先頭から入力が変わっていないプロセスをたどり、その中で最後の
+            チェックポイントの次のインデックスを返す。
+            再開できない場合は0を返す。
+
+            Returns:
+                int:
+        """
+        index = 0
+        for i, record in enumerate(self.__previous):
+            if (
+                i >= len(self.__process_names) or
+                record.name() != self.__process_names[i] or
+                not self.__isUnchanged(record)
+            ):
+                break
+            if record.checkpoint() and os.path.isfile(record.checkpoint()):
+                index = i + 1
+        return index
+
+    def restore(self, index):
+        r"""
+            resumeIndexの戻り値までのプロセスの記録を引き継ぎ、
+            そのチェックポイントのシーンを現在のシーンに読み込む。
+            引き継いだ記録より後の情報はマニフェストから破棄される。
+
+            Args:
+                index (int):resumeIndexの戻り値
+
+            Returns:
+                dict:チェックポイントの時点のコンストラクタの状態
+        """
+        self.__records = self.__previous[:index]
+        self.saveManifest()
+        if not index:
+            return {}
+        from maya import cmds
+        record = self.__records[-1]
+        print(' => Restore checkpoint : {}'.format(record.checkpoint()))
+        cmds.file(
+            record.checkpoint(), i=True, rnn=True, type=SceneType,
+            mergeNamespacesOnClash=True, namespace=':'
+        )
+        return record.state()
+
+    def startProcess(self, processName):
+        r"""
+            プロセスの入力ファイルの記録を開始する。
+
+            Args:
+                processName (str):
+
+            Returns:
+                ProcessRecord:
+        """
+        self.__current = ProcessRecord(processName)
+        return self.__current
+
+    def currentRecord(self):
+        r"""
+            記録中のプロセスのProcessRecordを返す。
+
+            Returns:
+                ProcessRecord:
+        """
+        return self.__current
+
+    def endProcess(self, isCheckpoint=False, state=None):
+        r"""
+            記録中のプロセスを終了し、マニフェストを更新する。
+            isCheckpointがTrueの場合は現在のシーンをチェックポイントとして
+            保存する。
+
+            Args:
+                isCheckpoint (bool):
+                state (dict):チェックポイントの時点のコンストラクタの状態
+        """
+        record = self.__current
+        self.__current = None
+        if record is None:
+            return
+        previous = {}
+        for r in self.__previous:
+            previous.update(r.files())
+        record.updateHashes(previous)
+        self.__records.append(record)
+        if isCheckpoint:
+            from maya import cmds
+            if not os.path.isdir(self.__directory):
+                os.makedirs(self.__directory)
+            scene = self.checkpointFile(record.name())
+            cmds.file(
+                scene, exportAll=True, force=True, type=SceneType,
+                preserveReferences=True
+            )
+            record.setCheckpoint(scene, state or {})
+        self.saveManifest()
+
+    def clear(self):
+        r"""
+            マニフェストとチェックポイントのシーンを削除する。
+        """
+        if not os.path.isdir(self.__directory):
+            return
+        for name in os.listdir(self.__directory):
+            if name == ManifestFileName or name.endswith(SceneExtension):
+                os.remove(os.path.join(self.__directory, name))
+        self.__previous = []
+        self.__records = []
@@ -17,6 +17,9 @@ import time, datetime, json, os, copy
 from . import info
 from .exporter import core
 
+# CPU時間の取得関数(python2ではprocess_timeが存在しないためclockを使用)。
+process_time = getattr(time, 'process_time', None) or time.clock
+
 def formatTime(seconds, numDigits=2):
     r"""
         与えられた浮動小数点を読みやすい時間表示にして文字列として返す。
@@ -30,7 +33,7 @@ def formatTime(seconds, numDigits=2):
     if seconds < 60:
         return '{} sec'.format(round(seconds, numDigits))
     else:
-        h, rem = divmod(seconds, 3600)
+        h, rem = divmod(int(seconds), 3600)
         m, s = divmod(rem, 60)
         return '{h}:{m:02d}:{s:02d}'.format(h=h, m=m, s=s)
 
@@ -51,13 +54,34 @@ class BuildTimer(object):
     def setEndTime(self, endTime):
         self.__endtime = endTime
 
-    @staticmethod
-    def _end_proc(datalist):
+    def _begin_measure(self, data):
+        r"""
+            プロセス開始時に計測値をdataに記録する。
+            追加の計測を行う場合はこのメソッドを上書きする。
+
+            Args:
+                data (dict):プロセスの情報を持つ辞書
+        """
+        data['cpuStartTime'] = process_time()
+
+    def _end_measure(self, data):
+        r"""
+            プロセス終了時に計測値をdataに記録する。
+            追加の計測を行う場合はこのメソッドを上書きする。
+
+            Args:
+                data (dict):プロセスの情報を持つ辞書
+        """
+        data['cpuEndTime'] = process_time()
+
+    def _end_proc(self, datalist):
         if not datalist:
             return
         last_data = datalist[-1]
         if 'endTime' in last_data:
             return
+        self._end_proc(last_data['subProcesses'])
+        self._end_measure(last_data)
         last_data['endTime'] = time.time()
 
     def _start_proc(self, processName, datalist):
@@ -65,6 +89,7 @@ class BuildTimer(object):
         data = {
             'name': processName, 'startTime': time.time(), 'subProcesses': []
         }
+        self._begin_measure(data)
         datalist.append(data)
 
     def endProcess(self):
@@ -143,6 +168,313 @@ class BuildTimer(object):
 
         return get_proc_data(self.process_list)
 
+    def summarize(self):
+        r"""
+            各プロセスの計測値を、プロセスのパス(親プロセス名/プロセス名)を
+            キーとした辞書で返す。
+            値はwall(経過時間)、cpu(CPU時間)と、計測されていれば
+            nodeDelta、memoryDelta、cmdsCallsを持つ辞書。
+
+            Returns:
+                OrderedDict:
+        """
+        from collections import OrderedDict
+        result = OrderedDict()
+        def summarize_proc(datalist, prefix):
+            for data in datalist:
+                if not 'endTime' in data:
+                    continue
+                path = prefix + data['name']
+                metrics = {'wall': data['endTime'] - data['startTime']}
+                if 'cpuEndTime' in data:
+                    metrics['cpu'] = data['cpuEndTime'] - data['cpuStartTime']
+                for key in ProfileMetricKeys:
+                    if key in data:
+                        metrics[key] = data[key]
+                result[path] = metrics
+                summarize_proc(data['subProcesses'], path + '/')
+        summarize_proc(self.process_list, '')
+        return result
+
+
+# BuildProfilerが記録する追加の計測値のキー。
+ProfileMetricKeys = ('nodeDelta', 'memoryDelta', 'cmdsCalls', 'profile')
+
+
+class BuildProfiler(BuildTimer):
+    r"""
+        BuildTimerの計測に加え、各プロセスでのノード数、メモリ使用量の増減、
+        mayaCmds経由のコマンド呼び出し回数、cProfileによるプロファイルを
+        記録するクラス。
+        記録する項目はコンストラクタのflagsで指定する。
+    """
+    NodeCount = 0b0001
+    Memory = 0b0010
+    CommandCalls = 0b0100
+    CProfile = 0b1000
+    AllMetrics = NodeCount | Memory | CommandCalls
+
+    def __init__(self, flags=AllMetrics, profileDirectory=''):
+        r"""
+            Args:
+                flags (int):記録する項目のフラグの組み合わせ
+                profileDirectory (str):cProfileの結果を書き出すディレクトリ
+        """
+        super(BuildProfiler, self).__init__()
+        self.__flags = flags
+        self.__profile_dir = profileDirectory
+        self.__profile = None
+
+    def flags(self):
+        return self.__flags
+
+    def profileDirectory(self):
+        return self.__profile_dir
+
+    @staticmethod
+    def nodeCount():
+        from maya import cmds
+        return len(cmds.ls())
+
+    @staticmethod
+    def memory():
+        r"""
+            Mayaのヒープメモリの使用量(MB)を返す。
+
+            Returns:
+                float:
+        """
+        from maya import cmds
+        return cmds.memory(heapMemory=True, megaByte=True)
+
+    def _begin_measure(self, data):
+        super(BuildProfiler, self)._begin_measure(data)
+        if self.__flags & self.NodeCount:
+            data['nodeCountStart'] = self.nodeCount()
+        if self.__flags & self.Memory:
+            data['memoryStart'] = self.memory()
+        if self.__flags & self.CommandCalls:
+            from . import mayaCmds
+            data['cmdsCallsStart'] = mayaCmds.callCounts()
+
+    def _end_measure(self, data):
+        super(BuildProfiler, self)._end_measure(data)
+        if 'nodeCountStart' in data:
+            data['nodeDelta'] = self.nodeCount() - data.pop('nodeCountStart')
+        if 'memoryStart' in data:
+            data['memoryDelta'] = self.memory() - data.pop('memoryStart')
+        if 'cmdsCallsStart' in data:
+            from . import mayaCmds
+            start = data.pop('cmdsCallsStart')
+            calls = {}
+            for cmd, num in mayaCmds.callCounts().items():
+                num -= start.get(cmd, 0)
+                if num:
+                    calls[cmd] = num
+            data['cmdsCalls'] = sum(calls.values())
+            data['cmdsCallDetails'] = dict(
+                sorted(calls.items(), key=lambda x: -x[1])[:10]
+            )
+
+    def start(self):
+        super(BuildProfiler, self).start()
+        if self.__flags & self.CommandCalls:
+            from . import mayaCmds
+            mayaCmds.resetCallCounts()
+            mayaCmds.startCallCounter()
+
+    def stop(self):
+        super(BuildProfiler, self).stop()
+        if self.__flags & self.CommandCalls:
+            from . import mayaCmds
+            mayaCmds.stopCallCounter()
+
+    def startProcess(self, processName):
+        super(BuildProfiler, self).startProcess(processName)
+        if not self.__flags & self.CProfile or not self.__profile_dir:
+            return
+        import cProfile
+        self.__profile = cProfile.Profile()
+        self.__profile.enable()
+
+    def endProcess(self):
+        if self.__profile and self.process_list:
+            self.__profile.disable()
+            if not os.path.isdir(self.__profile_dir):
+                os.makedirs(self.__profile_dir)
+            data = self.process_list[-1]
+            filepath = os.path.join(
+                self.__profile_dir, '{:02d}_{}.prof'.format(
+                    len(self.process_list), data['name']
+                )
+            )
+            self.__profile.dump_stats(filepath)
+            data['profile'] = filepath
+            self.__profile = None
+        super(BuildProfiler, self).endProcess()
+
+
+class BuildHistory(object):
+    r"""
+        各LODのビルドの計測結果の履歴をjsonで保存し、過去のビルドと比較して
+        処理時間が悪化したプロセスを検出する機能を提供するクラス。
+    """
+    Version = '1.0.0'
+    MaxEntries = 30
+    NumberOfComparisons = 5
+    RegressionThreshold = 0.2
+    MinimumSeconds = 0.5
+
+    def __init__(self, file=''):
+        r"""
+            Args:
+                file (str):履歴ファイルのパス
+        """
+        self.__file = file
+        self.__data = {}
+        if file:
+            self.load(file)
+
+    def file(self):
+        return self.__file
+
+    def load(self, file):
+        r"""
+            履歴ファイルを読み込む。ファイルがない場合は空の履歴となる。
+
+            Args:
+                file (str):
+        """
+        self.__file = file
+        self.__data = {}
+        if not os.path.exists(file):
+            return
+        with open(file, 'r') as f:
+            data = json.load(f)
+        if data.get('dataType') == self.dataType():
+            self.__data = data.get('datalist', {})
+
+    def save(self, file=None):
+        r"""
+            履歴をファイルに保存する。
+
+            Args:
+                file (str):省略した場合は読み込んだファイルに保存する
+        """
+        file = file if file else self.__file
+        data = core.getJsonMeta(self.Version)
+        data['dataType'] = self.dataType()
+        data['datalist'] = self.__data
+        with open(file, 'w') as f:
+            json.dump(data, f, indent=4)
+
+    def dataType(self):
+        return 'GrisBuildHistory'
+
+    def entries(self, lod):
+        r"""
+            lodの履歴を古い順に返す。
+
+            Args:
+                lod (str):
+
+            Returns:
+                list:
+        """
+        return copy.deepcopy(self.__data.get(lod, []))
+
+    def addEntry(self, lod, buildTimer, debugMode=None):
+        r"""
+            buildTimerの計測結果を履歴に追加する。
+            保持する履歴はMaxEntries件まで。
+
+            Args:
+                lod (str):
+                buildTimer (BuildTimer):
+                debugMode (str):実行時のモード
+        """
+        entries = self.__data.setdefault(lod, [])
+        entries.append(
+            {
+                'builtDay': datetime.datetime.now().strftime(
+                    '%Y/%m/%d-%H:%M:%S'
+                ),
+                'debugMode': '-' if debugMode is None else debugMode,
+                'buildTime': buildTimer.elapsedTime(isFormating=False),
+                'steps': buildTimer.summarize(),
+            }
+        )
+        del entries[:-self.MaxEntries]
+
+    def compare(self, lod, buildTimer, threshold=None):
+        r"""
+            buildTimerの計測結果を直近NumberOfComparisons件の履歴の平均と
+            比較し、経過時間がthreshold(割合)以上悪化したプロセスを返す。
+            MinimumSeconds未満の悪化は無視する。
+            戻り値は悪化の大きい順に並んだ辞書のリストで、各辞書は
+            step、wall、average、ratioを持つ。
+
+            Args:
+                lod (str):
+                buildTimer (BuildTimer):
+                threshold (float):省略時はRegressionThresholdを使用する
+
+            Returns:
+                list:
+        """
+        if threshold is None:
+            threshold = self.RegressionThreshold
+        entries = self.__data.get(lod, [])[-self.NumberOfComparisons:]
+        if not entries:
+            return []
+        regressions = []
+        for step, metrics in buildTimer.summarize().items():
+            history = [
+                x['steps'][step]['wall'] for x in entries
+                if step in x.get('steps', {})
+            ]
+            if not history:
+                continue
+            average = sum(history) / len(history)
+            wall = metrics['wall']
+            if wall - average < self.MinimumSeconds:
+                continue
+            ratio = (wall - average) / average if average else float('inf')
+            if ratio < threshold:
+                continue
+            regressions.append(
+                {
+                    'step': step, 'wall': wall,
+                    'average': average, 'ratio': ratio
+                }
+            )
+        regressions.sort(key=lambda x: -(x['wall'] - x['average']))
+        return regressions
+
+
+def formatRegressions(regressions):
+    r"""
+        BuildHistory.compareの結果を表示用の文字列にして返す。
+
+        Args:
+            regressions (list):
+
+        Returns:
+            str:
+    """
+    if not regressions:
+        return ''
+    lines = ['# Regressed build steps.'.ljust(80, '=')]
+    for reg in regressions:
+        lines.append(
+            '    {} : {} (average {}, +{}%)'.format(
+                reg['step'], formatTime(reg['wall']),
+                formatTime(reg['average']), int(round(reg['ratio'] * 100))
+            )
+        )
+    lines.append('=' * 80)
+    return '\n'.join(lines)
+
 
 class BuildInfoManager(core.JsonExporter):
     Version = '1.0.0'
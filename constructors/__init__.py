@@ -18,12 +18,16 @@ r"""
 """
 import os
 import re
+import sys
 
 from .. import buildInfo
-from .. import lib, node, func, core, grisNode, rigScripts, settings, verutil
+from .. import (
+    lib, node, func, core, grisNode, rigScripts, settings, verutil, nodeCache,
+    lazyLoader, moduleManifest, buildCache, grisNodeRegistry
+)
 from ..factoryModules import ModuleInfo
 from ..tools import cleanup
-from ..fileUtil import fileLinker
+from ..fileUtil import fileLinker, fileIndex
 
 cmds = func.cmds
 
@@ -264,6 +268,7 @@ class ConstructorManager(object):
     def __getitem__(self, key):
         r"""
             引数で与えれた名前のconstructorモジュールを返す。
+            モジュールは最初に参照された時点で読み込まれる。
             
             Args:
                 key (str):
@@ -271,7 +276,15 @@ class ConstructorManager(object):
             Returns:
                 module:
         """
-        return self.__constructors[key]
+        modname = self.__constructors[key]
+        module = self.__modules.get(key)
+        if module is None:
+            is_loaded = modname in sys.modules
+            module = lazyLoader.importModule(modname)
+            if is_loaded:
+                verutil.reload_module(module)
+            self.__modules[key] = module
+        return module
 
     def __contains__(self, item):
         r"""
@@ -309,16 +322,18 @@ class ConstructorManager(object):
     def reload(self):
         r"""
             constructorのリストを更新する。
+            リストはモジュールをインポートせずにマニフェストから作成され、
+            各モジュールは最初に参照された時点で読み込まれる。
+            既に読み込まれていたモジュールはその時点でリロードされる。
         """
         self.__constructors = {}
+        self.__modules = {}
         for prefix, rootpath in self.__pathset.items():
             if not os.path.isdir(rootpath):
                 continue
-            modules = lib.loadPythonModules(rootpath, prefix, 2)
-            for name, mod in modules:
-                verutil.reload_module(mod)
-                if 'Constructor' in dir(mod):
-                    self.__constructors[name.split('.')[-1]] = mod
+            manifest = moduleManifest.ModuleManifest(rootpath, prefix)
+            for name in manifest.moduleNames('Constructor'):
+                self.__constructors[name.split('.')[-1]] = name
 
     def names(self):
         r"""
@@ -602,6 +617,21 @@ class BasicConstructor(rigScripts.BaseCreator):
         メンバー変数ProcessListは、このコンストラクタが要求する
     """
     IsDebugMode = False
+    # Trueの場合、ProcessListの各プロセスの間だけnodeCacheを有効にする。
+    UseNodeCache = False
+    # Trueの場合、ビルド中はgrisNodeRegistryを有効にし、GrisNodeの検索に
+    # シーン全体のlsを使用しない。
+    UseGrisNodeRegistry = False
+    # Trueの場合、入力ファイルが変わっていない最後のチェックポイントから
+    # ビルドを再開する(buildCacheモジュールを参照)。
+    UseIncrementalBuild = False
+    # Trueの場合、ビルド開始時にプロジェクトのディレクトリを走査し、
+    # カレントファイルの検索にfileIndexを使用する。
+    # ビルド中に書き出されたファイルを見落とさないよう、問い合わせ毎に
+    # ディレクトリとリンカーの更新時間を検証する。
+    UseFileIndex = False
+    # チェックポイントとしてシーンを保存するプロセス名のリスト。
+    IncrementalCheckpoints = ('importJoints', 'importModels')
     DefaultDebugMode = 'Debug'
     DebugMode = ''
     DebugModeList = []
@@ -640,6 +670,11 @@ class BasicConstructor(rigScripts.BaseCreator):
     )
     ModelGroupName = 'all_grp'
     IsRearrangementModelGroup = True
+    # loadSkinWeightsでファイルを読み込む際のスレッド数。0以下はCPU数。
+    WeightLoadingThreads = 0
+    # ビルド時のプロファイル設定。buildInfo.BuildProfilerのフラグの組み合わせ。
+    # 0の場合は経過時間とCPU時間のみを計測する。
+    ProfileFlags = 0
 
     # createControllerNodeのオプション。=======================================
     ChainCtrl = 0b01
@@ -679,6 +714,7 @@ class BasicConstructor(rigScripts.BaseCreator):
         self.setCtrlTagAttached(True)
         self.__extraConstructor = ExtraConstructorManager(self)
         self.__build_timer = None
+        self.__build_cache = None
         for method in (
             'installExtraConstructor', 'addExtraConstructor',
             'extraConstructorUtilities', 
@@ -705,14 +741,38 @@ class BasicConstructor(rigScripts.BaseCreator):
         self.__lod = module.__name__.rsplit('.', 1)[-1].split('_', 1)[-1]
         return self.__lod
 
+    def setProfileFlags(self, flags):
+        r"""
+            ビルド時のプロファイル設定をセットする。
+            
+            Args:
+                flags (int):buildInfo.BuildProfilerのフラグの組み合わせ
+        """
+        self.ProfileFlags = flags
+
+    def profileDirectory(self):
+        r"""
+            cProfileの結果を書き出すディレクトリパスを返す。
+            
+            Returns:
+                str:
+        """
+        return os.path.join(self.projdir(), 'buildProfiles', self.lod())
+
     def createBuildTimer(self):
         r"""
             ビルド時間計測用タイマーオブジェクトを作成して返す。
+            ProfileFlagsが設定されている場合はBuildProfilerを作成する。
 
             Returns:
                 buildInfo.BuildTimer:
         """
-        self.__build_timer = buildInfo.BuildTimer()
+        if self.ProfileFlags:
+            self.__build_timer = buildInfo.BuildProfiler(
+                self.ProfileFlags, self.profileDirectory()
+            )
+        else:
+            self.__build_timer = buildInfo.BuildTimer()
         return self.__build_timer
 
     def buildTimer(self):
@@ -987,20 +1047,29 @@ class BasicConstructor(rigScripts.BaseCreator):
         if not os.path.isdir(rootpath):
             return []
         pattern = re.compile(matchChar, re.IGNORECASE)
-        filelist = [
-            x for x in os.listdir(rootpath) if pattern.search(x)
-        ]
+        if self.UseFileIndex:
+            names = fileIndex.listDir(rootpath, 0)
+        else:
+            names = os.listdir(rootpath)
+        filelist = [x for x in names if pattern.search(x)]
         if isFullPath:
             abs_files = [os.path.join(rootpath, x) for x in filelist]
             filelist = []
             for file in abs_files:
                 fl = fileLinker.getFileLinker(file)
                 if fl:
-                    p = fl.linkedPath()
+                    if self.UseFileIndex:
+                        p = fileIndex.linkedPath(fl.path(True), 0)
+                    else:
+                        p = fl.linkedPath()
                     if p:
                         file = p
                 filelist.append(file)
 
+        # インクリメンタルビルド中は入力ファイルとして記録する。
+        record = self.__build_cache and self.__build_cache.currentRecord()
+        if record:
+            record.addQuery(rootpath, isFullPath, matchChar, filelist)
         return filelist
 
     def currentModuleFiles(
@@ -1507,10 +1576,13 @@ class BasicConstructor(rigScripts.BaseCreator):
 
         # 下階層まで作成する場合。=============================================
         ignore_end_joint = option & self.IgnoreEndCtrl
-        return l_createControl(
-            target, parent, shapeCreator, spacers, calcSpaces,
-            ignore_end_joint, filter
+        result = l_createControl(
+            target, parent, None, spacers, calcSpaces, ignore_end_joint, filter
         )
+        # コントローラの形状は階層の作成後にまとめて作成する。
+        if shapeCreator and result:
+            shapeCreator.createMany([x[0] for x in result])
+        return result
         # =====================================================================        
 
     def createAngleDriver(self, target, name=None, position=0):
@@ -1976,7 +2048,10 @@ class BasicConstructor(rigScripts.BaseCreator):
 
     def loadSkinWeights(self, filelist=[], tag=''):
         r"""
-            指定したスキニング用ファイル（mel）をロードする。
+            指定したスキニング用ファイル（melまたはnpz）をロードする。
+            同名のファイルがmelとnpzの両方にある場合はnpzを優先する。
+            ファイルの解析とウェイトの読み込みはスレッドプールで並列に行い、
+            バインドとウェイトの適用のみをメインスレッドで行う。
             
             Args:
                 filelist (list):ロードするファイルのリスト
@@ -1998,44 +2073,86 @@ class BasicConstructor(rigScripts.BaseCreator):
                 return result
             return []
 
+        def loadWeights(restorer):
+            r"""
+                Args:
+                    restorer (skinWeightExporter.Restorer):
+            """
+            restorer.loadWeights()
+            return restorer
+
         sc_name_pattern = re.compile('(^.*)_wgt')
         from gris3.exporter import skinWeightExporter
         if not filelist:
             filelist = self.currentModuleFiles('weightManager', tag)
+        filelist = skinWeightExporter.selectWeightFiles(filelist)
 
-        weighted_list = {}
+        restorers = []
         for file in filelist:
             rootpath, filename = os.path.split(file)
             mobj = sc_name_pattern.search(filename)
             if not mobj:
-                continue
                 print(
                     '[Warning] : No node name found from filename.'
                     'Skip loading weights : %s' % filename
                 )
+                continue
             namelist = [mobj.group(1), 'sc']
 
-            rst = skinWeightExporter.Restorer()
-            rst.setFile(file)
+            rst = skinWeightExporter.getRestorer(file)
             rst.setSkinClusterName('_'.join(namelist))
-            info = rst.analyzeInfo()
-            shape = node.asObject(info.get('Skinned Shape'))
+            restorers.append(rst)
+        if not restorers:
+            return
+
+        # ファイルの解析とウェイトの読み込みを並列に行う。=====================
+        from multiprocessing.pool import ThreadPool
+        num_threads = self.WeightLoadingThreads
+        if num_threads < 1:
+            import multiprocessing
+            num_threads = multiprocessing.cpu_count()
+        pool = ThreadPool(max(1, min(num_threads, len(restorers))))
+        try:
+            restorers = pool.map(loadWeights, restorers)
+        finally:
+            pool.close()
+            pool.join()
+        # =====================================================================
+
+        weighted_list = {}
+        shapes = []
+        for rst in restorers:
+            shape = node.asObject(rst.analyzeInfo().get('Skinned Shape'))
             if not shape:
                 continue
+            if not shape in weighted_list:
+                shapes.append(shape)
             weighted_list[shape] = rst
 
-        loading_order = []
-        # inMesh > outMeshの接続がされている場合に備えて読み込み順序を操作する。
-        for shape in weighted_list:
-            if not shape in loading_order:
-                loading_order.append(shape)
-            srclist = listShapeFlow(shape)
-            for src in srclist:
-                if src not in loading_order or src not in weighted_list:
+        # inMesh > outMeshの接続がされている場合に備えて、接続先のシェイプが
+        # 接続元のシェイプより先に読み込まれるようにトポロジカルソートする。
+        import heapq
+        order_index = {x: i for i, x in enumerate(shapes)}
+        in_degrees = {x: 0 for x in shapes}
+        followers = {x: [] for x in shapes}
+        for shape in shapes:
+            for src in set(listShapeFlow(shape)):
+                if src == shape or src not in in_degrees:
                     continue
-                i = loading_order.index(src)
-                s = loading_order.pop(i)
-                loading_order.append(s)
+                followers[shape].append(src)
+                in_degrees[src] += 1
+        queue = [order_index[x] for x in shapes if not in_degrees[x]]
+        heapq.heapify(queue)
+        loading_order = []
+        while queue:
+            shape = shapes[heapq.heappop(queue)]
+            loading_order.append(shape)
+            for src in followers[shape]:
+                in_degrees[src] -= 1
+                if not in_degrees[src]:
+                    heapq.heappush(queue, order_index[src])
+        # 循環している場合は残りを元の順序で追加する。
+        loading_order.extend([x for x in shapes if in_degrees[x] > 0])
 
         for shape in loading_order:
             rst = weighted_list[shape]
@@ -2281,34 +2398,196 @@ class BasicConstructor(rigScripts.BaseCreator):
         print('# Start to setup.')
         timer.startProcess('initialize')
         self.loadSettings()
+        if self.UseFileIndex:
+            # カレントファイルの検索用にプロジェクトのディレクトリを
+            # 事前に走査する。
+            fileIndex.scanProject(self.projdir())
         self.initialize()
         self.printProgress('Done to initialize.', 2)
 
         extra_constructor = self.extraConstructorManager()
         extra_constructor.setBuildTimer(timer)
 
-        for process, pre_comment, post_comment in self.ProcessList:
-                timer.startProcess(process)
-                if pre_comment:
-                    self.printProgress(pre_comment)
-                extra_constructor.executeMethod('_'+process)
-                if hasattr(self, process):
-                    timer.startSubProcess('main')
-                    getattr(self, process)()
-                    timer.endSubProcess('main')
-                extra_constructor.executeMethod(process)
-                if post_comment :
-                    self.printProgress(post_comment , 2)
+        self.__build_cache = None
+        resume_index = 0
+        if self.UseIncrementalBuild:
+            timer.startProcess('restoreCheckpoint')
+            resume_index = self.restoreBuildCache()
+
+        if self.UseNodeCache:
+            nodeCache.NodeCache().resetStatistics()
+        if self.UseGrisNodeRegistry:
+            # 失敗時にもコールバックと索引が残らないようスコープで管理する。
+            with grisNodeRegistry.RegistryScope() as registry:
+                registry.resetStatistics()
+                self.executeProcessList(extra_constructor, timer, resume_index)
+                registry_stats = registry.statistics()
+        else:
+            self.executeProcessList(extra_constructor, timer, resume_index)
 
+        self.__build_cache = None
         extra_constructor.setBuildTimer()
         timer.stop()
         print('')
         print('/' * 80)
         print('Construction was done : {}'.format(self.lod()))
         print('   Setup time : {}'.format(timer.elapsedTime()))
+        if self.UseNodeCache:
+            print(
+                '   Node cache : {hits} hits / {misses} misses'.format(
+                    **nodeCache.statistics()
+                )
+            )
+        if self.UseGrisNodeRegistry:
+            print(
+                '   Gris node registry : {hits} hits / {misses} scans'.format(
+                    **registry_stats
+                )
+            )
         print('/' * 80)    
         return
 
+    def buildCacheDirectory(self):
+        r"""
+            インクリメンタルビルドのキャッシュを保存するディレクトリを返す。
+            
+            Returns:
+                str:
+        """
+        return os.path.join(self.projdir(), 'buildCache', self.lod())
+
+    def buildCodeFiles(self):
+        r"""
+            ビルドに使用するスクリプトファイルのリストを返す。
+            このコンストラクタとExtraConstructorのクラス階層のモジュールが
+            対象となり、これらが変更された場合キャッシュは使用されない。
+            
+            Returns:
+                list:
+        """
+        import inspect
+        classes = list(type(self).__mro__)
+        for ext_cst in self.extraConstructorManager().extraConstructors():
+            classes.extend(type(ext_cst).__mro__)
+        files = []
+        for cls in classes:
+            module = inspect.getmodule(cls)
+            path = getattr(module, '__file__', None)
+            if not path:
+                continue
+            path = os.path.splitext(os.path.abspath(path))[0] + '.py'
+            if not path in files:
+                files.append(path)
+        return files
+
+    def checkpointState(self):
+        r"""
+            チェックポイントとして保存するコンストラクタの状態を返す。
+            シーンに保存されない値を持つ場合は上書きして追加する。
+            
+            Returns:
+                dict:
+        """
+        return {
+            'jointBoundBoxSizes': list(self.__jointbbsize),
+            'topNodes': self.__topnodes[:],
+        }
+
+    def restoreCheckpointState(self, state):
+        r"""
+            checkpointStateで保存した状態を復元する。
+            
+            Args:
+                state (dict):
+        """
+        if 'jointBoundBoxSizes' in state:
+            self.__jointbbsize = state['jointBoundBoxSizes']
+        if 'topNodes' in state:
+            self.__topnodes = state['topNodes']
+
+    def restoreBuildCache(self):
+        r"""
+            インクリメンタルビルドの準備を行い、入力ファイルが変わって
+            いない最後のチェックポイントを読み込む。
+            戻り値はビルドを再開するProcessListのインデックス。
+            
+            Returns:
+                int:
+        """
+        self.__build_cache = buildCache.BuildCache(
+            self.buildCacheDirectory(), [x[0] for x in self.ProcessList],
+            self.buildCodeFiles(), self.currentFiles
+        )
+        index = self.__build_cache.resumeIndex()
+        state = self.__build_cache.restore(index)
+        if index:
+            self.restoreCheckpointState(state)
+            self.printProgress(
+                'Resume after {}.'.format(self.ProcessList[index - 1][0])
+            )
+        return index
+
+    def clearBuildCache(self):
+        r"""
+            インクリメンタルビルドのキャッシュを削除する。
+        """
+        buildCache.BuildCache(
+            self.buildCacheDirectory(), [x[0] for x in self.ProcessList],
+            [], self.currentFiles
+        ).clear()
+
+    def executeProcessList(self, extraConstructor, timer, resumeIndex=0):
+        r"""
+            ProcessListのプロセスを順に実行する。
+            resumeIndexより前のプロセスはキャッシュ済みとしてスキップする。
+            
+            Args:
+                extraConstructor (ExtraConstructorManager):
+                timer (buildInfo.BuildTimer):
+                resumeIndex (int):実行を開始するインデックス
+        """
+        for index, (process, pre_comment, post_comment) in enumerate(
+            self.ProcessList
+        ):
+            if index < resumeIndex:
+                self.printProgress('Skip {} (cached).'.format(process))
+                continue
+            timer.startProcess(process)
+            if pre_comment:
+                self.printProgress(pre_comment)
+            if self.__build_cache:
+                self.__build_cache.startProcess(process)
+            if self.UseNodeCache:
+                with nodeCache.CachedScope():
+                    self.executeProcess(process, extraConstructor, timer)
+            else:
+                self.executeProcess(process, extraConstructor, timer)
+            if self.__build_cache:
+                is_checkpoint = process in self.IncrementalCheckpoints
+                self.__build_cache.endProcess(
+                    is_checkpoint,
+                    self.checkpointState() if is_checkpoint else None
+                )
+            if post_comment :
+                self.printProgress(post_comment , 2)
+
+    def executeProcess(self, process, extraConstructor, timer):
+        r"""
+            ProcessListの1つのプロセスを、extraConstructorの同名のメソッドと
+            合わせて実行する。
+            
+            Args:
+                process (str):プロセス名
+                extraConstructor (ExtraConstructorManager):
+                timer (buildInfo.BuildTimer):
+        """
+        extraConstructor.executeMethod('_'+process)
+        if hasattr(self, process):
+            timer.startSubProcess('main')
+            getattr(self, process)()
+            timer.endSubProcess('main')
+        extraConstructor.executeMethod(process)
+
 
 class McpConstructor(BasicConstructor):
     r"""
@@ -86,24 +86,32 @@ class MayaFileSaver(MayaFileExporter):
         cmds.file(save=True, type=self.fileType())
 
 
-def exportMultSkinWeights(parentDir, isOverwrite=False, nodes=None):
+def exportMultSkinWeights(
+    parentDir, isOverwrite=False, nodes=None, asBinary=False
+):
     r"""
         スキニングのウェイトを書き出す。
+        asBinaryがTrueの場合はnpz形式のバイナリで書き出す。
         
         Args:
             parentDir (str):
             isOverwrite (bool):
             nodes (list):
+            asBinary (bool):バイナリ形式で書き出すかどうか
     """
     if not nodes:
         nodes = cmds.ls(sl=True)
 
-    exp = skinWeightExporter.Exporter()
+    if asBinary:
+        exp = skinWeightExporter.BinaryExporter()
+    else:
+        exp = skinWeightExporter.Exporter()
+    ext = exp.Extensions[0]
     for node in nodes:
         filepath = core.BasicExporter.getLatestFile(
-            parentDir, (node + '_wgt'), 'mel', isOverwrite=isOverwrite
+            parentDir, (node + '_wgt'), ext, isOverwrite=isOverwrite
         )
-        curpath  = os.path.join(parentDir, node + '_wgt.cur.mel')
+        curpath  = os.path.join(parentDir, node + '_wgt.cur.' + ext)
         exp.setShape(node)
 
         exp.setExportPath(filepath)
@@ -15,13 +15,26 @@ r"""
 """
 import os
 import re
+import json
 import datetime
 
 from maya import mel
 from gris3 import mayaCmds as cmds
+from gris3 import node
 from gris3.exporter import core
 
 Version = '1.0.0'
+BinaryVersion = '1.0.0'
+BinaryExtension = 'npz'
+# ウェイトファイル名からシェイプ名(_wgtより前の部分)を取り出す正規表現。
+WeightFileKeyPattern = re.compile('(^.*)_wgt')
+
+
+class WeightIndexError(RuntimeError):
+    r"""
+        ウェイトファイルのインデックスが適用先の範囲外の場合に送出される。
+    """
+    pass
 
 # /////////////////////////////////////////////////////////////////////////////
 # The main classes.                                                          //
@@ -224,10 +237,73 @@ class Exporter(core.AbstractExporter):
         # =====================================================================
 
 
+class BinaryExporter(Exporter):
+    r"""
+        スキンウェイトをバイナリ形式(numpyのnpz)で書き出す機能を提供するクラス。
+        MFnSkinCluster.getWeightsで全コンポーネントのウェイトを一度に取得し、
+        0以外のウェイトのみを疎な配列として保存する。
+    """
+    Extensions = [BinaryExtension]
+    def export(self):
+        r"""
+            ウェイトの書き出しを行う。
+        """
+        import numpy
+        current_time = datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S')
+        filepath = self.exportPath()
+        shape = self.shape()
+
+        skinCluster = mel.eval('findRelatedSkinCluster("%s");' % shape)
+        if not skinCluster:
+            raise RuntimeError(
+                'No skinCluster node was found from "%s"' % shape
+            )
+        sc = node.SkinCluster(skinCluster)
+        weights = sc.weightArray(shape)
+        components, influences = numpy.nonzero(weights)
+
+        header = {
+            'Format': '%s %s' % (__name__.split('.')[-1], BinaryVersion),
+            'Author': os.environ.get('USER', ''),
+            'Creation Date': current_time,
+            'Skinned Shape': shape,
+            'Skin Cluster': skinCluster,
+            'Skinning Method': str(sc('skinningMethod')),
+            'Maintain Max Inf': str(sc('maintainMaxInfluences')),
+            'Max Influences': str(sc('maxInfluences')),
+            'Number of Influences': str(weights.shape[1]),
+            'Number of Components': str(weights.shape[0]),
+            'Weight Distribution': str(sc('weightDistribution')),
+            'Influence order': sc.influenceNames(),
+        }
+
+        print('# Skin Weights Exporter(Binary).'.ljust(80, '='))
+        print('  Export to : %s' % filepath)
+        print('    Shape                   : %s' % shape)
+        print('    Skin Cluster            : %s' % skinCluster)
+        print('    Number of Weights       : %s' % len(components))
+        print('=' * 80)
+
+        with open(filepath, 'wb') as f:
+            numpy.savez_compressed(
+                f,
+                header=numpy.array(json.dumps(header)),
+                components=components.astype(numpy.uint32),
+                influences=influences.astype(numpy.uint32),
+                weights=weights[components, influences],
+            )
+
+
 class Restorer(object):
     r"""
         書き出されたmelのウェイトファイルを復元するクラス。
+        loadWeightsで事前にウェイトを読み込んでおくと、melを評価せずに
+        MFnSkinCluster.setWeightsで一度に適用する。
     """
+    WeightPattern = re.compile(
+        r'\.(?:wl|weightList)\[(\d+)\]\.(?:w|weights)\[(\d+)\]"\)'
+        r'\s+([^;\s]+)\s*;'
+    )
     def __init__(self, filepath=''):
         r"""
             Args:
@@ -248,6 +324,7 @@ class Restorer(object):
         """
         self.__file = filepath
         self.__param_cache = {}
+        self.__weights = None
 
     def file(self):
         r"""
@@ -364,9 +441,102 @@ class Restorer(object):
         self.__param_cache['Influence order'] = influences
         return self.__param_cache
 
-    def restore(self):
+    def readWeights(self):
         r"""
-            復元を開始する。
+            ファイルからウェイトを読み込み、コンポーネントのインデックス、
+            インフルエンスのインデックス、ウェイト値の３つの配列を返す。
+            
+            Returns:
+                tuple:(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        """
+        import numpy
+        with open(self.file(), 'r') as f:
+            found = self.WeightPattern.findall(f.read())
+        if not found:
+            return (
+                numpy.zeros(0, numpy.uint32), numpy.zeros(0, numpy.uint32),
+                numpy.zeros(0, numpy.float64)
+            )
+        data = numpy.array(found)
+        return (
+            data[:, 0].astype(numpy.uint32), data[:, 1].astype(numpy.uint32),
+            data[:, 2].astype(numpy.float64)
+        )
+
+    def loadWeights(self, force=False):
+        r"""
+            ヘッダの解析とウェイトの読み込みを行い、結果を保持する。
+            Mayaのコマンドを使用しないため、別スレッドで実行することができる。
+            
+            Args:
+                force (bool):キャッシュを破棄して強制的に更新するかどうか
+                
+            Returns:
+                tuple:readWeightsの戻り値
+        """
+        if self.__weights is not None and not force:
+            return self.__weights
+        self.analyzeInfo(force)
+        self.__weights = self.readWeights()
+        return self.__weights
+
+    def isLoaded(self):
+        r"""
+            loadWeightsでウェイトが読み込み済みかどうかを返す。
+            
+            Returns:
+                bool:
+        """
+        return self.__weights is not None
+
+    def weightArray(self, numComponents=None):
+        r"""
+            読み込んだウェイトを(コンポーネント数, インフルエンス数)の
+            numpy配列として返す。列の並びはInfluence orderと一致する。
+            
+            Args:
+                numComponents (int):コンポーネント数
+                
+            Returns:
+                numpy.ndarray:
+        """
+        import numpy
+        components, influences, weights = self.loadWeights()
+        num_infs = len(self.analyzeInfo()['Influence order'])
+        if numComponents is None:
+            numComponents = int(components.max()) + 1 if len(components) else 0
+        if len(components) and (
+            int(components.max()) >= numComponents or
+            int(influences.max()) >= num_infs
+        ):
+            raise WeightIndexError(
+                'The weight indices are out of range : %s' % self.file()
+            )
+        array = numpy.zeros((numComponents, num_infs), numpy.float64)
+        array[components, influences] = weights
+        return array
+
+    def applyWeightArray(self, skinCluster, shape, influences):
+        r"""
+            読み込んだウェイトをsetWeightsで一度に適用する。
+            
+            Args:
+                skinCluster (str):bindで作成されたskinCluster名
+                shape (str):適用先のシェイプ名
+                influences (list):バインドに使用したインフルエンスのリスト
+        """
+        sc = node.SkinCluster(skinCluster)
+        comp = sc.shapeComponent(shape)[1]
+        num_comps = node.OpenMaya2.MFnComponent(comp).elementCount
+        sc.setWeightArray(self.weightArray(num_comps), influences, shape)
+        print('Restored : %s' % self.file())
+
+    def bind(self):
+        r"""
+            解析結果を元にバインドを行い、skinClusterを作成する。
+            
+            Returns:
+                tuple:(skinCluster名, シェイプ名, インフルエンスのリスト)
         """
         boolFromStr = {
             'True':True,   '1':True,  'on':True,
@@ -390,7 +560,6 @@ class Restorer(object):
             shape = self.shape()
         else:
             shape = parameters.get('Skinned Shape', '')
-        is_matched_name = (shape == parameters.get('Skinned Shape'))
         # ---------------------------------------------------------------------
 
         # Bind skin.-----------------------------------------------------------
@@ -407,13 +576,34 @@ class Restorer(object):
                 '_sc'
             )
 
-        influences.append(shape)
-        skinCluster = cmds.skinCluster(influences, **keywords)
+        skinCluster = cmds.skinCluster(list(influences) + [shape], **keywords)
         cmds.setAttr(skinCluster[0]+'.maxInfluences', maxInfluences)
         # ---------------------------------------------------------------------
-        
-        # Apply to weight.-----------------------------------------------------
-        if is_matched_name:
+        return skinCluster[0], shape, influences
+
+    def applyWeights(self, skinCluster, shape, influences):
+        r"""
+            バインド後のskinClusterへファイルのウェイトを適用する。
+            
+            Args:
+                skinCluster (str):bindで作成されたskinCluster名
+                shape (str):適用先のシェイプ名
+                influences (list):バインドに使用したインフルエンスのリスト
+        """
+        file = self.file()
+        if self.isLoaded():
+            try:
+                self.applyWeightArray(skinCluster, shape, influences)
+                return
+            except WeightIndexError:
+                # 従来のmelによる復元は範囲外のインデックスを許容するため、
+                # melの評価にフォールバックする。
+                print(
+                    '[Warning] : The weight indices are out of range. '
+                    'Restore with mel instead : %s' % file
+                )
+
+        if shape == self.analyzeInfo().get('Skinned Shape'):
             mel.eval('source "%s";' % file.replace('\\', '/'))
             print('Matched : %s' % file)
             return
@@ -428,10 +618,192 @@ class Restorer(object):
                 if ptn.match(text):
                     text = ptn.sub(r'\1'+shape+r'\3', text)
                 buffer.append(text)
-        command = ''.join(buffer)
         mel.eval(''.join(buffer))
-        # ---------------------------------------------------------------------
 
+    def restore(self):
+        r"""
+            復元を開始する。
+        """
+        self.applyWeights(*self.bind())
+
+class BinaryRestorer(Restorer):
+    r"""
+        BinaryExporterで書き出されたnpzのウェイトファイルを復元するクラス。
+        ウェイトはMFnSkinCluster.setWeightsでシェイプ単位で一度に適用する。
+    """
+    def __init__(self, filepath=''):
+        r"""
+            Args:
+                filepath (str):入力npzファイル
+        """
+        super(BinaryRestorer, self).__init__(filepath)
+        self.__header = {}
+
+    def setFile(self, filepath):
+        r"""
+            入力ファイルパスをセットする。
+            
+            Args:
+                filepath (str):
+        """
+        super(BinaryRestorer, self).setFile(filepath)
+        self.__header = {}
+
+    def analyzeInfo(self, force=False):
+        r"""
+            与えられたウェイトファイルのヘッダを解析し、必用な情報を取得する。
+            戻り値の辞書はRestorer.analyzeInfoと同じキーを持つ。
+            
+            Args:
+                force (bool):キャッシュを破棄して強制的に更新するかどうか
+                
+            Returns:
+                dict:解析結果を持つ辞書オブジェクト
+        """
+        if self.__header and not force:
+            return self.__header
+        import numpy
+        file = self.file()
+        if not os.path.isfile(file):
+            raise RuntimeError(
+                'The specified file was not found : %s' % file
+            )
+        with numpy.load(file) as data:
+            self.__header = json.loads(str(data['header'][()]))
+        return self.__header
+
+    def readWeights(self):
+        r"""
+            ファイルからウェイトを読み込み、コンポーネントのインデックス、
+            インフルエンスのインデックス、ウェイト値の３つの配列を返す。
+            
+            Returns:
+                tuple:(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        """
+        import numpy
+        with numpy.load(self.file()) as data:
+            return (
+                data['components'], data['influences'], data['weights']
+            )
+
+    def weightArray(self, numComponents=None):
+        r"""
+            読み込んだウェイトを(コンポーネント数, インフルエンス数)の
+            numpy配列として返す。
+            numComponentsがファイルのコンポーネント数と異なる場合はエラーとなる。
+            
+            Args:
+                numComponents (int):コンポーネント数
+                
+            Returns:
+                numpy.ndarray:
+        """
+        num = int(self.analyzeInfo()['Number of Components'])
+        if numComponents is not None and numComponents != num:
+            raise RuntimeError(
+                'The number of components does not match the file : '
+                '%s(%s) - %s(%s)' % (
+                    self.shape(), numComponents, self.file(), num
+                )
+            )
+        return super(BinaryRestorer, self).weightArray(num)
+
+    def applyWeights(self, skinCluster, shape, influences):
+        r"""
+            バインド後のskinClusterへファイルのウェイトを一度に適用する。
+            
+            Args:
+                skinCluster (str):bindで作成されたskinCluster名
+                shape (str):適用先のシェイプ名
+                influences (list):バインドに使用したインフルエンスのリスト
+        """
+        self.applyWeightArray(skinCluster, shape, influences)
+
+
+def isBinaryFile(filepath):
+    r"""
+        filepathがバイナリ形式のウェイトファイルかどうかを返す。
+        
+        Args:
+            filepath (str):
+            
+        Returns:
+            bool:
+    """
+    return filepath.lower().endswith('.' + BinaryExtension)
+
+
+def getRestorer(filepath=''):
+    r"""
+        filepathの形式に対応するRestorerを返す。
+        
+        Args:
+            filepath (str):ウェイトファイルのパス
+            
+        Returns:
+            Restorer:
+    """
+    if isBinaryFile(filepath):
+        return BinaryRestorer(filepath)
+    return Restorer(filepath)
+
+
+def weightFileKey(filepath):
+    r"""
+        ウェイトファイルの対象を表すキー(ファイル名の_wgtより前の部分)を
+        返す。
+        リンカーで解決されたファイルはバージョン番号などが異なるため、
+        ディレクトリや拡張子を含むファイル名そのものはキーとしない。
+        
+        Args:
+            filepath (str):
+            
+        Returns:
+            str:
+    """
+    filename = os.path.basename(filepath)
+    mobj = WeightFileKeyPattern.search(filename)
+    if mobj:
+        return mobj.group(1)
+    return os.path.splitext(filename)[0]
+
+
+def selectWeightFiles(filelist):
+    r"""
+        同じシェイプに対してmelとバイナリ形式の両方のファイルがある場合に、
+        片方のみを残したリストを返す。
+        ファイルの対応はweightFileKeyで判定するため、リンカーがバージョンの
+        異なるファイルを指していても同じシェイプのものとして扱われる。
+        基本的にはバイナリ形式を優先し、melの方が新しい場合のみmelを使用する。
+        
+        Args:
+            filelist (list):ウェイトファイルのリスト
+            
+        Returns:
+            list:
+    """
+    files = {}
+    keys = []
+    for file in filelist:
+        key = weightFileKey(file)
+        if key not in files:
+            files[key] = file
+            keys.append(key)
+            continue
+        pre = files[key]
+        binary, legacy = (
+            (file, pre) if isBinaryFile(file) else (pre, file)
+        )
+        if not isBinaryFile(binary):
+            continue
+        try:
+            is_legacy_newer = (
+                os.path.getmtime(legacy) > os.path.getmtime(binary)
+            )
+        except OSError:
+            is_legacy_newer = False
+        files[key] = legacy if is_legacy_newer else binary
+    return [files[x] for x in keys]
 # /////////////////////////////////////////////////////////////////////////////
 #                                                                            //
 # /////////////////////////////////////////////////////////////////////////////
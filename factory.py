@@ -97,6 +97,7 @@ class FactoryData(object):
     """
     TagName = 'grisFactoryWorkspace'
     BuildLog = 'buildLog'
+    BuildHistory = 'buildHistory'
     def __init__(self):
         self.__rootpath = ''
         self.__xml_name = self.TagName + '.xml'
@@ -460,13 +461,28 @@ class FactoryData(object):
         bim.load(log_file)
         return bim
 
-    def updateBuildInfo(self, constructor):
+    def buildHistoryFile(self):
+        r"""
+            プロジェクトディレクトリ内のビルド計測履歴ファイルのパスを返す。
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.rootPath(), self.BuildHistory+'.json')
+
+    def updateBuildInfo(self, constructor, regressionThreshold=None):
         r"""
             ビルド情報を更新する。
             更新するにはビルド後のコンストラクタオブジェクトが必要となる。
+            また計測結果を履歴に追加し、過去のビルドと比べて
+            regressionThreshold(割合)以上遅くなったプロセスを報告する。
 
             Args:
                 constructor (constructors.BasicConstructor):ビルドしたコンストラクタ
+                regressionThreshold (float):悪化とみなす割合
+
+            Returns:
+                list:悪化したプロセスの情報のリスト
         """
         lod = constructor.lod()
         buildTimer = constructor.buildTimer()
@@ -478,6 +494,14 @@ class FactoryData(object):
         bim.setInformation(lod, buildTimer, debugMode)
         bim.export(log_file)
 
+        history = buildInfo.BuildHistory(self.buildHistoryFile())
+        regressions = history.compare(lod, buildTimer, regressionThreshold)
+        history.addEntry(lod, buildTimer, debugMode)
+        history.save()
+        if regressions:
+            print(buildInfo.formatRegressions(regressions))
+        return regressions
+
     def execScript(self, scriptName, debugMode=None, isReload=False):
         r"""
             リグビルド用のスクリプトを実行する。
@@ -16,7 +16,7 @@ r"""
         Proprietary and confidential
 """
 import os, inspect
-from .. import lib, uilib, factory, settings, verutil
+from .. import lib, uilib, factory, settings, verutil, moduleManifest
 QtWidgets, QtGui, QtCore = uilib.QtWidgets, uilib.QtGui, uilib.QtCore
 
 ModuleInfo = factory.ModuleInfo
@@ -490,8 +490,11 @@ class FactoryModuleManager(object):
         ]
         pathlist += p.listFactoryModules()
         for mod_name, root in pathlist:
-            for module in lib.loadPythonModules(root, mod_name, 1):
-                if not 'Department' in dir(module):
+            # Departmentを定義していないモジュールはインポートしない。
+            manifest = moduleManifest.ModuleManifest(root, mod_name)
+            for name in manifest.moduleNames('Department'):
+                module = lib.importModule(name, echoErrorMessage=True)
+                if not module or not 'Department' in dir(module):
                     continue
                 if isReload:
                     verutil.reload_module(module)
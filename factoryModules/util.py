@@ -16,7 +16,7 @@ r"""
 """
 
 import os
-from ..fileUtil import fileManager, fileLinker, operator
+from ..fileUtil import fileManager, fileLinker, fileIndex, operator
 
 
 def makeLinkInDir(parent, extensions, coordinator=None):
@@ -31,7 +31,7 @@ def makeLinkInDir(parent, extensions, coordinator=None):
     if coordinator is None:
         coordinator = fileManager.coordinateFiles
 
-    filedata = coordinator(os.listdir(parent), extensions)
+    filedata = coordinator(fileIndex.listDir(parent), extensions)
     print('# Operates in {}'.format(parent))
     for name, datalist in filedata.items():
         cur = None
@@ -60,6 +60,7 @@ def makeLinkInDir(parent, extensions, coordinator=None):
         origin = fl.path()
         if os.path.exists(origin):
             operator.deleteFiles(origin)
+    fileIndex.invalidate(parent)
     print('=' * 80)
     print()
 
@@ -90,7 +91,7 @@ def listProjectDirAndExtensions(projectPath):
         d_path = os.path.join(settings.rootPath(), d)
         if not os.path.isdir(d_path):
             continue
-        files = os.listdir(d_path)
+        files = fileIndex.listDir(d_path)
         if not files:
             continue
         extensions = [
@@ -115,6 +116,7 @@ def relinkProjectFiles(projectPath, coordinator=None):
         projectPath(str):
         coordinator(function):
     """
+    fileIndex.scanProject(projectPath)
     relink_dirs = listProjectDirAndExtensions(projectPath)
     if not relink_dirs:
         return
@@ -143,7 +143,7 @@ class ContextOption(factoryUI.ContextOption):
             return
         self.__path_editor.setText(file)
 
-        r = skinWeightExporter.Restorer(file)
+        r = skinWeightExporter.getRestorer(file)
         data = r.analyzeInfo()
         self.setInfluences(data['Influence order'])
 
@@ -163,7 +163,7 @@ class ContextOption(factoryUI.ContextOption):
             target = skinWeightExporter.cmds.ls(sl=True)[0]
             if not target:
                 return
-        r = skinWeightExporter.Restorer(file[0])
+        r = skinWeightExporter.getRestorer(file[0])
         r.setShape(target)
         if sc_name:
             r.setSkinClusterName(sc_name)
@@ -181,10 +181,14 @@ class WeightEditor(factoryModules.AbstractDepartmentGUI):
 
         self.__view = factoryUI.ModuleBrowserWidget()
         self.__view.setExtraContext(ContextOption)
-        self.__view.setExtensions('mel')
+        self.__view.setExtensions(
+            ['mel', skinWeightExporter.BinaryExtension]
+        )
         self.__view.setPath(self.workspaceDir())
         
         self.__isOverwrite = QtWidgets.QCheckBox('Overwrite to latest')
+        self.__as_binary = QtWidgets.QCheckBox('Export as binary(npz)')
+        self.__as_binary.setChecked(True)
 
         ext_btn = QtWidgets.QPushButton('Export Selected Weights')
         ext_btn.clicked.connect(self.export)
@@ -193,6 +197,7 @@ class WeightEditor(factoryModules.AbstractDepartmentGUI):
         exp_layout.setContentsMargins(0, 0, 0, 0)
         exp_layout.addWidget(self.__view)
         exp_layout.addWidget(self.__isOverwrite)
+        exp_layout.addWidget(self.__as_binary)
         exp_layout.addWidget(ext_btn)
         # =====================================================================
 
@@ -220,7 +225,9 @@ class WeightEditor(factoryModules.AbstractDepartmentGUI):
         """
         rootpath = self.workspaceDir()
         is_overwrite = self.__isOverwrite.isChecked()
-        exporter.exportMultSkinWeights(rootpath, is_overwrite)
+        exporter.exportMultSkinWeights(
+            rootpath, is_overwrite, asBinary=self.__as_binary.isChecked()
+        )
         self.__view.refresh()
 
 
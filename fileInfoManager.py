@@ -17,10 +17,22 @@ import os
 import json
 import time
 import re
+import errno
+import random
+import socket
 import shutil
 from . import lib, fileUtil, verutil
 
 
+# ロックファイルが放置されたとみなすまでの秒数。
+StaleLockTime = 60.0
+# ロック取得を再試行する際の待ち時間の最小値と最大値(秒)。
+LockRetryMinDelay = 0.005
+LockRetryMaxDelay = 0.25
+# ジャーナルの記録数がこの数を超えた場合に圧縮を行う。
+JournalCompactThreshold = 64
+
+
 class TimeoutError(Exception):
     r"""
         時間切れによる処理の中断が行われた時に送出される例外
@@ -28,11 +40,51 @@ class TimeoutError(Exception):
     pass
 
 
+def _replaceFile(src, dst):
+    r"""
+        srcをdstへ置き換える。dstが存在する場合は上書きする。
+
+        Args:
+            src (str):
+            dst (str):
+    """
+    replace = getattr(os, 'replace', None)
+    if replace:
+        replace(src, dst)
+        return
+    if os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+def _writeJsonSnapshot(filepath, data):
+    r"""
+        以前の形式のjsonファイルを書き出す。
+        一時ファイルに書き出した後に置き換えるため、以前のバージョンの
+        クライアントが書き込み途中の内容を読むことはない。
+
+        Args:
+            filepath (str):
+            data (any):
+    """
+    jsontext = json.dumps(data, ensure_ascii=False, indent=4)
+    tmpfile = '%s.%s.tmp' % (filepath, os.getpid())
+    with open(tmpfile, 'w') as f:
+        f.write(lib.encode(jsontext))
+    _replaceFile(tmpfile, filepath)
+
+
 class FileInfoModifier(object):
     r"""
         情報ファイルにロックをかけてから編集を行うコンテキストマネージャ。
         また、ロックをかけるディレクトリが存在しない場合は先に作成も行う。
+        ロックファイルはO_EXCLで作成されるため、複数のプロセスが同時に
+        ロックを取得することはない。StaleLockTime秒以上更新されていない
+        ロックファイルは放置されたものとみなし、固有の名前へリネームして
+        から削除する。
     """
+    LockFileName = '.locked'
+
     def __init__(self, infoDir, timeout=5.0):
         r"""
             引数にはロックをかける情報ディレクトリパスを渡す。
@@ -42,8 +94,8 @@ class FileInfoModifier(object):
                 timeout (float):タイムアウトまでの時間
         """
         self.__infodir = infoDir
-        self.__lockfile = os.path.join(infoDir, '.locked')
-        self.__timeout = 5.0
+        self.__lockfile = os.path.join(infoDir, self.LockFileName)
+        self.__timeout = timeout
 
     def isLocked(self):
         r"""
@@ -54,40 +106,134 @@ class FileInfoModifier(object):
         """
         return os.path.exists(self.__lockfile)
 
-    def __enter__(self):
-        def makeLockFile():
-            r"""
-                ロック状態を表す空ファイルを生成するローカル関数。
-                作成に成功した場合はTrueを返す。
-                
-                Returns:
-                    bool:
-            """
-            if self.isLocked():
-                return False
-            try:
-                f = open(self.__lockfile, 'w')
-                f.close()
-            except:
+    def __makeLockFile(self):
+        r"""
+            ロック状態を表すファイルを排他的に生成する。
+            作成に成功した場合はTrueを返す。
+            
+            Returns:
+                bool:
+        """
+        try:
+            fd = os.open(
+                self.__lockfile, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+            )
+        except OSError as e:
+            if e.errno in (errno.EEXIST, errno.EACCES):
                 return False
-            else:
-                return True
+            raise
+        try:
+            info = {
+                'host': socket.gethostname(), 'pid': os.getpid(),
+                'time': time.time()
+            }
+            os.write(fd, json.dumps(info).encode('ascii'))
+        finally:
+            os.close(fd)
+        return True
 
-        if not os.path.exists(self.__infodir):
-            os.makedirs(self.__infodir)
+    @staticmethod
+    def __lockState(filepath):
+        r"""
+            ロックファイルの内容と更新日時を返す。
+            ファイルが存在しない場合はNoneを返す。
+
+            Args:
+                filepath (str):
+
+            Returns:
+                tuple:(bytes, float)
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                data = f.read()
+            return data, os.path.getmtime(filepath)
+        except (IOError, OSError):
+            return None
+
+    def __restoreLock(self, movedfile):
+        r"""
+            誤って移動したロックファイルを元の名前に戻す。
+            既にロックファイルが作成されている場合は上書きしない。
 
+            Args:
+                movedfile (str):
+        """
+        try:
+            os.link(movedfile, self.__lockfile)
+        except (AttributeError, OSError) as e:
+            # ハードリンクが使えない場合はリネームで戻す。
+            if (
+                getattr(e, 'errno', None) != errno.EEXIST and
+                not os.path.exists(self.__lockfile)
+            ):
+                try:
+                    os.rename(movedfile, self.__lockfile)
+                    return
+                except OSError:
+                    pass
+        os.remove(movedfile)
+
+    def __removeStaleLock(self):
+        r"""
+            ロックファイルがStaleLockTime秒以上更新されていない場合は
+            削除する。
+            確認から削除までの間に他のプロセスが新しいロックを作成する
+            場合があるため、先に固有の名前へリネームし、内容と更新日時が
+            確認時と一致した場合のみ削除する。一致しない場合は元に戻す。
+        """
+        state = self.__lockState(self.__lockfile)
+        if not state or time.time() - state[1] < StaleLockTime:
+            return
+        movedfile = '%s.%s.%s.stale' % (
+            self.__lockfile, socket.gethostname(), os.getpid()
+        )
+        try:
+            os.rename(self.__lockfile, movedfile)
+        except OSError:
+            return
+        if self.__lockState(movedfile) != state:
+            self.__restoreLock(movedfile)
+            return
+        os.remove(movedfile)
+        print('# Removed stale lock : %s' % self.__lockfile)
+
+    def __retry(self, function, message):
+        r"""
+            functionがTrueを返すまで待ち時間を伸ばしながら再試行する。
+            タイムアウトした場合はTimeoutErrorを送出する。
+
+            Args:
+                function (function):
+                message (str):タイムアウト時のメッセージ
+        """
         st = time.time()
+        delay = LockRetryMinDelay
         while(True):
-            test = makeLockFile()
-            if test:
-                return self
+            if function():
+                return
             if time.time() - st > self.__timeout:
                 raise TimeoutError(
-                    'Failed to modify the file info. [%s]' % os.path.basename(
-                        self.__infodir
-                    )
+                    '%s [%s]' % (message, os.path.basename(self.__infodir))
                 )
-            time.sleep(0.25)
+            time.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, LockRetryMaxDelay)
+
+    def __enter__(self):
+        def acquire():
+            if self.__makeLockFile():
+                return True
+            self.__removeStaleLock()
+            return False
+
+        if not os.path.exists(self.__infodir):
+            try:
+                os.makedirs(self.__infodir)
+            except OSError:
+                if not os.path.isdir(self.__infodir):
+                    raise
+        self.__retry(acquire, 'Failed to modify the file info.')
+        return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         r"""
@@ -101,28 +247,165 @@ class FileInfoModifier(object):
             Returns:
                 bool:
         """
-        st = time.time()
-        while(True):
+        def release():
             try:
                 os.remove(self.__lockfile)
-            except:
-                pass
-            else:
-                return False
-            if time.time() - st > self.__timeout:
-                raise TimeoutError(
-                    'Failed to release the lock. [%s]' % os.path.basename(
-                        self.__infodir
-                    )
-                )
-            time.sleep(0.25)
+            except OSError as e:
+                return e.errno == errno.ENOENT
+            return True
+
+        self.__retry(release, 'Failed to release the lock.')
+        return False
+
+
+class JsonJournal(object):
+    r"""
+        追記のみを行うJSON Lines形式のジャーナルファイルを扱うクラス。
+        1行目はジャーナルを識別するヘッダで、以降の各行に記録を1件ずつ
+        保持する。読み込んだ結果はパスごとにキャッシュされ、次回以降は
+        前回読み込んだ位置より後に追記された行のみを読み込む。
+        書き込みはFileInfoModifierでロックをかけた状態で行うこと。
+    """
+    Version = 1
+    __CACHE__ = {}
+
+    def __init__(self, filepath):
+        r"""
+            Args:
+                filepath (str):ジャーナルファイルのパス
+        """
+        self.__filepath = filepath
+
+    def path(self):
+        r"""
+            ジャーナルファイルのパスを返す。
+
+            Returns:
+                str:
+        """
+        return self.__filepath
+
+    def exists(self):
+        r"""
+            ジャーナルファイルが存在するかどうかを返す。
+
+            Returns:
+                bool:
+        """
+        return os.path.isfile(self.__filepath)
+
+    def __header(self):
+        r"""
+            新しいヘッダ行を返す。ヘッダはファイルの作成の度に作り直され、
+            キャッシュの有効性の判定に使用される。
+
+            Returns:
+                str:
+        """
+        return json.dumps(
+            {'journal': self.Version, 'id': '%016x' % random.getrandbits(64)}
+        )
+
+    def entries(self):
+        r"""
+            ジャーナルに記録された内容をリストで返す。
+            
+            Returns:
+                list:
+        """
+        path = self.__filepath
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            self.__CACHE__.pop(path, None)
+            return []
+        cache = self.__CACHE__.get(path)
+        with open(path, 'rb') as f:
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                return []
+            if (
+                not cache or cache['header'] != header or
+                size < cache['offset']
+            ):
+                cache = {'header': header, 'offset': f.tell(), 'entries': []}
+            if size > cache['offset']:
+                f.seek(cache['offset'])
+                data = f.read()
+                # 書き込み途中の最終行は次回に読み込む。
+                end = data.rfind(b'\n') + 1
+                for line in data[:end].splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        cache['entries'].append(
+                            json.loads(line.decode('ascii'))
+                        )
+                    except ValueError:
+                        print('# Skipped a broken line in %s' % path)
+                cache['offset'] += end
+        self.__CACHE__[path] = cache
+        return cache['entries'][:]
+
+    def append(self, *entries):
+        r"""
+            ジャーナルの末尾に記録を追加する。
+            
+            Args:
+                *entries (any):JSONに変換可能な値
+        """
+        lines = [json.dumps(x) for x in entries]
+        if not self.exists():
+            lines.insert(0, self.__header())
+        with open(self.__filepath, 'ab') as f:
+            f.write(('\n'.join(lines) + '\n').encode('ascii'))
+
+    def remove(self):
+        r"""
+            ジャーナルファイルを削除する。
+        """
+        self.__CACHE__.pop(self.__filepath, None)
+        if self.exists():
+            os.remove(self.__filepath)
+
+def _replayLogEntries(data, entries):
+    r"""
+        ログのジャーナルの記録をdataに順に適用したリストを返す。
+        記録は{'op':'add', 'data':dict}の形式。
+        既にdataに含まれている記録は、スナップショットの書き出し後に
+        ジャーナルの削除が行われなかったものとみなして適用しない。
+
+        Args:
+            data (list):
+            entries (list):
+
+        Returns:
+            list:
+    """
+    data = list(data)
+    keys = set(json.dumps(x, sort_keys=True) for x in data)
+    for entry in entries:
+        if entry.get('op') != 'add':
+            continue
+        key = json.dumps(entry['data'], sort_keys=True)
+        if key not in keys:
+            keys.add(key)
+            data.append(entry['data'])
+    return data
+
 
 class FileInfoManager(object):
     r"""
         ファイル情報を編集するための機能を提供するクラス。
+        ログ情報はジャーナル(log.jsonl)に追記され、圧縮時に以前の形式の
+        log.jsonへ書き出される。log.jsonはこのジャーナルを扱えない
+        以前のバージョンとの互換用のスナップショットとして残され、
+        ログ情報はlog.jsonの内容にジャーナルの記録を適用したものとなる。
     """
     FileTable = {
         'log':['log.json'],
+        'journal':['log.jsonl'],
         'image':['images', 'image.png'],
     }
     def __init__(self):
@@ -188,9 +471,30 @@ class FileInfoManager(object):
             shutil.rmtree(rootdir)
         return True
 
+    def logJournal(self):
+        r"""
+            ログ情報のジャーナルを返す。
+
+            Returns:
+                JsonJournal:
+        """
+        return JsonJournal(self.infoDir('journal'))
+
     def logData(self):
         r"""
             ログ情報を展開してlistにして返す。
+            以前の形式のlog.jsonの内容にジャーナルの記録を適用した結果を返す。
+            
+            Returns:
+                list:
+        """
+        return _replayLogEntries(
+            self.__legacyLogData(), self.logJournal().entries()
+        )
+
+    def __legacyLogData(self):
+        r"""
+            以前の形式のlog.jsonの内容を返す。
             
             Returns:
                 list:
@@ -220,15 +524,30 @@ class FileInfoManager(object):
 
     def saveLogData(self, data):
         r"""
-            ログ情報を書き出す。
+            ログ情報をlog.jsonに書き出し、ジャーナルを削除する。
             
             Args:
                 data (list):
         """
-        logpath = self.infoDir('log')
-        data = json.dumps(data, ensure_ascii=False, indent=4)
-        with open(logpath, 'w') as f:
-            f.write(lib.encode(data))
+        _writeJsonSnapshot(self.infoDir('log'), data)
+        self.logJournal().remove()
+
+    def appendLogData(self, data):
+        r"""
+            ログ情報を1件ジャーナルに追記する。
+            ジャーナルの記録数がJournalCompactThresholdを超えた場合は
+            log.jsonへの書き出しを行う。
+            saveLogDataと同じく、ロック処理は呼び出し側で行うこと。
+            
+            Args:
+                data (dict):
+        """
+        entry = {'op': 'add', 'data': data}
+        journal = self.logJournal()
+        if len(journal.entries()) >= JournalCompactThreshold:
+            self.saveLogData(_replayLogEntries(self.logData(), [entry]))
+            return
+        journal.append(entry)
 
     def setImage(self, imageFile, move=False):
         r"""
@@ -351,10 +670,8 @@ class FileInfoManager(object):
                 dict:
         """
         with FileInfoModifier(self.infoDir()):
-            data = self.logData()
             new_data = self.createData(comment=comment, **keywords)
-            data.append(new_data)
-            self.saveLogData(data)
+            self.appendLogData(new_data)
         return new_data
 
     def setComment(self, comment, **keywords):
@@ -427,7 +744,10 @@ class FileInfoManager(object):
                 if dataList:
                     self.saveLogData(dataList)
                 else:
-                    os.remove(self.infoDir('log'))
+                    self.logJournal().remove()
+                    logpath = self.infoDir('log')
+                    if os.path.exists(logpath):
+                        os.remove(logpath)
 
             if not dataList:
                 self.removeInfo(False)
@@ -496,9 +816,13 @@ class FileExistingError(Exception):
 class FileDiscarder(object):
     r"""
         古いファイルの管理を行う機能を提供するクラス。
+        移動したファイルの情報はジャーナルに追記され、cleanupなどの
+        圧縮時に以前の形式のjsonファイルへ書き出される。jsonファイルは
+        以前のバージョンとの互換用のスナップショットとして残される。
     """
     TargetDirectoryName = '.discarded'
     Jsonfilename = '.discarded_filemanager'
+    JournalFilename = '.discarded_filemanager.jsonl'
     def __init__(self, workdir=''):
         r"""
             Args:
@@ -539,6 +863,19 @@ class FileDiscarder(object):
         jsonfile = os.path.join(dscdir, self.Jsonfilename)
         return workdir, dscdir, jsonfile
 
+    def journal(self):
+        r"""
+            移動したファイルの情報を記録するジャーナルを返す。
+            ワークディレクトリが存在しない場合はNoneを返す。
+            
+            Returns:
+                JsonJournal:
+        """
+        workdir, dscdir, jsonfile = self.workDiscardedDirs()
+        if not workdir:
+            return None
+        return JsonJournal(os.path.join(dscdir, self.JournalFilename))
+
     def listMovedFiles(self):
         r"""
             移動されたデータのファイル名とその情報を持つ辞書を返す。
@@ -550,23 +887,43 @@ class FileDiscarder(object):
         if not workdir:
             return {}
 
-        ignored_ptn = re.compile('^\%s$|^__bk\d+$'+self.Jsonfilename)
-        dscdir = os.path.join(workdir, self.TargetDirectoryName)
-
+        newlist = {}
         if os.path.exists(jsonfile):
             with open(jsonfile, 'r') as f:
                 newlist = json.load(f)
-            # リストのクリーンナップ。
-            current_filelist = [
-                x for x in os.listdir(dscdir) if not ignored_ptn.match(x)
-            ]
-            return {
-                x:y for x, y in newlist.items()
-                if x in current_filelist
-            }
-        else:
+        for entry in self.journal().entries():
+            if entry.get('op') == 'add':
+                newlist.update(entry['data'])
+        if not newlist:
             return {}
 
+        # リストのクリーンナップ。
+        ignored_ptn = re.compile(
+            '^(%s|%s|%s)$|^__bk\d+$' % tuple([
+                re.escape(x) for x in (
+                    self.Jsonfilename, self.JournalFilename,
+                    FileInfoModifier.LockFileName
+                )
+            ])
+        )
+        current_filelist = set([
+            x for x in os.listdir(dscdir) if not ignored_ptn.match(x)
+        ])
+        return {
+            x:y for x, y in newlist.items()
+            if x in current_filelist
+        }
+
+    def compact(self):
+        r"""
+            現在のlistMovedFilesの結果を以前の形式のjsonファイルに
+            書き出し、ジャーナルを削除する。
+        """
+        workdir, dscdir, jsonfile = self.workDiscardedDirs()
+        with FileInfoModifier(dscdir):
+            _writeJsonSnapshot(jsonfile, self.listMovedFiles())
+            self.journal().remove()
+
     def writeFile(self, filepath, datalist):
         r"""
             ファイル情報をjsonファイルに書き出す。
@@ -603,9 +960,7 @@ class FileDiscarder(object):
             os.makedirs(dscdir)
         # =====================================================================
         
-        # 管理用のデータを作成する。
-        datalist = self.listMovedFiles()
-        # =====================================================================
+        datalist = {}
         cnt = 0
         for file in filepathes:
             if not os.path.exists(file):
@@ -633,9 +988,12 @@ class FileDiscarder(object):
             return
         # =====================================================================
 
-        # ファイル情報をjsonファイルに書き出す。===============================
-        # 失敗した場合はバックアップ用jsonファイルへと書き出す。
-        self.writeFile(jsonfile, datalist)
+        # ファイル情報をジャーナルに追記する。=================================
+        journal = self.journal()
+        with FileInfoModifier(dscdir):
+            journal.append({'op': 'add', 'data': datalist})
+        if len(journal.entries()) >= JournalCompactThreshold:
+            self.compact()
         # =====================================================================
 
     def restore(self, filename, fileInfo, overrideTargetName=None):
@@ -682,7 +1040,7 @@ class FileDiscarder(object):
             except:
                 pass
             return
-        self.writeFile(jsonfile, datalist)
+        self.compact()
 
     def removeFiles(self, filenames):
         r"""
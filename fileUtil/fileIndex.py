@@ -0,0 +1,370 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    Factoryプロジェクトのディレクトリの内容とリンカーの解決結果を
+    メモリ上に保持するインデックスを提供するモジュール。
+    ネットワークストレージ上のプロジェクトで、listdirやリンカーの読み込みの
+    往復を減らすために使用する。
+    ディレクトリの一覧はディレクトリの更新時間、リンカーのリンク先は
+    リンカーファイルの更新時間とサイズをキーとしてキャッシュされる。
+    最後に検証してからRevalidateInterval秒以内の問い合わせは、
+    statも行わずにメモリ上の内容を返す。問い合わせ毎にintervalを
+    指定した場合はその秒数が使用される。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import os
+import time
+import threading
+
+# 検証を省略してキャッシュを返す秒数。
+RevalidateInterval = 2.0
+# scanProjectでプロジェクトルートから走査するディレクトリの深さ。
+DefaultScanDepth = 3
+# scanProjectで使用するスレッド数。
+DefaultScanThreads = 8
+
+
+def _stat(path):
+    r"""
+        パスの(更新時間, サイズ)を返す。存在しない場合はNoneを返す。
+
+        Args:
+            path (str):
+
+        Returns:
+            tuple:
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+def _scanDirectory(path):
+    r"""
+        ディレクトリ内のファイル名と、サブディレクトリのパスのリストを返す。
+        os.scandirが使用できる場合はそちらを使用する。
+
+        Args:
+            path (str):
+
+        Returns:
+            tuple:(ファイル名のリスト, サブディレクトリのパスのリスト)
+    """
+    names = []
+    subdirs = []
+    scandir = getattr(os, 'scandir', None)
+    if scandir:
+        for entry in scandir(path):
+            names.append(entry.name)
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+        return names, subdirs
+    for name in os.listdir(path):
+        names.append(name)
+        subpath = os.path.join(path, name)
+        if os.path.isdir(subpath):
+            subdirs.append(subpath)
+    return names, subdirs
+
+
+class FileIndex(object):
+    r"""
+        ディレクトリの一覧とリンカーのリンク先をキャッシュする
+        シングルトンクラス。
+    """
+    def __new__(cls):
+        if hasattr(cls, '__instance__'):
+            return cls.__instance__
+        obj = super(FileIndex, cls).__new__(cls)
+        obj.__dirs = {}
+        obj.__links = {}
+        obj.__lock = threading.Lock()
+        obj.__interval = RevalidateInterval
+        obj.__hits = 0
+        obj.__misses = 0
+        cls.__instance__ = obj
+        return obj
+
+    def setRevalidateInterval(self, seconds):
+        r"""
+            検証を省略してキャッシュを返す秒数を設定する。
+            0の場合は問い合わせの度に更新時間を検証する。
+
+            Args:
+                seconds (float):
+        """
+        self.__interval = max(0.0, float(seconds))
+
+    def revalidateInterval(self):
+        r"""
+            検証を省略してキャッシュを返す秒数を返す。
+
+            Returns:
+                float:
+        """
+        return self.__interval
+
+    def statistics(self):
+        r"""
+            ヒット数、ミス数、ディレクトリ数、リンカー数を持つ辞書を返す。
+
+            Returns:
+                dict:
+        """
+        return {
+            'hits': self.__hits, 'misses': self.__misses,
+            'directories': len(self.__dirs), 'linkers': len(self.__links),
+        }
+
+    @staticmethod
+    def __key(path):
+        r"""
+            キャッシュのキーとなる正規化されたパスを返す。
+
+            Args:
+                path (str):
+
+            Returns:
+                str:
+        """
+        return os.path.normcase(os.path.abspath(path))
+
+    def __scan(self, path):
+        r"""
+            ディレクトリを走査してキャッシュに登録し、サブディレクトリの
+            パスのリストを返す。
+
+            Args:
+                path (str):
+
+            Returns:
+                list:
+        """
+        stamp = _stat(path)
+        if stamp is None:
+            with self.__lock:
+                self.__dirs.pop(self.__key(path), None)
+            return []
+        names, subdirs = _scanDirectory(path)
+        with self.__lock:
+            self.__dirs[self.__key(path)] = {
+                'mtime': stamp[0], 'names': names, 'subdirs': subdirs,
+                'checked': time.time(),
+            }
+        return subdirs
+
+    def __trustInterval(self, interval):
+        r"""
+            検証を省略する秒数を返す。intervalがNoneの場合は
+            setRevalidateIntervalで設定された値を返す。
+
+            Args:
+                interval (float):
+
+            Returns:
+                float:
+        """
+        return self.__interval if interval is None else interval
+
+    def __validEntry(self, path, interval=None):
+        r"""
+            ディレクトリのキャッシュが有効であればその内容を返す。
+            無効な場合はNoneを返す。
+
+            Args:
+                path (str):
+                interval (float):検証を省略する秒数
+
+            Returns:
+                dict:
+        """
+        entry = self.__dirs.get(self.__key(path))
+        if entry is None:
+            return
+        now = time.time()
+        if now - entry['checked'] < self.__trustInterval(interval):
+            return entry
+        stamp = _stat(path)
+        if stamp is None or stamp[0] != entry['mtime']:
+            return
+        entry['checked'] = now
+        return entry
+
+    def listDir(self, path, interval=None):
+        r"""
+            os.listdirと同じくディレクトリ内の名前のリストを返す。
+            ディレクトリが存在しない場合はOSErrorを送出する。
+
+            Args:
+                path (str):
+                interval (float):検証を省略する秒数
+
+            Returns:
+                list:
+        """
+        entry = self.__validEntry(path, interval)
+        if entry is not None:
+            self.__hits += 1
+            return entry['names'][:]
+        self.__misses += 1
+        if not os.path.isdir(path):
+            raise OSError('No such directory : %s' % path)
+        self.__scan(path)
+        return self.__dirs[self.__key(path)]['names'][:]
+
+    def linkedPath(self, linkerPath, interval=None):
+        r"""
+            リンカーが指しているファイルパスを返す。
+            結果はリンカーファイルの更新時間とサイズをキーにキャッシュされる。
+
+            Args:
+                linkerPath (str):リンカーファイルのパス(拡張子付き)
+                interval (float):検証を省略する秒数
+
+            Returns:
+                str:
+        """
+        from . import fileLinker
+        key = self.__key(linkerPath)
+        entry = self.__links.get(key)
+        now = time.time()
+        if (
+            entry is not None and
+            now - entry['checked'] < self.__trustInterval(interval)
+        ):
+            self.__hits += 1
+            return entry['target']
+        stamp = _stat(linkerPath)
+        if entry is not None and entry['stamp'] == stamp:
+            entry['checked'] = now
+            self.__hits += 1
+            return entry['target']
+        self.__misses += 1
+        target = fileLinker.FileLinker(linkerPath).linkedPath()
+        with self.__lock:
+            self.__links[key] = {
+                'stamp': stamp, 'target': target, 'checked': now
+            }
+        return target
+
+    def scan(self, directories, depth=DefaultScanDepth, threads=0):
+        r"""
+            ディレクトリ以下を指定の深さまで並列に走査してキャッシュする。
+
+            Args:
+                directories (list):
+                depth (int):走査する深さ(1の場合は指定ディレクトリのみ)
+                threads (int):スレッド数(0以下の場合はDefaultScanThreads)
+
+            Returns:
+                int:走査したディレクトリの数
+        """
+        from multiprocessing.pool import ThreadPool
+        threads = threads if threads > 0 else DefaultScanThreads
+        pending = [x for x in directories if os.path.isdir(x)]
+        count = 0
+        pool = ThreadPool(threads)
+        try:
+            for level in range(depth):
+                if not pending:
+                    break
+                results = pool.map(self.__scan, pending)
+                count += len(pending)
+                if level == depth - 1:
+                    break
+                pending = [x for subdirs in results for x in subdirs]
+        finally:
+            pool.close()
+            pool.join()
+        return count
+
+    def invalidate(self, path=None):
+        r"""
+            キャッシュを破棄する。
+            pathを指定した場合はそのディレクトリと、その中のリンカーの
+            キャッシュを破棄する。ファイルのパスを指定した場合はその親
+            ディレクトリが対象となる。
+
+            Args:
+                path (str):
+        """
+        with self.__lock:
+            if path is None:
+                self.__dirs.clear()
+                self.__links.clear()
+                return
+            key = self.__key(path)
+            if not key in self.__dirs and not os.path.isdir(path):
+                key = self.__key(os.path.dirname(path))
+            self.__dirs.pop(key, None)
+            prefix = key.rstrip(os.sep) + os.sep
+            for link in [x for x in self.__links if x.startswith(prefix)]:
+                del self.__links[link]
+
+
+def listDir(path, interval=None):
+    r"""
+        インデックスを経由してディレクトリ内の名前のリストを返す。
+
+        Args:
+            path (str):
+            interval (float):検証を省略する秒数
+
+        Returns:
+            list:
+    """
+    return FileIndex().listDir(path, interval)
+
+
+def linkedPath(linkerPath, interval=None):
+    r"""
+        インデックスを経由してリンカーのリンク先を返す。
+
+        Args:
+            linkerPath (str):リンカーファイルのパス(拡張子付き)
+            interval (float):検証を省略する秒数
+
+        Returns:
+            str:
+    """
+    return FileIndex().linkedPath(linkerPath, interval)
+
+
+def scanProject(projectPath, depth=DefaultScanDepth, threads=0):
+    r"""
+        Factoryプロジェクトのディレクトリを走査してインデックスを作成する。
+
+        Args:
+            projectPath (str):プロジェクトのルートディレクトリ
+            depth (int):走査する深さ
+            threads (int):スレッド数
+
+        Returns:
+            int:走査したディレクトリの数
+    """
+    return FileIndex().scan([projectPath], depth, threads)
+
+
+def invalidate(path=None):
+    r"""
+        インデックスを破棄する。pathを指定した場合はそのディレクトリのみ
+        破棄する。
+
+        Args:
+            path (str):
+    """
+    FileIndex().invalidate(path)
@@ -20,6 +20,7 @@ import re
 import json
 from ..exporter import core
 from .. import fileUtil
+from . import fileIndex
 
 Version = '1.0.0'
 
@@ -104,6 +105,7 @@ class FileLinker(object):
         with open(filepath, 'w') as f:
             text = json.dumps(data, indent=4, ensure_ascii=False)
             f.write(text)
+        fileIndex.invalidate(filepath)
 
 
 def getFileLinker(filepath, linkerObj=FileLinker):
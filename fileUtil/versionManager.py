@@ -15,6 +15,7 @@ r"""
 """
 import re
 import os
+from . import fileIndex
 
 class VersionManager(object):
     r"""
@@ -205,10 +206,12 @@ class VersionManager(object):
         if not os.path.isdir(self.rootPath()):
             return self.__list
 
+        if force:
+            fileIndex.invalidate(self.rootPath())
         re_obj = self.makeReglarExpression()
         as_minor = self.asMinorVersion()
 
-        for file in os.listdir(self.rootPath()):
+        for file in fileIndex.listDir(self.rootPath()):
             obj = re_obj.search(file)
             if not obj:
                 continue
@@ -847,6 +847,31 @@ def listMatrixPath(targetA, targetB):
     return mtxlist, invlist[:-1]
 
 
+def matrixPathMatrix(targetA, targetB):
+    r"""
+        listMatrixPathで得られる経路の行列を乗算した結果を返す。
+        経路上のノードの行列は一度にまとめて取得し、乗算は配列で行う。
+        共通の親が見つからない場合はNoneを返す。
+
+        Args:
+            targetA (str): トランスフォームノード（開始地点）
+            targetB (str):トランスフォームノード（終了地点）
+
+        Returns:
+            list: 16個のfloatを持つリスト
+    """
+    from . import matrixArray
+    path = listMatrixPath(targetA, targetB)
+    if not path:
+        return
+    plugs = (
+        [x + '.matrix' for x in path[0]] +
+        [x + '.inverseMatrix' for x in path[1]]
+    )
+    matrices = matrixArray.asMatrices(node.getAttrs(plugs))
+    return matrixArray.toLists(matrixArray.multiplyChain(matrices))[0]
+
+
 def expandAttr(attributes):
     r"""
         t、r、s、アトリビュートをt:aの書式で渡した場合、[tx, ty, tz]のように
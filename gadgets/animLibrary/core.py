@@ -16,11 +16,14 @@ r"""
 import os
 import json
 import time
+import uuid
 import codecs
 import shutil
 from abc import ABCMeta, abstractmethod
-from ... import node, lib, verutil, settings
-Version = 0.5
+from collections import OrderedDict
+from ... import node, lib, settings
+from . import poseIndex
+Version = 0.6
 
 
 def checkSelection():
@@ -284,31 +287,62 @@ class PoseDataManager(AbstractDataManager):
         """
         return 'pose'
 
+    PoseFile = 'pose.npz'
+    LegacyPoseFile = 'pose.json'
+
     def writeMethod(self, selectedNodeList, rootdir):
         r"""
             各ノードのkeyableアトリビュートの値を書き出す。
+            値はnode.getAttrsで一括取得し、ノード名とアトリビュート名の
+            インデックスと値の配列からなるnpz形式で保存する。
+            数値以外の値はjson文字列の配列として別に保持する。
+            また、以前のバージョンで読み込めるよう旧形式のjsonも書き出す。
             
             Args:
                 selectedNodeList (list):
                 rootdir (str):書き出し先のディレクトリパス。
         """
+        import numpy
         posedata = {}
+        nodes, attrs = [], []
+        numeric = ([], [], [])
+        extra = ([], [], [])
         for name, srcnode in selectedNodeList:
-            keyable_attrs = srcnode.listAttr(k=True)
-            datalist = {}
-            for attr in keyable_attrs:
-                datalist[attr.attrName()] = attr.get()
-            posedata[name] = datalist
-
-        with open(os.path.join(rootdir, 'pose.json'), 'w') as f:
+            keyable_attrs = srcnode.listAttr(k=True, asStr=True)
+            if not keyable_attrs:
+                continue
+            current = node.getAttrs(
+                [srcnode / x for x in keyable_attrs]
+            )
+            posedata[name] = dict(zip(keyable_attrs, current))
+            node_id = len(nodes)
+            nodes.append(name)
+            for attr, value in zip(keyable_attrs, current):
+                if attr not in attrs:
+                    attrs.append(attr)
+                if isinstance(value, (int, float)):
+                    table = numeric
+                else:
+                    table, value = extra, json.dumps(value)
+                table[0].append(node_id)
+                table[1].append(attrs.index(attr))
+                table[2].append(value)
+
+        numpy.savez_compressed(
+            os.path.join(rootdir, self.PoseFile),
+            nodes=numpy.array(nodes, dtype=numpy.str_),
+            attrs=numpy.array(attrs, dtype=numpy.str_),
+            nodeIndices=numpy.array(numeric[0], dtype=numpy.int32),
+            attrIndices=numpy.array(numeric[1], dtype=numpy.int32),
+            values=numpy.array(numeric[2], dtype=numpy.float64),
+            extraNodeIndices=numpy.array(extra[0], dtype=numpy.int32),
+            extraAttrIndices=numpy.array(extra[1], dtype=numpy.int32),
+            extraValues=numpy.array(extra[2], dtype=numpy.str_),
+        )
+        with open(os.path.join(rootdir, self.LegacyPoseFile), 'w') as f:
             json.dump(
                 posedata, f, sort_keys=True, indent=4, ensure_ascii=False
             )
-        # スクリーンキャプチャの書き出し。
-        # from gris3.uilib import mayaUIlib
-        # mayaUIlib.write3dViewToFile(
-            # os.path.join(rootdir, 'thumb.png'), 256, 256
-        # )
 
     def applyThumbnail(self, thumbnailPath, rootdir):
         r"""
@@ -324,19 +358,87 @@ class PoseDataManager(AbstractDataManager):
     
     def setupReading(self, namespaces, rootDir):
         r"""
-            ポーズ情報のデータを読み込む
+            ポーズ情報のデータを読み込む。
+            npz形式のファイルがない場合は旧形式のjsonファイルを読み込む。
             
             Args:
                 namespaces (list):適応対象ネームスペースのリスト
                 rootDir (str):
                 
             Returns:
-                dict:
-        """
-        with open(os.path.join(rootDir, 'pose.json'), 'r') as f:
-            posedata = json.load(f)
+                OrderedDict:ノード名をキー、アトリビュートと値の辞書を値とする
+        """
+        posefile = os.path.join(rootDir, self.PoseFile)
+        if not os.path.exists(posefile):
+            with open(os.path.join(rootDir, self.LegacyPoseFile), 'r') as f:
+                posedata = json.load(f)
+            return posedata
+
+        import numpy
+        posedata = OrderedDict()
+        with numpy.load(posefile) as data:
+            nodes = [str(x) for x in data['nodes']]
+            attrs = [str(x) for x in data['attrs']]
+            for n, a, v in zip(
+                data['nodeIndices'], data['attrIndices'], data['values']
+            ):
+                posedata.setdefault(nodes[n], OrderedDict())[attrs[a]] = (
+                    float(v)
+                )
+            if 'extraValues' in data.files:
+                for n, a, v in zip(
+                    data['extraNodeIndices'], data['extraAttrIndices'],
+                    data['extraValues']
+                ):
+                    posedata.setdefault(
+                        nodes[n], OrderedDict()
+                    )[attrs[a]] = json.loads(str(v))
         return posedata
 
+    def applyPose(self, namespaceObjects, data, weight=1.0):
+        r"""
+            複数のネームスペースオブジェクトに対し、ポーズを一括で適用する。
+            weightが1未満の場合は現在の値とポーズの値をブレンドする。
+            数値以外の値はブレンドせずにそのままセットし、セットできない
+            ものは無視する。
+            存在しない、ロックされている、animCurve以外から接続されている
+            アトリビュートは無視される。キーのあるアトリビュートには
+            cmds.setAttrと同様に値がセットされる。
+            
+            Args:
+                namespaceObjects (list):Namespaceオブジェクトのリスト
+                data (dict):setupReadingの戻り値
+                weight (float):ポーズの適用率
+        """
+        names, values = [], []
+        for ns in namespaceObjects:
+            for nodename, attrs in data.items():
+                for attr, value in attrs.items():
+                    names.append(ns(nodename, attr))
+                    values.append(value)
+
+        targets, others = [], []
+        for p, v in zip(node.findPlugs(names, ignoreMissing=True), values):
+            if p is None or not node.isSettablePlug(p):
+                continue
+            if isinstance(v, (int, float)):
+                targets.append((p, v))
+            else:
+                others.append((p, v))
+        if weight != 1.0 and targets:
+            current = node.getAttrs([x[0] for x in targets])
+            targets = [
+                (p, c + (v - c) * weight)
+                for (p, v), c in zip(targets, current)
+            ]
+        if targets:
+            node.setAttrs(targets)
+        for target in others:
+            try:
+                node.setAttrs([target])
+            except Exception:
+                pass
+
     def readMethod(self, namespaceObject, data):
         r"""
             あたえられたネームスペースオブジェクトに対し、ポーズ
@@ -346,13 +448,29 @@ class PoseDataManager(AbstractDataManager):
                 namespaceObject (Namespace):[]
                 data (dict):
         """
-        cmds = node.cmds
-        for nodename, attrs in data.items():
-            for attr, value in attrs.items():
-                try:
-                    cmds.setAttr(namespaceObject(nodename, attr), value)
-                except:
-                    pass
+        self.applyPose([namespaceObject], data)
+
+    def read(self, namespaces):
+        r"""
+            全てのネームスペースに対し、ポーズを一括で読み込む。
+            
+            Args:
+                namespaces (list):対象ネームスペーススペースのリスト
+        """
+        self.blend(namespaces, 1.0)
+
+    def blend(self, namespaces, weight):
+        r"""
+            全てのネームスペースに対し、現在のポーズとブレンドしながら
+            ポーズを一括で読み込む。
+            
+            Args:
+                namespaces (list):対象ネームスペーススペースのリスト
+                weight (float):ポーズの適用率
+        """
+        rootdir = os.path.join(self.workDir(), self.fileName())
+        data = self.setupReading(namespaces, rootdir)
+        self.applyPose([Namespace(x) for x in namespaces], data, weight)
 
     def selectMethod(self, namespaceObjects, setup_data):
         r"""
@@ -627,9 +745,22 @@ class GlobalDataManager(object):
             raise RuntimeError('More than 2 namespaces selected.')
         return (list(nslist.keys())[0], list(nslist.values())[0])
 
+    def index(self):
+        r"""
+            データ一覧の索引を返す。
+            旧形式のmeta.jsonが前回の取り込み以降に更新されている場合は
+            その内容を索引に取り込む。
+            
+            Returns:
+                poseIndex.PoseIndex:
+        """
+        index = poseIndex.PoseIndex(self.rootDir())
+        index.syncMetaData(self.metaDataFile(), self.rootDir())
+        return index
+
     def metaDataFile(self):
         r"""
-            メタデータを格納するファイルパスを返す。
+            旧形式のメタデータを格納するファイルパスを返す。
             
             Returns:
                 str:
@@ -638,7 +769,9 @@ class GlobalDataManager(object):
 
     def metaData(self):
         r"""
-            メタデータを返す。
+            旧形式のメタデータを返す。
+            以前のバージョンとの互換のためにのみ更新され、データの検索には
+            索引を使用する。
             
             Returns:
                 dict:
@@ -671,6 +804,19 @@ class GlobalDataManager(object):
         with codecs.open(metafile, 'wb', 'utf-8') as f:
             json.dump(metaData, f, indent=4, ensure_ascii=False)
 
+    def updateMetaData(self, function):
+        r"""
+            旧形式のメタデータを読み直し、'fileData'のリストを引数として
+            functionを実行した後に書き出す。
+            
+            Args:
+                function (function):
+        """
+        self.__cached_metadata = None
+        metadata = self.metaData()
+        function(metadata.setdefault('fileData', []))
+        self.writeMetaData(metadata)
+
     def write(self, dataName, thumbnailPath, targetNodes=None):
         r"""
             書き出し実行を行う。書き出しにはsetDataManagerで
@@ -701,26 +847,9 @@ class GlobalDataManager(object):
         ns, selected = self.getSelected(targetNodes)
         dataname_tag = '_'.join((ns, dataName))
 
-        # メタ情報の読み込み。=================================================
-        metafile = self.metaDataFile()
-        metadata = self.metaData()
-        filename_data = metadata.get('fileData', [])
-        # =====================================================================
-
-        # ファイル名のランダム生成。===========================================
-        import string
-        import random
-        existing_files = os.listdir(rootdir)
-        all_letters = string.digits+verutil.LETTERS+'!@#$%^&()_+-={}[]'
-        while(True):
-            filename = ''.join(
-                [
-                    random.choice(all_letters)
-                    for x in range(random.randint(5, 20))
-                ]
-            )
-            if not filename in existing_files:
-                break
+        # ファイル名の生成。===================================================
+        # ディレクトリの一覧と照合しなくても重複しないよう、uuidを用いる。
+        filename = uuid.uuid4().hex
         writer.setFileName(filename)
         # =====================================================================
 
@@ -736,14 +865,26 @@ class GlobalDataManager(object):
         # =====================================================================
 
         # タグデータの登録。===================================================
-        filename_data.append(
+        import getpass
+        self.index().addData(
             {
                 'fileName':filename, 'tagList':self.tags(),
                 'dataName':dataName, 'dataType':writer.dataType(),
+                'namespace':ns, 'creator':getpass.getuser(),
+                'creationTime':time.time(),
+                'hasThumbnail':os.path.exists(
+                    os.path.join(rootdir, filename, 'thumb.png')
+                ),
             }
         )
-        metadata['fileData'] = filename_data
-        self.writeMetaData(metadata)
+        self.updateMetaData(
+            lambda filedata: filedata.append(
+                {
+                    'fileName':filename, 'tagList':self.tags(),
+                    'dataName':dataName, 'dataType':writer.dataType(),
+                }
+            )
+        )
         # =====================================================================
         
         self.clearCache()
@@ -756,13 +897,12 @@ class GlobalDataManager(object):
                 FileDataList:
         """
         if not self.__cached_filedata:
-            metadata = self.metaData()
             self.__cached_filedata = FileDataList(
-                metadata.get('fileData', []), self.rootDir()
+                self.index().dataList(), self.rootDir()
             )
         return self.__cached_filedata
 
-    def applyDataFromFile(self, fileName, method, targetNodes=None):
+    def applyDataFromFile(self, fileName, method, targetNodes=None, *args):
         r"""
             与えれたファイル名fileNameのデータを任意のノードに適応する。
             
@@ -770,14 +910,12 @@ class GlobalDataManager(object):
                 fileName (str):ファイル名
                 method (str):
                 targetNodes (list):読み込みデータ適応先のノード
+                *args (any):methodに渡す追加の引数
         """
         namespaces = list(
             set([x.namespace() for x in node.selected(targetNodes)])
         )
-        datalist = self.fileDataList()
-        if not datalist:
-            return
-        data = datalist.findData(fileName)
+        data = self.index().findData(fileName)
         if not data:
             return
         datatype = data['dataType']
@@ -789,20 +927,25 @@ class GlobalDataManager(object):
             return
         exec_method = getattr(manager, method)
 
-        manager.setWorkDir(datalist.rootDir())
+        manager.setWorkDir(self.rootDir())
         manager.setFileName(fileName)
         with node.DoCommand():
-            exec_method(namespaces)
+            exec_method(namespaces, *args)
 
-    def readDataFromFile(self, fileName, targetNodes=None):
+    def readDataFromFile(self, fileName, targetNodes=None, weight=1.0):
         r"""
             与えれたファイル名fileNameのデータを読み込む。
+            weightが1未満の場合は現在の状態とブレンドする。
             
             Args:
                 fileName (str):ファイル名
                 targetNodes (list):読み込みデータ適応先のノード
+                weight (float):データの適用率
         """
-        self.applyDataFromFile(fileName, 'read', targetNodes)
+        if weight == 1.0:
+            self.applyDataFromFile(fileName, 'read', targetNodes)
+        else:
+            self.applyDataFromFile(fileName, 'blend', targetNodes, weight)
         
     def selectTargetNode(self, fileName, targetNodes=None):
         r"""
@@ -824,41 +967,27 @@ class GlobalDataManager(object):
                 tag (str):
                 fileList (list):
         """
-        rootdir = self.rootDir()
-        metadata = self.metaData()
-        filedata = metadata.get('fileData')
-        if not filedata:
-            return
+        def removeTag(filedata):
+            for data in filedata[:]:
+                if data['fileName'] not in fileList:
+                    continue
+                taglist = data['tagList']
+                if tag not in taglist:
+                    continue
+                taglist.remove(tag)
+                if not taglist:
+                    filedata.remove(data)
 
-        # 削除データの探索。===================================================
-        removing_files = []
-        removing_data = []
-        for data in filedata:
-            filename = data['fileName']
-            if not filename in fileList:
-                continue
-            taglist = data['tagList']
-            if not tag in taglist:
-                continue
-            del taglist[taglist.index(tag)]
-            if not taglist:
-                removing_files.append(filename)
-                removing_data.append(data)
-        # =====================================================================
-
-        # 探索データに基づき、実データを削除する。=============================
-        for data in removing_data:
-            del filedata[filedata.index(data)]
+        rootdir = self.rootDir()
+        removing_files = self.index().removeTag(fileList, tag)
+        if os.path.exists(self.metaDataFile()):
+            self.updateMetaData(removeTag)
         for file in removing_files:
             try:
                 shutil.rmtree(os.path.join(rootdir, file))
             except:
                 pass
-        # =====================================================================
-
-        # 更新されたmetaデータを保存する。=====================================
-        self.writeMetaData(metadata)
-        # =====================================================================
+        self.clearCache()
 
 '''
 # EX.//////////////////////////////////////////////////////////////////////////
@@ -0,0 +1,316 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    animLibraryのデータ一覧をSQLiteで管理する機能を提供するモジュール。
+    タグ、データ名、データタイプ、サムネイルの有無などを索引として保持し、
+    単一のmeta.jsonを毎回読み直すことなくデータの検索を行えるようにする。
+    meta.jsonは以前のバージョンとの互換のために更新が続けられるため、
+    更新日時とサイズが変化した場合のみ索引へ取り込み直す。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import os
+import json
+import codecs
+import sqlite3
+from contextlib import closing
+
+# データベースのスキーマのバージョン。
+SchemaVersion = 2
+# ネットワークドライブ上でのロック待ちの秒数。
+LockTimeout = 30.0
+# 辞書として返すデータのキーと、テーブルのカラムの対応。
+DataColumns = (
+    'fileName', 'dataName', 'dataType', 'namespace', 'creator',
+    'creationTime', 'hasThumbnail',
+)
+
+
+class PoseIndex(object):
+    r"""
+        データ一覧の索引を持つSQLiteデータベースを操作するクラス。
+        取り扱うデータはGlobalDataManagerのファイルデータと同じ形式の辞書で、
+        fileName、tagList、dataName、dataTypeなどのキーを持つ。
+    """
+    FileName = 'index.db'
+
+    def __init__(self, rootDir):
+        r"""
+            Args:
+                rootDir (str):データを格納するルートディレクトリ
+        """
+        self.__rootdir = rootDir
+
+    def path(self):
+        r"""
+            データベースファイルのパスを返す。
+
+            Returns:
+                str:
+        """
+        return os.path.join(self.__rootdir, self.FileName)
+
+    def exists(self):
+        r"""
+            データベースファイルが存在するかどうかを返す。
+
+            Returns:
+                bool:
+        """
+        return os.path.isfile(self.path())
+
+    def connect(self):
+        r"""
+            データベースへ接続し、スキーマが古い場合のみテーブルを作成する。
+            スキーマのバージョンの確認は読み込みのみで行うため、
+            閲覧のみの接続では書き込みロックを取得しない。
+
+            Returns:
+                sqlite3.Connection:
+        """
+        conn = sqlite3.connect(self.path(), timeout=LockTimeout)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SchemaVersion:
+            return conn
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS data ('
+                'fileName TEXT PRIMARY KEY, dataName TEXT, dataType TEXT, '
+                'namespace TEXT, creator TEXT, creationTime REAL, '
+                'hasThumbnail INTEGER)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS tags ('
+                'fileName TEXT, tag TEXT, PRIMARY KEY (fileName, tag))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS info ('
+                'key TEXT PRIMARY KEY, value TEXT)'
+            )
+            conn.execute('PRAGMA user_version = %s' % SchemaVersion)
+        return conn
+
+    def __toDataList(self, conn, rows):
+        r"""
+            dataテーブルの行のリストを、タグ付きの辞書のリストに変換する。
+
+            Args:
+                conn (sqlite3.Connection):
+                rows (list):
+
+            Returns:
+                list:
+        """
+        if not rows:
+            return []
+        taglist = {}
+        names = [x[0] for x in rows]
+        # SQLiteの変数の上限を超えないよう分割して問い合わせる。
+        for i in range(0, len(names), 500):
+            chunk = names[i:i+500]
+            for filename, tag in conn.execute(
+                'SELECT fileName, tag FROM tags WHERE fileName IN (%s) '
+                'ORDER BY rowid' % ','.join(['?'] * len(chunk)),
+                chunk
+            ):
+                taglist.setdefault(filename, []).append(tag)
+        results = []
+        for row in rows:
+            data = dict(zip(DataColumns, row))
+            data['hasThumbnail'] = bool(data['hasThumbnail'])
+            data['tagList'] = taglist.get(data['fileName'], [])
+            results.append(data)
+        return results
+
+    def addData(self, data):
+        r"""
+            データを索引に追加する。同名のデータがある場合は上書きする。
+
+            Args:
+                data (dict):fileNameとtagListを必ず持つ辞書
+        """
+        values = [data.get(x) for x in DataColumns]
+        values[-1] = 1 if values[-1] else 0
+        with closing(self.connect()) as conn:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO data VALUES (?,?,?,?,?,?,?)',
+                    values
+                )
+                conn.execute(
+                    'DELETE FROM tags WHERE fileName = ?',
+                    (data['fileName'],)
+                )
+                conn.executemany(
+                    'INSERT OR IGNORE INTO tags VALUES (?, ?)',
+                    [(data['fileName'], x) for x in data.get('tagList', [])]
+                )
+
+    def importMetaData(self, metaData, rootDir=None, stamp=None):
+        r"""
+            旧形式のmeta.jsonの内容を索引に取り込む。
+            既存のデータはデータ名、データタイプ、タグを更新し、作成者などの
+            meta.jsonにない情報は保持する。meta.jsonにないデータのうち、
+            ディレクトリが削除されているものは索引からも削除する。
+
+            Args:
+                metaData (dict):旧形式のメタデータ
+                rootDir (str):サムネイルの有無を調べるルートディレクトリ
+                stamp (str):取り込んだmeta.jsonを識別する文字列
+        """
+        rootdir = rootDir or self.__rootdir
+        filedata = metaData.get('fileData', [])
+        with closing(self.connect()) as conn:
+            with conn:
+                existing = set(
+                    [x[0] for x in conn.execute('SELECT fileName FROM data')]
+                )
+                for data in filedata:
+                    filename = data['fileName']
+                    if filename in existing:
+                        conn.execute(
+                            'UPDATE data SET dataName = ?, dataType = ? '
+                            'WHERE fileName = ?',
+                            (
+                                data.get('dataName'), data.get('dataType'),
+                                filename
+                            )
+                        )
+                    else:
+                        thumb = os.path.join(rootdir, filename, 'thumb.png')
+                        conn.execute(
+                            'INSERT INTO data VALUES (?,?,?,?,?,?,?)',
+                            (
+                                filename, data.get('dataName'),
+                                data.get('dataType'), None, None, None,
+                                1 if os.path.exists(thumb) else 0
+                            )
+                        )
+                    conn.execute(
+                        'DELETE FROM tags WHERE fileName = ?', (filename,)
+                    )
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO tags VALUES (?, ?)',
+                        [(filename, x) for x in data['tagList']]
+                    )
+                listed = set([x['fileName'] for x in filedata])
+                for filename in existing - listed:
+                    if os.path.isdir(os.path.join(rootdir, filename)):
+                        continue
+                    conn.execute(
+                        'DELETE FROM data WHERE fileName = ?', (filename,)
+                    )
+                    conn.execute(
+                        'DELETE FROM tags WHERE fileName = ?', (filename,)
+                    )
+                if stamp:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO info VALUES (?, ?)',
+                        ('metaDataStamp', stamp)
+                    )
+
+    def syncMetaData(self, metaFile, rootDir=None):
+        r"""
+            旧形式のmeta.jsonが前回の取り込み以降に更新されている場合は
+            索引に取り込み直す。
+            meta.jsonが存在しないか、読み込めない場合は何もしない。
+
+            Args:
+                metaFile (str):meta.jsonのパス
+                rootDir (str):サムネイルの有無を調べるルートディレクトリ
+
+            Returns:
+                bool:取り込みを行った場合はTrue
+        """
+        try:
+            st = os.stat(metaFile)
+        except OSError:
+            return False
+        stamp = '%r:%s' % (st.st_mtime, st.st_size)
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                'SELECT value FROM info WHERE key = ?', ('metaDataStamp',)
+            ).fetchone()
+        if row and row[0] == stamp:
+            return False
+        with codecs.open(metaFile, 'r', 'utf-8') as f:
+            try:
+                metadata = json.load(f)
+            except ValueError:
+                return False
+        self.importMetaData(metadata, rootDir, stamp)
+        return True
+
+    def dataList(self):
+        r"""
+            データのリストを登録順に返す。
+
+            Returns:
+                list:
+        """
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                'SELECT %s FROM data ORDER BY rowid' % ', '.join(DataColumns)
+            ).fetchall()
+            return self.__toDataList(conn, rows)
+
+    def findData(self, fileName):
+        r"""
+            与えられたファイル名を持つデータを返す。
+
+            Args:
+                fileName (str):
+
+            Returns:
+                dict:
+        """
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                'SELECT %s FROM data WHERE fileName = ?' % (
+                    ', '.join(DataColumns)
+                ),
+                (fileName,)
+            ).fetchall()
+            datalist = self.__toDataList(conn, rows)
+        return datalist[0] if datalist else None
+
+    def removeTag(self, fileNames, tag):
+        r"""
+            データからタグを削除し、タグがなくなったデータを索引から削除する。
+
+            Args:
+                fileNames (list):
+                tag (str):
+
+            Returns:
+                list:タグがなくなり削除されたデータのファイル名のリスト
+        """
+        removed = []
+        with closing(self.connect()) as conn:
+            with conn:
+                for filename in fileNames:
+                    cur = conn.execute(
+                        'DELETE FROM tags WHERE fileName = ? AND tag = ?',
+                        (filename, tag)
+                    )
+                    if not cur.rowcount:
+                        continue
+                    rest = conn.execute(
+                        'SELECT COUNT(*) FROM tags WHERE fileName = ?',
+                        (filename,)
+                    ).fetchone()[0]
+                    if rest:
+                        continue
+                    conn.execute(
+                        'DELETE FROM data WHERE fileName = ?', (filename,)
+                    )
+                    removed.append(filename)
+        return removed
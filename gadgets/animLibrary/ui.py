@@ -386,7 +386,11 @@ class DataView(imageViewer.ImageListView):
         item = QtGui.QStandardItem(data['dataName'])
         item.setData(data['fileName'])
         icon = os.path.join(self.rootDir(), data['fileName'], 'thumb.png')
-        icon = icon if os.path.exists(icon) else self.DefaultIcon
+        # 索引にサムネイルの有無がある場合はファイルの存在確認を省略する。
+        has_thumb = data.get('hasThumbnail')
+        if has_thumb is None:
+            has_thumb = os.path.exists(icon)
+        icon = icon if has_thumb else self.DefaultIcon
         item.setIcon(QtGui.QIcon(icon))
         model.setItem(row, 0, item)
 
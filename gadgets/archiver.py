@@ -70,6 +70,10 @@ class ArchiveDataView(QtWidgets.QWidget):
         arc_btn.setSize(64)
         arc_btn.setBgColor(166, 49, 32)
         self.buttonClicked = arc_btn.clicked
+        self.__incremental = QtWidgets.QCheckBox('Incremental')
+        self.__incremental.setToolTip(
+            'Archives only files changed since the last archive.'
+        )
 
         self.__view = factoryUI.ModuleBrowserWidget()
         self.__view.setExtensions('zip')
@@ -81,10 +85,14 @@ class ArchiveDataView(QtWidgets.QWidget):
         layout.addWidget(
             label, 2, 0, 1, 1, QtCore.Qt.AlignTop|QtCore.Qt.AlignHCenter
         )
-        layout.addWidget(self.__view, 0, 1, 4, 1)
+        layout.addWidget(
+            self.__incremental, 3, 0, 1, 1,
+            QtCore.Qt.AlignTop|QtCore.Qt.AlignHCenter
+        )
+        layout.addWidget(self.__view, 0, 1, 5, 1)
         layout.setColumnStretch(1, 1)
         layout.setRowStretch(0, 1)
-        layout.setRowStretch(3, 1)
+        layout.setRowStretch(4, 1)
 
     def view(self):
         r"""
@@ -95,6 +103,15 @@ class ArchiveDataView(QtWidgets.QWidget):
         """
         return self.__view
 
+    def isIncremental(self):
+        r"""
+        インクリメンタルアーカイブを行うかどうかを返す
+
+        Returns:
+            bool:
+        """
+        return self.__incremental.isChecked()
+
 
 class ArchiveProgressWidget(QtWidgets.QWidget):
     r"""
@@ -235,6 +252,7 @@ class RigDataArchiver(uilib.ClosableGroup):
         アーカイブを実行する
         """
         self.__archiver.setup()
+        self.__archiver.setIncremental(self.__dataview.isIncremental())
         self.__archiver.start()
         self.__stacked.setCurrentIndex(1)
 
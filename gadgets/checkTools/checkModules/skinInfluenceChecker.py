@@ -11,7 +11,8 @@ r"""
         "modulePrefix": "-default",
         "options": {
             "target": ["チェック対象グループ名"...],
-            "numberOfLimit": 4
+            "numberOfLimit": 4,
+            "sumTolerance": 0.001
         }
     }
 
@@ -51,22 +52,28 @@ class AbstractVertexSelector(ui.OperatorPage):
     def target(self):
         return self.__target
     
-    def check(self, weightlist):
-        return False
+    def errorMask(self, result):
+        r"""
+            skinUtility.analyzeWeightsの結果から、エラーとなる頂点をTrueとする
+            真偽値の配列を返す。オーバーライド用。
+            
+            Args:
+                result (dict):
+                
+            Returns:
+                numpy.ndarray:
+        """
+        return result['influenceCounts'] < 0
 
     def updateUI(self,  info):
         self.setTarget(info[0])
 
     def getErroredVertices(self):
         target = self.target()
-        weightlist = skinUtility.listWeights(target)
-        vertices = []
-        fmt = '{}.vtx[{{}}]'.format(target)
-        for idx, wlist in weightlist.items():
-            if not self.check(wlist):
-                continue
-            vertices.append(fmt.format(idx))
-        return vertices
+        result = skinUtility.analyzeWeights(target)
+        if not result:
+            return []
+        return skinUtility.listVerticesFromMask(target, self.errorMask(result))
 
     def selectVertex(self):
         vertices = self.getErroredVertices()
@@ -80,8 +87,8 @@ class ZeroInfluenceSelector(AbstractVertexSelector):
     def label(self):
         return 'Non weighted vertices selector'
 
-    def check(self, weightlist):
-        return not weightlist
+    def errorMask(self, result):
+        return result['influenceCounts'] == 0
 
 
 class LimitationBreakSelector(AbstractVertexSelector):
@@ -98,8 +105,29 @@ class LimitationBreakSelector(AbstractVertexSelector):
     def limit(self):
         return self.__limit
 
-    def check(self, weightlist):
-        return len(weightlist) > self.limit()
+    def errorMask(self, result):
+        return result['influenceCounts'] > self.limit()
+
+
+class UnnormalizedSelector(AbstractVertexSelector):
+    def __init__(self, parent=None):
+        super(UnnormalizedSelector, self).__init__(parent)
+        self.__tolerance = 0.001
+
+    def label(self):
+        return 'Unnormalized vertices selector'
+
+    def setTolerance(self, tolerance):
+        self.__tolerance = float(tolerance)
+
+    def tolerance(self):
+        return self.__tolerance
+
+    def errorMask(self, result):
+        return (
+            (result['sumErrors'] > self.tolerance()) &
+            (result['influenceCounts'] > 0)
+        )
 
 
 class CategoryOption(core.AbstractCategoryOption):
@@ -118,6 +146,7 @@ class CategoryOption(core.AbstractCategoryOption):
         self.result_view = ui.NodeResultViewer()
         self.result_view.addOperatorPage(ZeroInfluenceSelector(), 1)
         self.result_view.addOperatorPage(LimitationBreakSelector(), 2)
+        self.result_view.addOperatorPage(UnnormalizedSelector(), 3)
         
         layout = QtWidgets.QVBoxLayout(parent)
         layout.addWidget(self.result_view)
@@ -129,11 +158,15 @@ class CategoryOption(core.AbstractCategoryOption):
         """
         self.targets = optionData.get('target', ['geo_grp'])
         self.number_of_limit = optionData.get('numberOfLimit', 4)
+        self.sum_tolerance = optionData.get('sumTolerance', 0.001)
 
     def execCheck(self):
         checker = skinInfluenceChecker.PolySkinInfluenceChecker()
         checker.setTargets(self.targets)
         checker.setNumberOfLimit(self.number_of_limit)
+        checker.setSumTolerance(self.sum_tolerance)
+        self.result_view.operatorPage(2).setLimit(self.number_of_limit)
+        self.result_view.operatorPage(3).setTolerance(self.sum_tolerance)
         checked = checker.check()
         self.result_view.setResults(checked)
         return self.getResultFromData(checked)
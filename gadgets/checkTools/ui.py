@@ -492,9 +492,11 @@ class Framework(QtWidgets.QWidget):
         opt_tab = self.optionTab()
         catlist = self.categoryList()
         catlist.clearSelection()
-        for w in opt_tab.allWidgets():
-            w.createUI()
-            w.doCheck()
+        from ... import skinWeightCache
+        with skinWeightCache.CachedScope():
+            for w in opt_tab.allWidgets():
+                w.createUI()
+                w.doCheck()
     
     def setCategoryFromData(self, data):
         if not data.get('dataType') == util.DataType:
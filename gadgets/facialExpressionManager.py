@@ -265,13 +265,15 @@ class VirtualSliderButton(QtWidgets.QPushButton):
         if values is None:
             self.__param_range = {'blendShape': bs, 'values':{}}
             return
+        current = facialMemoryManager.listBlendShapeValues(bs, False)
         all_values = OrderedDict()
-        for attr in bs.listAttrNames():
+        for attr in current:
             all_values[attr] = 0
         all_values.update(values)
 
         value_range = {
-            attr: (bs(attr), val) for attr, val in all_values.items()
+            attr: (current[attr] if attr in current else bs(attr), val)
+            for attr, val in all_values.items()
         }
         self.__param_range = {
             'blendShape': bs,
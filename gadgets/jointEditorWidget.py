@@ -343,8 +343,13 @@ class JointAxisEditor(uilib.ClosableGroup):
         self.__apply_to_children = QtWidgets.QCheckBox('Apply to Children')
         self.__apply_to_children.setChecked(True)
         self.__freeze = QtWidgets.QCheckBox('Freeze')
+        self.__batch = QtWidgets.QCheckBox('Batch Mode')
+        self.__batch.setToolTip(
+            'Compute all orientations at once and set them in one step.'
+        )
         layout.addWidget(self.__apply_to_children, 0, 0, 1, 1)
         layout.addWidget(self.__freeze, 1, 0, 1, 1)
+        layout.addWidget(self.__batch, 2, 0, 1, 1)
         # =====================================================================
         
         # 実行ボタン===========================================================
@@ -354,7 +359,7 @@ class JointAxisEditor(uilib.ClosableGroup):
         set_btn.setBgColor(*uilib.Color.ExecColor)
         set_btn.setToolTip('Edit joint axis.')
         set_btn.clicked.connect(self.setAxis)
-        layout.addWidget(set_btn, 0, 1, 2, 1)
+        layout.addWidget(set_btn, 0, 1, 3, 1)
         layout.setAlignment(set_btn, QtCore.Qt.AlignRight)
         # =====================================================================
 
@@ -365,7 +370,7 @@ class JointAxisEditor(uilib.ClosableGroup):
             AxisChooser, AxisChooser, mayaUIlib.NodePicker, mayaUIlib.NodePicker,
         )
         self.__uis = []
-        row = 2
+        row = 3
         for i, gui_data in enumerate(
             zip(
                 ('Primary Axis', 'Secondary Axis'),
@@ -468,6 +473,7 @@ class JointAxisEditor(uilib.ClosableGroup):
             self.__apply_to_children.isChecked()
         )
         self.__orient_mod.setIsFreeze(self.__freeze.isChecked())
+        self.__orient_mod.setBatchMode(self.__batch.isChecked())
         # =====================================================================
 
         with node.DoCommand():
@@ -492,6 +498,12 @@ class JointMirror(uilib.ClosableGroup):
         # Behaviorかどうか。
         self.__behavior = QtWidgets.QCheckBox('Behavior')
         self.__behavior.setChecked(True)
+
+        # 一括処理を行うかどうか。
+        self.__batch = QtWidgets.QCheckBox('Batch Mode')
+        self.__batch.setToolTip(
+            'Compute all mirrored joints at once and set them in one step.'
+        )
         
         # 軸の設定。===========================================================
         ax_label = QtWidgets.QLabel('Mirror Axis')
@@ -549,13 +561,14 @@ class JointMirror(uilib.ClosableGroup):
 
         layout = QtWidgets.QGridLayout(self)
         layout.setSpacing(1)
-        layout.addWidget(mrr_btn, 0, 1, 3, 1)
+        layout.addWidget(mrr_btn, 0, 1, 4, 1)
         layout.setAlignment(mrr_btn, QtCore.Qt.AlignRight)
         layout.addWidget(self.__apply_to_children, 0, 0, 1, 1)
         layout.addWidget(self.__behavior, 1, 0, 1, 1)
-        layout.addWidget(ax_grp, 2, 0, 1, 1)
-        layout.addWidget(rep_grp, 3, 0, 1, 2)
-        layout.addWidget(parent_grp, 4, 0, 1, 2)
+        layout.addWidget(self.__batch, 2, 0, 1, 1)
+        layout.addWidget(ax_grp, 3, 0, 1, 1)
+        layout.addWidget(rep_grp, 4, 0, 1, 2)
+        layout.addWidget(parent_grp, 5, 0, 1, 2)
 
     def mirroring(self):
         r"""
@@ -569,6 +582,7 @@ class JointMirror(uilib.ClosableGroup):
         self.__mirror.setIsReplacingParent(self.__parent.isChecked())
         self.__mirror.setParentSearchingString(self.__p_search.text())
         self.__mirror.setParentReplacedString(self.__p_replaced.text())
+        self.__mirror.setBatchMode(self.__batch.isChecked())
         with node.DoCommand():
             self.__mirror.execute()
 
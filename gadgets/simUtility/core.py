@@ -15,6 +15,8 @@ r"""
 """
 from collections import OrderedDict
 from maya import OpenMayaUI
+from maya.api import OpenMaya as OpenMaya2
+from maya.api import OpenMayaAnim as OpenMayaAnim2
 from gris3 import node, func, lib
 cmds = func.cmds
 
@@ -699,4 +701,349 @@ class NSpringSimulator(SpringSimulator):
             cst = cmds.parentConstraint(joint, target, mo=False)
             temp_cst_grp.addChild(*cst)
 
-        return temp_root
\ No newline at end of file
+        return temp_root
+
+class ArraySpringSimulator(SpringSimulator):
+    r"""
+        hairSystemを使用せず、NumPyによるスプリング計算でシミュレーションを
+        行うクラス。
+        チェーンの親の行列をフレーム毎に１度だけサンプリングし、全チェーンを
+        同時に計算した結果の回転値をアニメーションカーブへ一括で書き込む。
+    """
+    # 1フレームあたりの計算回数。Noneの場合はソルバーの初期値を使用する。
+    SubSteps = None
+    RotateAttrs = ('rotateX', 'rotateY', 'rotateZ')
+
+    def createSimulatedSystem(self, simOption=None):
+        r"""
+            シミュレーション対象のチェーンの情報を収集する。
+            対象ノードのキーは削除され、現在の状態がレスト状態となる。
+            戻り値は以下のキーを持つ辞書で、bakeに渡す。
+                nodes (list):対象ノード名のリスト
+                parents (list):チェーン内の親のインデックス。ルートは-1
+                drivers (list):ルートの親ノード名。ルート以外はNone
+                options (dict):シミュレーションのパラメータ
+            
+            Args:
+                simOption (dict):ParameterPresetと同じキーを持つパラメータ
+                
+            Returns:
+                dict:
+        """
+        hir_list = self.hierarchyList()
+        if not hir_list:
+            raise RuntimeError(
+                'Simulated nodes were not detected.'
+                '(Execute setup method before simulating.)'
+            )
+        options = dict(ParameterPreset['mid'])
+        if isinstance(simOption, dict):
+            options.update(simOption)
+        nodes, parents, drivers = [], [], []
+        for parent, chains in hir_list.items():
+            for objectlist in chains:
+                if len(objectlist) < 2:
+                    continue
+                for i, object in enumerate(objectlist):
+                    parents.append(len(nodes) - 1 if i else -1)
+                    drivers.append(None if i else parent)
+                    nodes.append(object())
+        if not nodes:
+            raise RuntimeError('No chain to simulate was detected.')
+        data = {
+            'nodes': nodes, 'parents': parents, 'drivers': drivers,
+            'options': options,
+        }
+        data.update(self.__restInfo(nodes))
+        cmds.cutKey(nodes, cl=True)
+        return data
+
+    def __restInfo(self, nodes):
+        r"""
+            ノードのレスト状態のローカル行列と、回転値の計算に必要な情報を
+            返す。
+            
+            Args:
+                nodes (list):
+                
+            Returns:
+                dict:
+        """
+        import numpy
+        values = node.getAttrs(nodes, ['matrix', 'rotateAxis', 'rotateOrder'])
+        joints = [x for x in nodes if cmds.nodeType(x) == 'joint']
+        orients = dict(
+            zip(joints, node.getAttrs(joints, ['jointOrient']))
+        ) if joints else {}
+        # getAttrsの角度はUIの単位のため、現在の単位からラジアンへ変換する。
+        to_rad = OpenMaya2.MAngle(1, OpenMaya2.MAngle.uiUnit()).asRadians()
+        axes, joint_orients = [], []
+        for n, v in zip(nodes, values):
+            axes.append(
+                OpenMaya2.MEulerRotation(
+                    [x * to_rad for x in v[1]]
+                ).asMatrix().inverse()
+            )
+            jo = orients.get(n, [(0, 0, 0)])[0]
+            joint_orients.append(
+                OpenMaya2.MEulerRotation(
+                    [x * to_rad for x in jo]
+                ).asMatrix().inverse()
+            )
+        return {
+            'rest': numpy.array(
+                [x[0] for x in values], dtype=numpy.float64
+            ).reshape(-1, 4, 4),
+            'inverseRotateAxes': axes,
+            'inverseJointOrients': joint_orients,
+            'rotateOrders': [int(x[2]) for x in values],
+        }
+
+    def sampleMatrices(self, nodes, frames):
+        r"""
+            nodesのワールド行列を各フレームで１度ずつサンプリングする。
+            Noneはワールド(単位行列)として扱われる。
+            
+            Args:
+                nodes (list):ノード名のリスト
+                frames (list):フレームのリスト
+                
+            Returns:
+                numpy.ndarray:(フレーム数, ノード数, 4, 4)
+        """
+        import numpy
+        result = numpy.tile(numpy.eye(4), (len(frames), len(nodes), 1, 1))
+        sampled = [i for i, x in enumerate(nodes) if x]
+        if not sampled:
+            return result
+        plugs = [
+            x[0] for x in node.findPlugs(
+                [nodes[i] for i in sampled], ['worldMatrix[0]']
+            )
+        ]
+        cur_time = cmds.currentTime(q=True)
+        try:
+            for f, frame in enumerate(frames):
+                cmds.currentTime(frame, e=True, update=True)
+                result[f, sampled] = numpy.array(
+                    node.getAttrs(plugs), dtype=numpy.float64
+                ).reshape(-1, 4, 4)
+        finally:
+            cmds.currentTime(cur_time, e=True)
+        return result
+
+    def solve(self, data, frames):
+        r"""
+            createSimulatedSystemで収集したチェーンのシミュレーションを行い、
+            各フレームのローカル行列を返す。
+            他のチェーンに属するノードを親に持つチェーンは、親のチェーンの
+            計算結果を親の行列として順に計算される。
+            
+            Args:
+                data (dict):createSimulatedSystemの戻り値
+                frames (list):フレームのリスト
+                
+            Returns:
+                numpy.ndarray:(フレーム数, ノード数, 4, 4)
+        """
+        import numpy
+        from . import springSolver
+        nodes, parents = data['nodes'], data['parents']
+        drivers, options = data['drivers'], data['options']
+        index = {x: i for i, x in enumerate(nodes)}
+        num_frames = len(frames)
+
+        # チェーンを、親のチェーンが先に計算される世代毎に分ける。
+        chains = []
+        for i, p in enumerate(parents):
+            if p < 0:
+                chains.append([i])
+            else:
+                chains[-1].append(i)
+        generations = {}
+        node_gen = {}
+        remained = chains
+        gen = 0
+        while remained:
+            next_chains = []
+            for chain in remained:
+                driver = drivers[chain[0]]
+                if driver in index and not index[driver] in node_gen:
+                    next_chains.append(chain)
+                    continue
+                generations.setdefault(gen, []).append(chain)
+            for chain in generations.get(gen, []):
+                for i in chain:
+                    node_gen[i] = gen
+            if len(next_chains) == len(remained):
+                raise RuntimeError('The chains have a cyclic dependency.')
+            remained = next_chains
+            gen += 1
+
+        external = sorted(
+            set([x for x in drivers if x is not None and not x in index])
+        )
+        ext_index = {x: i for i, x in enumerate(external)}
+        ext_matrices = self.sampleMatrices(external, frames)
+        world_mtx = numpy.zeros((num_frames, len(nodes), 4, 4))
+        local_mtx = numpy.zeros((num_frames, len(nodes), 4, 4))
+        fps = OpenMaya2.MTime(1, OpenMaya2.MTime.kSeconds).asUnits(
+            OpenMaya2.MTime.uiUnit()
+        )
+        for gen in range(len(generations)):
+            targets = [i for chain in generations[gen] for i in chain]
+            remap = {x: i for i, x in enumerate(targets)}
+            driver_list, sub_parents, sub_drivers = [], [], []
+            for i in targets:
+                if parents[i] >= 0:
+                    sub_parents.append(remap[parents[i]])
+                    sub_drivers.append(0)
+                    continue
+                sub_parents.append(-1)
+                driver = drivers[i]
+                if driver in index:
+                    driver_list.append(world_mtx[:, index[driver]])
+                elif driver is None:
+                    driver_list.append(
+                        numpy.tile(numpy.eye(4), (num_frames, 1, 1))
+                    )
+                else:
+                    driver_list.append(ext_matrices[:, ext_index[driver]])
+                sub_drivers.append(len(driver_list) - 1)
+            worlds, locals_ = springSolver.solveSpringChains(
+                numpy.stack(driver_list, axis=1), data['rest'][targets],
+                sub_parents, sub_drivers,
+                stiffness=options['stiffness'], mass=options['mass'],
+                drag=options['drag'], damp=options['damp'],
+                gravity=options['gravity'], fps=fps,
+                subSteps=self.SubSteps or springSolver.DefaultSubSteps
+            )
+            world_mtx[:, targets] = worlds
+            local_mtx[:, targets] = locals_
+        return local_mtx
+
+    def rotationValues(self, data, localMatrices):
+        r"""
+            ローカル行列の配列を、各ノードの回転値(ラジアン)の配列に変換する。
+            フレーム間でオイラー角が連続するように補正される。
+            
+            Args:
+                data (dict):createSimulatedSystemの戻り値
+                localMatrices (numpy.ndarray):(フレーム数, ノード数, 4, 4)
+                
+            Returns:
+                numpy.ndarray:(ノード数, 3, フレーム数)
+        """
+        import numpy
+        num_frames, num = localMatrices.shape[:2]
+        rotations = localMatrices[:, :, :3, :3].copy()
+        # スケールを取り除く。
+        rotations /= numpy.linalg.norm(rotations, axis=-1, keepdims=True)
+        result = numpy.zeros((num, 3, num_frames), dtype=numpy.float64)
+        for n in range(num):
+            inv_ra = data['inverseRotateAxes'][n]
+            inv_jo = data['inverseJointOrients'][n]
+            order = data['rotateOrders'][n]
+            previous = None
+            for f in range(num_frames):
+                m = numpy.eye(4)
+                m[:3, :3] = rotations[f, n]
+                mtx = inv_ra * OpenMaya2.MMatrix(m.ravel().tolist()) * inv_jo
+                euler = OpenMaya2.MEulerRotation.decompose(mtx, order)
+                if previous is not None:
+                    euler.setToClosestSolution(previous)
+                previous = euler
+                result[n, :, f] = (euler.x, euler.y, euler.z)
+        return result
+
+    def writeAnimCurves(self, nodes, frames, values):
+        r"""
+            回転値をアニメーションカーブとして一括で書き込む。
+            カーブの作成と接続は１つのMDGModifierで、キーの追加は
+            MAnimCurveChangeを用いて行い、アンドゥに登録される。
+            
+            Args:
+                nodes (list):ノード名のリスト
+                frames (list):フレームのリスト
+                values (numpy.ndarray):(ノード数, 3, フレーム数)のラジアン
+        """
+        plugs = node.findPlugs(nodes, self.RotateAttrs)
+        connected = [
+            x.name() for row in plugs for x in row if x.isDestination
+        ]
+        if connected:
+            raise RuntimeError(
+                'The rotation of the nodes is already connected : {}'.format(
+                    ', '.join(connected)
+                )
+            )
+        modifier = OpenMaya2.MDGModifier()
+        curves = []
+        for n, row in zip(nodes, plugs):
+            for attr, plug in zip(self.RotateAttrs, row):
+                curve = modifier.createNode('animCurveTA')
+                modifier.renameNode(
+                    curve, '{}_{}'.format(n.split('|')[-1], attr)
+                )
+                curve_fn = OpenMaya2.MFnDependencyNode(curve)
+                modifier.connect(curve_fn.findPlug('output', False), plug)
+                curves.append(curve)
+        modifier.doIt()
+
+        times = OpenMaya2.MTimeArray(
+            [OpenMaya2.MTime(x, OpenMaya2.MTime.uiUnit()) for x in frames]
+        )
+        change = OpenMayaAnim2.MAnimCurveChange()
+        flat_values = values.reshape(-1, len(frames))
+        for curve, curve_values in zip(curves, flat_values):
+            OpenMayaAnim2.MFnAnimCurve(curve).addKeys(
+                times, curve_values.tolist(),
+                OpenMayaAnim2.MFnAnimCurve.kTangentLinear,
+                OpenMayaAnim2.MFnAnimCurve.kTangentLinear,
+                False, change
+            )
+
+        def undo():
+            change.undoIt()
+            modifier.undoIt()
+
+        def redo():
+            modifier.doIt()
+            change.redoIt()
+
+        from gris3 import apiUndo
+        apiUndo.commit(undo, redo)
+
+    def bake(self, roots=None, start=None, end=None):
+        r"""
+            createSimulatedSystemで収集したチェーンのシミュレーションを行い、
+            回転値をベイクする。
+            
+            Args:
+                roots (list):createSimulatedSystemの戻り値のリスト
+                start (float):シミューレーション開始フレーム
+                end (float):シミューレーション終了フレーム
+        """
+        if not start:
+            start = cmds.playbackOptions(q=True, min=True)
+        if not end:
+            end = cmds.playbackOptions(q=True, max=True)
+        if not roots:
+            roots = [self.createSimulatedSystem()]
+        elif isinstance(roots, dict):
+            roots = [roots]
+        frames = [start + x for x in range(int(end - start) + 1)]
+        for data in roots:
+            local_mtx = self.solve(data, frames)
+            values = self.rotationValues(data, local_mtx)
+            cmds.cutKey(data['nodes'], at=self.RotateAttrs, cl=True)
+            self.writeAnimCurves(data['nodes'], frames, values)
+
+    def simulate(self, simOption=None):
+        r"""
+            シミューレーションをセットアップからベイクまで一通り実行する。
+            
+            Args:
+                simOption (dict):
+        """
+        self.bake([self.createSimulatedSystem(simOption)])
@@ -0,0 +1,300 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    ジョイントチェーンのスプリングシミュレーションをNumPyで計算する
+    ソルバーを提供するモジュール。
+    Mayaに依存せず、行列の配列のみを入出力とするため単体で実行できる。
+    行列はMayaと同じ行ベクトル形式(平行移動が4行目)の4x4行列とする。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import numpy
+
+# stiffnessをバネ定数に換算する係数。
+SpringScale = 400.0
+# drag、dampを減衰係数に換算する係数。
+DampingScale = 20.0
+# 1フレームあたりの計算回数の初期値。
+DefaultSubSteps = 4
+
+
+def _perJoint(value, count):
+    r"""
+        スカラー値またはジョイント毎の値を(ジョイント数, 1)の配列に変換する。
+
+        Args:
+            value (float or list):
+            count (int):ジョイント数
+
+        Returns:
+            numpy.ndarray:
+    """
+    value = numpy.asarray(value, dtype=numpy.float64).reshape(-1)
+    if value.size == 1:
+        value = numpy.repeat(value, count)
+    if value.size != count:
+        raise ValueError(
+            'The number of values does not match the number of joints.'
+        )
+    return value.reshape(-1, 1)
+
+
+def hierarchyLevels(parentIndices):
+    r"""
+        親のインデックスのリストから、階層の深さ毎のインデックスの配列の
+        リストを返す。親のないジョイントの親のインデックスは-1とする。
+
+        Args:
+            parentIndices (list):
+
+        Returns:
+            list:
+    """
+    parents = numpy.asarray(parentIndices, dtype=numpy.int64)
+    depth = numpy.full(len(parents), -1, dtype=numpy.int64)
+    depth[parents < 0] = 0
+    for d in range(len(parents)):
+        current = numpy.nonzero(depth == d)[0]
+        if not current.size:
+            break
+        children = numpy.nonzero(numpy.isin(parents, current))[0]
+        depth[children] = d + 1
+    if (depth < 0).any():
+        raise ValueError('The hierarchy has a cycle or an invalid parent.')
+    return [
+        numpy.nonzero(depth == d)[0] for d in range(depth.max() + 1)
+    ]
+
+
+def alignRotations(srcVectors, dstVectors):
+    r"""
+        srcVectorsの方向をdstVectorsの方向へ最短で回転させる3x3行列の配列を
+        返す。行列は行ベクトル形式で、src.dot(matrix)がdstの方向になる。
+
+        Args:
+            srcVectors (numpy.ndarray):(..., 3)の配列
+            dstVectors (numpy.ndarray):(..., 3)の配列
+
+        Returns:
+            numpy.ndarray:(..., 3, 3)の配列
+    """
+    def normalize(v):
+        length = numpy.linalg.norm(v, axis=-1, keepdims=True)
+        return v / numpy.where(length > 1e-12, length, 1.0)
+
+    a = normalize(srcVectors)
+    b = normalize(dstVectors)
+    v = numpy.cross(a, b)
+    c = numpy.sum(a * b, axis=-1)
+    skew = numpy.zeros(v.shape[:-1] + (3, 3), dtype=numpy.float64)
+    skew[..., 0, 1] = -v[..., 2]
+    skew[..., 0, 2] = v[..., 1]
+    skew[..., 1, 0] = v[..., 2]
+    skew[..., 1, 2] = -v[..., 0]
+    skew[..., 2, 0] = -v[..., 1]
+    skew[..., 2, 1] = v[..., 0]
+    # 真逆を向く場合は回転を求められないため回転させない。
+    factor = numpy.where(c > -1 + 1e-8, 1.0 / numpy.maximum(1 + c, 1e-8), 0)
+    skew *= numpy.where(c > -1 + 1e-8, 1.0, 0)[..., None, None]
+    rotation = (
+        numpy.eye(3) + skew +
+        numpy.matmul(skew, skew) * factor[..., None, None]
+    )
+    # 列ベクトル形式の行列を転置して行ベクトル形式にする。
+    return numpy.swapaxes(rotation, -1, -2)
+
+
+def goalMatrices(driverMatrices, restMatrices, parentIndices, driverIndices):
+    r"""
+        ドライバの行列とレスト状態のローカル行列から、シミュレーション前の
+        各フレームのワールド行列を計算する。
+
+        Args:
+            driverMatrices (numpy.ndarray):(フレーム数, ドライバ数, 4, 4)
+            restMatrices (numpy.ndarray):(ジョイント数, 4, 4)
+            parentIndices (list):親ジョイントのインデックス。ルートは-1
+            driverIndices (list):ルートジョイントのドライバのインデックス
+
+        Returns:
+            numpy.ndarray:(フレーム数, ジョイント数, 4, 4)
+    """
+    driver_mtx = numpy.asarray(driverMatrices, dtype=numpy.float64)
+    rest = numpy.asarray(restMatrices, dtype=numpy.float64)
+    parents = numpy.asarray(parentIndices, dtype=numpy.int64)
+    drivers = numpy.asarray(driverIndices, dtype=numpy.int64)
+    levels = hierarchyLevels(parents)
+    result = numpy.zeros(
+        (len(driver_mtx), len(rest), 4, 4), dtype=numpy.float64
+    )
+    roots = levels[0]
+    result[:, roots] = numpy.matmul(rest[roots], driver_mtx[:, drivers[roots]])
+    for idx in levels[1:]:
+        result[:, idx] = numpy.matmul(rest[idx], result[:, parents[idx]])
+    return result
+
+
+def solveSpringChains(
+    driverMatrices, restMatrices, parentIndices, driverIndices,
+    stiffness=0.5, mass=5.0, drag=0.35, damp=0.1, gravity=9.8,
+    fps=24.0, subSteps=DefaultSubSteps, gravityAxis=(0.0, -1.0, 0.0)
+):
+    r"""
+        全チェーンのスプリングシミュレーションを同時に計算する。
+        各ジョイントはレスト状態の位置(ゴール)へバネで引き寄せられ、
+        dampはゴールとの相対速度、dragは絶対速度に対する減衰として働く。
+        積分は陰的オイラー法で行うため、パラメータによらず発散しない。
+        ルートジョイントはゴールに固定され、その他のジョイントは親との
+        距離がレスト状態の長さに保たれる。
+        戻り値はシミュレーション後のワールド行列とローカル行列のtuple。
+
+        Args:
+            driverMatrices (numpy.ndarray):
+                (フレーム数, ドライバ数, 4, 4)のドライバのワールド行列
+            restMatrices (numpy.ndarray):
+                (ジョイント数, 4, 4)のレスト状態のローカル行列
+            parentIndices (list):親ジョイントのインデックス。ルートは-1
+            driverIndices (list):ルートジョイントのドライバのインデックス
+            stiffness (float or list):ゴールへ引き寄せる強さ
+            mass (float or list):質量
+            drag (float or list):絶対速度に対する減衰
+            damp (float or list):ゴールとの相対速度に対する減衰
+            gravity (float):重力加速度
+            fps (float):1秒あたりのフレーム数
+            subSteps (int):1フレームあたりの計算回数
+            gravityAxis (list):重力の方向
+
+        Returns:
+            tuple:
+                (ワールド行列, ローカル行列)。
+                共に(フレーム数, ジョイント数, 4, 4)の配列
+    """
+    parents = numpy.asarray(parentIndices, dtype=numpy.int64)
+    rest = numpy.asarray(restMatrices, dtype=numpy.float64)
+    num = len(parents)
+    levels = hierarchyLevels(parents)
+    roots = levels[0]
+    goals = goalMatrices(driverMatrices, rest, parents, driverIndices)
+    goal_pos = goals[:, :, 3, :3]
+    num_frames = len(goals)
+
+    # 各パラメータを計算用の係数に換算する。===================================
+    mass = numpy.maximum(_perJoint(mass, num), 1e-6)
+    spring = _perJoint(stiffness, num) * SpringScale / mass
+    rel_damp = _perJoint(damp, num) * DampingScale / mass
+    abs_damp = _perJoint(drag, num) * DampingScale / mass
+    gravity_vec = (
+        numpy.asarray(gravityAxis, dtype=numpy.float64) * float(gravity)
+    )
+    subSteps = max(int(subSteps), 1)
+    dt = 1.0 / (float(fps) * subSteps)
+    denom = 1.0 + dt * dt * spring + dt * (rel_damp + abs_damp)
+    lengths = numpy.linalg.norm(
+        goal_pos[0] - goal_pos[0][numpy.maximum(parents, 0)], axis=-1
+    )
+    # =========================================================================
+
+    positions = numpy.zeros((num_frames, num, 3), dtype=numpy.float64)
+    positions[0] = goal_pos[0]
+    pos = goal_pos[0].copy()
+    vel = numpy.zeros((num, 3), dtype=numpy.float64)
+    for f in range(1, num_frames):
+        goal_vel = (goal_pos[f] - goal_pos[f-1]) * float(fps)
+        for s in range(1, subSteps + 1):
+            goal = goal_pos[f-1] + (goal_pos[f] - goal_pos[f-1]) * (
+                float(s) / subSteps
+            )
+            new_vel = (
+                vel + dt * (
+                    spring * (goal - pos) + rel_damp * goal_vel + gravity_vec
+                )
+            ) / denom
+            new_pos = pos + dt * new_vel
+            new_pos[roots] = goal[roots]
+            # 親からの距離をレスト状態の長さに保つ。
+            for idx in levels[1:]:
+                vec = new_pos[idx] - new_pos[parents[idx]]
+                length = numpy.linalg.norm(vec, axis=-1, keepdims=True)
+                fallback = goal[idx] - goal[parents[idx]]
+                vec = numpy.where(length > 1e-12, vec, fallback)
+                length = numpy.linalg.norm(vec, axis=-1, keepdims=True)
+                new_pos[idx] = (
+                    new_pos[parents[idx]] +
+                    vec / numpy.maximum(length, 1e-12) * lengths[idx, None]
+                )
+            vel = (new_pos - pos) / dt
+            pos = new_pos
+        positions[f] = pos
+
+    return chainMatrices(
+        driverMatrices, rest, parents, driverIndices, positions
+    )
+
+
+def chainMatrices(
+    driverMatrices, restMatrices, parentIndices, driverIndices, positions
+):
+    r"""
+        シミュレーション後の位置から、各ジョイントが子の位置を向くように
+        回転させたワールド行列とローカル行列を計算する。
+        子を持たないジョイントはレスト状態のローカル行列を保つ。
+
+        Args:
+            driverMatrices (numpy.ndarray):(フレーム数, ドライバ数, 4, 4)
+            restMatrices (numpy.ndarray):(ジョイント数, 4, 4)
+            parentIndices (list):親ジョイントのインデックス。ルートは-1
+            driverIndices (list):ルートジョイントのドライバのインデックス
+            positions (numpy.ndarray):(フレーム数, ジョイント数, 3)
+
+        Returns:
+            tuple:(ワールド行列, ローカル行列)
+    """
+    driver_mtx = numpy.asarray(driverMatrices, dtype=numpy.float64)
+    rest = numpy.asarray(restMatrices, dtype=numpy.float64)
+    parents = numpy.asarray(parentIndices, dtype=numpy.int64)
+    drivers = numpy.asarray(driverIndices, dtype=numpy.int64)
+    levels = hierarchyLevels(parents)
+    num_frames, num = positions.shape[:2]
+
+    # 向きを決める子(チェーンの次のジョイント)を決定する。
+    aim_child = numpy.full(num, -1, dtype=numpy.int64)
+    for i in range(num - 1, -1, -1):
+        if parents[i] >= 0:
+            aim_child[parents[i]] = i
+
+    worlds = numpy.zeros((num_frames, num, 4, 4), dtype=numpy.float64)
+    for d, idx in enumerate(levels):
+        if d == 0:
+            parent_mtx = driver_mtx[:, drivers[idx]]
+        else:
+            parent_mtx = worlds[:, parents[idx]]
+        carried = numpy.matmul(rest[idx], parent_mtx)
+        has_child = aim_child[idx] >= 0
+        if has_child.any():
+            src_idx = idx[has_child]
+            child = aim_child[src_idx]
+            src_rot = carried[:, has_child, :3, :3]
+            # 親に追従した状態での子の方向を、シミュレーション後の方向へ
+            # 向ける。
+            src_dir = numpy.matmul(
+                rest[child, 3, :3][None, :, None, :], src_rot
+            )[:, :, 0]
+            dst_dir = positions[:, child] - carried[:, has_child, 3, :3]
+            align = alignRotations(src_dir, dst_dir)
+            carried[:, has_child, :3, :3] = numpy.matmul(src_rot, align)
+        worlds[:, idx] = carried
+
+    parent_worlds = numpy.zeros_like(worlds)
+    roots = levels[0]
+    parent_worlds[:, roots] = driver_mtx[:, drivers[roots]]
+    non_roots = numpy.nonzero(parents >= 0)[0]
+    parent_worlds[:, non_roots] = worlds[:, parents[non_roots]]
+    local_mtx = numpy.matmul(worlds, numpy.linalg.inv(parent_worlds))
+    return worlds, local_mtx
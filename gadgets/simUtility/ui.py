@@ -103,6 +103,7 @@ class ProcessWidget(QtWidgets.QGroupBox):
             ('setup', True),
             ('bake', True),
             ('hideObject', False),
+            ('arraySolver', False),
         ):
            btn = QtWidgets.QCheckBox(lib.title(key))
            btn.setChecked(checked)
@@ -355,7 +356,10 @@ class MainWidget(QtWidgets.QWidget):
         print('-'*80)
 
         # sim = simCore.NSpringSimulator()
-        sim = simCore.SpringSimulator()
+        if state['arraySolver']:
+            sim = simCore.ArraySpringSimulator()
+        else:
+            sim = simCore.SpringSimulator()
         restore_display = (
             sim.hideObjects() if state['hideObject'] and state['bake']
             else None
@@ -180,9 +180,12 @@ class Creator(extendedUI.EasyMovableSplitter):
     def refreshPresetList(self):
         r"""
             プリセットのリストを更新する。
+            リストはrigScripts.rigModuleManifestから作成されるため、
+            この時点ではモジュールはインポートされない。
             itemのdata内には
                 QtCore.Qt.UserRole+1 : モジュール名
                 QtCore.Qt.UserRole+2 : オプション表示タブのインデックス
+                                       (未作成の場合は-1)
                 QtCore.Qt.UserRole+3 : ベースネーム
             が格納されている。
         """
@@ -190,7 +193,7 @@ class Creator(extendedUI.EasyMovableSplitter):
         model.removeRows(0, model.rowCount())
         rootitem = model.invisibleRootItem()
 
-        modules = rigScripts.rigModuleList(loadMode=1)
+        entries = rigScripts.rigModuleManifest()
         self.__param_editor.addOptionWidget(QtWidgets.QWidget())
 
         catitems = {}
@@ -199,20 +202,24 @@ class Creator(extendedUI.EasyMovableSplitter):
         preset_icon = QtGui.QIcon(uilib.IconPath('uiBtn_squareLayout'))
         module_icon = QtGui.QIcon(uilib.IconPath('unit'))
 
-        for mod in modules:
-            mod_name = mod.__name__
-            prename = mod_name.split('.')[-1]
+        for entry in entries:
+            mod_name = entry['name']
+            prename = entry['unitType']
 
             # プリセットだった場合の処理。=====================================
-            if hasattr(mod, 'Preset'):
-                p = mod.Preset()
-                item = QtGui.QStandardItem(p.name())
+            if 'Preset' in entry['names']:
+                p = entry['preset'] or {
+                    'name': '', 'description': '', 'includes': []
+                }
+                item = QtGui.QStandardItem(p['name'] or prename)
                 item.setData('__preset__')
                 item.setIcon(preset_icon)
                 item.setData(prename, QtCore.Qt.UserRole + 2)
-                item.setData(p.description(), QtCore.Qt.UserRole + 3)
+                item.setData(p['description'], QtCore.Qt.UserRole + 3)
                 item.setData(
-                    '\n'.join([x() for x in p.includes()]),
+                    '\n'.join(
+                        [rigScripts.PresetElement(*x)() for x in p['includes']]
+                    ),
                     QtCore.Qt.UserRole + 4
                 )
                 rootitem.setChild(rootitem.rowCount(), 0, item)
@@ -221,8 +228,8 @@ class Creator(extendedUI.EasyMovableSplitter):
 
             # モジュール内にCategory変数があれば、そのカテゴリ内にこの ========
             # モジュールをまとめる。
-            if hasattr(mod, 'Category'):
-                catname = mod.Category
+            if entry['category']:
+                catname = entry['category']
                 if catname in catitems:
                     parentitem = catitems[catname]
                 else:
@@ -235,8 +242,8 @@ class Creator(extendedUI.EasyMovableSplitter):
             # モジュール内にBaseName変数があれば、このモジュールが選択された
             # 時にオプションUIのNameフィールドに、BaseNameの中身を表示する。
             # 無ければRigNamePatternに沿ってモジュール名からNameを作成する。
-            if hasattr(mod, 'BaseName'):
-                basename = mod.BaseName
+            if entry['baseName']:
+                basename = entry['baseName']
             else:
                 basename = rigScripts.RigNamePattern.sub('', prename)
             # =================================================================
@@ -251,22 +258,37 @@ class Creator(extendedUI.EasyMovableSplitter):
             else:
                 items.append(item)
 
-            # オプション項目がある場合、それをUIとして保持しておく。===========
-            if hasattr(mod, 'Option'):
-                self.__param_editor.addOptionWidget(
-                    self.addOption(mod.Option())
-                )
-                item.setData(
-                    self.__param_editor.optionTabCount() - 1,
-                    QtCore.Qt.UserRole + 2
-                )
-            # =================================================================
+            # オプション項目がある場合、UIは最初に選択された時に作成する。
+            if 'Option' in entry['names']:
+                item.setData(-1, QtCore.Qt.UserRole + 2)
         for cat in sorted(catitems.keys()):
             rootitem.setChild(rootitem.rowCount(), 0, catitems[cat])
 
         for item in items:
             rootitem.setChild(rootitem.rowCount(), 0, item)
 
+    def optionTabIndex(self, index):
+        r"""
+            与えられたアイテムのオプション表示タブのインデックスを返す。
+            オプションUIが未作成の場合はモジュールを読み込んで作成する。
+            
+            Args:
+                index (QtCore.QModelIndex):
+                
+            Returns:
+                int:
+        """
+        tab_index = index.data(QtCore.Qt.UserRole + 2)
+        if tab_index is None:
+            return 0
+        if tab_index >= 0:
+            return tab_index
+        module = rigScripts.getRigModule(index.data())
+        self.__param_editor.addOptionWidget(self.addOption(module.Option()))
+        tab_index = self.__param_editor.optionTabCount() - 1
+        index.model().setData(index, tab_index, QtCore.Qt.UserRole + 2)
+        return tab_index
+
     def updateEditor(self, selected, deselected):
         r"""
             編集用UIを更新する。
@@ -302,11 +324,7 @@ class Creator(extendedUI.EasyMovableSplitter):
         self.__editor.setCurrentIndex(2)
         self.__currentModule = index.data()
         self.__param_editor.setName(index.data(QtCore.Qt.UserRole + 3))
-        tab_index = index.data(QtCore.Qt.UserRole + 2)
-        if tab_index is None:
-            self.__param_editor.setCurrentIndex(0)
-        else:
-            self.__param_editor.setCurrentIndex(tab_index)
+        self.__param_editor.setCurrentIndex(self.optionTabIndex(index))
 
     def create(self):
         r"""
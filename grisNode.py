@@ -13,7 +13,7 @@ r"""
         Unauthorized copying of this file, via any medium is strictly prohibited
         Proprietary and confidential
 """
-from . import node, info, system
+from . import node, info, system, grisNodeRegistry
 
 
 class GrisRootError(Exception):
@@ -28,6 +28,19 @@ class AbstractGrisNode(object):
     NodeType = ''
     BasicAttrs = []
     ExtraAttrs = []
+    @classmethod
+    def _tagAttrs(cls):
+        r"""
+            このクラスを識別するためのアトリビュート名(BasicAttrsの
+            ロングネーム)のリストを返す。
+            
+            Returns:
+                list:
+        """
+        return [
+            x[0].get('ln', x[0].get('longName')) for x in cls.BasicAttrs
+        ]
+
     def _test(self):
         r"""
             設定されたノードが、このクラスを構成するに足るかどうを判定する。
@@ -37,9 +50,7 @@ class AbstractGrisNode(object):
         """
         if not self.isType(self.NodeType):
             return False
-        for attr in [
-            x[0].get('ln', x[0].get('longName')) for x in self.BasicAttrs
-        ]:
+        for attr in self._tagAttrs():
             if not self.hasAttr(attr):
                 return False
         return True
@@ -67,7 +78,11 @@ class AbstractGrisNode(object):
             if value is not None:
                 n(attrname, value[0], **value[1])
             node.cmds.setAttr(n + '.' + attrname, **state)
-        return cls(n())
+        obj = cls(n())
+        registry = grisNodeRegistry.activeRegistry()
+        if registry is not None:
+            registry.register(obj)
+        return obj
 
     def setup(self):
         r"""
@@ -96,13 +111,21 @@ class AbstractRootNode(AbstractGrisNode):
             Returns:
                 any:
         """
+        registry = grisNodeRegistry.activeRegistry()
+        if registry is not None:
+            n = registry.relatedNode(self, groupType, grisNodeClass)
+            if n is not None:
+                return n
+
         t_attr = self.attr(groupType)
         n = t_attr.source()
         if n:
-            return grisNodeClass(n())
-
-        n = grisNodeClass._create(**keywords)
-        n.attr('message') >> t_attr
+            n = grisNodeClass(n())
+        else:
+            n = grisNodeClass._create(**keywords)
+            n.attr('message') >> t_attr
+        if registry is not None:
+            registry.setRelatedNode(self, groupType, n)
         return n
 
 
@@ -1067,6 +1090,8 @@ def listNodes(grisNode, *nodelist, **keywords):
         このモジュールで定義されたAbstractGrisNodeの派生クラスに該当する
         ノードをリストで返す。
         引き数nodelistとkeywordsはcmds.lsにわたす引き数となる。
+        grisNodeRegistryが有効で、keywordsの指定がない場合は
+        シーンを検索せずに索引から返す。
         
         Args:
             grisNode (AbstractGrisNode):
@@ -1076,6 +1101,17 @@ def listNodes(grisNode, *nodelist, **keywords):
         Returns:
             list:
     """
+    registry = grisNodeRegistry.activeRegistry()
+    if (
+        registry is not None and not keywords and
+        registry.isIndexable(grisNode)
+    ):
+        if not nodelist:
+            return registry.listNodes(grisNode)
+        return registry.filterNodes(
+            grisNode,
+            node.cmds.ls(*nodelist, type=grisNode.NodeType) or []
+        )
     result = []
     for n in node.ls(*nodelist, type=grisNode.NodeType, **keywords):
         gn = grisNode(n.name())
@@ -0,0 +1,512 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    grisNodeで定義されたノードをシーン中から検索するための索引を
+    提供するモジュール。
+    GrisNodeのクラスごとに、初回の問い合わせ時のみ識別用アトリビュート
+    (BasicAttrsの先頭)を持つノードをシーンから検索し、以降はノードの
+    追加・削除のコールバックで索引を更新する。
+    また、ルートノードから関連ノード(unit_grpなど)へのコネクションの
+    解決結果を保持し、コネクションの変更時に破棄する。
+    索引は既定では無効で、setEnabledまたはRegistryScopeで有効にする。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+from collections import OrderedDict
+from maya import cmds
+from maya.api import OpenMaya
+
+
+def _dependNode(name):
+    r"""
+        ノード名からMObjectを返す。存在しない場合はNoneを返す。
+
+        Args:
+            name (str):
+
+        Returns:
+            OpenMaya.MObject:
+    """
+    sel = OpenMaya.MSelectionList()
+    try:
+        sel.add(name)
+        return sel.getDependNode(0)
+    except Exception:
+        return None
+
+
+def _hashCode(name):
+    r"""
+        ノード名からMObjectHandleのハッシュコードを返す。
+        存在しない場合はNoneを返す。
+
+        Args:
+            name (str):
+
+        Returns:
+            int:
+    """
+    mobject = _dependNode(name)
+    if mobject is None:
+        return None
+    return OpenMaya.MObjectHandle(mobject).hashCode()
+
+
+def _nodeName(mobject):
+    r"""
+        MObjectのノード名をcmds.lsと同じ形式で返す。
+
+        Args:
+            mobject (OpenMaya.MObject):
+
+        Returns:
+            str:
+    """
+    if mobject.hasFn(OpenMaya.MFn.kDagNode):
+        return OpenMaya.MDagPath.getAPathTo(mobject).partialPathName()
+    return OpenMaya.MFnDependencyNode(mobject).name()
+
+
+def _rawName(obj):
+    r"""
+        AbstractNodeの作成時の名前を返す。
+        name()と違い、ノードの名前が変わっても元の文字列を返す。
+
+        Args:
+            obj (node.AbstractNode):
+
+        Returns:
+            str:
+    """
+    return str.__str__(obj)
+
+
+def _matches(mobject, grisNode):
+    r"""
+        MObjectがGrisNodeのクラスの条件を満たすかどうかを返す。
+        AbstractGrisNode._testと同じ判定をAPIで行う。
+
+        Args:
+            mobject (OpenMaya.MObject):
+            grisNode (type):AbstractGrisNodeの派生クラス
+
+        Returns:
+            bool:
+    """
+    fn = OpenMaya.MFnDependencyNode(mobject)
+    if fn.typeName != grisNode.NodeType:
+        return False
+    for attr in grisNode._tagAttrs():
+        if not fn.hasAttribute(attr):
+            return False
+    return True
+
+
+class GrisNodeRegistry(object):
+    r"""
+        GrisNodeの索引を保持するシングルトンクラス。
+    """
+    def __new__(cls):
+        if hasattr(cls, '__instance__'):
+            return cls.__instance__
+        obj = super(GrisNodeRegistry, cls).__new__(cls)
+        obj.__indexes = {}
+        obj.__instances = {}
+        obj.__pending = []
+        obj.__related = {}
+        obj.__related_roots = set()
+        obj.__callbacks = []
+        obj.__enabled = False
+        obj.__hits = 0
+        obj.__misses = 0
+        cls.__instance__ = obj
+        return obj
+
+    def setEnabled(self, state):
+        r"""
+            索引を有効にするかどうかを設定する。
+            無効にした場合は索引とコールバックを全て破棄する。
+
+            Args:
+                state (bool):
+        """
+        state = bool(state)
+        if state == self.__enabled:
+            return
+        self.__enabled = state
+        if state:
+            self.__installCallbacks()
+        else:
+            self.clear()
+            self.__removeCallbacks()
+
+    def isEnabled(self):
+        r"""
+            索引が有効かどうかを返す。
+
+            Returns:
+                bool:
+        """
+        return self.__enabled
+
+    def statistics(self):
+        r"""
+            ヒット数、ミス数、索引を持つクラス数、索引されたノード数を
+            持つ辞書を返す。
+            ミス数はシーンを検索した回数を表す。
+
+            Returns:
+                dict:
+        """
+        return {
+            'hits': self.__hits, 'misses': self.__misses,
+            'classes': len(self.__indexes),
+            'nodes': sum(len(x) for x in self.__indexes.values()),
+        }
+
+    def resetStatistics(self):
+        r"""
+            ヒット数とミス数を0に戻す。
+        """
+        self.__hits = 0
+        self.__misses = 0
+
+    def __installCallbacks(self):
+        r"""
+            ノードの追加と削除、コネクションの変更、シーンの切り替えを
+            検知するコールバックを登録する。
+        """
+        def nodeAdded(mobject, clientData):
+            if self.__indexes:
+                self.__pending.append(OpenMaya.MObjectHandle(mobject))
+
+        def nodeRemoved(mobject, clientData):
+            self.__removeNode(OpenMaya.MObjectHandle(mobject).hashCode())
+
+        def connectionChanged(srcPlug, dstPlug, made, clientData):
+            if not self.__related_roots:
+                return
+            code = OpenMaya.MObjectHandle(dstPlug.node()).hashCode()
+            if code in self.__related_roots:
+                self.__forgetRelated(code)
+
+        self.__callbacks = [
+            OpenMaya.MDGMessage.addNodeAddedCallback(nodeAdded),
+            OpenMaya.MDGMessage.addNodeRemovedCallback(nodeRemoved),
+            OpenMaya.MDGMessage.addConnectionCallback(connectionChanged),
+        ]
+        for msg in (
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+            OpenMaya.MSceneMessage.kBeforeRemoveReference,
+        ):
+            self.__callbacks.append(
+                OpenMaya.MSceneMessage.addCallback(
+                    msg, lambda *args: self.clear()
+                )
+            )
+
+    def __removeCallbacks(self):
+        r"""
+            登録したコールバックを全て削除する。
+        """
+        if self.__callbacks:
+            OpenMaya.MMessage.removeCallbacks(self.__callbacks)
+        self.__callbacks = []
+
+    def __removeNode(self, code):
+        r"""
+            削除されたノードを索引から取り除く。
+
+            Args:
+                code (int):MObjectHandleのハッシュコード
+        """
+        for grisNode, index in self.__indexes.items():
+            if index.pop(code, None) is not None:
+                self.__instances.pop((grisNode, code), None)
+        if not self.__related:
+            return
+        if code in self.__related_roots:
+            self.__forgetRelated(code)
+        for key in [
+            k for k, v in self.__related.items() if v[0] == code
+        ]:
+            del self.__related[key]
+
+    def __forgetRelated(self, code):
+        r"""
+            ルートノードの関連ノードの解決結果を破棄する。
+
+            Args:
+                code (int):ルートノードのハッシュコード
+        """
+        self.__related_roots.discard(code)
+        for key in [k for k in self.__related if k[0] == code]:
+            del self.__related[key]
+
+    def __addNode(self, handle):
+        r"""
+            ノードを条件を満たす全てのクラスの索引に追加する。
+
+            Args:
+                handle (OpenMaya.MObjectHandle):
+        """
+        if not handle.isValid() or not handle.isAlive():
+            return
+        mobject = handle.object()
+        code = handle.hashCode()
+        for grisNode, index in self.__indexes.items():
+            if code not in index and _matches(mobject, grisNode):
+                index[code] = handle
+
+    def __resolvePending(self):
+        r"""
+            前回の問い合わせ以降に追加されたノードを索引に反映する。
+        """
+        pending, self.__pending = self.__pending, []
+        for handle in pending:
+            self.__addNode(handle)
+
+    def __index(self, grisNode):
+        r"""
+            GrisNodeのクラスの索引を返す。
+            初回はシーンを検索して索引を作成する。
+
+            Args:
+                grisNode (type):AbstractGrisNodeの派生クラス
+
+            Returns:
+                OrderedDict:
+        """
+        self.__resolvePending()
+        index = self.__indexes.get(grisNode)
+        if index is not None:
+            self.__hits += 1
+            return index
+        self.__misses += 1
+        index = OrderedDict()
+        tag = grisNode._tagAttrs()[0]
+        for name in cmds.ls('*.' + tag, o=True, r=True) or []:
+            mobject = _dependNode(name)
+            if mobject is None or not _matches(mobject, grisNode):
+                continue
+            handle = OpenMaya.MObjectHandle(mobject)
+            index[handle.hashCode()] = handle
+        self.__indexes[grisNode] = index
+        return index
+
+    def __instance(self, grisNode, handle):
+        r"""
+            索引のノードをGrisNodeのインスタンスとして返す。
+            名前が変わっていなければ以前に作成したインスタンスを返す。
+
+            Args:
+                grisNode (type):AbstractGrisNodeの派生クラス
+                handle (OpenMaya.MObjectHandle):
+
+            Returns:
+                AbstractGrisNode:
+        """
+        key = (grisNode, handle.hashCode())
+        name = _nodeName(handle.object())
+        obj = self.__instances.get(key)
+        if obj is None or _rawName(obj) != name:
+            obj = grisNode(name)
+            self.__instances[key] = obj
+        return obj
+
+    @staticmethod
+    def isIndexable(grisNode):
+        r"""
+            GrisNodeのクラスが索引の対象になるかどうかを返す。
+            NodeTypeとBasicAttrsを持つクラスのみが対象となる。
+
+            Args:
+                grisNode (type):AbstractGrisNodeの派生クラス
+
+            Returns:
+                bool:
+        """
+        return bool(grisNode.NodeType and grisNode._tagAttrs())
+
+    def listNodes(self, grisNode):
+        r"""
+            シーン中のGrisNodeのクラスに該当するノードをリストで返す。
+
+            Args:
+                grisNode (type):AbstractGrisNodeの派生クラス
+
+            Returns:
+                list:
+        """
+        return [
+            self.__instance(grisNode, x)
+            for x in self.__index(grisNode).values() if x.isAlive()
+        ]
+
+    def filterNodes(self, grisNode, nodelist):
+        r"""
+            ノード名のリストのうち、GrisNodeのクラスに該当するものを
+            インスタンスのリストとして返す。
+
+            Args:
+                grisNode (type):AbstractGrisNodeの派生クラス
+                nodelist (list):ノード名のリスト
+
+            Returns:
+                list:
+        """
+        index = self.__index(grisNode)
+        result = []
+        for name in nodelist:
+            handle = index.get(_hashCode(name))
+            if handle is not None and handle.isAlive():
+                result.append(self.__instance(grisNode, handle))
+        return result
+
+    def register(self, grisNode):
+        r"""
+            作成されたGrisNodeを索引に追加する。
+            ノードの追加時点ではアトリビュートが無いため、作成の完了後に
+            呼び出す。
+
+            Args:
+                grisNode (AbstractGrisNode):
+        """
+        if not self.__indexes:
+            return
+        mobject = _dependNode(grisNode())
+        if mobject is not None:
+            self.__addNode(OpenMaya.MObjectHandle(mobject))
+
+    def relatedNode(self, root, attr, grisNode):
+        r"""
+            ルートノードのアトリビュートに接続されている関連ノードの
+            解決結果を返す。無い場合はNoneを返す。
+
+            Args:
+                root (AbstractGrisNode):ルートノード
+                attr (str):アトリビュート名
+                grisNode (type):関連ノードのクラス
+
+            Returns:
+                AbstractGrisNode:
+        """
+        entry = self.__related.get((_hashCode(root()), attr))
+        if entry is None:
+            return None
+        obj = entry[1]
+        if type(obj) is not grisNode or _rawName(obj) != obj.name():
+            return None
+        self.__hits += 1
+        return obj
+
+    def setRelatedNode(self, root, attr, related):
+        r"""
+            ルートノードのアトリビュートに接続されている関連ノードを
+            記録する。
+
+            Args:
+                root (AbstractGrisNode):ルートノード
+                attr (str):アトリビュート名
+                related (AbstractGrisNode):関連ノード
+        """
+        code = _hashCode(root())
+        related_code = _hashCode(related())
+        if code is None or related_code is None:
+            return
+        self.__related[(code, attr)] = (related_code, related)
+        self.__related_roots.add(code)
+
+    def clear(self):
+        r"""
+            全ての索引を破棄する。
+        """
+        self.__indexes.clear()
+        self.__instances.clear()
+        self.__related.clear()
+        self.__related_roots.clear()
+        self.__pending = []
+
+
+class RegistryScope(object):
+    r"""
+        with文の中でのみ索引を有効にするコンテキスト制御クラス。
+        with文を抜ける際に索引は破棄され、元の有効状態に戻される。
+    """
+    def __enter__(self):
+        registry = GrisNodeRegistry()
+        self.__state = registry.isEnabled()
+        registry.setEnabled(True)
+        return registry
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        r"""
+            Args:
+                exc_type (any):
+                exc_value (any):
+                traceback (any):
+
+            Returns:
+                bool:
+        """
+        registry = GrisNodeRegistry()
+        registry.clear()
+        registry.setEnabled(self.__state)
+        return False
+
+
+def activeRegistry():
+    r"""
+        索引が有効な場合はGrisNodeRegistryを、無効な場合はNoneを返す。
+
+        Returns:
+            GrisNodeRegistry:
+    """
+    registry = GrisNodeRegistry()
+    return registry if registry.isEnabled() else None
+
+
+def setEnabled(state):
+    r"""
+        索引を有効にするかどうかを設定する。
+
+        Args:
+            state (bool):
+    """
+    GrisNodeRegistry().setEnabled(state)
+
+
+def isEnabled():
+    r"""
+        索引が有効かどうかを返す。
+
+        Returns:
+            bool:
+    """
+    return GrisNodeRegistry().isEnabled()
+
+
+def statistics():
+    r"""
+        索引のヒット数、ミス数などの統計を返す。
+
+        Returns:
+            dict:
+    """
+    return GrisNodeRegistry().statistics()
+
+
+def clear():
+    r"""
+        全ての索引を破棄する。
+    """
+    GrisNodeRegistry().clear()
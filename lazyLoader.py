@@ -0,0 +1,102 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    gris3のサブモジュールを必要になった時点で読み込むための機能と、
+    その読み込みにかかった時間を記録する機能を提供するモジュール。
+    ルートパッケージから遅延読み込みされるモジュールや、
+    ConstructorManagerなどが個別に読み込むモジュールの時間が記録され、
+    importReportで確認することができる。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import sys
+import time
+import importlib
+from collections import OrderedDict
+
+# モジュール名と読み込みにかかった秒数の記録。
+__IMPORT_TIMES__ = OrderedDict()
+_Timer = getattr(time, 'perf_counter', time.time)
+
+
+def importModule(moduleName):
+    r"""
+        モジュールを読み込んで返す。
+        まだ読み込まれていないモジュールの場合は読み込みにかかった時間を
+        記録する。時間は内部で読み込まれたモジュールの分も含む。
+
+        Args:
+            moduleName (str):モジュールのフルネーム
+
+        Returns:
+            module:
+    """
+    module = sys.modules.get(moduleName)
+    if module is not None:
+        return module
+    start = _Timer()
+    module = importlib.import_module(moduleName)
+    __IMPORT_TIMES__[moduleName] = _Timer() - start
+    return module
+
+
+def importReport():
+    r"""
+        importModuleで記録した読み込み時間を、時間の長い順に
+        (モジュール名, 秒数)のリストで返す。
+
+        Returns:
+            list:
+    """
+    return sorted(
+        __IMPORT_TIMES__.items(), key=lambda x: x[1], reverse=True
+    )
+
+
+def printImportReport():
+    r"""
+        importReportの内容と、現在読み込まれているgris3のモジュール数を
+        出力する。
+    """
+    report = importReport()
+    print('# Import Report ' + '=' * 62)
+    for name, seconds in report:
+        print('    %-56s : %8.3f sec' % (name, seconds))
+    print('    Total : %.3f sec (%s modules)' % (
+        sum([x[1] for x in report]), len(report)
+    ))
+    print('    Loaded gris3 modules : %s' % len(loadedModules()))
+    print('# ' + '=' * 76)
+
+
+def resetImportReport():
+    r"""
+        記録した読み込み時間を全て破棄する。
+    """
+    __IMPORT_TIMES__.clear()
+
+
+def loadedModules(prefix=None):
+    r"""
+        読み込み済みのモジュールのうち、名前がprefixで始まるものを
+        ソートして返す。prefixを省略した場合はこのパッケージ名を使用する。
+
+        Args:
+            prefix (str):
+
+        Returns:
+            list:
+    """
+    prefix = prefix or __name__.split('.')[0]
+    return sorted([
+        x for x, m in list(sys.modules.items())
+        if m is not None and (x == prefix or x.startswith(prefix + '.'))
+    ])
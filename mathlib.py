@@ -364,6 +364,17 @@ class Vector(list):
         """
         self.__set(self.norm())
 
+    def asArray(self):
+        r"""
+            ベクトルを(3,)のnumpy.ndarrayとして返す。
+            複数のベクトルをまとめて計算する場合はmatrixArrayを使用する。
+            
+            Returns:
+                numpy.ndarray:
+        """
+        import numpy
+        return numpy.array(self, dtype=numpy.float64)
+
     @property
     def x(self):
         r"""
@@ -521,7 +532,9 @@ class FMatrix(object):
             if isinstance(elements[0], (list, tuple)):
                 valuelist = elements[0]
             elif isinstance(elements[0], self.__class__):
-                valuelist = elements.asList()
+                valuelist = elements[0].asList()
+            else:
+                valuelist = list(elements[0])
         else:
             valuelist = elements
 
@@ -530,7 +543,7 @@ class FMatrix(object):
                 (
                     '%s requires list or tuple includes '
                     '16 elements.'
-                ) % cls.name
+                ) % self.__class__.__name__
             )
         valuelist = [float(x) for x in valuelist]
 
@@ -724,6 +737,16 @@ class FMatrix(object):
         """
         return self.__elements[:]
 
+    def asArray(self):
+        r"""
+            行列を(4, 4)のnumpy.ndarrayとして返す。
+            
+            Returns:
+                numpy.ndarray:
+        """
+        from . import matrixArray
+        return matrixArray.asMatrices(self.__elements)[0]
+
     def multiply(self, matrix):
         r"""
             行列の乗算の結果を返す。
@@ -734,15 +757,9 @@ class FMatrix(object):
             Returns:
                 FMatrix:
         """
-        newElements = []
-        cols = self.columns()
-        rows = matrix.rows()
-
-        return self.__class__(
-            [sum([x * y for x, y in zip(col, row)])
-                for col in cols for row in rows
-            ]
-        )
+        from . import matrixArray
+        result = matrixArray.multiply(self.asArray(), matrix.asArray())
+        return self.__class__(result.ravel().tolist())
 
     def inverseMatrix(self):
         r"""
@@ -751,50 +768,9 @@ class FMatrix(object):
             Returns:
                 FMatrix:
         """
-        oMtx = self.columns()
-        iMtx = self.__class__().columns()
-        n = range(self.MatrixSize)
-
-        # Gauss-Jordan method.-------------------------------------------------
-        for k in n:
-            # Selects pivot. then the element on (k, k) will be a max value.
-            max = k
-            for j in range(k+1, self.MatrixSize):
-                if abs(oMtx[j][k]) > abs(oMtx[max][k]):
-                    max = j
-
-            # Swaps a column.
-            if max != k:
-                for i in n:
-                    tmp = oMtx[max][i]
-                    oMtx[max][i] = oMtx[k][i]
-                    oMtx[k][i] = tmp
-                    
-                    tmp = iMtx[max][i]
-                    iMtx[max][i] = iMtx[k][i]
-                    iMtx[k][i] = tmp
-
-            # Changes a value of an element on (k, k) to 1.
-            tmp = oMtx[k][k]
-            for i in n:
-                oMtx[k][i] /= tmp
-                iMtx[k][i] /= tmp
-
-            # Changes a values of an elements with the exception of the
-            # element on (k, k) to 0.
-            for j in n:
-                if j == k:
-                    continue
-                tmp = oMtx[j][k] / oMtx[k][k]
-                for i in n:
-                    oMtx[j][i] = oMtx[j][i] - oMtx[k][i] * tmp
-                    iMtx[j][i] = iMtx[j][i] - iMtx[k][i] * tmp
-        # ---------------------------------------------------------------------
-        
-        newElements = []
-        for elm in iMtx:
-            newElements.extend(elm)
-        return self.__class__(newElements)
+        from . import matrixArray
+        result = matrixArray.inverse(self.asArray())
+        return self.__class__(result.ravel().tolist())
 
     def setTranslate(self, x=0.0, y=0.0, z=0.0):
         r"""
@@ -0,0 +1,575 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    行列やベクトルの配列を一括で計算する機能を提供するモジュール。
+    行列は(N, 4, 4)、ベクトルや位置は(N, 3)のNumPy配列として取り扱い、
+    乗算、逆行列、分解、ミラー、エイム方向の計算を配列単位で行う。
+    行列はMayaと同じ行ベクトル形式(平行移動が4行目)の4x4行列とする。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import numpy
+from .verutil import BaseString
+
+# MayaのrotateOrderアトリビュートの値に対応する回転順序。
+RotateOrders = ('xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx')
+# mathlib.mirrorMatrixと同じ、ミラー時に反転する列番号。
+MirrorX = (1, 2)
+MirrorY = (0, 2)
+MirrorZ = (0, 1)
+# 長さが0とみなす値。
+Epsilon = 1e-12
+
+
+def asMatrices(matrices):
+    r"""
+        行列、または行列のリストを(N, 4, 4)の配列に変換する。
+        16個のfloatを持つリスト、MMatrix、FMatrix、4x4の配列を受け付ける。
+
+        Args:
+            matrices (any):
+
+        Returns:
+            numpy.ndarray:
+    """
+    if hasattr(matrices, 'asList'):
+        matrices = matrices.asList()
+    elif (
+        isinstance(matrices, (list, tuple)) and matrices and
+        hasattr(matrices[0], 'asList')
+    ):
+        matrices = [x.asList() for x in matrices]
+    array = numpy.array(matrices, dtype=numpy.float64)
+    if array.size % 16:
+        raise ValueError('The given value can not be converted to matrices.')
+    return array.reshape(-1, 4, 4)
+
+
+def asVectors(vectors):
+    r"""
+        ベクトル、またはベクトルのリストを(N, 3)の配列に変換する。
+
+        Args:
+            vectors (any):
+
+        Returns:
+            numpy.ndarray:
+    """
+    array = numpy.array(vectors, dtype=numpy.float64)
+    if array.size % 3:
+        raise ValueError('The given value can not be converted to vectors.')
+    return array.reshape(-1, 3)
+
+
+def toLists(matrices):
+    r"""
+        行列の配列を16個のfloatを持つリストのリストに変換する。
+
+        Args:
+            matrices (numpy.ndarray):(N, 4, 4)の配列
+
+        Returns:
+            list:
+    """
+    return numpy.asarray(matrices).reshape(-1, 16).tolist()
+
+
+def identity(count=1):
+    r"""
+        単位行列の配列を返す。
+
+        Args:
+            count (int):行列の数
+
+        Returns:
+            numpy.ndarray:(count, 4, 4)の配列
+    """
+    return numpy.tile(numpy.eye(4), (count, 1, 1))
+
+
+def multiply(*matrices):
+    r"""
+        与えられた行列の配列を頭から順に乗算する。
+        各引数は(N, 4, 4)または(4, 4)の配列で、(4, 4)の場合は全ての行列に
+        対して同じ行列を乗算する。
+
+        Args:
+            *matrices (numpy.ndarray):
+
+        Returns:
+            numpy.ndarray:
+    """
+    if not matrices:
+        raise ValueError('No matrices were specified.')
+    result = numpy.asarray(matrices[0], dtype=numpy.float64)
+    for matrix in matrices[1:]:
+        result = numpy.matmul(result, matrix)
+    return result
+
+
+def multiplyChain(matrices):
+    r"""
+        (K, N, 4, 4)の配列を先頭の軸に沿って順に乗算した(N, 4, 4)の配列を
+        返す。
+
+        Args:
+            matrices (numpy.ndarray):
+
+        Returns:
+            numpy.ndarray:
+    """
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)
+    return multiply(*matrices)
+
+
+def inverse(matrices):
+    r"""
+        行列の配列の逆行列を返す。
+
+        Args:
+            matrices (numpy.ndarray):(N, 4, 4)の配列
+
+        Returns:
+            numpy.ndarray:
+    """
+    return numpy.linalg.inv(numpy.asarray(matrices, dtype=numpy.float64))
+
+
+def transformPoints(points, matrices):
+    r"""
+        位置の配列に行列の配列を乗算した位置を返す。
+
+        Args:
+            points (numpy.ndarray):(N, 3)の配列
+            matrices (numpy.ndarray):(N, 4, 4)または(4, 4)の配列
+
+        Returns:
+            numpy.ndarray:(N, 3)の配列
+    """
+    points = asVectors(points)
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)
+    return (
+        numpy.einsum('...i,...ij->...j', points, matrices[..., :3, :3]) +
+        matrices[..., 3, :3]
+    )
+
+
+def transformVectors(vectors, matrices):
+    r"""
+        ベクトルの配列に行列の配列を乗算したベクトルを返す。
+        平行移動の値は無視される。
+
+        Args:
+            vectors (numpy.ndarray):(N, 3)の配列
+            matrices (numpy.ndarray):(N, 4, 4)または(4, 4)の配列
+
+        Returns:
+            numpy.ndarray:(N, 3)の配列
+    """
+    vectors = asVectors(vectors)
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)
+    return numpy.einsum('...i,...ij->...j', vectors, matrices[..., :3, :3])
+
+
+def normalize(vectors):
+    r"""
+        ベクトルの配列を正規化する。長さが0のベクトルはそのまま返す。
+
+        Args:
+            vectors (numpy.ndarray):(..., 3)の配列
+
+        Returns:
+            numpy.ndarray:
+    """
+    vectors = numpy.asarray(vectors, dtype=numpy.float64)
+    length = numpy.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / numpy.where(length > Epsilon, length, 1.0)
+
+
+def axisVectors(axis):
+    r"""
+        +(-)X、Y、Zの文字列、またはベクトルを正規化された(3,)の配列に
+        変換する。
+
+        Args:
+            axis (str or list):
+
+        Returns:
+            numpy.ndarray:
+    """
+    if isinstance(axis, BaseString):
+        sign = -1.0 if axis.startswith('-') else 1.0
+        index = 'XYZ'.index(axis.lstrip('+-').upper())
+        vector = numpy.zeros(3)
+        vector[index] = sign
+        return vector
+    return normalize(numpy.asarray(axis, dtype=numpy.float64).reshape(3))
+
+
+def rotateOrderAxes(rotateOrder):
+    r"""
+        回転順序を表す文字列、またはrotateOrderの値を軸番号のリストに変換する。
+
+        Args:
+            rotateOrder (str or int):
+
+        Returns:
+            list:
+    """
+    if not isinstance(rotateOrder, BaseString):
+        rotateOrder = RotateOrders[int(rotateOrder)]
+    return ['xyz'.index(x) for x in rotateOrder.lower()]
+
+
+def _splitByRotateOrder(function, values, rotateOrder, degrees, shape):
+    r"""
+        要素毎に回転順序が異なる場合に、回転順序毎に分けてfunctionを
+        実行した結果をまとめて返す。
+
+        Args:
+            function (function):eulerToMatrices、matricesToEulerのいずれか
+            values (numpy.ndarray):
+            rotateOrder (list):要素毎のrotateOrderの値
+            degrees (bool):
+            shape (tuple):1要素あたりの戻り値の形状
+
+        Returns:
+            numpy.ndarray:
+    """
+    orders = numpy.asarray(rotateOrder).reshape(-1)
+    result = numpy.empty((len(values),) + shape)
+    for order in numpy.unique(orders):
+        indices = orders == order
+        result[indices] = function(values[indices], int(order), degrees)
+    return result
+
+
+def eulerToMatrices(rotations, rotateOrder=0, degrees=True):
+    r"""
+        オイラー角の配列を回転行列(N, 3, 3)の配列に変換する。
+
+        Args:
+            rotations (numpy.ndarray):(N, 3)の配列
+            rotateOrder (str or int or list):回転順序、または要素毎の回転順序
+            degrees (bool):rotationsが度数法かどうか
+
+        Returns:
+            numpy.ndarray:
+    """
+    rotations = asVectors(rotations)
+    if numpy.ndim(rotateOrder):
+        return _splitByRotateOrder(
+            eulerToMatrices, rotations, rotateOrder, degrees, (3, 3)
+        )
+    if degrees:
+        rotations = numpy.radians(rotations)
+    count = len(rotations)
+    result = numpy.tile(numpy.eye(3), (count, 1, 1))
+    for axis in rotateOrderAxes(rotateOrder):
+        j, k = (axis + 1) % 3, (axis + 2) % 3
+        cos = numpy.cos(rotations[:, axis])
+        sin = numpy.sin(rotations[:, axis])
+        rot = numpy.tile(numpy.eye(3), (count, 1, 1))
+        rot[:, j, j] = cos
+        rot[:, j, k] = sin
+        rot[:, k, j] = -sin
+        rot[:, k, k] = cos
+        result = numpy.matmul(result, rot)
+    return result
+
+
+def matricesToEuler(rotations, rotateOrder=0, degrees=True):
+    r"""
+        回転行列(N, 3, 3)の配列をオイラー角(N, 3)の配列に変換する。
+
+        Args:
+            rotations (numpy.ndarray):正規直交な回転行列の配列
+            rotateOrder (str or int or list):回転順序、または要素毎の回転順序
+            degrees (bool):戻り値を度数法で返すかどうか
+
+        Returns:
+            numpy.ndarray:
+    """
+    m = numpy.asarray(rotations, dtype=numpy.float64).reshape(-1, 3, 3)
+    if numpy.ndim(rotateOrder):
+        return _splitByRotateOrder(
+            matricesToEuler, m, rotateOrder, degrees, (3,)
+        )
+    i, j, k = rotateOrderAxes(rotateOrder)
+    # 軸の並びが巡回順でない場合は符号が反転する。
+    parity = 1.0 if (j - i) % 3 == 1 else -1.0
+    cy = numpy.sqrt(m[:, i, i] ** 2 + m[:, i, j] ** 2)
+    gimbal = cy < 1e-9
+    ai = numpy.where(
+        gimbal,
+        numpy.arctan2(-parity * m[:, k, j], m[:, j, j]),
+        numpy.arctan2(parity * m[:, j, k], m[:, k, k])
+    )
+    aj = numpy.arctan2(-parity * m[:, i, k], cy)
+    ak = numpy.where(
+        gimbal, 0.0, numpy.arctan2(parity * m[:, i, j], m[:, i, i])
+    )
+    result = numpy.empty((len(m), 3))
+    result[:, i] = ai
+    result[:, j] = aj
+    result[:, k] = ak
+    if degrees:
+        result = numpy.degrees(result)
+    return result
+
+
+def _factorize(matrices):
+    r"""
+        行列の配列の3x3部分を回転行列、スケール値、シアー値に分解する。
+
+        Args:
+            matrices (numpy.ndarray):(N, 4, 4)または(N, 3, 3)の配列
+
+        Returns:
+            tuple:(rotation, scale, shear)
+    """
+    rows = numpy.asarray(matrices, dtype=numpy.float64)[..., :3, :3]
+    rows = rows.reshape(-1, 3, 3)
+    x_axis = rows[:, 0]
+    sx = numpy.linalg.norm(x_axis, axis=-1)
+    x_axis = normalize(x_axis)
+
+    xy = numpy.sum(rows[:, 1] * x_axis, axis=-1)
+    y_axis = rows[:, 1] - x_axis * xy[:, None]
+    sy = numpy.linalg.norm(y_axis, axis=-1)
+    y_axis = normalize(y_axis)
+
+    xz = numpy.sum(rows[:, 2] * x_axis, axis=-1)
+    yz = numpy.sum(rows[:, 2] * y_axis, axis=-1)
+    z_axis = rows[:, 2] - x_axis * xz[:, None] - y_axis * yz[:, None]
+    sz = numpy.linalg.norm(z_axis, axis=-1)
+    z_axis = normalize(z_axis)
+    # 負のスケールを持つ場合はZ軸を反転して正規直交な回転行列にする。
+    flipped = numpy.sum(numpy.cross(x_axis, y_axis) * z_axis, axis=-1) < 0
+    sz = numpy.where(flipped, -sz, sz)
+    z_axis = numpy.where(flipped[:, None], -z_axis, z_axis)
+
+    scale = numpy.stack([sx, sy, sz], axis=-1)
+    safe = numpy.where(numpy.abs(scale) > Epsilon, scale, 1.0)
+    shear = numpy.stack(
+        [xy / safe[:, 1], xz / safe[:, 2], yz / safe[:, 2]], axis=-1
+    )
+    rotation = numpy.stack([x_axis, y_axis, z_axis], axis=1)
+    return rotation, scale, shear
+
+
+def rotationMatrices(matrices):
+    r"""
+        行列の配列からスケール、シアーを取り除いた回転行列(N, 3, 3)の配列を
+        返す。
+
+        Args:
+            matrices (numpy.ndarray):(N, 4, 4)または(N, 3, 3)の配列
+
+        Returns:
+            numpy.ndarray:
+    """
+    return _factorize(matrices)[0]
+
+
+def decompose(matrices, rotateOrder=0, degrees=True):
+    r"""
+        行列の配列を移動値、回転値、スケール値、シアー値に分解する。
+        MayaのTransformと同じく、スケール、シアー、回転、移動の順で
+        合成された行列とみなす。
+
+        Args:
+            matrices (numpy.ndarray):(N, 4, 4)の配列
+            rotateOrder (str or int):回転順序
+            degrees (bool):回転値を度数法で返すかどうか
+
+        Returns:
+            tuple:(translate, rotate, scale, shear)の(N, 3)の配列
+    """
+    matrices = asMatrices(matrices)
+    rotation, scale, shear = _factorize(matrices)
+    rotate = matricesToEuler(rotation, rotateOrder, degrees)
+    return matrices[:, 3, :3].copy(), rotate, scale, shear
+
+
+def compose(
+    translate=None, rotate=None, scale=None, shear=None,
+    rotateOrder=0, degrees=True
+):
+    r"""
+        移動値、回転値、スケール値、シアー値の配列から行列の配列を作成する。
+        decomposeの逆の操作を行う。
+
+        Args:
+            translate (numpy.ndarray):(N, 3)の配列
+            rotate (numpy.ndarray):(N, 3)の配列
+            scale (numpy.ndarray):(N, 3)の配列
+            shear (numpy.ndarray):(N, 3)の配列(xy, xz, yz)
+            rotateOrder (str or int):回転順序
+            degrees (bool):rotateが度数法かどうか
+
+        Returns:
+            numpy.ndarray:(N, 4, 4)の配列
+    """
+    values = [
+        asVectors(x) for x in (translate, rotate, scale, shear)
+        if x is not None
+    ]
+    count = max([len(x) for x in values]) if values else 1
+    result = identity(count)
+    if scale is not None:
+        scale = asVectors(scale)
+        result[:, :3, :3] *= scale[:, :, None]
+    if shear is not None:
+        shear = asVectors(shear)
+        shear_mtx = numpy.tile(numpy.eye(3), (count, 1, 1))
+        shear_mtx[:, 1, 0] = shear[:, 0]
+        shear_mtx[:, 2, 0] = shear[:, 1]
+        shear_mtx[:, 2, 1] = shear[:, 2]
+        result[:, :3, :3] = numpy.matmul(result[:, :3, :3], shear_mtx)
+    if rotate is not None:
+        result[:, :3, :3] = numpy.matmul(
+            result[:, :3, :3], eulerToMatrices(rotate, rotateOrder, degrees)
+        )
+    if translate is not None:
+        result[:, 3, :3] = asVectors(translate)
+    return result
+
+
+def mirror(matrices, axis=MirrorX):
+    r"""
+        行列の配列に対してmirrorBehavior状態の行列の配列を返す。
+        mathlib.mirrorMatrixを配列に対して行う。
+
+        Args:
+            matrices (numpy.ndarray):(N, 4, 4)の配列
+            axis (tuple):MirrorX(Y, Z)のいずれか
+
+        Returns:
+            numpy.ndarray:
+    """
+    result = asMatrices(matrices).copy()
+    result[:, :3, list(axis)] *= -1
+    result[:, 3, 3 - sum(axis)] *= -1
+    return result
+
+
+def aimRotations(aimVectors, upVectors, aimAxis='+X', upAxis='+Y'):
+    r"""
+        aimAxisがaimVectorsを向き、upAxisがupVectorsの方向を向く回転行列
+        (N, 3, 3)の配列を返す。aimConstraintのworldUpTypeがvectorの場合と
+        同じ向きとなる。
+
+        Args:
+            aimVectors (numpy.ndarray):(N, 3)の配列
+            upVectors (numpy.ndarray):(N, 3)または(3,)の配列
+            aimAxis (str or list):ローカルのエイム軸
+            upAxis (str or list):ローカルのアップ軸
+
+        Returns:
+            numpy.ndarray:
+    """
+    aim = normalize(asVectors(aimVectors))
+    up = numpy.broadcast_to(
+        numpy.asarray(upVectors, dtype=numpy.float64), aim.shape
+    )
+    up = normalize(up - aim * numpy.sum(up * aim, axis=-1)[:, None])
+    world = numpy.stack([aim, up, numpy.cross(aim, up)], axis=1)
+
+    local_aim = axisVectors(aimAxis)
+    local_up = axisVectors(upAxis)
+    local_up = normalize(
+        local_up - local_aim * numpy.dot(local_up, local_aim)
+    )
+    if numpy.linalg.norm(local_up) < Epsilon:
+        raise ValueError('The aim axis and the up axis must not be parallel.')
+    local = numpy.stack(
+        [local_aim, local_up, numpy.cross(local_aim, local_up)]
+    )
+    # local.dot(R) = worldとなる回転Rを求める。
+    return numpy.matmul(local.T, world)
+
+
+def aimMatrices(
+    positions, targets, upVectors, aimAxis='+X', upAxis='+Y'
+):
+    r"""
+        positionsの位置からtargetsの位置を向く行列の配列を返す。
+
+        Args:
+            positions (numpy.ndarray):(N, 3)の配列
+            targets (numpy.ndarray):(N, 3)の配列
+            upVectors (numpy.ndarray):(N, 3)または(3,)の配列
+            aimAxis (str or list):ローカルのエイム軸
+            upAxis (str or list):ローカルのアップ軸
+
+        Returns:
+            numpy.ndarray:(N, 4, 4)の配列
+    """
+    positions = asVectors(positions)
+    result = identity(len(positions))
+    result[:, :3, :3] = aimRotations(
+        asVectors(targets) - positions, upVectors, aimAxis, upAxis
+    )
+    result[:, 3, :3] = positions
+    return result
+
+
+def localMatrices(worldMatrices, parentIndices):
+    r"""
+        ワールド行列の配列と親のインデックスから、親に対するローカル行列の
+        配列を返す。親のない行列の親のインデックスは-1とする。
+
+        Args:
+            worldMatrices (numpy.ndarray):(N, 4, 4)の配列
+            parentIndices (list):
+
+        Returns:
+            numpy.ndarray:
+    """
+    world = asMatrices(worldMatrices)
+    parents = numpy.asarray(parentIndices, dtype=numpy.int64)
+    result = world.copy()
+    has_parent = parents >= 0
+    if has_parent.any():
+        result[has_parent] = numpy.matmul(
+            world[has_parent], inverse(world[parents[has_parent]])
+        )
+    return result
+
+
+def worldMatrices(localMatrices, parentIndices):
+    r"""
+        ローカル行列の配列と親のインデックスから、ワールド行列の配列を返す。
+        親のない行列の親のインデックスは-1とする。
+
+        Args:
+            localMatrices (numpy.ndarray):(N, 4, 4)の配列
+            parentIndices (list):
+
+        Returns:
+            numpy.ndarray:
+    """
+    local_mtx = asMatrices(localMatrices)
+    parents = numpy.asarray(parentIndices, dtype=numpy.int64)
+    result = local_mtx.copy()
+    done = parents < 0
+    while not done.all():
+        ready = ~done & done[parents]
+        if not ready.any():
+            raise ValueError(
+                'The hierarchy has a cycle or an invalid parent.'
+            )
+        result[ready] = numpy.matmul(
+            local_mtx[ready], result[parents[ready]]
+        )
+        done |= ready
+    return result
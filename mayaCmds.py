@@ -21,9 +21,112 @@ from maya import mel
 MAYA_VERSION = float(about(v=True).split()[0])
 
 # プラグインのセットアップ。 ==================================================
-for plugin in ['matrixNodes']:
-    if not pluginInfo(plugin, q=True, l=True):
-        loadPlugin(plugin)
+# 必要なプラグインはインポート時ではなく、PluginDependentCommandsに列挙した
+# コマンドをこのモジュール経由で最初に呼び出した時に読み込まれる。
+# それ以外の方法(mel.eval、maya.cmdsの直接呼び出し、ノードを作成する
+# その他のコマンドなど)でプラグインのノードを扱う場合は、事前に
+# loadRequiredPluginsを呼び出す必要がある。
+RequiredPlugins = ['matrixNodes']
+PluginDependentCommands = (
+    'createNode', 'shadingNode', 'nodeType', 'objectType', 'listNodeTypes',
+)
+__LOADED_PLUGINS__ = []
+
+def loadRequiredPlugins():
+    r"""
+        RequiredPluginsに列挙されたプラグインが読み込まれていなければ
+        読み込む。２回目以降の呼び出しでは何もしない。
+    """
+    if __LOADED_PLUGINS__ == RequiredPlugins:
+        return
+    for plugin in RequiredPlugins:
+        if not pluginInfo(plugin, q=True, l=True):
+            loadPlugin(plugin)
+    __LOADED_PLUGINS__[:] = RequiredPlugins
+
+
+def __pluginDependentCommand(function):
+    def wrapper(*args, **keywords):
+        loadRequiredPlugins()
+        return function(*args, **keywords)
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+
+for __name in PluginDependentCommands:
+    globals()[__name] = __pluginDependentCommand(globals()[__name])
+del __name
+# =============================================================================
+
+# コマンドの呼び出し回数の計測機能。==========================================
+# startCallCounterを呼ぶと、このモジュール経由で呼ばれたmaya.cmdsの
+# コマンドの呼び出し回数を記録する。計測はstopCallCounterで終了する。
+__CALL_COUNTS__ = {}
+__COUNTED_ORIGINALS__ = {}
+
+def __countedCommand(name, function):
+    def wrapper(*args, **keywords):
+        __CALL_COUNTS__[name] = __CALL_COUNTS__.get(name, 0) + 1
+        return function(*args, **keywords)
+    wrapper.__name__ = name
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+
+def startCallCounter():
+    r"""
+        このモジュールのコマンドを呼び出し回数を記録するラッパーに置き換える。
+    """
+    if __COUNTED_ORIGINALS__:
+        return
+    from maya import cmds as maya_cmds
+    module_dict = globals()
+    for name in dir(maya_cmds):
+        if name.startswith('_') or not name in module_dict:
+            continue
+        function = module_dict[name]
+        if not callable(function) or isinstance(function, type):
+            continue
+        __COUNTED_ORIGINALS__[name] = function
+        module_dict[name] = __countedCommand(name, function)
+
+
+def stopCallCounter():
+    r"""
+        startCallCounterで置き換えたコマンドを元に戻す。
+    """
+    module_dict = globals()
+    for name, function in __COUNTED_ORIGINALS__.items():
+        module_dict[name] = function
+    __COUNTED_ORIGINALS__.clear()
+
+
+def isCallCounting():
+    r"""
+        コマンドの呼び出し回数を計測中かどうかを返す。
+        
+        Returns:
+            bool:
+    """
+    return bool(__COUNTED_ORIGINALS__)
+
+
+def callCounts():
+    r"""
+        コマンド名をキー、呼び出し回数を値とする辞書のコピーを返す。
+        
+        Returns:
+            dict:
+    """
+    return dict(__CALL_COUNTS__)
+
+
+def resetCallCounts():
+    r"""
+        記録したコマンドの呼び出し回数をリセットする。
+    """
+    __CALL_COUNTS__.clear()
 # =============================================================================
 
 # Melのラッパー実行クラスの作成。==============================================
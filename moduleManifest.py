@@ -0,0 +1,526 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    リグスクリプト、コンストラクタ、FactoryModuleなどのモジュール一覧を
+    インポートせずに取得するためのマニフェストを提供するモジュール。
+    各モジュールのソースを構文解析し、CategoryやBaseNameなどの変数、
+    定義されているクラス名、Optionクラスのオプション項目を抜き出して
+    JSONファイルにキャッシュする。
+    キャッシュはファイルの更新時間とサイズが変わった場合にのみ作り直される。
+    ワイルドカードインポートや条件分岐の中での定義、リテラル以外の値など、
+    構文解析で判定できない項目はモジュールをインポートして判定する。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import os
+import ast
+import json
+from . import lib
+from .verutil import BaseString
+
+# キャッシュの形式のバージョン。
+ManifestVersion = 2
+# 値を取得するモジュール変数名と、マニフェストのキーの対応。
+ModuleVariables = (
+    ('Category', 'category'), ('BaseName', 'baseName'),
+    ('Version', 'version'), ('IgnoreLoad', 'ignoreLoad'),
+)
+# オプションを追加するOptionクラスのメソッド名のパターン。
+OptionMethodPrefix = 'add'
+OptionMethodSuffix = 'Option'
+# 中で名前が定義されていても構文解析では判定しない文の型。
+ConditionalStatements = tuple(
+    [
+        getattr(ast, x) for x in (
+            'If', 'For', 'While', 'With', 'Try', 'TryExcept', 'TryFinally',
+            'TryStar',
+        ) if hasattr(ast, x)
+    ]
+)
+
+
+def _literal(value):
+    r"""
+        構文木のノードをPythonの値に変換する。変換できない場合はNoneを返す。
+
+        Args:
+            value (ast.AST):
+
+        Returns:
+            any:
+    """
+    try:
+        return ast.literal_eval(value)
+    except Exception:
+        return None
+
+
+def _returnedValue(function):
+    r"""
+        return文のみで構成されたメソッドの戻り値の構文木を返す。
+
+        Args:
+            function (ast.FunctionDef):
+
+        Returns:
+            ast.AST:
+    """
+    body = [
+        x for x in function.body
+        if not (
+            isinstance(x, ast.Expr) and
+            isinstance(_literal(x.value), BaseString)
+        )
+    ]
+    if len(body) != 1 or not isinstance(body[0], ast.Return):
+        return
+    return body[0].value
+
+
+def _baseName(base):
+    r"""
+        クラスの基底クラスを表す構文木を"module.Class"形式の文字列にする。
+
+        Args:
+            base (ast.AST):
+
+        Returns:
+            str:
+    """
+    if isinstance(base, ast.Name):
+        return base.id
+    if isinstance(base, ast.Attribute):
+        parent = _baseName(base.value)
+        return '%s.%s' % (parent, base.attr) if parent else base.attr
+    return ''
+
+
+def _scanOptions(classNode):
+    r"""
+        Optionクラスのdefineメソッドから、オプション項目の一覧を抜き出す。
+
+        Args:
+            classNode (ast.ClassDef):
+
+        Returns:
+            list:{'type', 'name', 'keywords'}を持つ辞書のリスト
+    """
+    results = []
+    for function in classNode.body:
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        if function.name != 'define':
+            continue
+        for call in ast.walk(function):
+            if not isinstance(call, ast.Call):
+                continue
+            f = call.func
+            if not isinstance(f, ast.Attribute):
+                continue
+            if (
+                not f.attr.startswith(OptionMethodPrefix) or
+                not f.attr.endswith(OptionMethodSuffix) or
+                not call.args
+            ):
+                continue
+            name = _literal(call.args[0])
+            if not name:
+                continue
+            results.append(
+                {
+                    'type': f.attr[
+                        len(OptionMethodPrefix):-len(OptionMethodSuffix)
+                    ].lower(),
+                    'name': name,
+                    'keywords': {
+                        x.arg: _literal(x.value) for x in call.keywords
+                        if x.arg
+                    },
+                }
+            )
+    return results
+
+
+def _scanPreset(classNode):
+    r"""
+        Presetクラスのname、description、includesメソッドの戻り値を
+        抜き出す。includesはPresetElementの引数を
+        [ユニット名, 位置, サフィックス]のリストに変換する。
+
+        Args:
+            classNode (ast.ClassDef):
+
+        Returns:
+            dict:
+    """
+    result = {'name': '', 'description': '', 'includes': []}
+    for function in classNode.body:
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        value = _returnedValue(function)
+        if value is None:
+            continue
+        if function.name in ('name', 'description'):
+            result[function.name] = _literal(value) or ''
+            continue
+        if function.name != 'includes':
+            continue
+        if not isinstance(value, (ast.List, ast.Tuple)):
+            continue
+        for element in value.elts:
+            if not isinstance(element, ast.Call):
+                continue
+            args = [_literal(x) for x in element.args]
+            keywords = {
+                x.arg: _literal(x.value) for x in element.keywords if x.arg
+            }
+            args += [
+                keywords.get(x, y) for x, y in (
+                    ('unitName', None), ('position', 0), ('suffix', '')
+                )[len(args):]
+            ]
+            if args[0]:
+                result['includes'].append(args[:3])
+    return result
+
+
+def scanModule(filepath):
+    r"""
+        Pythonファイルを構文解析し、モジュールの情報を持つ辞書を返す。
+        辞書は以下のキーを持つ。
+            category, baseName, version, ignoreLoad : モジュール変数の値
+            names : モジュールのトップレベルで定義されている名前のリスト
+            incomplete : ワイルドカードインポートや条件分岐などにより、
+                         namesに無い名前が定義されている可能性があるか
+            unresolved : 値がリテラルでないモジュール変数のキーのリスト
+            bases : クラス名と基底クラス名のリストの辞書
+            options : Optionクラスのオプション項目のリスト
+                      (名前がリテラルで指定されているもののみ)
+            preset : Presetクラスの情報(無い場合はNone)
+            error : 構文解析に失敗した場合のエラーメッセージ
+
+        Args:
+            filepath (str):
+
+        Returns:
+            dict:
+    """
+    result = {
+        'names': [], 'bases': {}, 'options': [], 'preset': None,
+        'incomplete': False, 'unresolved': [], 'error': '',
+    }
+    for _, key in ModuleVariables:
+        result[key] = None
+    try:
+        with open(filepath, 'rb') as f:
+            tree = ast.parse(f.read(), filepath)
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
+    variables = dict(ModuleVariables)
+    names = set()
+    for element in tree.body:
+        if isinstance(element, ast.ClassDef):
+            names.add(element.name)
+            result['bases'][element.name] = [
+                _baseName(x) for x in element.bases
+            ]
+            if element.name == 'Option':
+                result['options'] = _scanOptions(element)
+            elif element.name == 'Preset':
+                result['preset'] = _scanPreset(element)
+        elif isinstance(element, ast.FunctionDef):
+            names.add(element.name)
+        elif isinstance(element, ast.Assign):
+            for target in element.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                names.add(target.id)
+                if target.id not in variables:
+                    continue
+                key = variables[target.id]
+                try:
+                    result[key] = ast.literal_eval(element.value)
+                except Exception:
+                    result[key] = None
+                    if key not in result['unresolved']:
+                        result['unresolved'].append(key)
+                else:
+                    if key in result['unresolved']:
+                        result['unresolved'].remove(key)
+        elif isinstance(element, (ast.Import, ast.ImportFrom)):
+            for alias in element.names:
+                if alias.name == '*':
+                    result['incomplete'] = True
+                    continue
+                names.add((alias.asname or alias.name).split('.')[0])
+        elif isinstance(element, ConditionalStatements):
+            result['incomplete'] = True
+    result['names'] = sorted(names)
+    return result
+
+
+def moduleVariable(entry, name, default=None):
+    r"""
+        マニフェストのエントリから、モジュール変数nameの値を返す。
+        変数が定義されていない場合はdefaultを返す。
+        値がリテラルでない場合や、ワイルドカードインポートや条件分岐の
+        中で定義されている可能性がある場合はモジュールをインポートして
+        値を取得する。
+
+        Args:
+            entry (dict):ModuleManifest.entriesの要素
+            name (str):ModuleVariablesに含まれる変数名
+            default (any):
+
+        Returns:
+            any:
+    """
+    key = dict(ModuleVariables)[name]
+    if (
+        key in entry['unresolved'] or
+        (entry['incomplete'] and name not in entry['names'])
+    ):
+        module = lib.importModule(entry['name'], echoErrorMessage=True)
+        return getattr(module, name, default) if module else default
+    if name not in entry['names']:
+        return default
+    return entry[key]
+
+
+class ModuleManifest(object):
+    r"""
+        ディレクトリ内のPythonモジュールのマニフェストを管理するクラス。
+        lib.loadPythonModulesと同じ規則でモジュールを列挙し、
+        各モジュールの情報をscanModuleで取得する。
+    """
+    def __init__(self, directory, prefix='', cacheDir=None):
+        r"""
+            Args:
+                directory (str):モジュールを検索するディレクトリ
+                prefix (str):モジュール名につけるプレフィックス
+                cacheDir (str):キャッシュファイルの保存先
+        """
+        self.__directory = directory
+        self.__prefix = prefix
+        self.__cachedir = cacheDir
+        self.__entries = None
+
+    def directory(self):
+        r"""
+            モジュールを検索するディレクトリを返す。
+
+            Returns:
+                str:
+        """
+        return self.__directory
+
+    def prefix(self):
+        r"""
+            モジュール名につけるプレフィックスを返す。
+
+            Returns:
+                str:
+        """
+        return self.__prefix
+
+    def cacheFile(self):
+        r"""
+            キャッシュファイルのパスを返す。
+            キャッシュの保存先が指定されていない場合はグローバル設定の
+            プレファレンスディレクトリ下を使用する。
+
+            Returns:
+                str:
+        """
+        cachedir = self.__cachedir
+        if not cachedir:
+            from . import settings
+            cachedir = settings.GlobalPref().subPrefDir('moduleManifest')
+        name = self.__prefix or os.path.basename(self.__directory)
+        return os.path.join(cachedir, '%s.json' % name)
+
+    def __sourceFiles(self):
+        r"""
+            (モジュール名, ソースファイルパス)のリストを返す。
+            パッケージの場合は__init__.pyがソースファイルとなる。
+
+            Returns:
+                list:
+        """
+        results = {}
+        if not os.path.isdir(self.__directory):
+            return []
+        for m in os.listdir(self.__directory):
+            path = os.path.join(self.__directory, m)
+            name = lib.pythonModuleNameFromPath(path)
+            if not name:
+                continue
+            if os.path.isdir(path):
+                path = os.path.join(path, '__init__.py')
+            elif not path.endswith('.py'):
+                path = path[:-1]
+            if not os.path.isfile(path):
+                continue
+            results[name] = path
+        return sorted(results.items())
+
+    def __loadCache(self, path):
+        r"""
+            キャッシュファイルを読み込み、モジュール名をキーとする辞書を
+            返す。読み込めない場合は空の辞書を返す。
+
+            Args:
+                path (str):
+
+            Returns:
+                dict:
+        """
+        if not os.path.isfile(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        if data.get('version') != ManifestVersion:
+            return {}
+        return data.get('modules', {})
+
+    def __saveCache(self, path, modules):
+        r"""
+            キャッシュファイルを保存する。保存に失敗した場合は何もしない。
+
+            Args:
+                path (str):
+                modules (dict):
+        """
+        data = {'version': ManifestVersion, 'modules': modules}
+        try:
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+        except Exception:
+            pass
+
+    def update(self, force=False):
+        r"""
+            マニフェストを更新する。
+            forceがFalseの場合、更新時間とサイズが変わっていないモジュールは
+            キャッシュの内容を使用する。
+
+            Args:
+                force (bool):全てのモジュールを解析し直すかどうか
+
+            Returns:
+                list:
+        """
+        cachefile = None if force else self.cacheFile()
+        cache = self.__loadCache(cachefile) if cachefile else {}
+        modules = {}
+        is_changed = force
+        for name, path in self.__sourceFiles():
+            stat = os.stat(path)
+            stamp = [stat.st_mtime, stat.st_size]
+            data = cache.get(name)
+            if not data or data.get('stamp') != stamp:
+                data = {'stamp': stamp, 'data': scanModule(path)}
+                is_changed = True
+            modules[name] = data
+        if set(modules) != set(cache):
+            is_changed = True
+        if is_changed:
+            self.__saveCache(cachefile or self.cacheFile(), modules)
+
+        prefix = self.__prefix + '.' if self.__prefix else ''
+        self.__entries = []
+        for name, data in sorted(modules.items()):
+            entry = dict(data['data'])
+            entry['name'] = prefix + name
+            entry['unitType'] = name
+            self.__entries.append(entry)
+        self.__resolveOptions()
+        return self.__entries
+
+    def __resolveOptions(self):
+        r"""
+            Optionクラスが同じディレクトリ内の別モジュールのOptionを継承して
+            いる場合、基底クラスのオプション項目を前に追加する。
+        """
+        entries = {x['unitType']: x for x in self.__entries}
+
+        def collect(unitType, visited):
+            entry = entries.get(unitType)
+            if not entry or unitType in visited:
+                return []
+            visited.add(unitType)
+            options = []
+            for base in entry['bases'].get('Option', []):
+                parent = base.split('.')
+                if len(parent) == 2 and parent[1] == 'Option':
+                    options.extend(collect(parent[0], visited))
+            names = set([x['name'] for x in entry['options']])
+            options = [x for x in options if x['name'] not in names]
+            return options + entry['options']
+
+        for unittype, entry in entries.items():
+            entry['options'] = collect(unittype, set())
+
+    def entries(self):
+        r"""
+            マニフェストの各モジュールの情報を持つ辞書のリストを返す。
+            辞書はscanModuleの戻り値に、モジュールのフルネームを表すname、
+            モジュール名を表すunitTypeを加えたもの。
+
+            Returns:
+                list:
+        """
+        if self.__entries is None:
+            self.update()
+        return self.__entries
+
+    def entry(self, unitType):
+        r"""
+            与えられたモジュール名の情報を返す。無い場合はNoneを返す。
+
+            Args:
+                unitType (str):
+
+            Returns:
+                dict:
+        """
+        for entry in self.entries():
+            if entry['unitType'] == unitType:
+                return entry
+
+    def moduleNames(self, definedName=None):
+        r"""
+            モジュールのフルネームのリストを返す。
+            definedNameを指定した場合は、その名前をトップレベルで定義
+            しているモジュールのみを返す。構文解析で判定できない
+            モジュールはインポートして判定する。
+
+            Args:
+                definedName (str):
+
+            Returns:
+                list:
+        """
+        results = []
+        for entry in self.entries():
+            if definedName and definedName not in entry['names']:
+                if not entry['incomplete']:
+                    continue
+                module = lib.importModule(entry['name'], echoErrorMessage=True)
+                if not module or not hasattr(module, definedName):
+                    continue
+            results.append(entry['name'])
+        return results
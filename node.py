@@ -24,7 +24,7 @@ from maya.api import OpenMaya as OpenMaya2
 from maya.api import OpenMayaAnim as OpenMayaAnim2
 sutil = OpenMaya.MScriptUtil()
 #from gris3.mayaCmds import parent as c_parent
-from . import mayaCmds, colorUtil, mathlib, verutil
+from . import mayaCmds, colorUtil, mathlib, verutil, nodeCache
 index_reobj = re.compile('(^.*[^\]])\[(\d+)\]$')
 
 
@@ -41,6 +41,21 @@ if over_2026:
         'pointMatrixMult': 'pointMatrixMultDL',
     }
 
+# スキンクラスターのウェイトをAPIで一括取得する際に、シェイプの全コンポーネントを
+# 指定するための接尾辞のテーブル。
+SKIN_COMPONENT_TABLE = {
+    'mesh': '.vtx[*]',
+    'nurbsCurve': '.cv[*]',
+    'nurbsSurface': '.cv[*][*]',
+    'lattice': '.pt[*][*][*]',
+}
+
+# getAttrs/setAttrsで整数として扱う数値アトリビュートの型。
+_IntNumericTypes = (
+    OpenMaya2.MFnNumericData.kByte, OpenMaya2.MFnNumericData.kChar,
+    OpenMaya2.MFnNumericData.kShort, OpenMaya2.MFnNumericData.kInt,
+    OpenMaya2.MFnNumericData.kLong,
+)
 
 
 # /////////////////////////////////////////////////////////////////////////////
@@ -162,10 +177,32 @@ def pointMatrixMult(position, matrixList):
         Returns:
             list:[float, float, float]
     """
-    mtx = identityMatrix()
-    mtx[12:15] = position
-    new_mtx = multiplyMatrix([mtx]+matrixList)
-    return new_mtx[12:15]
+    if not matrixList:
+        return list(position[:3])
+    point = OpenMaya2.MPoint(*position[:3]) * multiplyMatrix(matrixList, False)
+    return [point.x, point.y, point.z]
+
+
+def multiplyMatrices(matrixLists, asList=True):
+    r"""
+        複数の行列の乗算をまとめて行う。
+        引数matrixListsには、multiplyMatrixの引数matrixListと同じ形式の
+        リストを同じ数の行列を持つように並べたリストを渡す。
+        asListがFalseの場合は乗算結果を(N, 4, 4)のnumpy.ndarrayとして返す。
+        
+        Args:
+            matrixLists (list):行列を表すリストを持つlistのリスト
+            asList (bool):戻り値をリストとして返すかどうか。
+            
+        Returns:
+            list:
+    """
+    from . import matrixArray
+    chain = [matrixArray.asMatrices(x) for x in zip(*matrixLists)]
+    result = matrixArray.multiply(*chain)
+    if asList:
+        return matrixArray.toLists(result)
+    return result
 # /////////////////////////////////////////////////////////////////////////////
 #                                                                            //
 # /////////////////////////////////////////////////////////////////////////////
@@ -1269,6 +1306,15 @@ class AbstractNode(AbstractNodeStr):
         if nodeName.find('.') > -1:
             # 引数がアトリビュート名付きの場合は、そのまま文字列として返す。
             return nodeName
+
+        # __init__を持つクラスはインスタンスを使いまわせないため除外する。
+        cache = nodeCache.activeCache()
+        if cache is not None and cls.__init__ is AbstractNode.__init__:
+            obj = cache.find(nodeName, cls)
+            if obj is not None:
+                return obj
+        else:
+            cache = None
     
         obj = super(AbstractNode, cls).__new__(cls, nodeName)
 
@@ -1293,6 +1339,8 @@ class AbstractNode(AbstractNodeStr):
             
             # メソッドのオーバーライド
             obj.name = obj.__node.name
+        if cache is not None:
+            cache.add(nodeName, cls, obj)
         return obj
 
     def dagNodeFn(self):
@@ -1401,6 +1449,37 @@ class AbstractNode(AbstractNodeStr):
             cmds.setAttr(node_attr, l=True)
         # +====================================================================
 
+    def getAttrs(self, attrs, asArray=False):
+        r"""
+            複数のアトリビュートの値をMPlugを用いて一括で取得する。
+            詳細はモジュール関数getAttrsを参照。
+            
+            Args:
+                attrs (list):アトリビュート名のリスト
+                asArray (bool):戻り値をnumpy.ndarrayにするかどうか
+                
+            Returns:
+                list or numpy.ndarray:
+        """
+        return getAttrs([self.name()], attrs, asArray)[0]
+
+    def setAttrs(self, values, force=False, undoable=True):
+        r"""
+            アトリビュート名をキー、値を値とする辞書を受け取り、
+            1つのMDGModifierで一括で値をセットする。
+            詳細はモジュール関数setAttrsを参照。
+            
+            Args:
+                values (dict):
+                force (bool):ロックされたアトリビュートのロックを一時的に解除する
+                undoable (bool):アンドゥ可能にするかどうか
+        """
+        name = self.name()
+        setAttrs(
+            [('{}.{}'.format(name, x), y) for x, y in values.items()],
+            force=force, undoable=undoable
+        )
+
     def __nonzero__(self):
         r"""
             真偽テストの上書きメソッド。
@@ -2282,6 +2361,8 @@ class SkinCluster(AbstractNode):
                 cmds.setAttr(inf+'.lockInfluenceWeights', 0)
             except:
                 pass
+        from . import skinWeightCache
+        skinWeightCache.invalidate(self)
 
     def removeInfluences(self, influences):
         r"""
@@ -2296,6 +2377,8 @@ class SkinCluster(AbstractNode):
             if not inf in orig_influences:
                 continue
             cmds.skinCluster(sc, e=True, ri=inf)
+        from . import skinWeightCache
+        skinWeightCache.invalidate(self)
 
     def resetInfluences(self, influences, isRefresh=True):
         r"""
@@ -2317,6 +2400,21 @@ class SkinCluster(AbstractNode):
         if isRefresh:
             cmds.dgdirty(a=True)
 
+    def weightData(self, shape=None):
+        r"""
+            shapeのウェイト情報を返す。skinWeightCacheが有効な場合は
+            キャッシュを経由する。
+            ウェイト配列は読み取り専用のため、編集する場合はコピーすること。
+            
+            Args:
+                shape (str):このスキンクラスターが影響しているシェイプ名
+                
+            Returns:
+                skinWeightCache.WeightCacheData:
+        """
+        from . import skinWeightCache
+        return skinWeightCache.getWeightData(self, self.resolveShape(shape))
+
     def listWeightValues(self, shape):
         r"""
             このスキンクラスターが影響させるshapeのウェイトリストをリストで返す。
@@ -2329,16 +2427,7 @@ class SkinCluster(AbstractNode):
             Returns:
                 list:
         """
-        sel = OpenMaya2.MSelectionList()
-        sel.add(self())
-        sel.add(shape)
-        mfn_sc = OpenMayaAnim2.MFnSkinCluster(sel.getDependNode(0))
-        shape_obj, comp_obj = sel.getComponent(1)
-        weights = mfn_sc.getWeights(shape_obj, comp_obj)
-        wlist = list(weights[0])
-        num = weights[1]
-        weightlist = [wlist[x:x+num] for x in range(0, len(wlist), num)]
-        return weightlist
+        return self.weightData(shape).weights().tolist()
 
 
     def listWeights(self):
@@ -2348,31 +2437,266 @@ class SkinCluster(AbstractNode):
             対応する値は
                 コンポーネントに対応するアトリビュート名をキー、値をウェイト値
             とする辞書。
+            weightListに存在する全ての要素を論理インデックスで返すため、
+            値が0の要素も含まれる。
             
             Returns:
                 dict:
         """
+        wl_plug = OpenMaya2.MFnDependencyNode(
+            self.skinFn().object()
+        ).findPlug('weightList', False)
         weightlist = {}
-        sc = self.name()
-        index_ptn = re.compile('\[(\d+)\]')
-        for attr in cmds.listAttr(self/'wl', m=True):
-            index = index_ptn.search(attr)
-            if not index:
-                continue
-            index = int(index.group(1))
+        for index in wl_plug.getExistingArrayAttributeIndices():
+            weights = wl_plug.elementByLogicalIndex(index).child(0)
             wlist = weightlist.setdefault(index, {})
-            if not '.' in attr:
-                continue
-            w = cmds.getAttr(sc + '.' + attr)
-            wlist[attr] = w
+            for i in weights.getExistingArrayAttributeIndices():
+                wlist['weightList[%s].weights[%s]' % (index, i)] = (
+                    weights.elementByLogicalIndex(i).asDouble()
+                )
         return weightlist
 
+    def listNonZeroWeights(self, shape=None):
+        r"""
+            shapeのウェイトのうち、0以外のものを辞書で返す。
+            戻り値はshapeのコンポーネントのインデックスをキー、
+            インフルエンス名とウェイト値の辞書を値とする辞書。
+            listWeightsと違いweightDataを経由するため高速だが、
+            0のウェイトは含まれない。
+            
+            Args:
+                shape (str):このスキンクラスターが影響しているシェイプ名
+                
+            Returns:
+                dict:
+        """
+        import numpy
+        data = self.weightData(shape)
+        weights = data.weights()
+        influences = data.influences()
+        weightlist = {}
+        for index, row in enumerate(weights):
+            weightlist[index] = {
+                influences[x]: float(row[x]) for x in numpy.nonzero(row)[0]
+            }
+        return weightlist
+
+    def skinFn(self):
+        r"""
+            API2.0のMFnSkinClusterを返す。
+            
+            Returns:
+                OpenMayaAnim2.MFnSkinCluster:
+        """
+        sel = OpenMaya2.MSelectionList()
+        sel.add(self())
+        return OpenMayaAnim2.MFnSkinCluster(sel.getDependNode(0))
+
+    def geometries(self):
+        r"""
+            このスキンクラスターが変形しているシェイプ名のリストを返す。
+            
+            Returns:
+                list:
+        """
+        return cmds.skinCluster(self(), q=True, g=True) or []
+
+    def resolveShape(self, shape=None):
+        r"""
+            ウェイトの取得対象となるシェイプ名を返す。
+            shapeが省略された場合は変形対象の最初のシェイプを、
+            トランスフォームの場合はその下のシェイプを返す。
+            
+            Args:
+                shape (str):シェイプまたはトランスフォーム名
+                
+            Returns:
+                str:
+        """
+        if not shape:
+            shapes = self.geometries()
+            if not shapes:
+                raise RuntimeError(
+                    'No geometry is deformed by the skinCluster : %s' % self
+                )
+            return shapes[0]
+        shape = verutil.String(shape)
+        if cmds.nodeType(shape) in SKIN_COMPONENT_TABLE:
+            return shape
+        shapes = cmds.listRelatives(
+            shape, shapes=True, ni=True, type=list(SKIN_COMPONENT_TABLE)
+        )
+        if not shapes:
+            raise RuntimeError('Unsupported shape type : %s' % shape)
+        return shapes[0]
+
+    def shapeComponent(self, shape=None, components=None):
+        r"""
+            shapeのコンポーネントを表すMDagPathとコンポーネントを返す。
+            shapeが省略された場合は変形対象の最初のシェイプを使用する。
+            componentsが指定された場合はその番号のコンポーネントのみを
+            表すコンポーネントを返す(メッシュとnurbsCurveのみ対応)。
+            
+            Args:
+                shape (str):このスキンクラスターが影響しているシェイプ名
+                components (list):コンポーネント番号のリスト
+                
+            Returns:
+                tuple:(OpenMaya2.MDagPath, OpenMaya2.MObject)
+        """
+        shape = self.resolveShape(shape)
+        node_type = cmds.nodeType(shape)
+        sel = OpenMaya2.MSelectionList()
+        if components is None:
+            sel.add(shape + SKIN_COMPONENT_TABLE[node_type])
+            return sel.getComponent(0)
+        comp_types = {
+            'mesh': OpenMaya2.MFn.kMeshVertComponent,
+            'nurbsCurve': OpenMaya2.MFn.kCurveCVComponent,
+        }
+        if node_type not in comp_types:
+            raise ValueError(
+                'Component indices are not supported for %s : %s' % (
+                    node_type, shape
+                )
+            )
+        sel.add(shape)
+        fn = OpenMaya2.MFnSingleIndexedComponent()
+        comp = fn.create(comp_types[node_type])
+        fn.addElements([int(x) for x in components])
+        return sel.getDagPath(0), comp
+
+    def influenceNames(self):
+        r"""
+            MFnSkinClusterが返すインフルエンスの順番でインフルエンス名の
+            リストを返す。weightArrayの列の並びと一致する。
+            
+            Returns:
+                list:
+        """
+        return [
+            x.partialPathName() for x in self.skinFn().influenceObjects()
+        ]
+
+    def weightArray(self, shape=None):
+        r"""
+            shapeの全コンポーネントのウェイトを(コンポーネント数,
+            インフルエンス数)のnumpy配列として一度に取得する。
+            列の並びはinfluenceNamesの戻り値と一致する。
+            
+            Args:
+                shape (str):このスキンクラスターが影響しているシェイプ名
+                
+            Returns:
+                numpy.ndarray:
+        """
+        import numpy
+        path, comp = self.shapeComponent(shape)
+        weights, num = self.skinFn().getWeights(path, comp)
+        values = numpy.fromiter(weights, numpy.float64, len(weights))
+        return values.reshape(-1, num) if num else values.reshape(0, 0)
+
+    def influenceIndices(self, influences=None):
+        r"""
+            influencesに対応するインフルエンスの論理インデックスのリストを返す。
+            influencesが省略された場合はinfluenceNamesの順番で返す。
+            
+            Args:
+                influences (list):インフルエンス名のリスト
+                
+            Returns:
+                list:
+        """
+        mfn = self.skinFn()
+        if influences is None:
+            return [
+                mfn.indexForInfluenceObject(x) for x in mfn.influenceObjects()
+            ]
+        sel = OpenMaya2.MSelectionList()
+        for inf in influences:
+            sel.add(verutil.String(inf))
+        return [
+            mfn.indexForInfluenceObject(sel.getDagPath(x))
+            for x in range(sel.length())
+        ]
+
+    def setWeightArray(
+        self, weights, influences=None, shape=None, normalize=False,
+        undoable=False, components=None
+    ):
+        r"""
+            (コンポーネント数, インフルエンス数)のウェイト配列を一度の
+            setWeightsで全コンポーネントに適用する。
+            influencesは配列の列に対応するインフルエンス名のリストで、
+            省略された場合はinfluenceNamesの順番とみなす。
+            componentsが指定された場合は配列の各行をその番号の
+            コンポーネントにのみ適用する。
+            undoableがTrueの場合はMayaのアンドゥキューに登録する。
+            
+            Args:
+                weights (numpy.ndarray):ウェイト配列
+                influences (list):列に対応するインフルエンス名のリスト
+                shape (str):このスキンクラスターが影響しているシェイプ名
+                normalize (bool):適用時に正規化を行うかどうか
+                undoable (bool):アンドゥ可能にするかどうか
+                components (list):行に対応するコンポーネント番号のリスト
+                
+            Returns:
+                OpenMaya2.MDoubleArray:適用前のウェイト
+        """
+        if components is not None:
+            # setWeightsはコンポーネント番号の昇順で値を割り当てるため
+            # 行の並びを揃え、重複する番号は受け付けない。
+            import numpy
+            components = numpy.asarray(components, dtype=numpy.int64)
+            order = numpy.argsort(components, kind='mergesort')
+            components = components[order]
+            if (
+                len(components) != len(weights) or
+                numpy.any(components[1:] == components[:-1])
+            ):
+                raise ValueError(
+                    'The weight array does not match the components : %s' % (
+                        self
+                    )
+                )
+            weights = weights[order]
+        path, comp = self.shapeComponent(shape, components)
+        indices = OpenMaya2.MIntArray(self.influenceIndices(influences))
+        if weights.ndim != 2 or weights.shape[1] != len(indices):
+            raise ValueError(
+                'The weight array does not match the influences : %s' % self
+            )
+        from . import skinWeightCache
+        mfn = self.skinFn()
+        values = OpenMaya2.MDoubleArray(weights.ravel().tolist())
+        old_values = mfn.setWeights(
+            path, comp, indices, values, normalize, True
+        )
+        skinWeightCache.invalidate(self)
+        if undoable:
+            from . import apiUndo
+
+            def setValues(valueList, isNormalized):
+                mfn.setWeights(path, comp, indices, valueList, isNormalized)
+                skinWeightCache.invalidate(self)
+
+            apiUndo.commit(
+                lambda: setValues(old_values, False),
+                lambda: setValues(values, normalize)
+            )
+        return old_values
+
     def fixBrokenLimitInfluence(
         self, limit=4, checkOnly=False, isSelecting=True, withWeightList=False
     ):
         r"""
             limit以上のインフルエンスがバインドされている頂点をlimit内に
             収まるように修正する。
+            ウェイトはweightArrayで一度に取得し、全頂点の判定と修正を
+            配列演算で行った後、修正した頂点のみに一度のsetWeightsで
+            適用する（アンドゥ可能）。
+            limitが1未満の場合はValueErrorを送出する。
             
             Args:
                 limit (int):
@@ -2383,26 +2707,36 @@ class SkinCluster(AbstractNode):
             Returns:
                 list or dict:
         """
+        import numpy
+        if limit < 1:
+            raise ValueError(
+                'The limit must be greater than 0 : {}'.format(limit)
+            )
         sc = self.name()
         mesh = self.attr('outputGeometry[0]').destinations(type='mesh')
         null_result = {} if withWeightList else []
         if not mesh:
             print('Warning : No mesh was found. : {}'.format(self))
             return null_result
-        weightlist = self.listWeights()
-        if not weightlist:
+        data = self.weightData(mesh[0])
+        weights = data.weights()
+        if not weights.size:
             return null_result
         # +====================================================================
 
-        # 上限数以上のインフルエンスを持つウェイトリストを振り分ける。+========
-        errored_list = {}
-        for index, wlist in weightlist.items():
-            if len(wlist) > limit:
-                errored_list['{}.vtx[{}]'.format(mesh[0] , index)] = [
-                    sc + '.' + x for x in wlist.keys()
-                ]
-        if not errored_list:
+        # 上限数以上のインフルエンスを持つ頂点を振り分ける。+==================
+        counts = numpy.count_nonzero(weights, axis=1)
+        errored = numpy.nonzero(counts > limit)[0]
+        if not len(errored):
             return null_result
+        logical_indices = data.indices()
+        errored_list = {}
+        for index in errored:
+            errored_list['{}.vtx[{}]'.format(mesh[0], index)] = [
+                '{}.weightList[{}].weights[{}]'.format(
+                    sc, index, logical_indices[x]
+                ) for x in numpy.nonzero(weights[index])[0]
+            ]
         # +====================================================================
 
         # チェックのみの場合はここで終了。
@@ -2413,52 +2747,23 @@ class SkinCluster(AbstractNode):
             return errored_list if withWeightList else e_list
 
         # +====================================================================
-        for vtx, errored in errored_list.items():
-            weightlist = {}
-            # ウェイト値の高い順にアトリビュートを並べるための辞書を ----------
-            # 作成する。
-
-            for attr in errored:
-                weight = cmds.getAttr(attr)
-                if weight in weightlist:
-                    weightlist[weight].append(attr)
-                else:
-                    weightlist[weight] = [attr]
-            valuelist = list(weightlist.keys())
-            valuelist.sort()
-            valuelist.reverse()
-            # ----------------------------------------------------------------
-
-            # ウェイトの高い順にアトリビュートとその値を並列に並べる。--------
-            weightattrs = []
-            values = []
-            for value in valuelist:
-                for attr in weightlist[value]:
-                    weightattrs.append(attr)
-                    values.append(value)
-            # ----------------------------------------------------------------
-
-            # limitよりも多いアトリビュートの値を０にセットする。-------------
-            for attr in weightattrs[limit:]:
-                cmds.setAttr(attr, 0)
-            weightattrs = weightattrs[:limit]
-            values = values[:limit]
-            # ----------------------------------------------------------------
-
-            # 全体の合計が１になるように、残ったウェイトを調整する。----------
-            ratio = 1.0 / sum(values)
-            values = [x*ratio for x in values]
-            n = 1.0 - sum(values)
-            if n != 0:
-                values[0] += n
-            for attr, value in zip(weightattrs, values):
-                cmds.setAttr(attr, value)
-            # ----------------------------------------------------------------
+        # ウェイト値の高い順にlimit個を残し、それ以外を０にする。
+        sub = weights[errored]
+        order = numpy.argsort(-sub, axis=1, kind='mergesort')
+        rows = numpy.arange(len(sub))[:, numpy.newaxis]
+        sub[rows, order[:, limit:]] = 0.0
+
+        # 全体の合計が１になるように、残ったウェイトを調整する。
+        sub /= sub.sum(axis=1, keepdims=True)
+        sub[rows[:, 0], order[:, 0]] += 1.0 - sub.sum(axis=1)
+        self.setWeightArray(
+            sub, shape=mesh[0], undoable=True, components=errored
+        )
         # +====================================================================
 
         self('maxInfluences', limit)
         if isSelecting:
-            cmds.select(errored_list.keys(), r=True)
+            cmds.select(e_list, r=True)
         return errored_list if withWeightList else e_list
 
 
@@ -3780,6 +4085,12 @@ def asObject(nodeName, nodeType=None):
         name = verutil.String(nodeName)
         if nodeType:
             return nodeType(name)
+        # キャッシュが有効な場合は、型の判定を行わずにキャッシュから返す。
+        cache = nodeCache.activeCache()
+        if cache is not None:
+            obj = cache.find(name)
+            if obj is not None:
+                return obj
         if not cmds.objExists(name):
             return
         types = cmds.nodeType(name, i=True)
@@ -3787,8 +4098,13 @@ def asObject(nodeName, nodeType=None):
         for t in types:
             cls = ClassTable.get(t)
             if cls:
-                return cls(name)
-        return AbstractNode(nodeName)
+                obj = cls(name)
+                break
+        else:
+            obj = AbstractNode(nodeName)
+        if cache is not None and isinstance(obj, AbstractNode):
+            cache.add(name, None, obj)
+        return obj
     except Exception as e:
         print('[Error] : {}'.format(e.args[0]))
         return
@@ -3847,6 +4163,317 @@ def toObjects(nodelist):
         return [asObject(nodelist)]
 
 
+# /////////////////////////////////////////////////////////////////////////////
+# アトリビュートの一括操作用関数。                                           //
+# /////////////////////////////////////////////////////////////////////////////
+def _attrNames(nodes, attrs=None):
+    r"""
+        ノードとアトリビュートのリストから"ノード名.アトリビュート名"の
+        リストを作成する。
+        attrsがNoneの場合はnodesがそのまま"ノード名.アトリビュート名"の
+        リストとみなされる。
+        
+        Args:
+            nodes (list):
+            attrs (list):
+            
+        Returns:
+            list:
+    """
+    if attrs is None:
+        return [
+            x if isinstance(x, OpenMaya2.MPlug) else str(x) for x in nodes
+        ]
+    return ['{}.{}'.format(str(n), a) for n in nodes for a in attrs]
+
+
+def findPlugs(nodes, attrs=None, ignoreMissing=False):
+    r"""
+        ノードとアトリビュートのリストから、API2.0のMPlugのリストを
+        一括で取得する。
+        MSelectionListは同じプラグをマージするため、名前毎に
+        MSelectionListを空にして取り出し、戻り値の並びが指定した名前の
+        並びと必ず一致するようにしている。
+        attrsを指定した場合、戻り値はノード毎のMPlugのリストのリストとなる。
+        attrsがNoneの場合、nodesは"ノード名.アトリビュート名"(または
+        MPlug)のリストとして扱われ、戻り値はMPlugのリストとなる。
+        
+        Args:
+            nodes (list):ノード名、または"ノード名.アトリビュート名"のリスト
+            attrs (list):アトリビュート名のリスト
+            ignoreMissing (bool):
+                存在しないアトリビュートをエラーにせずNoneとするかどうか
+            
+        Returns:
+            list:
+    """
+    names = _attrNames(nodes, attrs)
+    sel = OpenMaya2.MSelectionList()
+    plugs = []
+    for name in names:
+        if isinstance(name, OpenMaya2.MPlug):
+            plugs.append(name)
+            continue
+        sel.clear()
+        try:
+            sel.add(name)
+            plugs.append(sel.getPlug(0))
+        except Exception:
+            if not ignoreMissing:
+                raise RuntimeError(
+                    'Failed to find attribute : {}'.format(name)
+                )
+            plugs.append(None)
+    if attrs is None:
+        return plugs
+    num = len(attrs)
+    return [plugs[i:i+num] for i in range(0, len(plugs), num)]
+
+
+def _plugValue(plug):
+    r"""
+        API2.0のMPlugの値を、cmds.getAttrと同じ単位の値で返す。
+        コンパウンドの場合は子の値のtupleを返す。
+        
+        Args:
+            plug (OpenMaya2.MPlug):
+            
+        Returns:
+            any:
+    """
+    if plug.isArray:
+        return cmds.getAttr(plug.name())
+    if plug.isCompound:
+        return tuple(
+            [_plugValue(plug.child(i)) for i in range(plug.numChildren())]
+        )
+    attr = plug.attribute()
+    if attr.hasFn(OpenMaya2.MFn.kEnumAttribute):
+        return plug.asInt()
+    if attr.hasFn(OpenMaya2.MFn.kNumericAttribute):
+        num_type = OpenMaya2.MFnNumericAttribute(attr).numericType()
+        if num_type == OpenMaya2.MFnNumericData.kBoolean:
+            return plug.asBool()
+        if num_type in _IntNumericTypes:
+            return plug.asInt()
+        return plug.asDouble()
+    if attr.hasFn(OpenMaya2.MFn.kUnitAttribute):
+        unit_type = OpenMaya2.MFnUnitAttribute(attr).unitType()
+        if unit_type == OpenMaya2.MFnUnitAttribute.kAngle:
+            return plug.asMAngle().asUnits(OpenMaya2.MAngle.uiUnit())
+        if unit_type == OpenMaya2.MFnUnitAttribute.kDistance:
+            return plug.asMDistance().asUnits(OpenMaya2.MDistance.uiUnit())
+        if unit_type == OpenMaya2.MFnUnitAttribute.kTime:
+            return plug.asMTime().asUnits(OpenMaya2.MTime.uiUnit())
+        return plug.asDouble()
+    if attr.hasFn(OpenMaya2.MFn.kTypedAttribute):
+        data_type = OpenMaya2.MFnTypedAttribute(attr).attrType()
+        if data_type == OpenMaya2.MFnData.kString:
+            return plug.asString()
+        if data_type == OpenMaya2.MFnData.kMatrix:
+            return list(OpenMaya2.MFnMatrixData(plug.asMObject()).matrix())
+    if attr.hasFn(OpenMaya2.MFn.kMatrixAttribute):
+        return list(OpenMaya2.MFnMatrixData(plug.asMObject()).matrix())
+    return cmds.getAttr(plug.name())
+
+
+def _setPlugValue(modifier, plug, value):
+    r"""
+        MDGModifierにMPlugへ値をセットする操作を追加する。
+        値はcmds.setAttrと同じ単位で指定する。
+        
+        Args:
+            modifier (OpenMaya2.MDGModifier):
+            plug (OpenMaya2.MPlug):
+            value (any):
+    """
+    if plug.isCompound:
+        for i, v in enumerate(value):
+            _setPlugValue(modifier, plug.child(i), v)
+        return
+    attr = plug.attribute()
+    if attr.hasFn(OpenMaya2.MFn.kEnumAttribute):
+        modifier.newPlugValueInt(plug, int(value))
+        return
+    if attr.hasFn(OpenMaya2.MFn.kNumericAttribute):
+        num_type = OpenMaya2.MFnNumericAttribute(attr).numericType()
+        if num_type == OpenMaya2.MFnNumericData.kBoolean:
+            modifier.newPlugValueBool(plug, bool(value))
+        elif num_type in _IntNumericTypes:
+            modifier.newPlugValueInt(plug, int(value))
+        else:
+            modifier.newPlugValueDouble(plug, float(value))
+        return
+    if attr.hasFn(OpenMaya2.MFn.kUnitAttribute):
+        unit_type = OpenMaya2.MFnUnitAttribute(attr).unitType()
+        if unit_type == OpenMaya2.MFnUnitAttribute.kAngle:
+            modifier.newPlugValueMAngle(
+                plug,
+                OpenMaya2.MAngle(float(value), OpenMaya2.MAngle.uiUnit())
+            )
+        elif unit_type == OpenMaya2.MFnUnitAttribute.kDistance:
+            modifier.newPlugValueMDistance(
+                plug,
+                OpenMaya2.MDistance(float(value), OpenMaya2.MDistance.uiUnit())
+            )
+        elif unit_type == OpenMaya2.MFnUnitAttribute.kTime:
+            modifier.newPlugValueMTime(
+                plug, OpenMaya2.MTime(float(value), OpenMaya2.MTime.uiUnit())
+            )
+        else:
+            modifier.newPlugValueDouble(plug, float(value))
+        return
+    is_matrix = attr.hasFn(OpenMaya2.MFn.kMatrixAttribute)
+    if attr.hasFn(OpenMaya2.MFn.kTypedAttribute):
+        data_type = OpenMaya2.MFnTypedAttribute(attr).attrType()
+        if data_type == OpenMaya2.MFnData.kString:
+            modifier.newPlugValueString(plug, value)
+            return
+        is_matrix = data_type == OpenMaya2.MFnData.kMatrix
+    if is_matrix:
+        data = OpenMaya2.MFnMatrixData().create(
+            OpenMaya2.MMatrix([float(x) for x in value])
+        )
+        modifier.newPlugValue(plug, data)
+        return
+    raise RuntimeError(
+        'Unsupported attribute type for setAttrs : {}'.format(plug.name())
+    )
+
+
+def _lockedPlugs(plug):
+    r"""
+        MPlugとその子孫のうち、ロックされているもののリストを返す。
+        
+        Args:
+            plug (OpenMaya2.MPlug):
+            
+        Returns:
+            list:
+    """
+    result = [plug] if plug.isLocked else []
+    if plug.isCompound:
+        for i in range(plug.numChildren()):
+            result.extend(_lockedPlugs(plug.child(i)))
+    return result
+
+
+def isSettablePlug(plug):
+    r"""
+        cmds.setAttrと同じ条件で値をセットできるMPlugかどうかを返す。
+        ロックされているもの(子を含む)と、animCurve以外から接続されている
+        ものはFalseとなる。animCurveで駆動されている(キーのある)ものは
+        Trueとなる。
+        
+        Args:
+            plug (OpenMaya2.MPlug):
+            
+        Returns:
+            bool:
+    """
+    if _lockedPlugs(plug):
+        return False
+    source = plug.source()
+    if source.isNull:
+        return True
+    return source.node().hasFn(OpenMaya2.MFn.kAnimCurve)
+
+
+def getAttrs(nodes, attrs=None, asArray=False):
+    r"""
+        複数ノードの複数アトリビュートの値をMPlugを用いて一括で取得する。
+        値の単位はcmds.getAttrと同じで、コンパウンドアトリビュートの値は
+        子の値のtupleとなる。
+        attrsを指定した場合は[ノード][アトリビュート]の２次元のリスト、
+        attrsがNoneの場合、nodesは"ノード名.アトリビュート名"(または
+        MPlug)のリストとして扱われ、戻り値は値のリストとなる。
+        
+        Args:
+            nodes (list):ノード名、または"ノード名.アトリビュート名"のリスト
+            attrs (list):アトリビュート名のリスト
+            asArray (bool):戻り値をnumpy.ndarrayにするかどうか
+            
+        Returns:
+            list or numpy.ndarray:
+    """
+    plugs = findPlugs(nodes, attrs)
+    if attrs is None:
+        values = [_plugValue(x) for x in plugs]
+    else:
+        values = [[_plugValue(x) for x in row] for row in plugs]
+    if not asArray:
+        return values
+    import numpy
+    return numpy.array(values, dtype=numpy.float64)
+
+
+def setAttrs(nodes, attrs=None, values=None, force=False, undoable=True):
+    r"""
+        複数ノードの複数アトリビュートへ、1つのMDGModifierで一括で値を
+        セットする。値の単位はcmds.setAttrと同じ。
+        attrsを指定した場合、valuesは[ノード][アトリビュート]の２次元の
+        リスト(またはnumpy.ndarray)となる。
+        attrsがNoneの場合、nodesは"ノード名.アトリビュート名"(または
+        MPlug)をキーとし値を値とする辞書、またはそのペアのリストとして
+        扱われる。
+        undoableがTrueの場合、操作はMayaのアンドゥキューに登録される。
+        
+        Args:
+            nodes (list or dict):ノード名のリスト、または辞書
+            attrs (list):アトリビュート名のリスト
+            values (list):セットする値
+            force (bool):ロックされたアトリビュートのロックを一時的に解除する
+            undoable (bool):アンドゥ可能にするかどうか
+    """
+    if attrs is None:
+        items = nodes.items() if isinstance(nodes, dict) else nodes
+        names, flat_values = [], []
+        for name, value in items:
+            names.append(name)
+            flat_values.append(value)
+        plugs = findPlugs(names)
+    else:
+        plugs = [x for row in findPlugs(nodes, attrs) for x in row]
+        flat_values = [x for row in values for x in row]
+    if len(plugs) != len(flat_values):
+        raise ValueError(
+            'The number of values does not match the number of attributes.'
+        )
+
+    locked = []
+    for plug in plugs:
+        locked.extend(_lockedPlugs(plug))
+    if locked and not force:
+        raise RuntimeError(
+            'The attributes are locked : {}'.format(
+                ', '.join([x.name() for x in locked])
+            )
+        )
+
+    modifier = OpenMaya2.MDGModifier()
+    for plug, value in zip(plugs, flat_values):
+        _setPlugValue(modifier, plug, value)
+
+    def execute(method):
+        for plug in locked:
+            plug.isLocked = False
+        try:
+            method()
+        finally:
+            for plug in locked:
+                plug.isLocked = True
+
+    execute(modifier.doIt)
+    if undoable:
+        from . import apiUndo
+        apiUndo.commit(
+            lambda: execute(modifier.undoIt), lambda: execute(modifier.doIt)
+        )
+# /////////////////////////////////////////////////////////////////////////////
+#                                                                            //
+# /////////////////////////////////////////////////////////////////////////////
+
+
 def ls(*nodes, **keywords):
     r"""
         cmds.lsと同様だが、戻り値がAbstractNodeのリストになる。
@@ -3894,6 +4521,7 @@ def createNode(nodeType, **keywords):
         Returns:
             AbstractNode:
     """
+    mayaCmds.loadRequiredPlugins()
     return asObject(
         cmds.createNode(DL_CONV_TABLE.get(nodeType, nodeType), **keywords)
     )
@@ -3930,6 +4558,7 @@ def shadingNode(nodeType, **keywords):
         Returns:
             AbstractNode:
     """
+    mayaCmds.loadRequiredPlugins()
     return asObject(cmds.shadingNode(nodeType, **keywords))
 
 
@@ -0,0 +1,311 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    node.AbstractNodeのインスタンスをキャッシュする機能を提供するモジュール。
+    同じノードを何度もAbstractNodeへ変換する際に、MSelectionListや
+    関数セットの作成、ノードタイプの問い合わせを省略するために使用する。
+    キャッシュはMObjectHandleのハッシュコードをキーとし、ノード名から
+    ハッシュコードを引く索引を持つ。
+    ノードの名前の変更、削除、シーンの切り替えを検知して破棄される。
+    キャッシュは既定では無効で、setEnabledまたはCachedScopeで有効にする。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+from maya import OpenMaya
+from maya.api import OpenMaya as OpenMaya2
+
+
+class NodeCache(object):
+    r"""
+        AbstractNodeのインスタンスをキャッシュするシングルトンクラス。
+        インスタンスは(ノード名, 型)の組で検索され、型がNoneの場合は
+        node.asObjectが自動で判定した型を表す。
+    """
+    def __new__(cls):
+        if hasattr(cls, '__instance__'):
+            return cls.__instance__
+        obj = super(NodeCache, cls).__new__(cls)
+        obj.__entries = {}
+        obj.__handles = {}
+        obj.__names = {}
+        obj.__names_by_handle = {}
+        obj.__callbacks = []
+        obj.__enabled = False
+        obj.__hits = 0
+        obj.__misses = 0
+        cls.__instance__ = obj
+        return obj
+
+    def setEnabled(self, state):
+        r"""
+            キャッシュを有効にするかどうかを設定する。
+            無効にした場合はキャッシュとコールバックを全て破棄する。
+
+            Args:
+                state (bool):
+        """
+        state = bool(state)
+        if state == self.__enabled:
+            return
+        self.__enabled = state
+        if state:
+            self.__installCallbacks()
+        else:
+            self.clear()
+            self.__removeCallbacks()
+
+    def isEnabled(self):
+        r"""
+            キャッシュが有効かどうかを返す。
+
+            Returns:
+                bool:
+        """
+        return self.__enabled
+
+    def statistics(self):
+        r"""
+            ヒット数、ミス数、エントリ数、名前の索引数を持つ辞書を返す。
+
+            Returns:
+                dict:
+        """
+        return {
+            'hits': self.__hits, 'misses': self.__misses,
+            'entries': len(self.__entries), 'names': len(self.__names),
+        }
+
+    def resetStatistics(self):
+        r"""
+            ヒット数とミス数を0に戻す。
+        """
+        self.__hits = 0
+        self.__misses = 0
+
+    def __installCallbacks(self):
+        r"""
+            ノードの削除、名前の変更、シーンの切り替えを検知する
+            コールバックを登録する。
+        """
+        def nodeRemoved(mobject, clientData):
+            self.invalidate(OpenMaya2.MObjectHandle(mobject).hashCode())
+
+        def nameChanged(mobject, previousName, clientData):
+            self.__removeNames(OpenMaya2.MObjectHandle(mobject).hashCode())
+
+        self.__callbacks = [
+            OpenMaya2.MDGMessage.addNodeRemovedCallback(nodeRemoved),
+            OpenMaya2.MNodeMessage.addNameChangedCallback(
+                OpenMaya2.MObject(), nameChanged
+            ),
+        ]
+        for msg in (
+            OpenMaya2.MSceneMessage.kBeforeNew,
+            OpenMaya2.MSceneMessage.kBeforeOpen,
+            OpenMaya2.MSceneMessage.kBeforeImport,
+            OpenMaya2.MSceneMessage.kBeforeCreateReference,
+            OpenMaya2.MSceneMessage.kBeforeRemoveReference,
+        ):
+            self.__callbacks.append(
+                OpenMaya2.MSceneMessage.addCallback(
+                    msg, lambda *args: self.clear()
+                )
+            )
+
+    def __removeCallbacks(self):
+        r"""
+            登録したコールバックを全て削除する。
+        """
+        if self.__callbacks:
+            OpenMaya2.MMessage.removeCallbacks(self.__callbacks)
+        self.__callbacks = []
+
+    def __removeNames(self, code):
+        r"""
+            与えられたハッシュコードを指す名前の索引を削除する。
+
+            Args:
+                code (int):MObjectHandleのハッシュコード
+        """
+        for key in self.__names_by_handle.pop(code, []):
+            self.__names.pop(key, None)
+
+    def find(self, name, nodeType=None):
+        r"""
+            キャッシュからノード名に該当するインスタンスを返す。
+            見つからない場合、またはノードが無効になっている場合は
+            Noneを返す。
+
+            Args:
+                name (str):ノード名
+                nodeType (type):インスタンスの型
+
+            Returns:
+                node.AbstractNode:
+        """
+        key = (name, nodeType)
+        code = self.__names.get(key)
+        if code is None:
+            self.__misses += 1
+            return
+        handle = self.__handles.get(code)
+        obj = self.__entries.get(code, {}).get(nodeType)
+        if (
+            obj is None or not handle.isValid() or not handle.isAlive()
+            or not self.__matchName(obj, name)
+        ):
+            self.__names.pop(key, None)
+            self.__misses += 1
+            return
+        self.__hits += 1
+        return obj
+
+    @staticmethod
+    def __matchName(obj, name):
+        r"""
+            インスタンスの現在の名前が検索に使用された名前と同じノードを
+            指しているかどうかを返す。
+            親子付けの変更や同名ノードの作成によって名前が変わった場合は
+            Falseを返す。
+
+            Args:
+                obj (node.AbstractNode):
+                name (str):
+
+            Returns:
+                bool:
+        """
+        current = obj.name()
+        if name == current:
+            return True
+        if name.startswith('|') and obj.isDag():
+            return obj._node().fullPathName() == name
+        return False
+
+    def add(self, name, nodeType, obj):
+        r"""
+            インスタンスをキャッシュに追加する。
+
+            Args:
+                name (str):ノード名
+                nodeType (type):インスタンスの型
+                obj (node.AbstractNode):
+        """
+        try:
+            handle = OpenMaya.MObjectHandle(obj._node().object())
+        except Exception:
+            return
+        code = handle.hashCode()
+        self.__handles[code] = handle
+        self.__entries.setdefault(code, {})[nodeType] = obj
+        key = (name, nodeType)
+        self.__names[key] = code
+        self.__names_by_handle.setdefault(code, set()).add(key)
+
+    def invalidate(self, code=None):
+        r"""
+            キャッシュを破棄する。
+            codeにMObjectHandleのハッシュコードを指定した場合は
+            そのノードのキャッシュのみを破棄する。
+
+            Args:
+                code (int):
+        """
+        if code is None:
+            self.clear()
+            return
+        self.__entries.pop(code, None)
+        self.__handles.pop(code, None)
+        self.__removeNames(code)
+
+    def clear(self):
+        r"""
+            全てのキャッシュを破棄する。
+        """
+        self.__entries.clear()
+        self.__handles.clear()
+        self.__names.clear()
+        self.__names_by_handle.clear()
+
+
+class CachedScope(object):
+    r"""
+        with文の中でのみキャッシュを有効にするコンテキスト制御クラス。
+        with文を抜ける際にキャッシュは破棄され、元の有効状態に戻される。
+    """
+    def __enter__(self):
+        cache = NodeCache()
+        self.__state = cache.isEnabled()
+        cache.setEnabled(True)
+        return cache
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        r"""
+            Args:
+                exc_type (any):
+                exc_value (any):
+                traceback (any):
+
+            Returns:
+                bool:
+        """
+        cache = NodeCache()
+        cache.clear()
+        cache.setEnabled(self.__state)
+        return False
+
+
+def activeCache():
+    r"""
+        キャッシュが有効な場合はNodeCacheを、無効な場合はNoneを返す。
+
+        Returns:
+            NodeCache:
+    """
+    cache = NodeCache()
+    return cache if cache.isEnabled() else None
+
+
+def setEnabled(state):
+    r"""
+        キャッシュを有効にするかどうかを設定する。
+
+        Args:
+            state (bool):
+    """
+    NodeCache().setEnabled(state)
+
+
+def isEnabled():
+    r"""
+        キャッシュが有効かどうかを返す。
+
+        Returns:
+            bool:
+    """
+    return NodeCache().isEnabled()
+
+
+def statistics():
+    r"""
+        キャッシュのヒット数、ミス数などの統計を返す。
+
+        Returns:
+            dict:
+    """
+    return NodeCache().statistics()
+
+
+def clear():
+    r"""
+        全てのキャッシュを破棄する。
+    """
+    NodeCache().clear()
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    APIで行った編集をMayaのアンドゥキューに登録するためのコマンドプラグイン。
+    gris3.apiUndo.commitから呼び出されるため、直接使用することはない。
+    
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+from maya.api import OpenMaya
+
+CommandName = 'grisApiUndo'
+
+
+def maya_useNewAPI():
+    r"""
+        API2.0を使用するプラグインであることをMayaに伝える。
+    """
+    pass
+
+
+class ApiUndoCommand(OpenMaya.MPxCommand):
+    r"""
+        gris3.apiUndoに積まれたアンドゥ、リドゥ用の関数を保持するコマンド。
+    """
+    def __init__(self):
+        super(ApiUndoCommand, self).__init__()
+        self.__undo = None
+        self.__redo = None
+
+    def doIt(self, args):
+        r"""
+            保留中のアンドゥ、リドゥ用の関数を取り出して保持する。
+            
+            Args:
+                args (OpenMaya.MArgList):
+        """
+        from gris3 import apiUndo
+        self.__undo, self.__redo = apiUndo.popPending()
+
+    def undoIt(self):
+        if self.__undo:
+            self.__undo()
+
+    def redoIt(self):
+        if self.__redo:
+            self.__redo()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(mobject):
+    plugin = OpenMaya.MFnPlugin(mobject, 'Eske Yoshinob', '1.0', 'Any')
+    plugin.registerCommand(CommandName, ApiUndoCommand)
+
+
+def uninitializePlugin(mobject):
+    plugin = OpenMaya.MFnPlugin(mobject)
+    plugin.deregisterCommand(CommandName)
@@ -15,7 +15,7 @@ r"""
 """
 import re
 from abc import ABCMeta, abstractmethod
-from .. import grisNode, func, node, lib, system, verutil
+from .. import grisNode, func, node, lib, system, verutil, moduleManifest
 cmds = func.cmds
 
 RigNamePattern = re.compile('Rig[A-Z]*$')
@@ -1000,6 +1000,33 @@ def rigModuleList(loadMode=0):
         if not hasattr(x, 'IgnoreLoad') or x.IgnoreLoad
     ]
 
+def rigModuleManifest(includeIgnored=False):
+    r"""
+        grisのリグ用モジュールの情報の一覧をモジュールをインポートせずに
+        返す。各要素はmoduleManifest.ModuleManifest.entriesの辞書で、
+        rigModuleListと同じくIgnoreLoadが偽となるモジュールは
+        includeIgnoredがTrueの場合のみリストされ、構文エラーのある
+        モジュールはリストされない。IgnoreLoadの値がリテラルでない
+        モジュールはインポートして判定する。
+        
+        Args:
+            includeIgnored (bool):IgnoreLoadがFalseのモジュールも含めるか
+            
+        Returns:
+            list:
+    """
+    import os
+    manifest = moduleManifest.ModuleManifest(
+        os.path.dirname(__file__), __name__
+    )
+    return [
+        x for x in manifest.entries()
+        if not x['error'] and (
+            includeIgnored or
+            moduleManifest.moduleVariable(x, 'IgnoreLoad', True)
+        )
+    ]
+
 def getRigModule(unitType, isReload=False):
     r"""
         引数unitTypeのモジュールを返す
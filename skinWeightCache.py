@@ -0,0 +1,394 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    skinClusterのウェイト行列をキャッシュする機能を提供するモジュール。
+    チェッカーやスキニング関連のツールが同じウェイトを何度も取得しないよう、
+    skinCluster、シェイプ毎にウェイト配列とインフルエンスの情報を保持する。
+    キャッシュは使用メモリ量(バイト数)を上限としたLRUで管理され、
+    ウェイトの編集、ノードの削除、シーンの切り替えを検知して破棄される。
+    ペイントやskinPercentによる編集はコールバックで検知できない場合があるため、
+    キャッシュは既定では無効で、setEnabledまたはCachedScopeで
+    ウェイトを編集しない区間(チェッカーの実行中など)のみ有効にする。
+    
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+from collections import OrderedDict
+from maya.api import OpenMaya
+
+# キャッシュが使用するメモリ量の上限(バイト)。
+DefaultMaxBytes = 512 * 1024 * 1024
+# キャッシュの破棄対象となるskinClusterのアトリビュート。
+WatchedAttributes = ('weightList', 'matrix')
+
+
+class WeightCacheData(object):
+    r"""
+        キャッシュされた１つのウェイト行列の情報を持つクラス。
+    """
+    def __init__(self, weights, influences, indices):
+        r"""
+            Args:
+                weights (numpy.ndarray):(コンポーネント数, インフルエンス数)
+                influences (list):列に対応するインフルエンス名のリスト
+                indices (list):列に対応するインフルエンスの論理インデックス
+        """
+        weights.flags.writeable = False
+        self.__weights = weights
+        self.__influences = influences
+        self.__indices = indices
+
+    def weights(self):
+        r"""
+            読み取り専用のウェイト配列を返す。
+            
+            Returns:
+                numpy.ndarray:
+        """
+        return self.__weights
+
+    def influences(self):
+        r"""
+            列に対応するインフルエンス名のリストを返す。
+            
+            Returns:
+                list:
+        """
+        return self.__influences
+
+    def indices(self):
+        r"""
+            列に対応するインフルエンスの論理インデックスのリストを返す。
+            
+            Returns:
+                list:
+        """
+        return self.__indices
+
+    def nbytes(self):
+        r"""
+            ウェイト配列が使用しているバイト数を返す。
+            
+            Returns:
+                int:
+        """
+        return self.__weights.nbytes
+
+
+class SkinWeightCache(object):
+    r"""
+        skinClusterのウェイト行列をキャッシュするシングルトンクラス。
+    """
+    def __new__(cls):
+        if hasattr(cls, '__instance__'):
+            return cls.__instance__
+        obj = super(SkinWeightCache, cls).__new__(cls)
+        obj.__entries = OrderedDict()
+        obj.__node_callbacks = {}
+        obj.__scene_callbacks = []
+        obj.__max_bytes = DefaultMaxBytes
+        obj.__enabled = False
+        obj.__total_bytes = 0
+        obj.__hits = 0
+        obj.__misses = 0
+        cls.__instance__ = obj
+        return obj
+
+    def setEnabled(self, state):
+        r"""
+            キャッシュを有効にするかどうかを設定する。
+            無効にした場合はキャッシュとコールバックを全て破棄する。
+            
+            Args:
+                state (bool):
+        """
+        state = bool(state)
+        if state == self.__enabled:
+            return
+        self.__enabled = state
+        if state:
+            return
+        self.clear()
+        if self.__scene_callbacks:
+            OpenMaya.MMessage.removeCallbacks(self.__scene_callbacks)
+        self.__scene_callbacks = []
+
+    def isEnabled(self):
+        r"""
+            キャッシュが有効かどうかを返す。
+            
+            Returns:
+                bool:
+        """
+        return self.__enabled
+
+    def setMaxBytes(self, maxBytes):
+        r"""
+            キャッシュが使用するメモリ量の上限をセットする。
+            
+            Args:
+                maxBytes (int):
+        """
+        self.__max_bytes = int(maxBytes)
+        self.__trim()
+
+    def maxBytes(self):
+        r"""
+            キャッシュが使用するメモリ量の上限を返す。
+            
+            Returns:
+                int:
+        """
+        return self.__max_bytes
+
+    def totalBytes(self):
+        r"""
+            現在キャッシュが使用しているメモリ量を返す。
+            
+            Returns:
+                int:
+        """
+        return self.__total_bytes
+
+    def statistics(self):
+        r"""
+            ヒット数、ミス数、エントリ数、使用バイト数を持つ辞書を返す。
+            
+            Returns:
+                dict:
+        """
+        return {
+            'hits': self.__hits, 'misses': self.__misses,
+            'entries': len(self.__entries), 'bytes': self.__total_bytes,
+        }
+
+    def __trim(self):
+        r"""
+            使用メモリ量が上限を超えている間、古いエントリから破棄する。
+        """
+        while self.__entries and self.__total_bytes > self.__max_bytes:
+            key, entry = self.__entries.popitem(last=False)
+            self.__total_bytes -= entry[0].nbytes()
+
+    def __installSceneCallbacks(self):
+        r"""
+            シーンの切り替え時にキャッシュを全破棄するコールバックを登録する。
+        """
+        if self.__scene_callbacks:
+            return
+        for msg in (
+            OpenMaya.MSceneMessage.kBeforeNew,
+            OpenMaya.MSceneMessage.kBeforeOpen,
+        ):
+            self.__scene_callbacks.append(
+                OpenMaya.MSceneMessage.addCallback(
+                    msg, lambda *args: self.clear()
+                )
+            )
+
+    def __installNodeCallbacks(self, skinCluster, nodeId):
+        r"""
+            skinClusterのウェイト編集と削除を検知するコールバックを登録する。
+            
+            Args:
+                skinCluster (OpenMaya.MObject):
+                nodeId (tuple):(MObjectHandleのハッシュコード, UUID)
+        """
+        if nodeId in self.__node_callbacks:
+            return
+
+        def attributeChanged(msg, plug, otherPlug, clientData):
+            name = plug.partialName(useLongNames=True)
+            if name.startswith(WatchedAttributes):
+                self.invalidate(nodeId)
+
+        def nodeRemoved(node, modifier, clientData):
+            self.invalidate(nodeId, True)
+
+        self.__node_callbacks[nodeId] = [
+            OpenMaya.MNodeMessage.addAttributeChangedCallback(
+                skinCluster, attributeChanged
+            ),
+            OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+                skinCluster, nodeRemoved
+            ),
+        ]
+
+    def __key(self, skinCluster, shape):
+        r"""
+            skinClusterとシェイプからキャッシュのキーを作成する。
+            ハッシュコードは削除されたノードのものが再利用される場合が
+            あるため、ノードの識別にはUUIDも併せて用いる。
+            
+            Args:
+                skinCluster (node.SkinCluster):
+                shape (str):
+                
+            Returns:
+                tuple:((ハッシュコード, UUID), シェイプ名, MObjectHandle)
+        """
+        sel = OpenMaya.MSelectionList()
+        sel.add(skinCluster())
+        handle = OpenMaya.MObjectHandle(sel.getDependNode(0))
+        uuid = OpenMaya.MFnDependencyNode(handle.object()).uuid().asString()
+        if not shape:
+            shapes = skinCluster.geometries()
+            shape = shapes[0] if shapes else ''
+        return (handle.hashCode(), uuid), shape, handle
+
+    def get(self, skinCluster, shape=None):
+        r"""
+            skinClusterのウェイト情報を返す。
+            キャッシュにない場合はskinClusterから取得してキャッシュする。
+            キャッシュが無効な場合は常にskinClusterから取得する。
+            
+            Args:
+                skinCluster (node.SkinCluster):
+                shape (str):このスキンクラスターが影響しているシェイプ名
+                
+            Returns:
+                WeightCacheData:
+        """
+        if not self.__enabled:
+            self.__misses += 1
+            return WeightCacheData(
+                skinCluster.weightArray(shape),
+                skinCluster.influenceNames(), skinCluster.influenceIndices()
+            )
+        node_id, shape, handle = self.__key(skinCluster, shape)
+        key = (node_id, shape)
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            data, cached_handle = entry
+            # 削除されたノードのエントリは使用しない。
+            if cached_handle.isValid() and cached_handle.isAlive():
+                self.__entries[key] = entry
+                self.__hits += 1
+                return data
+            self.__total_bytes -= data.nbytes()
+
+        self.__misses += 1
+        data = WeightCacheData(
+            skinCluster.weightArray(shape),
+            skinCluster.influenceNames(), skinCluster.influenceIndices()
+        )
+        self.__installSceneCallbacks()
+        self.__installNodeCallbacks(handle.object(), node_id)
+        self.__entries[key] = (data, handle)
+        self.__total_bytes += data.nbytes()
+        self.__trim()
+        return data
+
+    def invalidate(self, nodeId=None, removeCallbacks=False):
+        r"""
+            キャッシュを破棄する。
+            nodeIdにskinCluster、または(ハッシュコード, UUID)のtupleを
+            指定した場合はそのskinClusterのキャッシュのみを破棄する。
+            
+            Args:
+                nodeId (tuple or node.SkinCluster):
+                removeCallbacks (bool):登録したコールバックも削除するかどうか
+        """
+        if not self.__enabled:
+            return
+        if nodeId is None:
+            self.clear()
+            return
+        if not isinstance(nodeId, tuple):
+            nodeId = self.__key(nodeId, '')[0]
+        for key in [x for x in self.__entries if x[0] == nodeId]:
+            self.__total_bytes -= self.__entries.pop(key)[0].nbytes()
+        if not removeCallbacks:
+            return
+        callbacks = self.__node_callbacks.pop(nodeId, [])
+        if callbacks:
+            OpenMaya.MMessage.removeCallbacks(callbacks)
+
+    def clear(self):
+        r"""
+            全てのキャッシュとskinClusterに登録したコールバックを破棄する。
+        """
+        self.__entries.clear()
+        self.__total_bytes = 0
+        for callbacks in self.__node_callbacks.values():
+            OpenMaya.MMessage.removeCallbacks(callbacks)
+        self.__node_callbacks = {}
+
+
+class CachedScope(object):
+    r"""
+        with文の中でのみキャッシュを有効にするコンテキスト制御クラス。
+        既に有効な場合は何もせず、このスコープで有効にした場合のみ
+        with文を抜ける際にキャッシュを破棄して無効に戻す。
+    """
+    def __enter__(self):
+        cache = SkinWeightCache()
+        self.__state = cache.isEnabled()
+        cache.setEnabled(True)
+        return cache
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        r"""
+            Args:
+                exc_type (any):
+                exc_value (any):
+                traceback (any):
+                
+            Returns:
+                bool:
+        """
+        SkinWeightCache().setEnabled(self.__state)
+        return False
+
+
+def setEnabled(state):
+    r"""
+        キャッシュを有効にするかどうかを設定する。
+        
+        Args:
+            state (bool):
+    """
+    SkinWeightCache().setEnabled(state)
+
+
+def isEnabled():
+    r"""
+        キャッシュが有効かどうかを返す。
+        
+        Returns:
+            bool:
+    """
+    return SkinWeightCache().isEnabled()
+
+
+def getWeightData(skinCluster, shape=None):
+    r"""
+        キャッシュを経由してskinClusterのウェイト情報を返す。
+        キャッシュが無効な場合はskinClusterから直接取得する。
+        
+        Args:
+            skinCluster (node.SkinCluster):
+            shape (str):このスキンクラスターが影響しているシェイプ名
+            
+        Returns:
+            WeightCacheData:
+    """
+    return SkinWeightCache().get(skinCluster, shape)
+
+
+def invalidate(skinCluster=None):
+    r"""
+        skinClusterのキャッシュを破棄する。
+        skinClusterが省略された場合は全て破棄する。
+        
+        Args:
+            skinCluster (node.SkinCluster):
+    """
+    SkinWeightCache().invalidate(skinCluster)
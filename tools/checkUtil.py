@@ -159,8 +159,12 @@ class AbstractAssetChecker(AbstractChecker):
                 )
             ]
             return [('???', checked)]
-        for target in targets:
-            result.extend(self.search(target))
+        # チェック中はウェイトを編集しないため、ウェイトのキャッシュを
+        # 有効にして同じskinClusterの取得を1度で済ませる。
+        from .. import skinWeightCache
+        with skinWeightCache.CachedScope():
+            for target in targets:
+                result.extend(self.search(target))
         return result
 
 
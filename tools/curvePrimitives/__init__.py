@@ -14,8 +14,11 @@ r"""
         Proprietary and confidential
 """
 import os
+import re
+import json
 
-from maya import OpenMaya, mel
+from maya import OpenMaya
+from maya.api import OpenMaya as OpenMaya2
 from ... import node, colorUtil
 cmds = node.cmds
 
@@ -38,9 +41,121 @@ def updateCurveTypeList():
     }
 updateCurveTypeList()
 
-__CURVE_SHAPE_BUFFER__ = {}
+# melファイルをコンパイルしたカーブ形状のデータテーブルのパス。
+CurveDataFile = os.path.join(os.path.dirname(__file__), 'curveData.json')
+__CURVE_DATA__ = None
 # =============================================================================
 
+# melファイル解析用の正規表現。================================================
+ShapeNamePattern = re.compile(r'-n\s+\(\$trs\s*\+\s*"(\w+)"\)')
+OverrideColorPattern = re.compile(r'setAttr\s+"\.ovc"\s+(\d+)\s*;')
+CurveDataPattern = re.compile(
+    r'setAttr\s+"\.cc"\s+-type\s+"nurbsCurve"([^;]*);'
+)
+# =============================================================================
+
+
+def parseCurveMel(filepath):
+    r"""
+        カーブ形状を作成するmelファイルを解析し、シェイプ毎の
+        名前、次数、フォーム、有理かどうか、ノット、CV、
+        オーバーライドカラーを持つ辞書のリストを返す。
+        有理カーブの場合、CVは[x, y, z, w]となる。
+        
+        Args:
+            filepath (str):
+            
+        Returns:
+            list:
+    """
+    with open(filepath, 'r') as f:
+        text = f.read()
+    results = []
+    for block in text.split('createNode nurbsCurve')[1:]:
+        name = ShapeNamePattern.search(block)
+        color = OverrideColorPattern.search(block)
+        curve_data = CurveDataPattern.search(block)
+        if not curve_data:
+            raise RuntimeError(
+                'Failed to parse the curve data : {}'.format(filepath)
+            )
+        tokens = curve_data.group(1).split()
+        degree, form = int(tokens[0]), int(tokens[2])
+        rational = tokens[3] == 'yes'
+        dimension = int(tokens[4])
+        stride = dimension + (1 if rational else 0)
+        num_knots = int(tokens[5])
+        knots = [float(x) for x in tokens[6:6+num_knots]]
+        num_cvs = int(tokens[6+num_knots])
+        values = [float(x) for x in tokens[7+num_knots:]]
+        cvs = []
+        for i in range(0, num_cvs*stride, stride):
+            cv = values[i:i+dimension] + [0.0] * (3 - dimension)
+            if rational:
+                cv.append(values[i+dimension])
+            cvs.append(cv)
+        results.append(
+            {
+                'name': name.group(1) if name else 'Shape',
+                'degree': degree, 'form': form, 'rational': rational,
+                'knots': knots, 'cvs': cvs,
+                'overrideColor': int(color.group(1)) if color else None,
+            }
+        )
+    return results
+
+
+def compileCurveData(writeFile=True):
+    r"""
+        melsディレクトリ内の全melファイルを解析したデータテーブルを作成する。
+        writeFileがTrueの場合はCurveDataFileに書き出す。
+        melファイルを追加、編集した場合はこの関数を実行して
+        データテーブルを更新する。
+        
+        Args:
+            writeFile (bool):
+            
+        Returns:
+            dict:
+    """
+    global __CURVE_DATA__
+    updateCurveTypeList()
+    data = {x: parseCurveMel(y) for x, y in CurveTypeList.items()}
+    if writeFile:
+        with open(CurveDataFile, 'w') as f:
+            json.dump(data, f, sort_keys=True, separators=(',', ':'))
+    __CURVE_DATA__ = data
+    return data
+
+
+def curveData(curveType):
+    r"""
+        任意のタイプのカーブ形状のデータを返す。
+        データはCurveDataFileから読み込まれ、テーブルにないタイプの場合は
+        melファイルを解析して追加する。
+        
+        Args:
+            curveType (str):
+            
+        Returns:
+            list:シェイプ毎のデータを持つ辞書のリスト
+    """
+    global __CURVE_DATA__
+    if __CURVE_DATA__ is None:
+        __CURVE_DATA__ = {}
+        if os.path.exists(CurveDataFile):
+            with open(CurveDataFile, 'r') as f:
+                __CURVE_DATA__ = json.load(f)
+    data = __CURVE_DATA__.get(curveType)
+    if data is None:
+        if not curveType in CurveTypeList:
+            raise ValueError(
+                'The sepcified type is invalid : {}'.format(curveType)
+            )
+        data = parseCurveMel(CurveTypeList[curveType])
+        __CURVE_DATA__[curveType] = data
+    return data
+
 if Maya_Version < 2016:
     def setColorIndex(shape, colorIndex):
         r"""
@@ -194,6 +309,199 @@ def applyWireColor(color, curves=None):
         curve(CurveColorAttr, color)
 
 
+def _toMObject(name):
+    r"""
+        ノード名からAPI2.0のMObjectを返す。
+        
+        Args:
+            name (str):
+            
+        Returns:
+            OpenMaya2.MObject:
+    """
+    sel = OpenMaya2.MSelectionList()
+    sel.add(name)
+    return sel.getDependNode(0)
+
+
+def _primitiveMatrix(spec, rotatePivot, scalePivot):
+    r"""
+        specの回転、スケール、移動をCVに適用する行列を返す。
+        適用順はPrimitiveCreatorと同じく回転、スケール、移動の順で、
+        回転はrotatePivot、スケールはscalePivotを中心に行う。
+        
+        Args:
+            spec (dict):
+            rotatePivot (list):
+            scalePivot (list):
+            
+        Returns:
+            OpenMaya2.MMatrix:
+    """
+    def translation(x, y, z):
+        return OpenMaya2.MMatrix(
+            [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, x, y, z, 1]
+        )
+    matrix = OpenMaya2.MMatrix()
+    rotation = spec.get('rotation')
+    if rotation:
+        rp = rotatePivot
+        matrix *= translation(-rp[0], -rp[1], -rp[2])
+        matrix *= OpenMaya2.MEulerRotation(
+            [OpenMaya2.MAngle(x, OpenMaya2.MAngle.kDegrees).asRadians()
+            for x in rotation]
+        ).asMatrix()
+        matrix *= translation(*rp)
+    scale = spec.get('scale')
+    if scale:
+        sp = scalePivot
+        matrix *= translation(-sp[0], -sp[1], -sp[2])
+        matrix *= OpenMaya2.MMatrix(
+            [scale[0], 0, 0, 0, 0, scale[1], 0, 0, 0, 0, scale[2], 0,
+            0, 0, 0, 1]
+        )
+        matrix *= translation(*sp)
+    values = spec.get('translation')
+    if values:
+        matrix *= translation(*values)
+    return matrix
+
+
+def createPrimitives(specs):
+    r"""
+        specsに従い、複数のカーブを一括で作成する。
+        カーブの形状はcurveDataのデータテーブルから作成され、シェイプの作成、
+        形状、色、ライン幅の設定はMDagModifier、MDGModifierを用いて
+        まとめて行われ、1つのアンドゥとして登録される。
+        specsの各要素は以下のキーを持つ辞書。curveType以外は省略できる。
+            curveType (str):作成するカーブのタイプ
+            parentNode (str):カーブを作成する親ノードの名前
+            keywords (dict):parentNodeがない場合に渡すcreateNode用の引き数
+            rotation (list):CVの回転量
+            scale (list):CVのスケール
+            translation (list):CVの移動量
+            colorIndex (int or list):インデックスカラーの番号、またはr,g,b
+            lineWidth (float):ラインの幅
+            
+        Args:
+            specs (list):
+            
+        Returns:
+            list:Primitiveのリスト
+    """
+    specs = list(specs)
+    data_list = [curveData(x['curveType']) for x in specs]
+    transforms = []
+    for spec in specs:
+        parent = spec.get('parentNode')
+        if not parent:
+            parent = cmds.createNode(
+                'transform', **(spec.get('keywords') or {})
+            )
+        transforms.append(str(parent))
+    pivots = node.getAttrs(transforms, ['rotatePivot', 'scalePivot'])
+
+    # シェイプの作成。=========================================================
+    dag_mod = OpenMaya2.MDagModifier()
+    shape_list = []
+    for trs, data in zip(transforms, data_list):
+        trs_obj = _toMObject(trs)
+        shortname = trs.split('|')[-1]
+        shapes = []
+        for d in data:
+            shape = dag_mod.createNode('nurbsCurve', trs_obj)
+            dag_mod.renameNode(shape, shortname + d['name'])
+            shapes.append(shape)
+        shape_list.append(shapes)
+    dag_mod.doIt()
+    # =========================================================================
+
+    # 形状、色、アトリビュートの設定。=========================================
+    dg_mod = OpenMaya2.MDGModifier()
+    width_list = []
+    for spec, data, shapes, pivot in zip(
+        specs, data_list, shape_list, pivots
+    ):
+        matrix = _primitiveMatrix(spec, pivot[0], pivot[1])
+        color = spec.get('colorIndex')
+        width = spec.get('lineWidth')
+        for d, shape in zip(data, shapes):
+            fn = OpenMaya2.MFnDependencyNode(shape)
+            rational = d.get('rational', False)
+            points = OpenMaya2.MPointArray()
+            for cv in d['cvs']:
+                point = OpenMaya2.MPoint(cv[:3]) * matrix
+                if rational:
+                    point.w = cv[3]
+                points.append(point)
+            curve_data = OpenMaya2.MFnNurbsCurveData().create()
+            # melのフォーム(0:open, 1:closed, 2:periodic)はAPIの値より1小さい。
+            OpenMaya2.MFnNurbsCurve().create(
+                points, d['knots'], d['degree'], d['form'] + 1, False,
+                rational, curve_data
+            )
+            dg_mod.newPlugValue(fn.findPlug('cached', False), curve_data)
+            dg_mod.newPlugValueBool(
+                fn.findPlug('isHistoricallyInteresting', False), False
+            )
+            fn.findPlug('visibility', False).isKeyable = False
+            if d['overrideColor'] is not None:
+                dg_mod.newPlugValueInt(
+                    fn.findPlug('overrideColor', False), d['overrideColor']
+                )
+            if color is not None:
+                if Maya_Version < 2016:
+                    dg_mod.newPlugValueBool(
+                        fn.findPlug('overrideEnabled', False), True
+                    )
+                    dg_mod.newPlugValueInt(
+                        fn.findPlug('overrideColor', False), color
+                    )
+                else:
+                    dg_mod.newPlugValueInt(
+                        fn.findPlug('useObjectColor', False), 2
+                    )
+                    rgb = (
+                        color if isinstance(color, (list, tuple))
+                        else colorUtil.NewColorIndex[color]
+                    )
+                    plug = fn.findPlug('wireColorRGB', False)
+                    for i, v in enumerate(rgb):
+                        dg_mod.newPlugValueFloat(plug.child(i), v)
+            if width is None or not fn.hasAttribute('lineWidth'):
+                continue
+            attr = OpenMaya2.MFnNumericAttribute().create(
+                CurveWidthAttr, CurveWidthAttr,
+                OpenMaya2.MFnNumericData.kFloat, -1
+            )
+            OpenMaya2.MFnNumericAttribute(attr).keyable = False
+            dg_mod.addAttribute(shape, attr)
+            width_list.append((fn, width))
+    dg_mod.doIt()
+    # =========================================================================
+
+    # ライン幅の設定と接続。===================================================
+    width_mod = OpenMaya2.MDGModifier()
+    for fn, width in width_list:
+        plug = fn.findPlug(CurveWidthAttr, False)
+        width_mod.newPlugValueFloat(plug, width)
+        width_mod.connect(plug, fn.findPlug('lineWidth', False))
+    width_mod.doIt()
+    # =========================================================================
+
+    def undo():
+        for mod in (width_mod, dg_mod, dag_mod):
+            mod.undoIt()
+
+    def redo():
+        for mod in (dag_mod, dg_mod, width_mod):
+            mod.doIt()
+
+    from ... import apiUndo
+    apiUndo.commit(undo, redo)
+    return [Primitive(x) for x in transforms]
+
+
 def createCurvePrimitive(curveType, parentNode=None, **keywords):
     r"""
         引き数parentNodeの下に任意の形状のカーブを作成する。
@@ -207,30 +515,16 @@ def createCurvePrimitive(curveType, parentNode=None, **keywords):
         Returns:
             Primitive:
     """
-    if not curveType in CurveTypeList:
-        raise ValueError(
-            'The sepcified type is invalid : {}'.format(curveType)
-        )
-    script_path = CurveTypeList[curveType]
-    if not parentNode:
-        flag = ''
-        for key in keywords:
-            flag += ' -%s "%s"' % (key, keywords[key])
-        script_lines = [
-            '{\nstring $trs = `createNode "transform" %s`;\n' % flag
+    result = createPrimitives(
+        [
+            {
+                'curveType': curveType, 'parentNode': parentNode,
+                'keywords': keywords,
+            }
         ]
-    else:
-        script_lines = ['{\nstring $trs = "%s";\n' % parentNode]
-    creation_cmds = __CURVE_SHAPE_BUFFER__.get(curveType)
-    if not creation_cmds:
-        with open(script_path, 'r') as f:
-            creation_cmds = f.readlines()
-        __CURVE_SHAPE_BUFFER__[curveType] = creation_cmds
-    script_lines.extend(creation_cmds)
-    script_lines.append('select -r $trs;\n}')
-    result = mel.eval(''.join(script_lines))
-    node = cmds.ls(sl=True)[0]
-    return Primitive(node)
+    )[0]
+    cmds.select(result.name(), r=True)
+    return result
 
 
 def mirrorCurve(curveList=None, axis='x', world=True, fixCrvAppearance=True):
@@ -501,12 +795,10 @@ class PrimitiveCreator(object):
         """
         return self.__line_width
 
-    def create(self, curveType=None, parentNode=None, **keywords):
+    def primitiveSpec(self, curveType=None, parentNode=None, **keywords):
         r"""
-            設定されている条件に従ってカーブを作成する。
-            各種引き数を指定すると、指定されている条件を上書きして作成する。
-            また引き数keywordsはparentNodeがNoneの場合に渡す、
-            createNodeへの引き数。
+            設定されている条件から、createPrimitivesに渡すカーブ作成用の
+            辞書を作成して返す。
             
             Args:
                 curveType (str):
@@ -514,40 +806,63 @@ class PrimitiveCreator(object):
                 **keywords (any):
                 
             Returns:
-                Primitive:
+                dict:
         """
         if (
-            self.affectFromNodeSize() and
+            self.affectFromNodeSize() and parentNode and
             cmds.attributeQuery('radius', ex=True, n=parentNode)
         ):
             self.__setSizeRatio(cmds.getAttr(parentNode+'.radius'))
         else:
             self.__setSizeRatio()
-            
-        if not curveType:
-            curveType = self.curveType()
-
-        shape = createCurvePrimitive(curveType, parentNode, **keywords)
-        for s in shape.shapes():
-            cmds.setAttr('%s.ihi' % s, 0)
-
-        for attr, function in zip(
-                [shape.setRotate, shape.setScale, shape.setTranslate],
-                [self.rotation, self.sizes, self.translation]
-            ):
-            values = function()
-            if not values:
-                continue
-            attr(values[0], values[1], values[2])
-
-        if self.colorIndex():
-            shape.setColorIndex(self.colorIndex())
-        addCurveWidthCtrlAttr(shape.shapes())
-        shape.setLineWidth(self.lineWidth())
-
+        spec = {
+            'curveType': curveType or self.curveType(),
+            'parentNode': parentNode, 'keywords': keywords,
+            'rotation': self.rotation(), 'scale': self.sizes(),
+            'translation': self.translation(),
+            'colorIndex': self.colorIndex() or None,
+            'lineWidth': self.lineWidth(),
+        }
         self.__setSizeRatio()
+        return spec
+
+    def create(self, curveType=None, parentNode=None, **keywords):
+        r"""
+            設定されている条件に従ってカーブを作成する。
+            各種引き数を指定すると、指定されている条件を上書きして作成する。
+            また引き数keywordsはparentNodeがNoneの場合に渡す、
+            createNodeへの引き数。
+            
+            Args:
+                curveType (str):
+                parentNode (str):親ノード
+                **keywords (any):
+                
+            Returns:
+                Primitive:
+        """
+        shape = createPrimitives(
+            [self.primitiveSpec(curveType, parentNode, **keywords)]
+        )[0]
+        cmds.select(shape.name(), r=True)
         return shape
 
+    def createMany(self, parentNodes, curveType=None):
+        r"""
+            設定されている条件に従って、parentNodesの各ノードの下に
+            カーブを一括で作成する。
+            
+            Args:
+                parentNodes (list):親ノードのリスト
+                curveType (str):
+                
+            Returns:
+                list:Primitiveのリスト
+        """
+        return createPrimitives(
+            [self.primitiveSpec(curveType, x) for x in parentNodes]
+        )
+
     def replace(self, targets=None, curveType=None):
         r"""
             targetsのカーブの形状をcurveTypeに置き換える
@@ -16,10 +16,16 @@ import json
 from .. import node, grisNode
 
 cmds = node.cmds
-Version = '1.0.1'
+Version = '1.1.0'
 GroupPrefix = '__grsFacialMemoryGrp__'
 TagAttr = '__grsFacialName__'
 VersionAttr = 'grsFacialMemoryVersion'
+# 表情データを配列で保持する場合のアトリビュート。
+TargetNamesAttr = 'grsFacialTargetNames'
+ExpressionNamesAttr = 'grsFacialExpressionNames'
+ValueTableAttr = 'grsFacialValueTable'
+# TableScopeの範囲内で共有される、マネージャ毎の表情データのキャッシュ。
+_TableCache = {}
 
 
 def listBlendShapeValues(blendShapeName, removeZeroValue=True):
@@ -39,9 +45,11 @@ def listBlendShapeValues(blendShapeName, removeZeroValue=True):
             OrderedDict:
     """
     bs = node.asObject(blendShapeName)
+    attrs = bs.listAttrNames() or []
     datalist = OrderedDict()
-    for attr in bs.listAttrNames():
-        value = bs(attr)
+    if not attrs:
+        return datalist
+    for attr, value in zip(attrs, node.getAttrs([bs], attrs)[0]):
         if removeZeroValue and value == 0:
             continue
         datalist[attr] = value
@@ -79,6 +87,290 @@ class BlendShapeData(dict):
         return self.__status
 
 
+class ExpressionTable(object):
+    r"""
+        表情×ブレンドシェイプのターゲットの値を１つの2次元配列で保持する
+        クラス。
+        行は表情名、列はターゲット(blendShapeのアトリビュート名)に対応し、
+        値が登録されていない表情は行を持たない。
+    """
+    def __init__(self, expressions=None, targets=None, values=None):
+        r"""
+            Args:
+                expressions (list):行に対応する表情名のリスト
+                targets (list):列に対応するターゲット名のリスト
+                values (list):(表情数×ターゲット数)の値、またはその1次元配列
+        """
+        import numpy
+        self.__expressions = list(expressions or [])
+        self.__targets = list(targets or [])
+        shape = (len(self.__expressions), len(self.__targets))
+        if values is None or not len(values):
+            self.__values = numpy.zeros(shape, dtype=numpy.float64)
+        else:
+            self.__values = numpy.array(
+                values, dtype=numpy.float64
+            ).reshape(shape)
+        self.__update()
+
+    def __update(self):
+        r"""
+            表情名、ターゲット名のインデックスを更新する。
+        """
+        self.__exp_index = {x: i for i, x in enumerate(self.__expressions)}
+        self.__tgt_index = {x: i for i, x in enumerate(self.__targets)}
+
+    def expressions(self):
+        r"""
+            行に対応する表情名のリストを返す。
+            
+            Returns:
+                list:
+        """
+        return self.__expressions[:]
+
+    def targets(self):
+        r"""
+            列に対応するターゲット名のリストを返す。
+            
+            Returns:
+                list:
+        """
+        return self.__targets[:]
+
+    def values(self):
+        r"""
+            (表情数×ターゲット数)の値の配列を返す。
+            
+            Returns:
+                numpy.ndarray:
+        """
+        return self.__values
+
+    def hasExpression(self, expression):
+        r"""
+            表情の値が登録されているかどうかを返す。
+            
+            Args:
+                expression (str):
+                
+            Returns:
+                bool:
+        """
+        return expression in self.__exp_index
+
+    def addTargets(self, targets):
+        r"""
+            未登録のターゲットを列として追加する。
+            
+            Args:
+                targets (list):
+        """
+        import numpy
+        new_targets = [x for x in targets if not x in self.__tgt_index]
+        if not new_targets:
+            return
+        self.__targets.extend(new_targets)
+        self.__values = numpy.hstack(
+            [
+                self.__values,
+                numpy.zeros(
+                    (len(self.__expressions), len(new_targets)),
+                    dtype=numpy.float64
+                )
+            ]
+        )
+        self.__update()
+
+    def row(self, expression, targets=None):
+        r"""
+            表情の値の配列を返す。
+            targetsを指定した場合はその並びの配列を返し、未登録の
+            ターゲットの値は0となる。
+            表情の値が登録されていない場合はNoneを返す。
+            
+            Args:
+                expression (str):
+                targets (list):
+                
+            Returns:
+                numpy.ndarray:
+        """
+        index = self.__exp_index.get(expression)
+        if index is None:
+            return None
+        if targets is None:
+            return self.__values[index].copy()
+        return self.matrix([expression], targets)[0]
+
+    def matrix(self, expressions, targets):
+        r"""
+            expressionsとtargetsの並びに並べ替えた値の2次元配列を返す。
+            未登録の表情、ターゲットの値は0となる。
+            
+            Args:
+                expressions (list):
+                targets (list):
+                
+            Returns:
+                numpy.ndarray:
+        """
+        import numpy
+        result = numpy.zeros(
+            (len(expressions), len(targets)), dtype=numpy.float64
+        )
+        rows = [
+            (i, self.__exp_index[x]) for i, x in enumerate(expressions)
+            if x in self.__exp_index
+        ]
+        columns = [
+            (i, self.__tgt_index[x]) for i, x in enumerate(targets)
+            if x in self.__tgt_index
+        ]
+        if not rows or not columns:
+            return result
+        dst_r, src_r = zip(*rows)
+        dst_c, src_c = zip(*columns)
+        result[numpy.ix_(dst_r, dst_c)] = self.__values[
+            numpy.ix_(src_r, src_c)
+        ]
+        return result
+
+    def data(self, expression):
+        r"""
+            表情を構成するターゲット名と値の辞書を返す。
+            値が0のターゲットは含まれない。
+            表情の値が登録されていない場合はNoneを返す。
+            
+            Args:
+                expression (str):
+                
+            Returns:
+                OrderedDict:
+        """
+        row = self.row(expression)
+        if row is None:
+            return None
+        return OrderedDict(
+            [(self.__targets[i], float(row[i])) for i in row.nonzero()[0]]
+        )
+
+    def setRow(self, expression, values, targets=None):
+        r"""
+            表情の値を設定する。
+            valuesがNoneの場合は表情の行を削除する。
+            targetsを指定した場合、valuesはtargetsの並びの値の配列となり、
+            指定しない場合はターゲット名と値の辞書となる。
+            
+            Args:
+                expression (str):
+                values (dict or list):
+                targets (list):
+        """
+        import numpy
+        if values is None:
+            self.removeRows([expression])
+            return
+        if targets is None:
+            targets = list(values.keys())
+            values = [values[x] for x in targets]
+        self.addTargets(targets)
+        index = self.__exp_index.get(expression)
+        if index is None:
+            index = len(self.__expressions)
+            self.__expressions.append(expression)
+            self.__values = numpy.vstack(
+                [
+                    self.__values,
+                    numpy.zeros((1, len(self.__targets)), numpy.float64)
+                ]
+            )
+            self.__update()
+        self.__values[index] = 0
+        self.__values[index, [self.__tgt_index[x] for x in targets]] = values
+
+    def removeRows(self, expressions):
+        r"""
+            表情の行を削除する。
+            
+            Args:
+                expressions (list):
+        """
+        import numpy
+        indices = [
+            self.__exp_index[x] for x in expressions if x in self.__exp_index
+        ]
+        if not indices:
+            return
+        self.__values = numpy.delete(self.__values, indices, axis=0)
+        indices = set(indices)
+        self.__expressions = [
+            x for i, x in enumerate(self.__expressions) if not i in indices
+        ]
+        self.__update()
+
+    def renameRows(self, nameMap):
+        r"""
+            表情名を一括でリネームする。
+            nameMapは旧表情名をキー、新表情名を値とする辞書で、リネーム先と
+            同名の表情がリネームされない場合、その行は削除される。
+            
+            Args:
+                nameMap (dict):
+        """
+        self.removeRows(
+            [x for x in nameMap.values() if not x in nameMap]
+        )
+        renamed = [nameMap.get(x, x) for x in self.__expressions]
+        if len(set(renamed)) != len(renamed):
+            raise ValueError('The renamed expressions are duplicated.')
+        self.__expressions = renamed
+        self.__update()
+
+
+class TableScope(object):
+    r"""
+        with文の中で、マネージャが配列形式で保持する表情データの読み込みを
+        最初の１度にまとめ、書き込みをwith文を抜ける際の１度にまとめる
+        コンテキスト制御クラス。
+        表情データノード毎のvalues、setValuesを繰り返し呼ぶ場合に使用する。
+    """
+    def __init__(self, manager):
+        r"""
+            Args:
+                manager (FacialMemoryManagerRoot):
+        """
+        self.__manager = manager
+        self.__key = None
+
+    def __enter__(self):
+        self.__key = self.__manager()
+        cache = _TableCache.setdefault(
+            self.__key, {'table': None, 'dirty': False, 'depth': 0}
+        )
+        cache['depth'] += 1
+        return self.__manager
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        r"""
+            Args:
+                exc_type (any):
+                exc_value (any):
+                traceback (any):
+                
+            Returns:
+                bool:
+        """
+        cache = _TableCache[self.__key]
+        cache['depth'] -= 1
+        if cache['depth'] > 0:
+            return False
+        del _TableCache[self.__key]
+        if cache['dirty']:
+            self.__manager.writeTable(cache['table'])
+        return False
+
+
 class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
     r"""
         セットアップデータを格納するgroupに関するクラス
@@ -99,6 +391,20 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
             {'ln':'grsFacialBlendShapeTag', 'dt':'string'}, {'l':True}, None
         )
     ]
+    # 表情データを配列で保持するためのアトリビュート。
+    # バージョン1.1.0以降で作成されたノード、またはconvertToCompactで変換
+    # されたノードが持つ。
+    ExtraAttrs = [
+        (
+            {'ln':TargetNamesAttr, 'dt':'string'}, {'l':True},
+            ['[]', {'type':'string'}]
+        ),
+        (
+            {'ln':ExpressionNamesAttr, 'dt':'string'}, {'l':True},
+            ['[]', {'type':'string'}]
+        ),
+        ({'ln':ValueTableAttr, 'dt':'doubleArray'}, {'l':True}, None),
+    ]
     def __init__(self, nodeName):
         r"""
             Args:
@@ -135,6 +441,106 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
         """
         return node.asObject(self.blendShapeName())
 
+    def isCompact(self):
+        r"""
+            表情データを配列形式で保持しているかどうかを返す。
+            
+            Returns:
+                bool:
+        """
+        return self.hasAttr(ValueTableAttr)
+
+    def tableScope(self):
+        r"""
+            表情データの読み込みと書き込みを１度にまとめるTableScopeを返す。
+            
+            Returns:
+                TableScope:
+        """
+        return TableScope(self)
+
+    def readTable(self):
+        r"""
+            配列形式で保持されている表情データを返す。
+            TableScopeの範囲内では最初に読み込んだデータを返す。
+            
+            Returns:
+                ExpressionTable:
+        """
+        cache = _TableCache.get(self())
+        if cache is not None and cache['table'] is not None:
+            return cache['table']
+        if not self.isCompact():
+            raise RuntimeError(
+                'The manager "{}" does not store the expressions as an '
+                'array.'.format(self())
+            )
+        table = ExpressionTable(
+            json.loads(self(ExpressionNamesAttr) or '[]'),
+            json.loads(self(TargetNamesAttr) or '[]'),
+            self(ValueTableAttr)
+        )
+        if cache is not None:
+            cache['table'] = table
+        return table
+
+    def writeTable(self, table):
+        r"""
+            表情データを配列形式で書き込む。
+            TableScopeの範囲内ではwith文を抜ける際にまとめて書き込む。
+            
+            Args:
+                table (ExpressionTable):
+        """
+        self.__data_cache = None
+        cache = _TableCache.get(self())
+        if cache is not None:
+            cache['table'] = table
+            cache['dirty'] = True
+            return
+        for attr, value, data_type in (
+            (TargetNamesAttr, json.dumps(table.targets()), 'string'),
+            (ExpressionNamesAttr, json.dumps(table.expressions()), 'string'),
+            (ValueTableAttr, table.values().ravel().tolist(), 'doubleArray'),
+        ):
+            with self.attr(attr) as plug:
+                plug.set(value, type=data_type)
+
+    def convertToCompact(self):
+        r"""
+            表情データノード毎にJSON文字列で保持されている表情データを、
+            このノードの配列形式のデータに変換する。
+        """
+        if self.isCompact():
+            return
+        datanodes = self.listExpressions()
+        table = ExpressionTable()
+        for exp, data in datanodes.items():
+            values = data.values()
+            if not data.hasAttr(DataTransform.StatusAttr):
+                # バージョン1.0.0のデータはステータスを持たないため、
+                # update_data_v1_0_1と同様に追加する。
+                plug = data.addIntAttr(
+                    DataTransform.StatusAttr, default=0, min=None, max=None,
+                    k=False
+                )
+                plug.set(1 if values else 0)
+                plug.setLock(True)
+            table.setRow(exp, values)
+
+        for flags, state, value in self.ExtraAttrs:
+            attrname = flags['ln']
+            cmds.addAttr(self(), **flags)
+            if value is not None:
+                self(attrname, value[0], **value[1])
+            cmds.setAttr(self() + '.' + attrname, **state)
+        self.writeTable(table)
+        for data in datanodes.values():
+            with data.attr('grsExpressionValues') as attr:
+                attr.set('', type='string')
+        with self.attr(VersionAttr) as attr:
+            attr.set(Version, type='string')
+
     @staticmethod
     def listDataNodes(targetNodes=None):
         r"""
@@ -161,8 +567,10 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
         """
         datalist = self.listDataNodes(self.children(type='transform'))
         result = OrderedDict()
-        for x in datalist:
-            result[x.expression()] = x
+        if not datalist:
+            return result
+        for x, tag in zip(datalist, node.getAttrs(datalist, [TagAttr])):
+            result[tag[0]] = x
         return result
 
     def listExpressionData(self, useCache=False):
@@ -181,8 +589,21 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
             return self.__data_cache
         expressions = self.listExpressions()
         datalist = OrderedDict()
-        for exp, data in expressions.items():
-            datalist[exp] = data.data()
+        if expressions and self.isCompact():
+            # 配列形式の場合は値とステータスを一括で取得する。
+            table = self.readTable()
+            statuses = node.getAttrs(
+                list(expressions.values()), [DataTransform.StatusAttr]
+            )
+            for exp, status in zip(expressions, statuses):
+                values = table.data(exp)
+                if values is not None:
+                    values = BlendShapeData(values)
+                    values.setStatus(status[0])
+                datalist[exp] = values
+        else:
+            for exp, data in expressions.items():
+                datalist[exp] = data.data()
         if useCache:
             self.__data_cache = datalist
         else:
@@ -204,12 +625,120 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
         expressions = self.listExpressions()
         if expressionName in expressions:
             return expressions[expressionName]
+        exp = self.__createDataNode(expressionName)
+        if self.isCompact():
+            # 削除された同名の表情の値が残っている場合は破棄する。
+            table = self.readTable()
+            if table.hasExpression(expressionName):
+                table.removeRows([expressionName])
+                self.writeTable(table)
+        return exp
+
+    def __createDataNode(self, expressionName):
+        r"""
+            表情データノードを作成する。
+            
+            Args:
+                expressionName (str):
+                
+            Returns:
+                DataTransform:
+        """
         exp = grisNode.createNode(
             DataTransform, n='facialExpression#', p=self()
         )
-        exp.setExpression(expressionName)
+        exp.setExpression(expressionName, False)
         return exp
 
+    def setExpressionValues(self, datalist, status=None):
+        r"""
+            複数の表情の値を一括で設定する。
+            datalistは
+            　キー：表情名
+            　値：表情に対応するblendShapeのアトリビュート名と値の辞書
+            を持ち、表情データが存在しない場合は作成する。
+            配列形式の場合、表情データの読み込みと書き込みはそれぞれ１度のみ
+            行われ、表情データノードが存在しない表情の値は破棄される。
+            戻り値はdatalistの並びの表情データのリスト。
+            
+            Args:
+                datalist (dict):
+                status (int):登録状態を指定する
+                
+            Returns:
+                list:
+        """
+        expressions = self.listExpressions()
+        for exp in datalist:
+            if not exp in expressions:
+                expressions[exp] = self.__createDataNode(exp)
+        if self.isCompact():
+            table = self.readTable()
+            table.removeRows(
+                [x for x in table.expressions() if not x in expressions]
+            )
+            for exp, values in datalist.items():
+                table.setRow(exp, values)
+            self.writeTable(table)
+        else:
+            for exp, values in datalist.items():
+                expressions[exp].setValues(values)
+        result = [expressions[x] for x in datalist]
+        if status is not None and result:
+            node.setAttrs(
+                result, [DataTransform.StatusAttr],
+                [[status] for x in result], force=True
+            )
+        return result
+
+    def renameExpressionValues(self, nameMap):
+        r"""
+            配列形式で保持されている表情の値の表情名を一括でリネームする。
+            nameMapは旧表情名をキー、新表情名を値とする辞書。
+            
+            Args:
+                nameMap (dict):
+        """
+        table = self.readTable()
+        table.renameRows(nameMap)
+        self.writeTable(table)
+
+    def expressionMatrix(self, expressions, targets):
+        r"""
+            expressionsの表情の値を、targetsの並びの2次元配列で返す。
+            戻り値は(表情数×ターゲット数)の値の配列と、値が登録されているか
+            どうかを表すboolの配列のtuple。
+            
+            Args:
+                expressions (list):表情名のリスト
+                targets (list):blendShapeのアトリビュート名のリスト
+                
+            Returns:
+                tuple:(numpy.ndarray, numpy.ndarray)
+        """
+        import numpy
+        datanodes = self.listExpressions()
+        registered = numpy.zeros(len(expressions), dtype=bool)
+        if self.isCompact():
+            table = self.readTable()
+            for i, exp in enumerate(expressions):
+                registered[i] = exp in datanodes and table.hasExpression(exp)
+            return table.matrix(expressions, targets), registered
+
+        matrix = numpy.zeros(
+            (len(expressions), len(targets)), dtype=numpy.float64
+        )
+        index = {x: i for i, x in enumerate(targets)}
+        for i, exp in enumerate(expressions):
+            values = datanodes[exp].values() if exp in datanodes else None
+            if values is None:
+                continue
+            registered[i] = True
+            for attr, value in values.items():
+                if attr in index:
+                    matrix[i, index[attr]] = value
+        return matrix, registered
+
     def setExpressionFromCurrentState(self, expression, status=1):
         r"""
             現在のblendShapeのアトリビュート値を用いて、引数expressionで
@@ -223,9 +752,7 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
         if not bs_name:
             raise RuntimeError('No blend shape node specified.')
         values = listBlendShapeValues(bs_name)
-        exp = self.addExpression(expression)
-        exp.setValues(values)
-        exp.setStatus(status)
+        self.setExpressionValues({expression: values}, status)
 
     def clearExpressions(self):
         r"""
@@ -234,6 +761,8 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
         datanodes = self.listExpressions().values()
         if datanodes:
             cmds.delete(list(datanodes))
+        if self.isCompact():
+            self.writeTable(ExpressionTable())
 
     def removeExpression(self, expression):
         r"""
@@ -246,6 +775,11 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
         removed = datanodes.get(expression)
         if removed:
             cmds.delete(removed)
+        if self.isCompact():
+            table = self.readTable()
+            if table.hasExpression(expression):
+                table.removeRows([expression])
+                self.writeTable(table)
 
     def setExpressionFromDataList(self, datalist, status=1):
         r"""
@@ -259,10 +793,7 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
                 datalist (dict):
                 status (int):登録状態を指定する
         """
-        for exp, data in datalist.items():
-            exp = self.addExpression(exp)
-            exp.setValues(data)
-            exp.setStatus(status)
+        self.setExpressionValues(datalist, status)
 
     def updateExpressionFromDataList(self, expressionlist, status=1):
         r"""
@@ -319,13 +850,16 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
                 'does not match the number of existing expression data.'
             )
 
-        cnt = 0
+        name_map = {}
         for n_exp, o_exp_data in zip(expressionlist, datalist.items()):
             if n_exp == o_exp_data[0]:
                 continue
-            o_exp_data[1].setExpression(n_exp)
-            cnt = 1
-        return cnt
+            o_exp_data[1].setExpression(n_exp, False)
+            name_map[o_exp_data[0]] = n_exp
+        if name_map and self.isCompact():
+            # 入れ替えを含むリネームに対応するため、値は一括でリネームする。
+            self.renameExpressionValues(name_map)
+        return 1 if name_map else 0
 
     def overrideExpressions(self, expressions, datalist, status=1):
         r"""
@@ -358,12 +892,13 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
                 )
             )
         # 上書き処理を実行。
+        current = self.listExpressionData()
+        new_data = OrderedDict()
         for exp_name in expressions:
-            exp = self.addExpression(exp_name)
-            values = exp.values()
+            values = dict(current.get(exp_name) or {})
             values.update(datalist)
-            exp.setValues(values)
-            exp.setStatus(status)
+            new_data[exp_name] = values
+        self.setExpressionValues(new_data, status)
 
     def applyExpression(self, expression):
         r"""
@@ -372,17 +907,80 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
             Args:
                 expression (str):表情名
         """
+        self.applyExpressions([expression])
+
+    def applyExpressions(self, expressions, weights=None):
+        r"""
+            引数expressionsで指定した複数の表情パラメータにweightsの重みを
+            かけて合成し、blendShapeに一括で適用する。
+            weightsを省略した場合、重みは全て1となる。
+            値が登録されていない表情は無視される。
+            
+            Args:
+                expressions (list):表情名のリスト
+                weights (list):表情毎の重みのリスト
+        """
+        import numpy
         bs = self.blendShape()
         if not bs:
             return
-        values = self.listExpressionData().get(expression)
-        for attr in bs.listAttrNames():
-            v = 0
-            if values is None:
-                continue
-            if attr in values:
-                v = values[attr]
-            bs(attr, v)
+        targets = bs.listAttrNames() or []
+        if not targets or not expressions:
+            return
+        if weights is None:
+            weights = [1.0] * len(expressions)
+        if len(weights) != len(expressions):
+            raise ValueError(
+                'The number of weights does not match the number of '
+                'expressions.'
+            )
+        matrix, registered = self.expressionMatrix(expressions, targets)
+        if not registered.any():
+            return
+        weights = numpy.array(weights, dtype=numpy.float64)[registered]
+        values = weights.dot(matrix[registered])
+        node.setAttrs([bs], targets, [values.tolist()])
+
+    def blendExpressions(
+        self, startExpression, endExpression, inbetweens, status=2
+    ):
+        r"""
+            表情startExpressionとendExpressionの中間値を、inbetweensの
+            表情に一括で設定する。
+            inbetweensの数に応じて分割度合いは変更される。
+            
+            Args:
+                startExpression (str):開始基準となる表情名
+                endExpression (str):終了基準となる表情名
+                inbetweens (list):中間補完される表情名のリスト
+                status (int):更新後のデータのステータス
+        """
+        import numpy
+        if not inbetweens:
+            return
+        datalist = self.listExpressionData()
+        st_values = datalist.get(startExpression) or {}
+        ed_values = datalist.get(endExpression) or {}
+        targets = list(OrderedDict.fromkeys(list(st_values) + list(ed_values)))
+        st_v = numpy.array(
+            [st_values.get(x, 0.0) for x in targets], dtype=numpy.float64
+        )
+        ed_v = numpy.array(
+            [ed_values.get(x, 0.0) for x in targets], dtype=numpy.float64
+        )
+        ratios = (
+            numpy.arange(1, len(inbetweens) + 1) / (len(inbetweens) + 1.0)
+        )
+        values = st_v + numpy.outer(ratios, ed_v - st_v)
+        self.setExpressionValues(
+            OrderedDict(
+                [
+                    (exp, OrderedDict(zip(targets, row.tolist())))
+                    for exp, row in zip(inbetweens, values)
+                ]
+            ),
+            status
+        )
 
     def setKeyframeOfAllExpressions(self, startFrame=0, isSettingRange=True):
         def setkey(bs, attrs, val, f):
@@ -432,15 +1030,12 @@ class FacialMemoryManagerRoot(grisNode.AbstractTopGroup):
                 list: 更新された表情名のリスト
         """
         orig_datalist = self.listExpressions()
-        result = []
-        for expression, data in datalist.items():
-            exp: DataTransform = orig_datalist.get(expression)
-            if not exp:
-                continue
-            exp.setValues(data)
-            exp.setStatus(status)
-            result.append(exp)
-        return result
+        updated = OrderedDict(
+            [(x, y) for x, y in datalist.items() if x in orig_datalist]
+        )
+        if not updated:
+            return []
+        return self.setExpressionValues(updated, status)
 
     def addDataList(self, datalist, status=2):
         r"""
@@ -485,15 +1080,52 @@ class DataTransform(node.Transform, grisNode.AbstractGrisNode):
     ]
     NotRegistared, Registared, RegistaredByProgram = range(3)
 
-    def setExpression(self, expression):
+    def __init__(self, nodeName):
+        r"""
+            Args:
+                nodeName (any):
+        """
+        super(DataTransform, self).__init__()
+        self.__manager = None
+
+    def manager(self):
+        r"""
+            この表情データを保持するマネージャノードを返す。
+            親が変わらない間は前回見つけたマネージャノードを返す。
+            
+            Returns:
+                FacialMemoryManagerRoot:
+        """
+        parent = self.parent()
+        if not parent:
+            self.__manager = None
+            return None
+        parent = parent()
+        if self.__manager and self.__manager[0] == parent:
+            return self.__manager[1]
+        roots = grisNode.listNodes(FacialMemoryManagerRoot, parent)
+        manager = roots[0] if roots else None
+        self.__manager = (parent, manager)
+        return manager
+
+    def setExpression(self, expression, renameValues=True):
         r"""
             表情名を設定する。
+            renameValuesがTrueの場合、マネージャが配列形式で保持している
+            値の表情名も合わせて変更する。
             
             Args:
                 expression (str):
+                renameValues (bool):
         """
+        old_name = self.expression() if renameValues else None
         with self.attr(TagAttr) as attr:
             attr.set(expression)
+        if not old_name or old_name == expression:
+            return
+        manager = self.manager()
+        if manager and manager.isCompact():
+            manager.renameExpressionValues({old_name: expression})
 
     def expression(self):
         r"""
@@ -515,6 +1147,12 @@ class DataTransform(node.Transform, grisNode.AbstractGrisNode):
             Args:
                 datalist (dict):
         """
+        manager = self.manager()
+        if manager and manager.isCompact():
+            table = manager.readTable()
+            table.setRow(self.expression(), datalist)
+            manager.writeTable(table)
+            return
         data_to_text = '' if datalist is None else json.dumps(datalist)
         with self.attr('grsExpressionValues') as attr:
             attr.set(data_to_text)
@@ -530,6 +1168,9 @@ class DataTransform(node.Transform, grisNode.AbstractGrisNode):
             Returns:
                 dict:
         """
+        manager = self.manager()
+        if manager and manager.isCompact():
+            return manager.readTable().data(self.expression())
         data_text = self('grsExpressionValues')
         if not data_text:
             return None
@@ -616,20 +1257,18 @@ def blendFacialMemoryData(startData, endData, inbetweens, status=2):
             inbetweens (DataTransform):中間補完される表情データのリスト
             status (int):更新後のデータのステータス
     """
-    st_values = startData.values()
-    ed_values = endData.values()
-    attrs = list(set(list(st_values.keys()) + list(ed_values.keys())))
-    inc_values = {}
-    div = len(inbetweens) + 1.0
-    for attr in attrs:
-        st_v = st_values.get(attr, 0.0)
-        ed_v = ed_values.get(attr, 0.0)
-        inc_values[attr] = [st_v, (ed_v - st_v) / div]
-    for i, i_data in enumerate(inbetweens, 1):
-        values = {x: (y[0] + y[1] * i) for x, y in inc_values.items()}
-        i_data.setValues(values)
-        i_data.setStatus(status)
-   
+    manager = startData.manager()
+    if not manager:
+        raise RuntimeError(
+            'The expression data "{}" does not belong to any manager.'.format(
+                startData()
+            )
+        )
+    manager.blendExpressions(
+        startData.expression(), endData.expression(),
+        [x.expression() for x in inbetweens], status
+    )
+
 
 def blendFacial(manager, startExpression, endExpression, inbetweens, status=2):
     r"""
@@ -647,16 +1286,15 @@ def blendFacial(manager, startExpression, endExpression, inbetweens, status=2):
             status (int):更新後のデータのステータス
     """
     expressions = manager.listExpressions()
-    exp_datalist = []
-    error_list = []
-    for explist in ([startExpression, endExpression], inbetweens):
-        for exp in explist:
-            data = expressions.get(exp)
-            if not data:
-                error_list.append(exp)
-                continue
-            exp_datalist.append(data)
-    blendFacialMemoryData(exp_datalist[0], exp_datalist[1], exp_datalist[2:])
+    if (
+        not startExpression in expressions or
+        not endExpression in expressions
+    ):
+        return False
+    manager.blendExpressions(
+        startExpression, endExpression,
+        [x for x in inbetweens if x in expressions], status
+    )
     return True
 
 
@@ -690,5 +1328,14 @@ def update_data_v1_0_1():
     
 
 
-
-
+def update_data_v1_1_0():
+    r"""
+        バージョン1.1.0未満の表情データを、マネージャノードの配列形式の
+        データに変換するためのパッチ関数。
+    """
+    for root in listManagerNode() or []:
+        version_str = root(VersionAttr)
+        mjr, mnr, debug = [int(x) for x in version_str.split('.')]
+        if (mjr, mnr) >= (1, 1):
+            continue
+        root.convertToCompact()
@@ -4,21 +4,166 @@
 r"""
     Dates:
         date:2021/06/08 15:21 shunsuke komori[eske3g@gmail.com]
-        update:2021/07/20 19:07 shunsuke komori[eske3g@gmail.com]
+        update:2026/10/18 10:00 shunsuke komori[eske3g@gmail.com]
 
     License:
         Copyright 2021 shunsuke komori[eske3g@gmail.com] - All Rights Reserved
         Unauthorized copying of this file, via any medium is strictly prohibited
         Proprietary and confidential
 """
+import os
+import re
+import sys
 from abc import ABCMeta, abstractmethod
 from collections import OrderedDict
 
+# 1ステートメントとして保持する最大文字数。
+# これを超える部分(巨大なsetAttrのデータ部など)は先頭と末尾の行のみ保持する。
+MaxStatementLength = 65536
+# ファイル単位のエラーを格納する際のラベル。
+FileErrorLabel = 'File Error'
+
+StringPattern = re.compile(r'"(?:[^"\\]|\\.)*"')
+StringEndPattern = re.compile(r'(?:[^"\\]|\\.)*"')
+
+
+def _split_string_state(line, in_string):
+    r"""
+        行の中の文字列リテラルを取り除き、行末で文字列が閉じているかどうかを
+        判定する。
+        
+        Args:
+            line (str):
+            in_string (bool):行頭の時点で文字列の途中かどうか
+            
+        Returns:
+            tuple(str, bool):文字列を除いた行と、行末で文字列の途中かどうか
+    """
+    if in_string:
+        result = StringEndPattern.match(line)
+        if not result:
+            return '', True
+        line = line[result.end():]
+    line = StringPattern.sub('', line)
+    if '"' in line:
+        return line[:line.index('"')], True
+    return line, False
+
+
+def iterate_statements(lines):
+    r"""
+        mayaAsciiの行のイテレータから、複数行にまたがる構文を1つの文字列に
+        まとめたステートメントを順番に返すジェネレータ。
+        各行は前後の空白を除去した上で半角スペースで連結される。
+        コメント行はそれ単体で１つのステートメントとして返す。
+        
+        Args:
+            lines (iterable):ファイルオブジェクトや文字列のリスト
+            
+        Returns:
+            generator:
+    """
+    head = []
+    length = 0
+    last = None
+    in_string = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if not head and line.startswith('//'):
+            yield line
+            continue
+
+        if length < MaxStatementLength:
+            head.append(line)
+            length += len(line)
+        else:
+            last = line
+
+        if in_string or '"' in line:
+            code, in_string = _split_string_state(line, in_string)
+        else:
+            code = line
+        if in_string or not code.rstrip().endswith(';'):
+            continue
+
+        if last is not None:
+            head.append(last)
+        yield ' '.join(head)
+        head, length, last = [], 0, None
+
+    # 終端記号がないまま終わった場合は残りを１ステートメントとして返す。
+    if head:
+        if last is not None:
+            head.append(last)
+        yield ' '.join(head)
+
+
+def list_maya_ascii_files(directory):
+    r"""
+        指定ディレクトリ以下にあるmayaAsciiファイルのパスをソートして返す。
+        
+        Args:
+            directory (str):
+            
+        Returns:
+            list:
+    """
+    results = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        results.extend(
+            [os.path.join(root, x) for x in sorted(files) if x.endswith('.ma')]
+        )
+    return results
+
+
+def _setup_multiprocessing():
+    r"""
+        Mayaのインタープリタ上から呼ばれた場合に、子プロセスとしてmaya本体
+        ではなくmayapyが起動されるように設定する。
+    """
+    import multiprocessing
+    exe = sys.executable
+    name = os.path.basename(exe).lower()
+    if not name.startswith('maya') or name.startswith('mayapy'):
+        return
+    mayapy = os.path.join(
+        os.path.dirname(exe), 'mayapy' + os.path.splitext(exe)[-1]
+    )
+    if os.path.exists(mayapy):
+        multiprocessing.set_executable(mayapy)
+
+
+def _check_file_process(args):
+    r"""
+        プロセスプールから呼ばれるファイルチェック用の関数。
+        チェッカーモジュールはモジュール名で受け取り、プロセス内でインポート
+        してインストールする。
+        
+        Args:
+            args (tuple):ファイルパスとチェッカーモジュール名のリストのタプル
+            
+        Returns:
+            tuple(str, OrderedDict):
+    """
+    from importlib import import_module
+    filepath, module_names = args
+    manager = DataChckerManager()
+    for module_name in module_names:
+        manager.install(import_module(module_name))
+    try:
+        return filepath, manager.check_file(filepath)
+    except Exception as e:
+        return filepath, OrderedDict([(FileErrorLabel, (-1, str(e)))])
+
 
 class DataChckerManager(object):
     def __init__(self):
         self.__header_checkers = []
         self.__all_checkers = []
+        self.__modules = []
 
     def install(self, module_name):
         if not hasattr(module_name, 'DataChecker'):
@@ -33,8 +178,18 @@ class DataChckerManager(object):
             self.__header_checkers.append(obj)
         else:
             self.__all_checkers.append(obj)
+        self.__modules.append(module_name.__name__)
         return obj
 
+    def installed_modules(self):
+        r"""
+            インストールされたチェッカーモジュール名のリストを返す。
+            
+            Returns:
+                list:
+        """
+        return self.__modules[:]
+
     def header_checkers(self):
         return self.__header_checkers[:]
 
@@ -42,36 +197,102 @@ class DataChckerManager(object):
         return self.__all_checkers
 
     def check_file(self, filepath):
-        header_lines = []
+        r"""
+            mayaAsciiファイルを先頭から一度だけ読み進め、ステートメント毎に
+            登録されている全てのチェッカーへ渡してチェックを行う。
+            ファイル全体をメモリに展開しないため、巨大なファイルでも
+            使用メモリ量は一定に保たれる。
+            
+            Args:
+                filepath (str):
+                
+            Returns:
+                OrderedDict:チェッカーのラベルをキーとしたチェック結果
+        """
+        header_checkers = self.header_checkers()
+        all_checkers = self.all_checkers()
+        for checker in header_checkers + all_checkers:
+            checker.begin()
+
         results = OrderedDict()
         with open(filepath, 'r') as f:
-            text = f.readline()
-            while text:
-                if text.startswith('createNode'):
-                    break
-                header_lines.append(text.strip())
-                text = f.readline()
-
+            statements = iterate_statements(f)
             # ヘッダー部分のチェック。
-            for checker in self.header_checkers():
-                results[checker.label()] = checker.check(header_lines)
-            if not self.all_checkers():
+            for statement in statements:
+                if statement.startswith('createNode'):
+                    break
+                for checker in header_checkers:
+                    checker.feed(statement)
+            else:
+                statement = None
+            for checker in header_checkers:
+                results[checker.label()] = checker.finish()
+            if not all_checkers:
                 return results
 
             # 全体チェックを開始。
-            all_lines = []
-            while text:
-                all_lines.append(text.strip())
-                text = f.readline()
+            if statement is not None:
+                for checker in all_checkers:
+                    checker.feed(statement)
+            for statement in statements:
+                for checker in all_checkers:
+                    checker.feed(statement)
 
-        for checker in self.all_checkers():
-            results[checker.label()] = checker.check(all_lines)
+        for checker in all_checkers:
+            results[checker.label()] = checker.finish()
+        return results
+
+    def check_files(self, filepaths, processes=None, chunksize=4):
+        r"""
+            複数のmayaAsciiファイルをプロセスプールを用いて並列にチェックする。
+            各プロセスではインストール済みのチェッカーモジュールを
+            インポートし直して使用する。
+            読み込みに失敗したファイルはFileErrorLabelをキーとした
+            エラー結果を持つ。
+            
+            Args:
+                filepaths (list or str):ファイルパスのリスト、またはディレクトリ
+                processes (int):プロセス数。Noneの場合はCPU数
+                chunksize (int):1プロセスに一度に割り当てるファイル数
+                
+            Returns:
+                OrderedDict:ファイルパスをキーとしたcheck_fileの結果
+        """
+        if not isinstance(filepaths, (list, tuple)):
+            filepaths = list_maya_ascii_files(filepaths)
+        args = [(x, self.installed_modules()) for x in filepaths]
+        results = OrderedDict()
+        if processes == 1 or len(args) < 2:
+            for arg in args:
+                filepath, result = _check_file_process(arg)
+                results[filepath] = result
+            return results
+
+        import multiprocessing
+        _setup_multiprocessing()
+        pool = multiprocessing.Pool(processes)
+        try:
+            for filepath, result in pool.imap(
+                _check_file_process, args, chunksize
+            ):
+                results[filepath] = result
+        finally:
+            pool.close()
+            pool.join()
         return results
 
 
 class AbstractMayaDataChecker(
     ABCMeta('AbstractMayaDataChecker', (object,), {})
 ):
+    r"""
+        mayaAsciiファイルをチェックするチェッカーの基底クラス。
+        DataChckerManagerからはbegin、feed、finishの順で呼ばれ、
+        feedにはステートメントが１つずつ渡される。
+        デフォルトの実装ではステートメントを蓄積し、finishでcheckを呼ぶ。
+        メモリ使用量を抑えたい場合はfeedとfinishを上書きし、
+        必要な情報のみを保持するようにする。
+    """
     HeaderChecker, AllChecker = range(2)
 
     @abstractmethod
@@ -81,6 +302,31 @@ class AbstractMayaDataChecker(
     def checker_type(self):
         return self.HeaderChecker
 
+    def begin(self):
+        r"""
+            ファイルのチェック開始時に呼ばれる。
+        """
+        self._statements = []
+
+    def feed(self, statement):
+        r"""
+            ステートメントを１つ受け取る。
+            
+            Args:
+                statement (str):
+        """
+        self._statements.append(statement)
+
+    def finish(self):
+        r"""
+            ファイルのチェック終了時に呼ばれ、チェック結果を返す。
+            
+            Returns:
+                tuple(int, str):checkと同じ形式の戻り値
+        """
+        statements, self._statements = self._statements, []
+        return self.check(statements)
+
     @abstractmethod
     def check(self, header_lines):
         r"""
@@ -99,3 +345,28 @@ class AbstractMayaDataChecker(
                 tuple(int, str):問題ない場合は1，警告は0、エラーは-1を返す。
         """
         return 1, ''
+
+
+class AbstractStreamDataChecker(AbstractMayaDataChecker):
+    r"""
+        ステートメントを蓄積せず、feed毎に処理を行うチェッカーの基底クラス。
+        サブクラスはfeedとfinishを実装する。checkは与えられた行から
+        ステートメントを組み立ててfeedに渡すため、従来通り行のリストでも
+        呼び出せる。
+    """
+    def begin(self):
+        pass
+
+    @abstractmethod
+    def feed(self, statement):
+        pass
+
+    @abstractmethod
+    def finish(self):
+        return 1, ''
+
+    def check(self, header_lines):
+        self.begin()
+        for statement in iterate_statements(header_lines):
+            self.feed(statement)
+        return self.finish()
@@ -15,27 +15,25 @@ import re
 from . import core
 
 
-class DataChecker(core.AbstractMayaDataChecker):
+class DataChecker(core.AbstractStreamDataChecker):
+    ReferencePattern = re.compile(r'file\s\-rdi\s')
+    EndPattern = re.compile(r'.* "(.+)";$')
+
     def label(self):
         return 'External Reference'
 
-    def check(self, header_lines):
-        ref_ptn = re.compile('file\s\-rdi\s')
-        end_ptn = re.compile('.* "(.+)";$')
-        stacked = []
-        references = []
-        for line in header_lines:
-            if stacked:
-                stacked.append(line)
-            else:
-                if not ref_ptn.match(line):
-                    continue
-                stacked.append(line)
-            end_line = end_ptn.search(line)
-            if not end_line:
-                continue
-            references.append(end_line.groups())
-            stacked = []
+    def begin(self):
+        self.__references = []
+
+    def feed(self, statement):
+        if not self.ReferencePattern.match(statement):
+            return
+        end_line = self.EndPattern.search(statement)
+        if end_line:
+            self.__references.append(end_line.groups())
+
+    def finish(self):
+        references, self.__references = self.__references, []
         num = len(references)
         if num < 1:
             return 1, ''
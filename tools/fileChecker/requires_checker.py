@@ -15,28 +15,25 @@ import re
 from . import core
 
 
-class DataChecker(core.AbstractMayaDataChecker):
+class DataChecker(core.AbstractStreamDataChecker):
+    RequirePattern = re.compile(r'requires\s')
+    EndPattern = re.compile(r'"([\w\.]+)"\s"([\w\.]+)";$')
 
     def label(self):
         return 'Requires'
 
-    def check(self, header_lines):
-        req_ptn = re.compile('requires\s')
-        end_ptn = re.compile('"([\w\.]+)"\s"([\w\.]+)";$')
-        stacked = []
-        requires = []
-        for line in header_lines:
-            if stacked:
-                stacked.append(line)
-            else:
-                if not req_ptn.match(line):
-                    continue
-                stacked.append(line)
-            end_line = end_ptn.search(line)
-            if not end_line:
-                continue
-            requires.append(end_line.groups())
-            stacked = []
+    def begin(self):
+        self.__requires = []
+
+    def feed(self, statement):
+        if not self.RequirePattern.match(statement):
+            return
+        end_line = self.EndPattern.search(statement)
+        if end_line:
+            self.__requires.append(end_line.groups())
+
+    def finish(self):
+        requires, self.__requires = self.__requires, []
         num = len(requires)
         if num < 1:
             return 1, ''
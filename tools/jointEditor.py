@@ -16,6 +16,7 @@ r"""
 from .. import node, mathlib, verutil
 from ..tools import util
 cmds = node.cmds
+OpenMaya2 = node.OpenMaya2
 
 Axislist = [
     '+X', '+Y', '+Z', '-X', '-Y', '-Z'
@@ -278,6 +279,152 @@ def splitJoint(numberOfJoints=1, joints=None):
 
     return result
 
+# 一括処理で取得するジョイントのアトリビュート。
+JointStateAttrs = (
+    'worldMatrix[0]', 'parentMatrix[0]', 'r', 'ra', 'ro', 'is', 'ssc'
+)
+
+
+def _toMObject(name):
+    r"""
+        ノード名からAPI2.0のMObjectを返す。
+        
+        Args:
+            name (str):
+            
+        Returns:
+            OpenMaya2.MObject:
+    """
+    sel = OpenMaya2.MSelectionList()
+    sel.add(name)
+    return sel.getDependNode(0)
+
+
+def _worldPositions(nodelist):
+    r"""
+        ノードのワールド位置を一括で取得し、(N, 3)の配列で返す。
+        
+        Args:
+            nodelist (list):
+            
+        Returns:
+            numpy.ndarray:
+    """
+    from .. import matrixArray
+    matrices = node.getAttrs(['%s.worldMatrix[0]' % x for x in nodelist])
+    return matrixArray.asMatrices(matrices)[:, 3, :3]
+
+
+def _readJointStates(joints):
+    r"""
+        ジョイントの行列と回転に関するアトリビュートの値を一括で取得する。
+        戻り値の辞書はworld、parent、r、ra、ro、is、sscをキーとし、
+        ジョイント毎の値を持つ配列を値とする。
+        
+        Args:
+            joints (list):
+            
+        Returns:
+            dict:
+    """
+    import numpy
+    from .. import matrixArray
+    columns = list(zip(*node.getAttrs(joints, JointStateAttrs)))
+    return {
+        'world': matrixArray.asMatrices(columns[0]),
+        'parent': matrixArray.asMatrices(columns[1]),
+        'r': matrixArray.asVectors(columns[2]),
+        'ra': matrixArray.asVectors(columns[3]),
+        'ro': numpy.array(columns[4], dtype=numpy.int64),
+        'is': matrixArray.asVectors(columns[5]),
+        'ssc': numpy.array(columns[6], dtype=bool),
+    }
+
+
+def _jointLocalValues(worldMatrices, parentMatrices, states):
+    r"""
+        ジョイントがworldMatricesのワールド行列となるための移動値と
+        jointOrientの値を計算する。
+        rotate、rotateAxis、inverseScale、segmentScaleCompensateの値は
+        statesのものを使用する。
+        
+        Args:
+            worldMatrices (numpy.ndarray):(N, 4, 4)の配列
+            parentMatrices (numpy.ndarray):(N, 4, 4)の配列
+            states (dict):_readJointStatesの戻り値と同じ形式の辞書
+            
+        Returns:
+            tuple:(translate, jointOrient)の(N, 3)の配列
+    """
+    import numpy
+    from .. import matrixArray
+    local_mtx = matrixArray.multiply(
+        worldMatrices, matrixArray.inverse(parentMatrices)
+    )
+    rows = local_mtx[:, :3, :3]
+    # segmentScaleCompensateが有効な場合はinverseScaleの影響を取り除く。
+    rows = numpy.where(
+        states['ssc'][:, None, None], rows * states['is'][:, None, :], rows
+    )
+    base = numpy.matmul(
+        matrixArray.eulerToMatrices(states['ra'], 'xyz'),
+        matrixArray.eulerToMatrices(states['r'], states['ro'])
+    )
+    jo_mtx = numpy.matmul(
+        numpy.swapaxes(base, 1, 2), matrixArray.rotationMatrices(rows)
+    )
+    return (
+        local_mtx[:, 3, :3].copy(), matrixArray.matricesToEuler(jo_mtx, 'xyz')
+    )
+
+
+class RestorableTransform(verutil.String):
+    r"""
+        初期位置保持機能を持つTransformノード向けのクラス。
+    """
+    def __new__(cls, name, unLock=False):
+        r"""
+            初期化メソッド。インスタンス作成時の位置情報を保持。
+            
+            Args:
+                name (str):ノード名
+                unLock (bool):
+                
+            Returns:
+                RestorableTransform:
+        """
+        object = super(RestorableTransform, cls).__new__(cls, name)
+        object.initialMatrix = cmds.getAttr('%s.worldMatrix' % name)
+        return object
+
+    def restore(self):
+        r"""
+            初期化時に保持していた状態へ復元するメソッド。
+        """
+        attr = ['t', 'r', 's']
+        axis = ['x', 'y', 'z']
+        lockedlist = []
+
+        ssc = None
+        if cmds.attributeQuery('ssc', ex=True, n=self):
+            ssc = cmds.getAttr(self + '.ssc')
+
+        for at in attr:
+            for ax in axis:
+                nodeattr = '%s.%s%s' % (self, at, ax)
+                if not cmds.getAttr(nodeattr, l=True):
+                    continue
+
+                lockedlist.append(nodeattr)
+                cmds.setAttr(nodeattr, l=False)
+        cmds.xform(self, ws=True, m=self.initialMatrix)
+
+        for attr in lockedlist:
+            cmds.setAttr(attr, l=True)
+        if ssc is not None:
+            cmds.setAttr(self + '.ssc', ssc)
+
+
 class OrientationModifier(object):
     r"""
         ジョイントの軸を制御するための機能を提供するクラス。
@@ -302,6 +449,7 @@ class OrientationModifier(object):
         self.__secondaryMode   = 'origin'
         self.__upTarget        = []
         self.__targetUpAxis    = '+Z'
+        self.__batch_mode      = False
 
     def setApplyToChildren(self, state):
         r"""
@@ -596,6 +744,24 @@ class OrientationModifier(object):
         """
         return self.__freeze_only
 
+    def setBatchMode(self, state):
+        r"""
+            全ジョイントの方向を配列で一括計算するかどうかを設定する。
+            
+            Args:
+                state (bool):
+        """
+        self.__batch_mode = bool(state)
+
+    def batchMode(self):
+        r"""
+            全ジョイントの方向を配列で一括計算するかどうかを返す。
+            
+            Returns:
+                bool:
+        """
+        return self.__batch_mode
+
     def _alignAxis(self, selected=None, surf=None):
         r"""
             実行メソッドの本体。
@@ -606,52 +772,6 @@ class OrientationModifier(object):
                 selected (list):操作対象ノードをリストで指定
                 surf (node.AbstractEditableShape):方向合わせに使用するノード
         """
-        class TransformNode(verutil.String):
-            r"""
-                初期位置保持機能を持つTransformノード向けのローカルクラス。
-            """
-            def __new__(cls, name, unLock=False):
-                r"""
-                    初期化メソッド。インスタンス作成時の位置情報を保持。
-                    
-                    Args:
-                        name (str):ノード名
-                        unLock (bool):
-                        
-                    Returns:
-                        TransformNode:
-                """
-                object = super(TransformNode, cls).__new__(cls, name)
-                object.initialMatrix = cmds.getAttr('%s.worldMatrix' % name)
-                return object
-
-            def restore(self):
-                r"""
-                    初期化時に保持していた状態へ復元するメソッド。
-                """
-                attr = ['t', 'r', 's']
-                axis = ['x', 'y', 'z']
-                lockedlist = []
-
-                ssc = None
-                if cmds.attributeQuery('ssc', ex=True, n=self):
-                    ssc = cmds.getAttr(self + '.ssc')
-
-                for at in attr:
-                    for ax in axis:
-                        nodeattr = '%s.%s%s' % (self, at, ax)
-                        if not cmds.getAttr(nodeattr, l=True):
-                            continue
-
-                        lockedlist.append(nodeattr)
-                        cmds.setAttr(nodeattr, l=False)
-                cmds.xform(self, ws=True, m=self.initialMatrix)
-
-                for attr in lockedlist:
-                    cmds.setAttr(attr, l=True)
-                if ssc is not None:
-                    cmds.setAttr(self + '.ssc', ssc)
-
         def __freeze(selectedJoints):
             r"""
                 指定ジョイント階層化すべてのの回転フリーズを行う。
@@ -783,7 +903,10 @@ class OrientationModifier(object):
 
             # 子ノードのTransformアトリビュートをすべてアンロックする。========
             allChildren = (
-                [TransformNode(x) for x in joint.children(type='transform')]
+                [
+                    RestorableTransform(x)
+                    for x in joint.children(type='transform')
+                ]
                 if joint.hasChild() else []
             )
             # =================================================================
@@ -813,6 +936,156 @@ class OrientationModifier(object):
         if self.isFreeze():
             __freeze(selected)
 
+    def _alignAxisBatch(self, selected=None, surf=None):
+        r"""
+            _alignAxisの一括処理版。
+            代理ノードやaimConstraintを使用せず、全ジョイントの行列を
+            一度に取得して新しい方向を配列で計算し、移動値とjointOrientを
+            1つのMDGModifierで書き戻す。
+            
+            Args:
+                selected (list):操作対象ノードをリストで指定
+                surf (node.AbstractEditableShape):方向合わせに使用するノード
+        """
+        import numpy
+        from .. import matrixArray
+        if self.applyToChildren():
+            allChildren = cmds.listRelatives(
+                selected, type='joint', ad=True, pa=True
+            )
+            if allChildren:
+                allChildren.reverse()
+                selected.extend(node.toObjects(allChildren))
+
+        target = self.target()
+        upTarget = self.upTarget()
+        pri_mode = self.primaryMode()
+        sec_mode = self.secondaryMode()
+
+        if self.freezeOnly():
+            cmds.makeIdentity(selected, a=True, r=True)
+            cmds.select(selected, r=True)
+            return
+
+        if not target and pri_mode == 'node':
+            raise RuntimeError('Aim target is not spcified.')
+
+        if not upTarget and sec_mode == 'node':
+            raise RuntimeError('Up target is not spcified.')
+
+        # 処理対象のジョイントと、位置を復元する子を振り分ける。==============
+        processed, leaves, children, transforms = [], [], [], []
+        first_children, parent_of = [], {}
+        checked = set()
+        for joint in selected:
+            if joint in checked or not joint.hasAttr('ssc'):
+                continue
+            checked.add(joint)
+            joint_children = joint.children(type='transform')
+            if not joint_children:
+                # 子がいない場合はjoとrotateを０にする。
+                if joint.hasParent() and joint.isType('joint'):
+                    leaves.append(joint)
+                continue
+            processed.append(joint)
+            first_children.append(joint_children[0])
+            for child in joint_children:
+                parent_of[child] = joint
+                if child.isType('joint'):
+                    children.append(child)
+                else:
+                    transforms.append(RestorableTransform(child))
+        processed_set, leaf_set = set(processed), set(leaves)
+        children = [x for x in children if x not in processed_set]
+        # =====================================================================
+
+        values = {}
+        for joint in leaves:
+            values['%s.r' % joint] = (0, 0, 0)
+            values['%s.jo' % joint] = (0, 0, 0)
+        if not processed:
+            if values:
+                node.setAttrs(values, force=True)
+            return
+
+        joints = processed + children
+        indices = {x: i for i, x in enumerate(joints)}
+        states = _readJointStates(joints)
+        num = len(processed)
+        world = states['world'][:num]
+        positions = world[:, 3, :3]
+
+        def closestPositions(targets):
+            if not isinstance(targets, (list, tuple)):
+                targets = [targets]
+            tgt_positions = _worldPositions(targets)
+            distances = numpy.sum(
+                (positions[:, None] - tgt_positions[None]) ** 2, axis=-1
+            )
+            return tgt_positions[numpy.argmin(distances, axis=1)]
+
+        # プライマリ軸とセカンダリ軸が向く方向を求める。======================
+        if pri_mode == 'firstChild':
+            aim_vectors = _worldPositions(first_children) - positions
+        elif pri_mode == 'origin':
+            aim_vectors = matrixArray.transformVectors(
+                self.primaryAimVector(), world
+            )
+        elif pri_mode == 'vector':
+            aim_vectors = numpy.tile(self.primaryAimVector(), (num, 1))
+        else:
+            aim_vectors = closestPositions(target) - positions
+
+        if sec_mode == 'origin':
+            up_vectors = matrixArray.transformVectors(
+                self.targetUpVector(), world
+            )
+        elif sec_mode == 'vector':
+            up_vectors = numpy.tile(self.targetUpVector(), (num, 1))
+        elif sec_mode == 'node':
+            up_vectors = closestPositions(upTarget) - positions
+        else:
+            up_vectors = [surf.closestNormal(x.tolist()) for x in positions]
+        # =====================================================================
+
+        rotations = matrixArray.aimRotations(
+            aim_vectors, up_vectors, self.primaryAxis(), self.secondaryAxis()
+        )
+        # 向く方向が求まらない場合は元の向きを維持する。
+        valid = numpy.linalg.norm(aim_vectors, axis=-1) > matrixArray.Epsilon
+        rotations = numpy.where(
+            valid[:, None, None], rotations,
+            matrixArray.rotationMatrices(world)
+        )
+        scale = matrixArray.decompose(world)[2]
+
+        new_world = states['world'].copy()
+        new_world[:num, :3, :3] = rotations * scale[:, :, None]
+        new_parent = states['parent'].copy()
+        for child, parent in parent_of.items():
+            if child in indices:
+                new_parent[indices[child]] = new_world[indices[parent]]
+
+        # 処理対象のジョイントはrotateとrotateAxisを0にする。
+        states['r'][:num] = 0
+        states['ra'][:num] = 0
+        translates, orients = _jointLocalValues(new_world, new_parent, states)
+        for i, joint in enumerate(joints):
+            values['%s.t' % joint] = translates[i].tolist()
+            if joint not in leaf_set:
+                values['%s.jo' % joint] = orients[i].tolist()
+            if i < num:
+                values['%s.r' % joint] = (0, 0, 0)
+                values['%s.ra' % joint] = (0, 0, 0)
+        node.setAttrs(values, force=True)
+
+        # ジョイント以外の子は元のワールド行列へ復元する。
+        for child in transforms:
+            child.restore()
+
+        if self.isFreeze():
+            cmds.makeIdentity(selected, a=True, r=True)
+
     def execute(self, selected=None):
         r"""
             実行メソッド。
@@ -822,15 +1095,16 @@ class OrientationModifier(object):
         """
         pre_selections = cmds.ls(sl=True)
         selected = node.selected(selected, type='joint')
+        align = self._alignAxisBatch if self.batchMode() else self._alignAxis
         if self.secondaryMode() != 'surface':
-            self._alignAxis(selected)
+            align(selected)
         else:
             uptarget = self.upTarget()
             if not uptarget:
                 raise RuntimeError('The up target is invalid.')
             uptarget = uptarget[0]
             with node.editFreezedShape(uptarget) as surf:
-                self._alignAxis(selected, surf)
+                align(selected, surf)
         if pre_selections:
             cmds.select(pre_selections, r=True, ne=True)
 
@@ -850,6 +1124,7 @@ class JointMirror(object):
         self.__is_replacing_parent = True
         self.__parent_searching_str = '_L'
         self.__parent_relaced_str = '_R'
+        self.__batch_mode = False
 
     def setApplyToChildren(self, state):
         r"""
@@ -1000,6 +1275,24 @@ class JointMirror(object):
                 str:
         """
         return self.__parent_relaced_str
+
+    def setBatchMode(self, state):
+        r"""
+            ミラー後の行列を配列で一括計算するかどうかを設定する。
+            
+            Args:
+                state (bool):
+        """
+        self.__batch_mode = bool(state)
+
+    def batchMode(self):
+        r"""
+            ミラー後の行列を配列で一括計算するかどうかを返す。
+            
+            Returns:
+                bool:
+        """
+        return self.__batch_mode
     # =========================================================================
 
     @staticmethod
@@ -1123,6 +1416,161 @@ class JointMirror(object):
         # =====================================================================
         return n_joint
 
+    @staticmethod
+    def mirrorJointsBatch(
+            joints,
+            applyToChildren,
+            isMirrorBehavior, mirrorPlane,
+            searchingString, replacedString,
+            isReplacingParent,
+            parentSearchingString, parentReplacedString
+        ):
+        r"""
+            mirrorJointの一括処理版。
+            ミラー元の全ジョイントのワールド行列を一度に取得してミラー後の
+            行列を配列で計算する。複製したジョイントの親子付けと名前の変更は
+            1つのMDagModifierで、移動値とjointOrientは1つのMDGModifierで
+            行う。
+            
+            Args:
+                joints (list):ミラー元のルートジョイントのリスト
+                applyToChildren (str):
+                isMirrorBehavior (bool):
+                mirrorPlane (str):
+                searchingString (str):
+                replacedString (str):
+                isReplacingParent (str):
+                parentSearchingString (str):
+                parentReplacedString (str):
+                
+            Returns:
+                list:複製されたルートジョイントのリスト
+        """
+        import numpy
+        from .. import matrixArray, apiUndo
+        axis = {
+            'myz': matrixArray.MirrorX,
+            'mxz': matrixArray.MirrorY,
+            'mxy': matrixArray.MirrorZ,
+        }[mirrorPlane]
+        roots = [x for x in node.toObjects(joints) if x and x.isType('joint')]
+        if not roots:
+            return []
+
+        # ミラー元のジョイントを親が先に来る順に列挙する。====================
+        sources, parents, root_parents = [], [], []
+        for root in roots:
+            indices = {root.fullName(): len(sources)}
+            sources.append(root.fullName())
+            parents.append(-1)
+            descendants = []
+            if applyToChildren:
+                descendants = cmds.listRelatives(
+                    root(), ad=True, type='joint', f=True
+                ) or []
+                descendants.reverse()
+            for path in sorted(descendants, key=lambda x: x.count('|')):
+                parent_index = indices.get(path.rsplit('|', 1)[0])
+                if parent_index is None:
+                    continue
+                indices[path] = len(sources)
+                sources.append(path)
+                parents.append(parent_index)
+
+            # ミラー先の親を確定する。
+            origin_parent = root.parent()
+            new_parent = None
+            if (
+                isReplacingParent and origin_parent and
+                '|' not in origin_parent
+            ):
+                replaced_parent = node.asObject(
+                    origin_parent.replace(
+                        parentSearchingString, parentReplacedString, 1
+                    )
+                )
+                if replaced_parent != origin_parent and replaced_parent:
+                    new_parent = replaced_parent
+            root_parents.append((new_parent, new_parent or origin_parent))
+        # =====================================================================
+
+        # ミラー後のワールド行列と親の行列を求める。==========================
+        states = _readJointStates(sources)
+        if isMirrorBehavior:
+            mirrored = matrixArray.mirror(states['world'], axis)
+        else:
+            mirrored = states['world'].copy()
+            mirrored[:, 3, 3 - sum(axis)] *= -1
+
+        parents = numpy.array(parents, dtype=numpy.int64)
+        root_indices = numpy.nonzero(parents < 0)[0]
+        has_parent = parents >= 0
+        parent_mtx = matrixArray.identity(len(sources))
+        parent_mtx[has_parent] = mirrored[parents[has_parent]]
+        for index, (new_parent, space) in zip(root_indices, root_parents):
+            if not space:
+                continue
+            parent_mtx[index] = matrixArray.asMatrices(
+                cmds.getAttr('%s.worldMatrix' % space)
+            )[0]
+            if new_parent and new_parent.isType('joint'):
+                states['is'][index] = new_parent('s')[0]
+        translates, orients = _jointLocalValues(mirrored, parent_mtx, states)
+        # =====================================================================
+
+        # ジョイントを複製し、親子付けと名前の変更を行う。====================
+        duplicated = [
+            _toMObject(x) for x in cmds.duplicate(sources, po=True)
+        ]
+        new_parents = [None] * len(sources)
+        for index, (new_parent, space) in zip(root_indices, root_parents):
+            if new_parent:
+                new_parents[index] = _toMObject(new_parent())
+        for i in numpy.nonzero(has_parent)[0]:
+            new_parents[i] = duplicated[parents[i]]
+
+        dag_mod = OpenMaya2.MDagModifier()
+        for source, mobj, parent in zip(sources, duplicated, new_parents):
+            if parent is not None:
+                dag_mod.reparentNode(mobj, parent)
+                inverse_scale = OpenMaya2.MFnDependencyNode(mobj).findPlug(
+                    'inverseScale', False
+                )
+                if (
+                    parent.hasFn(OpenMaya2.MFn.kJoint) and
+                    not inverse_scale.isDestination
+                ):
+                    dag_mod.connect(
+                        OpenMaya2.MFnDependencyNode(parent).findPlug(
+                            'scale', False
+                        ),
+                        inverse_scale
+                    )
+            name = source.rsplit('|', 1)[-1]
+            dag_mod.renameNode(
+                mobj, name.replace(searchingString, replacedString)
+            )
+        dag_mod.doIt()
+        apiUndo.commit(dag_mod.undoIt, dag_mod.doIt)
+        # =====================================================================
+
+        values = []
+        for i, mobj in enumerate(duplicated):
+            fn = OpenMaya2.MFnDependencyNode(mobj)
+            values.append(
+                (fn.findPlug('translate', False), translates[i].tolist())
+            )
+            values.append(
+                (fn.findPlug('jointOrient', False), orients[i].tolist())
+            )
+        node.setAttrs(values, force=True)
+        return node.toObjects(
+            [
+                OpenMaya2.MDagPath.getAPathTo(duplicated[x]).partialPathName()
+                for x in root_indices
+            ]
+        )
+
     def execute(self, selected=None):
         r"""
             クラスの設定に従ってミラーリングを実行する。
@@ -1131,6 +1579,17 @@ class JointMirror(object):
                 selected (list):
         """
         selected_joints = node.selected(type='transform')
+        if self.batchMode():
+            results = self.mirrorJointsBatch(
+                selected_joints,
+                self.applyToChildren(),
+                self.mirrorBehavior(), self.MirrorFlags[self.mirrorAxis()],
+                self.searchingString(), self.replacedString(),
+                self.isReplacingParent(),
+                self.parentSearchingString(), self.parentReplacedString()
+            )
+            cmds.select([x() for x in results])
+            return
         results = []
         for joint in selected_joints:
             results.append(
@@ -0,0 +1,460 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# old_style:google style:google
+r"""
+    メッシュのトポロジー情報をNumPy配列として一括で取得し、ハードエッジや
+    ボーダーエッジ、ハードエッジで囲まれたフェースの領域などを配列演算で
+    計算する機能を提供するモジュール。
+    フェースバーテックスの法線、エッジとフェースの接続情報、UVは最初に
+    必要になった時点でMFnMeshから一度だけ取得され、以降は再利用される。
+
+    Dates:
+        date:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+        update:2026/10/18 10:00 Eske Yoshinob[eske3g@gmail.com]
+
+    License:
+        Copyright 2017 Eske Yoshinob[eske3g@gmail.com] - All Rights Reserved
+        Unauthorized copying of this file, via any medium is strictly prohibited
+        Proprietary and confidential
+"""
+import numpy
+from maya.api import OpenMaya
+
+
+def _toArray(mayaArray, dtype=numpy.int64):
+    r"""
+        MIntArrayなどのMayaの配列をNumPy配列に変換する。
+
+        Args:
+            mayaArray (any):
+            dtype (numpy.dtype):
+
+        Returns:
+            numpy.ndarray:
+    """
+    return numpy.fromiter(mayaArray, dtype=dtype, count=len(mayaArray))
+
+
+def connectedComponents(count, pairsA, pairsB):
+    r"""
+        0からcount-1までの要素を、pairsAとpairsBの同じ位置の要素同士で
+        結合した時の連結成分を計算し、各要素の代表番号の配列を返す。
+        配列単位で根の付け替えと経路圧縮を繰り返すUnion-Findで計算する。
+
+        Args:
+            count (int):要素数
+            pairsA (numpy.ndarray):結合する要素の番号の配列
+            pairsB (numpy.ndarray):pairsAと結合する要素の番号の配列
+
+        Returns:
+            numpy.ndarray:各要素の代表番号(連結成分内の最小の番号)
+    """
+    parent = numpy.arange(count)
+    a = numpy.asarray(pairsA, dtype=parent.dtype)
+    b = numpy.asarray(pairsB, dtype=parent.dtype)
+    while True:
+        ra = parent[a]
+        rb = parent[b]
+        mask = ra != rb
+        if not mask.any():
+            return parent
+        a, b, ra, rb = a[mask], b[mask], ra[mask], rb[mask]
+        # 大きい方の根を小さい方の根へ付け替える。
+        numpy.minimum.at(
+            parent, numpy.maximum(ra, rb), numpy.minimum(ra, rb)
+        )
+        # 経路圧縮を行い、全要素が根を直接指すようにする。
+        while True:
+            compressed = parent[parent]
+            if numpy.array_equal(compressed, parent):
+                break
+            parent = compressed
+
+
+class MeshTopology(object):
+    r"""
+        メッシュのトポロジー情報を配列として保持するクラス。
+        各情報は最初に要求された時点で取得され、キャッシュされる。
+        メッシュを編集した後は新しいインスタンスを作成すること。
+    """
+    def __init__(self, mesh):
+        r"""
+            Args:
+                mesh (str):操作対象となるメッシュノード
+        """
+        sel = OpenMaya.MSelectionList()
+        sel.add(mesh)
+        self.__mesh = mesh
+        self.__fn = OpenMaya.MFnMesh(sel.getDependNode(0))
+        self.__cache = {}
+
+    def mesh(self):
+        r"""
+            操作対象のメッシュ名を返す。
+
+            Returns:
+                str:
+        """
+        return self.__mesh
+
+    def meshFn(self):
+        r"""
+            操作対象のMFnMeshを返す。
+
+            Returns:
+                OpenMaya.MFnMesh:
+        """
+        return self.__fn
+
+    def __cached(self, key, function):
+        r"""
+            keyに対応するキャッシュを返す。無い場合はfunctionの戻り値を
+            キャッシュして返す。
+
+            Args:
+                key (str):
+                function (function):
+
+            Returns:
+                any:
+        """
+        if not key in self.__cache:
+            self.__cache[key] = function()
+        return self.__cache[key]
+
+    def __faceVertexData(self):
+        r"""
+            各フェースの頂点数と、フェースバーテックス順の頂点番号の配列を
+            返す。
+
+            Returns:
+                tuple:
+        """
+        counts, vertices = self.__fn.getVertices()
+        return _toArray(counts), _toArray(vertices)
+
+    def faceVertexCounts(self):
+        r"""
+            各フェースの頂点数の配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        return self.__cached('faceVertex', self.__faceVertexData)[0]
+
+    def faceVertices(self):
+        r"""
+            全フェースの頂点番号をフェースバーテックス順に並べた配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        return self.__cached('faceVertex', self.__faceVertexData)[1]
+
+    def edgeVertices(self):
+        r"""
+            各エッジの両端の頂点番号を持つ(エッジ数, 2)の配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        def get():
+            fn = self.__fn
+            return numpy.array(
+                [fn.getEdgeVertices(i) for i in range(fn.numEdges)],
+                dtype=numpy.int64
+            ).reshape(-1, 2)
+        return self.__cached('edgeVertices', get)
+
+    def edgeSmooths(self):
+        r"""
+            各エッジがスムースかどうかを表すboolの配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        def get():
+            fn = self.__fn
+            return numpy.array(
+                [fn.isEdgeSmooth(i) for i in range(fn.numEdges)], dtype=bool
+            )
+        return self.__cached('edgeSmooths', get)
+
+    def normals(self):
+        r"""
+            正規化された法線の(法線数, 3)の配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        def get():
+            normals = numpy.array(
+                [(v.x, v.y, v.z) for v in self.__fn.getNormals()],
+                dtype=numpy.float64
+            ).reshape(-1, 3)
+            length = numpy.linalg.norm(normals, axis=1)
+            length[length == 0] = 1.0
+            return normals / length[:, None]
+        return self.__cached('normals', get)
+
+    def faceVertexNormalIds(self):
+        r"""
+            フェースバーテックス順の法線番号の配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        def get():
+            return _toArray(self.__fn.getNormalIds()[1])
+        return self.__cached('normalIds', get)
+
+    def faceVertexUVIds(self, uvSet=''):
+        r"""
+            フェースバーテックス順のUV番号の配列を返す。
+            UVが割り当てられていないフェースの値は-1となる。
+
+            Args:
+                uvSet (str):UVセット名。空文字の場合はカレントのUVセット
+
+            Returns:
+                numpy.ndarray:
+        """
+        def get():
+            fn = self.__fn
+            if uvSet:
+                counts, ids = fn.getAssignedUVs(uvSet)
+            else:
+                counts, ids = fn.getAssignedUVs()
+            counts = _toArray(counts)
+            ids = _toArray(ids)
+            fv_counts = self.faceVertexCounts()
+            result = numpy.full(len(self.faceVertices()), -1, numpy.int64)
+            assigned = numpy.repeat(counts == fv_counts, fv_counts)
+            result[assigned] = ids
+            return result
+        return self.__cached('uvIds:' + uvSet, get)
+
+    def __halfEdgeData(self):
+        r"""
+            各フェースバーテックスから次のフェースバーテックスへ向かう
+            ハーフエッジの情報を返す。
+            戻り値は以下の配列を持つ辞書。
+                'face':ハーフエッジの属するフェース番号
+                'edge':ハーフエッジに対応するエッジ番号
+                'start':エッジの1つ目の頂点側のフェースバーテックス番号
+                'end':エッジの2つ目の頂点側のフェースバーテックス番号
+            各配列はエッジ番号順に並べ替えられている。
+
+            Returns:
+                dict:
+        """
+        counts = self.faceVertexCounts()
+        vertices = self.faceVertices()
+        edge_vertices = self.edgeVertices()
+        num_fv = len(vertices)
+
+        faces = numpy.repeat(numpy.arange(len(counts)), counts)
+        offsets = numpy.cumsum(counts) - counts
+        fv_next = numpy.arange(1, num_fv + 1)
+        fv_next[offsets + counts - 1] = offsets
+        v0 = vertices
+        v1 = vertices[fv_next]
+
+        # 頂点の組からエッジ番号を求める。
+        num_vtx = int(max(edge_vertices.max(), vertices.max())) + 1
+        edge_keys = (
+            edge_vertices.min(axis=1) * num_vtx + edge_vertices.max(axis=1)
+        )
+        he_keys = numpy.minimum(v0, v1) * num_vtx + numpy.maximum(v0, v1)
+        key_order = numpy.argsort(edge_keys)
+        edges = key_order[
+            numpy.searchsorted(edge_keys[key_order], he_keys)
+        ]
+
+        # エッジの1つ目の頂点側のフェースバーテックスをstartとする。
+        fv = numpy.arange(num_fv)
+        flip = v0 != edge_vertices[edges, 0]
+        start = numpy.where(flip, fv_next, fv)
+        end = numpy.where(flip, fv, fv_next)
+
+        order = numpy.argsort(edges, kind='stable')
+        return {
+            'face': faces[order], 'edge': edges[order],
+            'start': start[order], 'end': end[order],
+        }
+
+    def halfEdges(self):
+        r"""
+            エッジ番号順に並べられたハーフエッジの情報を返す。
+
+            Returns:
+                dict:
+        """
+        return self.__cached('halfEdges', self.__halfEdgeData)
+
+    def edgeFaceCounts(self):
+        r"""
+            各エッジに接続されたフェース数の配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        def get():
+            return numpy.bincount(
+                self.halfEdges()['edge'], minlength=len(self.edgeVertices())
+            )
+        return self.__cached('edgeFaceCounts', get)
+
+    def borderEdges(self):
+        r"""
+            フェースが1つしか接続されていないエッジの番号の配列を返す。
+
+            Returns:
+                numpy.ndarray:
+        """
+        return numpy.nonzero(self.edgeFaceCounts() == 1)[0]
+
+    def __compareAtEdgeVertices(self, values, twoFaces, multiFaces):
+        r"""
+            2つ以上のフェースが接続されたエッジについて、エッジの両端の頂点で
+            フェースバーテックスごとの値を比較し、条件を満たすエッジの
+            番号の配列を返す。
+
+            Args:
+                values (numpy.ndarray):フェースバーテックス順の値
+                twoFaces (function):2フェースのエッジの両端の値の配列を
+                    受け取り、結果のboolの配列を返す関数
+                multiFaces (function):3フェース以上のエッジの片側の値の
+                    配列を受け取り、その頂点で条件を満たすかを返す関数
+
+            Returns:
+                numpy.ndarray:
+        """
+        he = self.halfEdges()
+        counts = self.edgeFaceCounts()
+        starts = numpy.cumsum(counts) - counts
+        va = values[he['start']]
+        vb = values[he['end']]
+        result = numpy.zeros(len(counts), dtype=bool)
+
+        two = numpy.nonzero(counts == 2)[0]
+        s = starts[two]
+        result[two] = twoFaces(va[s], va[s + 1], vb[s], vb[s + 1])
+
+        # 非多様体エッジは数が少ないため個別に処理する。
+        for e in numpy.nonzero(counts > 2)[0]:
+            s, c = starts[e], counts[e]
+            result[e] = multiFaces(va[s:s+c]) and multiFaces(vb[s:s+c])
+        return numpy.nonzero(result)[0]
+
+    def hardEdges(self, threshold=0.995):
+        r"""
+            法線的にハードエッジとなっているエッジの番号の配列を返す。
+            エッジの両端の頂点それぞれで、接続フェースのフェースバーテックス
+            法線同士の内積の最小値がthresholdを下回る場合にハードエッジと
+            判定する。
+
+            Args:
+                threshold (float):判定のしきい値(内積)
+
+            Returns:
+                numpy.ndarray:
+        """
+        normals = self.normals()
+        normal_ids = self.faceVertexNormalIds()
+
+        def dot(a, b):
+            return numpy.einsum('ij,ij->i', normals[a], normals[b])
+
+        def two_faces(a0, a1, b0, b1):
+            return (dot(a0, a1) < threshold) & (dot(b0, b1) < threshold)
+
+        def multi_faces(ids):
+            vectors = normals[ids]
+            dots = vectors.dot(vectors.T)
+            return dots[numpy.triu_indices(len(ids), 1)].min() < threshold
+
+        return self.__compareAtEdgeVertices(
+            normal_ids, two_faces, multi_faces
+        )
+
+    def uvSeamEdges(self, uvSet=''):
+        r"""
+            接続フェース間でUVが分かれているエッジの番号の配列を返す。
+
+            Args:
+                uvSet (str):UVセット名。空文字の場合はカレントのUVセット
+
+            Returns:
+                numpy.ndarray:
+        """
+        def two_faces(a0, a1, b0, b1):
+            return (a0 != a1) | (b0 != b1)
+
+        def multi_faces(ids):
+            return len(numpy.unique(ids)) > 1
+
+        return self.__compareAtEdgeVertices(
+            self.faceVertexUVIds(uvSet), two_faces, multi_faces
+        )
+
+    def faceRegions(self, passableEdges):
+        r"""
+            passableEdgesで指定したエッジを介して接続されたフェースを
+            同じ領域とし、各フェースの領域番号の配列を返す。
+
+            Args:
+                passableEdges (numpy.ndarray):エッジごとのboolの配列
+
+            Returns:
+                numpy.ndarray:
+        """
+        he = self.halfEdges()
+        edges = he['edge']
+        faces = he['face']
+        link = (edges[:-1] == edges[1:]) & passableEdges[edges[:-1]]
+        return connectedComponents(
+            len(self.faceVertexCounts()), faces[:-1][link], faces[1:][link]
+        )
+
+    def facesInsideHardEdges(self, faces):
+        r"""
+            引数facesのフェースから、ハードエッジ(スムースではないエッジ)を
+            越えずに到達できる全てのフェース番号の配列を返す。
+
+            Args:
+                faces (list):起点となるフェース番号のリスト
+
+            Returns:
+                numpy.ndarray:
+        """
+        regions = self.faceRegions(self.edgeSmooths())
+        seeds = numpy.unique(regions[numpy.asarray(list(faces), dtype=int)])
+        return numpy.nonzero(numpy.isin(regions, seeds))[0]
+
+    def edgeNames(self, indices):
+        r"""
+            エッジ番号のリストをエッジのコンポーネント名のリストに変換する。
+
+            Args:
+                indices (list):
+
+            Returns:
+                list:
+        """
+        return ['%s.e[%s]' % (self.__mesh, x) for x in indices]
+
+    def faceNames(self, indices, mesh=None):
+        r"""
+            フェース番号のリストをフェースのコンポーネント名のリストに
+            変換する。
+
+            Args:
+                indices (list):
+                mesh (str):コンポーネント名に使用するメッシュ名
+
+            Returns:
+                list:
+        """
+        mesh = mesh or self.__mesh
+        return ['%s.f[%s]' % (mesh, x) for x in indices]
@@ -15,6 +15,7 @@ r"""
         Proprietary and confidential
 """
 import re
+from collections import OrderedDict
 from .. import node
 from . import selectionUtil
 cmds = node.cmds
@@ -81,21 +82,6 @@ def swap(nodelist=None, isMirror=False):
         else:
             return factorDic['0DEFAULT']
 
-    def swapValue(tgtA, tgtB, attr, factor, isMirror):
-        r"""
-            Args:
-                tgtA (node.AbstractNode):
-                tgtB (node.AbstractNode):
-                attr (str):
-                factor (float):
-                isMirror (bool):
-        """
-        a_val = tgtA(attr)
-        if not isMirror:
-            b_val = tgtB(attr)
-            tgtA(attr, b_val * factor)
-        tgtB(attr, a_val * factor)
-
     nodelist = node.selected(nodelist)
     pairlist = {}
     standalones = []
@@ -113,15 +99,26 @@ def swap(nodelist=None, isMirror=False):
             continue
         pairlist[n] = rev
     
+    # 値はnode.getAttrsで一括取得し、最後にnode.setAttrsで一括でセットする。
+    values = OrderedDict()
     # シングルノードのミラー処理。=============================================
     for n in standalones:
         factorlist = getFactors(n, StandaloneTrs)
+        attrs, factors = [], []
         for attr, factor in zip('trs', factorlist):
             for ax, f in zip('xyz', factor):
-                at = attr + ax
-                if not n(at, k=True) or n(at, l=True):
-                    continue
-                n(at, n(at) * f)
+                attrs.append(attr + ax)
+                factors.append(f)
+        plugs = node.findPlugs([n], attrs)[0]
+        targets = [
+            (at, f) for at, f, p in zip(attrs, factors, plugs)
+            if p.isKeyable and node.isSettablePlug(p)
+        ]
+        if not targets:
+            continue
+        current = node.getAttrs([n], [x[0] for x in targets])[0]
+        for (at, f), val in zip(targets, current):
+            values[n / at] = val * f
     # =========================================================================
     
     # =========================================================================
@@ -132,14 +129,30 @@ def swap(nodelist=None, isMirror=False):
         if not matching_attrs:
             continue
         factorlist = getFactors(tgt_a, PairTrs)
-        a_values, b_values = {}, {}
+        attrs, factors = [], []
         for attr, factor in zip('trs', factorlist):
             for ax, f in zip('xyz', factor):
                 at = attr + ax
                 if at not in matching_attrs:
                     continue
-                swapValue(tgt_a, tgt_b, at, f, isMirror)
+                attrs.append(at)
+                factors.append(f)
                 del matching_attrs[matching_attrs.index(at)]
-        for attr in matching_attrs:
-            swapValue(tgt_a, tgt_b, attr, 1, isMirror)
+        attrs.extend(matching_attrs)
+        factors.extend([1] * len(matching_attrs))
+
+        a_plugs, b_plugs = node.findPlugs([tgt_a, tgt_b], attrs)
+        current = node.getAttrs(a_plugs + b_plugs)
+        a_values, b_values = current[:len(attrs)], current[len(attrs):]
+        for at, f, a_val, b_val, a_plug, b_plug in zip(
+            attrs, factors, a_values, b_values, a_plugs, b_plugs
+        ):
+            # ロックされているもの、animCurve以外から接続されているものは
+            # そのままにする。
+            if not isMirror and node.isSettablePlug(a_plug):
+                values[tgt_a / at] = b_val * f
+            if node.isSettablePlug(b_plug):
+                values[tgt_b / at] = a_val * f
     # =========================================================================
+    if values:
+        node.setAttrs(values)
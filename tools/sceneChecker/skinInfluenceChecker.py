@@ -24,6 +24,7 @@ class PolySkinInfluenceChecker(checkUtil.AbstractDagChecker):
         super(PolySkinInfluenceChecker, self).__init__()
         self.setCategory('Poly skin influence Checker')
         self.__limit = 4
+        self.__sum_tolerance = 0.001
     
     def setNumberOfLimit(self, limit):
         self.__limit = int(limit)
@@ -31,11 +32,35 @@ class PolySkinInfluenceChecker(checkUtil.AbstractDagChecker):
     def numberOfLimit(self):
         return self.__limit
 
+    def setSumTolerance(self, tolerance):
+        r"""
+            ウェイトの合計値の１からの誤差の許容値を設定する。
+            
+            Args:
+                tolerance (float):
+        """
+        self.__sum_tolerance = float(tolerance)
+
+    def sumTolerance(self):
+        r"""
+            ウェイトの合計値の１からの誤差の許容値を返す。
+            
+            Returns:
+                float:
+        """
+        return self.__sum_tolerance
+
     def checkObject(self, target):
         r"""
+            ウェイト行列全体から頂点毎のインフルエンス数と合計値を配列演算で
+            求めてチェックする。
+            結果にはerrorVertices(頂点インデックスの配列)とworstVertexが
+            含まれる。
+            
             Args:
                 target (node.Transform):
         """
+        import numpy
         checked = []
         if target is None:
             return checked
@@ -45,30 +70,50 @@ class PolySkinInfluenceChecker(checkUtil.AbstractDagChecker):
         if not meshs:
             return checked
         
-        weightlist = skinUtility.listWeights(target)
-        if not weightlist:
+        result = skinUtility.analyzeWeights(target)
+        if not result:
             return checked
-        limit = self.numberOfLimit()
-        limit_error, zero_error = False, False
-        for idx, wlist in weightlist.items():
-            if not wlist:
-                zero_error = True
-            elif len(wlist) > limit:
-                limit_error = True
-            if zero_error and limit_error:
-                break
-        if zero_error:
+        counts = result['influenceCounts']
+        sum_errors = result['sumErrors']
+
+        zero_errors = numpy.nonzero(counts == 0)[0]
+        if len(zero_errors):
             checked.append(
                 checkUtil.CheckedResult(
-                    'No weighted vertex was found.', processId=1
+                    'No weighted vertex was found. ({} vertices)'.format(
+                        len(zero_errors)
+                    ),
+                    processId=1, errorVertices=zero_errors,
+                    worstVertex=int(zero_errors[0])
                 )
             )
-        if limit_error:
+
+        limit_errors = numpy.nonzero(counts > self.numberOfLimit())[0]
+        if len(limit_errors):
+            worst = int(limit_errors[numpy.argmax(counts[limit_errors])])
             checked.append(
                 checkUtil.CheckedResult(
-                    'Some vertices break a limit about number of influences.',
-                    processId=2
+                    (
+                        'Some vertices break a limit about number of '
+                        'influences. ({} vertices, worst : vtx[{}] has {})'
+                    ).format(len(limit_errors), worst, counts[worst]),
+                    processId=2, errorVertices=limit_errors,
+                    worstVertex=worst
                 )
             )
-        return checked
 
+        sum_errors[counts == 0] = 0
+        unnormalized = numpy.nonzero(sum_errors > self.sumTolerance())[0]
+        if len(unnormalized):
+            worst = int(unnormalized[numpy.argmax(sum_errors[unnormalized])])
+            checked.append(
+                checkUtil.CheckedResult(
+                    (
+                        'The sum of weights is not 1 on some vertices. '
+                        '({} vertices, worst : vtx[{}])'
+                    ).format(len(unnormalized), worst),
+                    processId=3, errorVertices=unnormalized,
+                    worstVertex=worst
+                )
+            )
+        return checked
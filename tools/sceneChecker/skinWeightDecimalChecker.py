@@ -15,7 +15,7 @@ r"""
         Proprietary and confidential
 """
 from .. import checkUtil, skinUtility
-from ... import node, mathlib
+from ... import node
 cmds = node.cmds
 
 
@@ -33,9 +33,15 @@ class SkinWeightDecimalChecker(checkUtil.AbstractDagChecker):
 
     def checkObject(self, target):
         r"""
+            ウェイト行列全体の丸め誤差を配列演算で求め、小数点以下の桁数が
+            既定値を超える頂点数と最も誤差の大きい頂点を報告する。
+            結果にはerrorVertices(頂点インデックスの配列)とworstVertexが
+            含まれる。
+            
             Args:
                 target (node.Transform):
         """
+        import numpy
         checked = []
         if target is None:
             return checked
@@ -46,24 +52,24 @@ class SkinWeightDecimalChecker(checkUtil.AbstractDagChecker):
         if not meshs:
             return checked
 
-        weightlist = skinUtility.listWeightValues(target)
-        if not weightlist:
+        decimal = self.numberOfDecimal()
+        result = skinUtility.analyzeWeights(target, decimal)
+        if not result:
             return checked
 
-        decimal = self.numberOfDecimal()
-        limit_error, zero_error = False, False
-        for idx, wlist in enumerate(weightlist):
-            for w in wlist:
-                if mathlib.getNumberOfDecimals(w) > decimal:
-                    checked.append(
-                        checkUtil.CheckedResult(
-                            (
-                                'This mesh contains skinning weights '
-                                'with more than {} decimal places.'
-                            ).format(decimal),
-                            processId=1
-                        )
-                    )
-                    return checked
+        residuals = result['decimalResiduals']
+        errored = numpy.nonzero(residuals > skinUtility.DecimalTolerance)[0]
+        if not len(errored):
+            return checked
+        worst = int(errored[numpy.argmax(residuals[errored])])
+        checked.append(
+            checkUtil.CheckedResult(
+                (
+                    'This mesh contains skinning weights '
+                    'with more than {} decimal places. '
+                    '({} vertices, worst : vtx[{}])'
+                ).format(decimal, len(errored), worst),
+                processId=1, errorVertices=errored, worstVertex=worst
+            )
+        )
         return checked
-
@@ -14,7 +14,6 @@ r"""
         Proprietary and confidential
 """
 import re
-from maya.api import OpenMaya
 from .. import node
 from ..tools import nameUtility
 SIDE_TABLE = nameUtility.SIDE_TABLE
@@ -240,87 +239,22 @@ def convertFaceInsideHardedges(facelist=None, select=True):
         facelist = cmds.filterExpand(sm=34, fp=True)
     if not facelist:
         return
-    
-    def search(face_idx, mfn_poly, mfn_edge, converted_faces, finished_edges):
-        r"""
-            与えられたフェース番号に隣接するエッジを調べ、ハードエッジでは
-            なかった場合、さらに隣接するフェースまで探査を行う。
-            結果、ハードエッジ内に収まるフェース番号のリストを
-            引数converted_facesに格納する再帰関数。
-
-            Args:
-                face_idx (int):探索フェース番号
-                mfn_poly (OpenMaya.MFnMeshPolygon):操作対象ポリゴン
-                mfn_edge (OpenMaya.MFnMeshEdge):操作対象エッジ
-                converted_faces (set):変換済みフェース番号のセット
-                finished_edges (set):処理済みエッジ番号のセット
-        """
-        mfn_poly.setIndex(face_idx)
-        edges = mfn_poly.getEdges()
-        for e_index in edges:
-            if e_index in finished_edges:
-                continue
-            finished_edges.add(e_index)
-            mfn_edge.setIndex(e_index)
-            if not mfn_edge.isSmooth:
-                continue
-            c_faces = mfn_edge.getConnectedFaces()
-            for f_index in c_faces:
-                if f_index in converted_faces:
-                    continue
-                converted_faces.add(f_index)
-                search(
-                    f_index, mfn_poly, mfn_edge, converted_faces, finished_edges
-                )
-    
-    def search_inside_faces(face_data, edge_data):
-        r"""
-            シェイプ名をキー、フェース番号のセットを値として持つ辞書を受け取り、
-            フェースがハードエッジに到達するまで選択拡張を続け、その結果の
-            フェース名を返す。
-            edge_dataは処理済みエッジ番号を保持するためのバッファ変数で、
-            face_dataと同じシェイプ名のキーを持つ辞書。
-
-            Args:
-                face_data (dict):
-                edge_data (dict):
 
-            Returns:
-                list(str):結果のフェースリスト
-        """
-        faces = []
-        for mesh in face_data:
-            finished_edges = edge_data[mesh]
-            converted_faces = face_data[mesh]
-            sel = OpenMaya.MSelectionList()
-            sel.add(mesh)
-            dpend = sel.getDependNode(0)
-            # fmesh = OpenMaya.MFnMesh(dpend)
-            mipoly = OpenMaya.MItMeshPolygon(dpend)
-            miedge = OpenMaya.MItMeshEdge(dpend)
-            for index in [x for x in face_data[mesh]]:
-                search(index, mipoly, miedge, converted_faces, finished_edges)
-            
-            best_name = cmds.ls(mesh)[0]
-            for f_index in converted_faces:
-                faces.append('{}.f[{}]'.format(best_name, f_index))
-        return faces
-
-    converted_faces = {}
+    from . import meshTopology
+    face_data = {}
     face_ptn = re.compile('(^[a-zA-Z\d_|]+)\.f\[(\d+)\]$')
     for face in facelist:
         r = face_ptn.search(face)
-        converted_faces.setdefault(r.group(1), set()).add(int(r.group(2)))
-    finished_edges = {x: set() for x in converted_faces}
-    import sys
-    limit = sys.getrecursionlimit()
-    sys.setrecursionlimit(10000000)
-    try:
-        faces = search_inside_faces(converted_faces, finished_edges)
-    except Exception as e:
-        raise e
-    finally:
-        sys.setrecursionlimit(limit)
+        face_data.setdefault(r.group(1), set()).add(int(r.group(2)))
+
+    faces = []
+    for mesh, indices in face_data.items():
+        topology = meshTopology.MeshTopology(mesh)
+        faces.extend(
+            topology.faceNames(
+                topology.facesInsideHardEdges(indices), cmds.ls(mesh)[0]
+            )
+        )
     if select and faces:
         cmds.select(faces, r=True, ne=True)
     return faces
@@ -371,54 +305,9 @@ def selectHardEdges(mesh, isSelecting=True, threshold=0.995):
         Returns:
             list:検索したハードエッジのリスト
     """
-    def listVectorDots(normalList):
-        r"""
-            与えられた法線のリストに対し、n番目とn+1番目の法線の内積結果を
-            格納したリストを返す。
-            
-            Args:
-                normalList (list):
-                
-            Returns:
-                list:
-        """
-        dotlist = []
-        nl = len(normalList)
-        for i in range(nl):
-            for j in range(i+1, nl):
-                dotlist.append(normalList[i]*normalList[j])
-        return dotlist
-
-    sel = OpenMaya.MSelectionList()
-    sel.add(mesh)
-    depend = sel.getDependNode(0)
-    mfnm = OpenMaya.MFnMesh(depend)
-    miedge = OpenMaya.MItMeshEdge(depend)
-    hardedges = []
-    while(not miedge.isDone()):
-        index = miedge.index()
-        vts_idx = mfnm.getEdgeVertices(index)
-        face_idx = list(miedge.getConnectedFaces())
-        if len(face_idx) < 2:
-            miedge.next()
-            continue
-        count = 0
-        for vid in vts_idx:
-            normals = []
-            for fid in face_idx:
-                normals.append(mfnm.getFaceVertexNormal(fid, vid).normal())
-            dotlist = listVectorDots(normals)
-            try:
-                min_dot = min(dotlist)
-            except Exception as e:
-                print('Invalid edge : %s' % ('%s.e[%s]'%(mesh, index)))
-                raise e
-            if min(dotlist) < threshold:
-                count += 1
-        miedge.next()
-        
-        if count == len(vts_idx):
-            hardedges.append('%s.e[%s]'%(mesh, index))
+    from . import meshTopology
+    topology = meshTopology.MeshTopology(mesh)
+    hardedges = topology.edgeNames(topology.hardEdges(threshold))
     if isSelecting and hardedges:
         cmds.select(hardedges, r=True, ne=True)
     return hardedges
@@ -16,7 +16,7 @@ r"""
 import re
 from maya.api import OpenMaya
 
-from .. import node, mathlib, verutil, mathlib
+from .. import node, verutil
 from . import modelingSupporter, util
 cmds = node.cmds
 
@@ -94,16 +94,98 @@ def listWeightValues(target):
     return sc.listWeightValues(target)
 
 
-def listOverDecimalWeightVertices(target, decimal=2, selecting=False):
-    weights = listWeightValues(target)
+def weightData(target):
+    r"""
+        選択オブジェクトについているSkinClusterのウェイト情報を
+        キャッシュを経由して返す。
+        
+        Args:
+            target (str):
+            
+        Returns:
+            skinWeightCache.WeightCacheData:
+    """
+    sc = findSkinCluster(target)
+    if not sc:
+        return None
+    return sc.weightData(target)
+
+
+# analyzeWeightsで小数点以下の桁数を判定する際の許容誤差。
+DecimalTolerance = 1e-9
+
+
+def analyzeWeights(target, decimal=2):
+    r"""
+        選択オブジェクトについているSkinClusterのウェイト行列全体を配列演算で
+        解析し、頂点毎の結果を持つ辞書を返す。
+        辞書は以下のキーを持つ。
+            influenceCounts : ０以外のウェイトを持つインフルエンス数
+            decimalResiduals : decimal桁で丸めた際の誤差の最大値
+            sumErrors : ウェイトの合計値の１からの誤差
+        
+        Args:
+            target (str):
+            decimal (int):許容する小数点以下の桁数
+            
+        Returns:
+            dict:
+    """
+    import numpy
+    data = weightData(target)
+    if data is None:
+        return {}
+    weights = data.weights()
+    if not weights.size:
+        empty = numpy.zeros(len(weights))
+        return {
+            'influenceCounts': empty.astype(numpy.int64),
+            'decimalResiduals': empty,
+            'sumErrors': numpy.ones(len(weights)),
+        }
+    return {
+        'influenceCounts': numpy.count_nonzero(weights, axis=1),
+        'decimalResiduals': numpy.abs(
+            weights - numpy.round(weights, decimal)
+        ).max(axis=1),
+        'sumErrors': numpy.abs(weights.sum(axis=1) - 1.0),
+    }
+
+
+def listVerticesFromMask(target, mask):
+    r"""
+        頂点毎の真偽値の配列maskがTrueの頂点名のリストを返す。
+        
+        Args:
+            target (str):
+            mask (numpy.ndarray):
+            
+        Returns:
+            list:
+    """
+    import numpy
     vts_fmt = '{}.vtx[{{}}]'.format(target)
+    return [vts_fmt.format(x) for x in numpy.nonzero(mask)[0]]
+
+
+def listOverDecimalWeightVertices(target, decimal=2, selecting=False):
+    r"""
+        小数点以下decimal桁を超えるウェイトを持つ頂点のリストを返す。
+        
+        Args:
+            target (str):
+            decimal (int):許容する小数点以下の桁数
+            selecting (bool):該当する頂点を選択するかどうか
+            
+        Returns:
+            list:
+    """
+    result = analyzeWeights(target, decimal)
     vtxlist = []
-    for idx, wlist in enumerate(weights):
-        for w in wlist:
-            if mathlib.getNumberOfDecimals(w) <= decimal:
-                continue
-            vtxlist.append(vts_fmt.format(idx))
-            break
+    if result:
+        vtxlist = listVerticesFromMask(
+            target, result['decimalResiduals'] > DecimalTolerance
+        )
     if selecting:
         if not vtxlist:
             cmds.select(cl=True)
@@ -112,7 +194,6 @@ def listOverDecimalWeightVertices(target, decimal=2, selecting=False):
     return vtxlist
             
 
-
 def showBindSkinOption():
     r"""
         バインドオプションを開く
@@ -335,6 +416,8 @@ def bindToFace(falloff=0.0, hierarchy=True):
         surfaceAssociation='closestPoint', influenceAssociation='closestJoint'
     )
     cmds.delete(duplicated)
+    from .. import skinWeightCache
+    skinWeightCache.invalidate()
 
 
 def transferObjectsWeights(sourceNodes=None, target=None):
@@ -366,6 +449,8 @@ def transferObjectsWeights(sourceNodes=None, target=None):
             noMirror=True, surfaceAssociation='closestPoint', 
             influenceAssociation='closestJoint'
         )
+    from .. import skinWeightCache
+    skinWeightCache.invalidate()
 
 
 def getStoredModel(target):
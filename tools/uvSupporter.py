@@ -33,320 +33,240 @@ def updateView(t=0.5):
     time.sleep(t)
 # *********************************************************************
 
-def alignGridUV(faces=None):
+def _quadGrids(mfnMesh, faceIds):
     r"""
-        ポリゴンフェースのUVをグリッド状に配置する。
-        選択フェースは必ずすべて４角ポリゴンである必要がある。
-        
+        フェースのリストのうち、UVを持つ四角ポリゴンをUVで繋がっている
+        単位でまとめ、各まとまりのUV番号とグリッド上の整数座標を返す。
+        グリッド座標は隣接フェース表を幅優先で探索して決定する。
+
         Args:
-            faces (list):操作対象となるフェースのリスト。
+            mfnMesh (OpenMaya.MFnMesh):
+            faceIds (list):フェース番号のリスト
+
+        Returns:
+            list:(UV番号の配列, (UV数, 2)のグリッド座標の配列)のリスト
     """
-    class Uv(int):
-        r"""
-            UV名とそれに付随する情報を持つクラス。
-        """
-        def __new__(cls, uvid, shape, edgelist, face_ids, position):
-            r"""
-                Args:
-                    uvid (any):
-                    shape (any):
-                    edgelist (any):
-                    face_ids (any):
-                    position (any):
-            """
-            obj = super(Uv, cls).__new__(cls, uvid)
-            obj.shape = shape
-            obj.edges = edgelist
-            obj.face_ids = set(face_ids)
-            obj.is_done = False
-            obj.p = position
-            obj.init_p = position[:]
-            obj.numEdges = len(edgelist)
-            return obj
+    import numpy
+    from collections import deque
+    counts, vertices = mfnMesh.getVertices()
+    uv_counts, uv_ids = mfnMesh.getAssignedUVs()
+    counts = numpy.array(counts, dtype=numpy.int64)
+    uv_counts = numpy.array(uv_counts, dtype=numpy.int64)
+    uv_ids = numpy.array(uv_ids, dtype=numpy.int64)
+    uv_offsets = numpy.cumsum(uv_counts) - uv_counts
 
-        def __call__(self):
-            return '%s.map[%s]' % (self.shape, self)
+    # UVを持つ四角ポリゴンのみを対象とする。===================================
+    faces = numpy.unique(numpy.array(faceIds, dtype=numpy.int64))
+    faces = faces[(counts[faces] == 4) & (uv_counts[faces] == 4)]
+    if not len(faces):
+        return []
+    quads = uv_ids[uv_offsets[faces][:, None] + numpy.arange(4)]
+    num_quads = len(quads)
+    # =========================================================================
 
-        def update(self, edgelist, applyIndex=False):
-            r"""
-                Args:
-                    edgelist (list):
-                    applyIndex (any):
-            """
-            self.edges = list(
-                {
-                    edgelist[edgelist.index(x)]
-                    for x in self.edges if x in edgelist
-                }
-            )
-            for edge in self.edges:
-                edge.uvs.add(self)
-            self.numEdges = len(self.edges)
+    # 同じUVの組を持つ辺同士を隣接させた表を作成する。=========================
+    nexts = numpy.roll(quads, -1, axis=1)
+    num_uvs = int(quads.max()) + 1
+    keys = (
+        numpy.minimum(quads, nexts) * num_uvs + numpy.maximum(quads, nexts)
+    ).ravel()
+    order = numpy.argsort(keys, kind='stable')
+    same = numpy.nonzero(keys[order][:-1] == keys[order][1:])[0]
+    neighbors = numpy.full(num_quads * 4, -1, dtype=numpy.int64)
+    neighbors[order[same]] = order[same + 1]
+    neighbors[order[same + 1]] = order[same]
+    neighbors = neighbors.reshape(num_quads, 4)
+    # =========================================================================
 
-        def position(self, initPosition=False):
-            r"""
-                UVの位置を返す。
-                
-                Args:
-                    initPosition (any):
-                    
-                Returns:
-                    list:
-            """
-            return self.init_p if initPosition else self.p
+    # 幅優先探索で各フェースの角のグリッド座標を決定する。=====================
+    unit = numpy.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=numpy.int64)
+    coords = numpy.zeros((num_quads, 4, 2), dtype=numpy.int64)
+    groups = numpy.full(num_quads, -1, dtype=numpy.int64)
+    num_groups = 0
+    for seed in range(num_quads):
+        if groups[seed] >= 0:
+            continue
+        groups[seed] = num_groups
+        coords[seed] = unit
+        queue = deque([seed])
+        while queue:
+            f = queue.popleft()
+            for k in range(4):
+                link = neighbors[f, k]
+                if link < 0:
+                    continue
+                g, m = divmod(int(link), 4)
+                if groups[g] >= 0:
+                    continue
+                pa = coords[f, k]
+                pb = coords[f, (k + 1) % 4]
+                # 辺から隣接フェースの内側へ向かう方向。
+                d = pa - coords[f, (k + 3) % 4]
+                if quads[g, m] == quads[f, (k + 1) % 4]:
+                    corners = (pb, pa, pa + d, pb + d)
+                else:
+                    corners = (pa, pb, pb + d, pa + d)
+                for i, c in enumerate(corners):
+                    coords[g, (m + i) % 4] = c
+                groups[g] = num_groups
+                queue.append(g)
+        num_groups += 1
+    # =========================================================================
 
-        def move(self, u, v):
-            r"""
-                UVを任意の座標に移動する。
-                移動後、positionで返す内容は更新される。
-                
-                Args:
-                    u (float):
-                    v (float):
-            """
-            cmds.polyEditUV(self(), r=False, u=u, v=v)
-            self.p = [u, v]
+    results = []
+    for group in range(num_groups):
+        mask = groups == group
+        ids, index = numpy.unique(quads[mask].ravel(), return_index=True)
+        results.append((ids, coords[mask].reshape(-1, 2)[index]))
+    return results
 
-    class Edge(int):
-        r"""
-            エッジ名とそれに付随する情報を持つクラス。
-            メンバー変数facesにはこのエッジに接するフェース名がset形式で格納
-            されている。
-        """
-        def __new__(cls, edge):
-            r"""
-                Args:
-                    edge (int):エッジ番号
-            """
-            obj = super(Edge, cls).__new__(cls, edge)
-            obj.faces = set()
-            obj.uvs = set()
-            obj.counts = 0
-            return obj
 
-        def toUvs(self):
-            return list(self.uvs)
+def _fitGridToUvs(grid, positions):
+    r"""
+        グリッド座標を、現在のUV配置に近い向きで元のUVの範囲に収まるように
+        変換した座標を返す。
 
+        Args:
+            grid (numpy.ndarray):(UV数, 2)のグリッド座標
+            positions (numpy.ndarray):(UV数, 2)の現在のUV座標
 
-    # DEBUG.***************************************************************
-    def updateView(t=0.5):
-        r"""
-            Args:
-                t (any):
-        """
-        cmds.textureWindow(
-            cmds.getPanel(sty='polyTexturePlacementPanel'), e=True, ref=True
-        )
-        time.sleep(t)
-    # *********************************************************************
+        Returns:
+            numpy.ndarray:
+    """
+    import numpy
+    grid = grid.astype(numpy.float64)
+    # 現在の配置に対するグリッドの軸の向きを最小二乗法で求める。
+    a = numpy.hstack([grid, numpy.ones((len(grid), 1))])
+    linear = numpy.linalg.lstsq(a, positions, rcond=None)[0][:2]
+    if (
+        abs(linear[0, 0]) + abs(linear[1, 1]) >=
+        abs(linear[0, 1]) + abs(linear[1, 0])
+    ):
+        signs = numpy.sign([linear[0, 0], linear[1, 1]])
+    else:
+        grid = grid[:, ::-1]
+        signs = numpy.sign([linear[1, 0], linear[0, 1]])
+    grid = grid * numpy.where(signs == 0, 1, signs)
 
-    def align(uv, xEdgeData, yEdgeData, allUvs):
-        r"""
-            uvに接続される隣接UVの位置をグリッド状に位置合わせする。
-            
-            Args:
-                uv (Uv):操作対象元のUVコンポーネント名。
-                xEdgeData (list):X軸相当のエッジ名と向き
-                yEdgeData (list):Y軸相当のエッジ名と向き
-                allUvs (list):操作対象となる全UVコンポーネントのリスト
-        """
-        pos = uv.position()
-        next_uvs = []
-        # cmds.select(uv(), ['%s.e[%s]'%(uv.shape, x) for x in uv.edges])
-        # updateView(1)
-        for edge in uv.edges:
-            uvids = edge.toUvs()
-            target = None
-            # 操作対象UVをエッジから検出する。=================================
-            for uvid in uvids:
-                if uvid == uv:
-                    continue
-                tgt = allUvs.get(uvid)
-                if tgt is None:
-                    continue
-                if uv.face_ids & tgt.face_ids:
-                    target = tgt
-                    break
-            if target is None or target.is_done:
-                continue
-            # =================================================================
-            
-            # エッジ情報から移動方向を決定する。===============================
-            offset = None
-            data = [target, None, None]
-            if edge == yEdgeData[0]:
-                offset = [0, yEdgeData[1]]
-                data[2] = [yEdgeData[0], -yEdgeData[1]]
-            elif edge == xEdgeData[0]:
-                offset = [xEdgeData[1], 0]
-                data[1] = [xEdgeData[0], -xEdgeData[1]]
-            else:
-                if edge.faces & xEdgeData[0].faces:
-                    offset = [0, -yEdgeData[1]]
-                    data[2] = [edge, yEdgeData[1]]
-                elif edge.faces & yEdgeData[0].faces:
-                    offset = [-xEdgeData[1], 0]
-                    data[1] = [edge, xEdgeData[1]]
-            if not offset:
-                continue
-            # =================================================================
-            newpos = [x+y*0.01 for x, y in zip(pos, offset)]
-            target.move(newpos[0], newpos[1])
-            target.is_done = True
-            next_uvs.append(data)
+    # 元のUVの範囲に合わせる。
+    g_min = grid.min(axis=0)
+    g_size = grid.max(axis=0) - g_min
+    p_min = positions.min(axis=0)
+    p_size = positions.max(axis=0) - p_min
+    scale = p_size / numpy.where(g_size > 0, g_size, 1)
+    scale[g_size == 0] = 0
+    return p_min + (grid - g_min) * scale
 
-        for nuv in next_uvs:
-            for i in range(1, 3):
-                if nuv[i]:
-                    continue
-                src = nuv[3-i][0]
-                edgedata = [xEdgeData, yEdgeData][i-1]
-                for edge in nuv[0].edges:
-                    if edge == src:
-                        continue
-                    if edge.faces & src.faces:
-                        f = 1 if edge.faces & edgedata[0].faces else -1
-                        nuv[i] = (edge, edgedata[1]*f)
-            align(nuv[0], nuv[1], nuv[2], allUvs)
 
-    def search_and_align(allUvs):
-        r"""
-            Args:
-                allUvs (any):
-        """
-        corner = None
-        for uv in allUvs:
-            if not corner and uv.numEdges <= 2:
-                corner = uv
-        if not corner:
-            return
+def _addUvTweaks(mfnMesh, uvIds, deltaU, deltaV):
+    r"""
+        ヒストリを持つメッシュのUVを、シェイプのuvPtアトリビュートの
+        トゥイーク値に移動量を加えることで、1度のsetAttrで移動する。
 
-        # コーナーの縦エッジを特定する。=======================================
-        vx = OpenMaya.MVector((1, 0, 0))
-        vy = OpenMaya.MVector((0, 1, 0))
-        edgelist = {}
-        for edge in corner.edges:
-            comp = [x for x in edge.toUvs() if x.face_ids & corner.face_ids]
-            vectors = [OpenMaya.MVector(allUvs[x].position()+[0]) for x in comp]
-            s_vector = vectors.pop(comp.index(corner))
-            v = (vectors[0]-s_vector).normal()
-            xdot = v * vx
-            ydot = v * vy
-            edgelist.setdefault(abs(ydot), []).append(
-                (edge, -1 if xdot < 0 else 1, -1 if ydot < 0 else 1)
+        Args:
+            mfnMesh (OpenMaya.MFnMesh):
+            uvIds (numpy.ndarray):移動するUV番号
+            deltaU (numpy.ndarray):全UVのUの移動量
+            deltaV (numpy.ndarray):全UVのVの移動量
+    """
+    import numpy
+    start, end = int(uvIds.min()), int(uvIds.max())
+    tweaks = numpy.zeros((end - start + 1, 2), dtype=numpy.float64)
+    plug = mfnMesh.findPlug('uvPt', False)
+    for i in plug.getExistingArrayAttributeIndices():
+        if start <= i <= end:
+            element = plug.elementByLogicalIndex(i)
+            tweaks[i - start] = (
+                element.child(0).asFloat(), element.child(1).asFloat()
             )
-        # =====================================================================
-
-        # UVシェルの最大値の大きさを求め、移動量の目安にする。=================
-        poslist = [
-            [uv.position()[x] for uv in allUvs] for x in range(2)
-        ]
-        pivot = corner.position()
-        # =====================================================================
+    tweaks[:, 0] += deltaU[start:end+1]
+    tweaks[:, 1] += deltaV[start:end+1]
+    cmds.setAttr(
+        '%s.uvPt[%s:%s]' % (mfnMesh.fullPathName(), start, end),
+        *tweaks.ravel().tolist(), type='float2'
+    )
 
-        y_edge = edgelist[max(edgelist.keys())][0]
-        x_edge = edgelist[min(edgelist.keys())][0]
-        del allUvs[corner]
-        align(corner, x_edge[:2], (y_edge[0], y_edge[2]), allUvs)
-        corner.is_done = True
 
-        # 大きさを合わせる。===================================================
-        moved_uvs = {x:y for x, y in allUvs.items() if x.is_done}
-        moved_uvs[corner] = corner
-        init_poslist = [
-            [uv.position(True)[x] for uv in moved_uvs] for x in range(2)
-        ]
-        pos = [min(init_poslist[0]), min(init_poslist[1])]
-        wh = [max(x)-min(x) for x in init_poslist]
-        poslist = [
-            [uv.position()[x] for uv in moved_uvs] for x in range(2)
-        ]
-        new_wh = [max(x)-min(x) for x in poslist]
-        new_pos = [min(poslist[0]), min(poslist[1])]
-        uv_targets = [x() for x in moved_uvs]
-        cmds.polyEditUV(
-            uv_targets, pu=new_pos[0], pv=new_pos[1],
-            su=(wh[0]/new_wh[0]), sv=(wh[1]/new_wh[1])
-        )
-        cmds.polyEditUV(
-            uv_targets, u=pos[0]-new_pos[0], v=pos[1]-new_pos[1]
-        )
-        # =====================================================================
+def alignGridUV(faces=None):
+    r"""
+        ポリゴンフェースのUVをグリッド状に配置する。
+        四角ポリゴン以外のフェースは無視される。
+        UVで繋がっているフェースのまとまりごとに、元のUVの範囲に収まる
+        ように配置される。
+        ヒストリを持たないメッシュはMFnMesh.setUVsで、ヒストリを持つ
+        メッシュはuvPtアトリビュートへのsetAttrで一度に書き込まれる。
         
-        allUvs = {x:y for x, y in allUvs.items() if not x.is_done}
-        search_and_align(allUvs)
-        # cmds.select([x() for x in allUvs])
-
-            
+        Args:
+            faces (list):操作対象となるフェースのリスト。
+    """
+    import numpy
     if not faces:
         faces = cmds.filterExpand(sm=34)
     else:
-        faces = cmds.filterExpand(faces, sm=35)
+        faces = cmds.filterExpand(faces, sm=34)
     if not faces:
         return
 
-    bb = cmds.polyEvaluate(bc2=True)
-    shortest = min([bb[x][1]-bb[x][0] for x in range(2)])
-
     # シェイプごとに切り分ける。
     shapes = {}
+    edited = []
     idx_ptn = re.compile('\[(\d+)\]')
     for face in faces:
-        shapes.setdefault(face.split('.')[0], []).append(face)
-    for shape, faces in shapes.items():
-        edgecounts = {}
-        uvdata = []
-        face_ids = [int(idx_ptn.search(x).group(1)) for x in faces]
+        shapes.setdefault(face.split('.')[0], []).append(
+            int(idx_ptn.search(face).group(1))
+        )
+    for shape, face_ids in shapes.items():
         sel = OpenMaya.MSelectionList().add(shape)
-        dagpath = sel.getDagPath(0)
-        mfnm = OpenMaya.MFnMesh(dagpath)
-        poly_iter = OpenMaya.MItMeshPolygon(dagpath)
-        vtx_iter = OpenMaya.MItMeshVertex(dagpath)
+        mfnm = OpenMaya.MFnMesh(sel.getDagPath(0))
+        grids = _quadGrids(mfnm, face_ids)
+        if not grids:
+            continue
+
+        old_u, old_v = mfnm.getUVs()
+        new_u = numpy.array(old_u, dtype=numpy.float64)
+        new_v = numpy.array(old_v, dtype=numpy.float64)
+        for ids, grid in grids:
+            positions = numpy.stack([new_u[ids], new_v[ids]], axis=1)
+            new_pos = _fitGridToUvs(grid, positions)
+            new_u[ids] = new_pos[:, 0]
+            new_v[ids] = new_pos[:, 1]
 
-        edgecounts = {}
-        # UVとフェース、エッジの関係性を探索し保持する。=======================
-        for face_id in face_ids:
-            poly_iter.setIndex(face_id)
-            edge_indexes = set(poly_iter.getEdges())
-            # 四角ポリゴンではない場合は無視する。
-            if len(edge_indexes) != 4:
-                continue
-            for i, vid in enumerate(poly_iter.getVertices()):
-                vtx_iter.setIndex(vid)
-                v_edges = set(vtx_iter.getConnectedEdges())
-                uvid = poly_iter.getUVIndex(i)
-                edges = list(v_edges & edge_indexes)
-                # エッジの数をカウント。
-                for edge in edges:
-                    if not edge in edgecounts:
-                        e_data = Edge(edge)
-                        edgecounts[edge] = e_data
-                    else:
-                        e_data = edgecounts[edge]
-                    e_data.counts += 1
-                    e_data.faces.add(face_id)
-                if not uvid in uvdata:
-                    uvdata.append(
-                        Uv(uvid, shape, edges, [face_id], poly_iter.getUV(i))
+        # ヒストリを持つ場合はsetUVsの結果が上書きされるため
+        # uvPtのトゥイーク値として書き込む。
+        mesh = mfnm.fullPathName()
+        if cmds.listConnections(mesh + '.inMesh', s=True, d=False):
+            uv_ids = numpy.concatenate([x[0] for x in grids])
+            try:
+                _addUvTweaks(
+                    mfnm, uv_ids, new_u - numpy.array(old_u),
+                    new_v - numpy.array(old_v)
+                )
+            except RuntimeError:
+                # 書き込めない場合はUV毎にpolyEditUVで編集する。
+                for uvid in uv_ids:
+                    cmds.polyEditUV(
+                        '%s.map[%s]' % (mesh, uvid), r=False,
+                        u=new_u[uvid], v=new_v[uvid]
                     )
-                else:
-                    uv_obj = uvdata[uvdata.index(uvid)]
-                    uv_obj.edges.extend(edges)
-                    uv_obj.face_ids.add(face_id)
-        # 選択面を形成するエッジオブジェクトのリスト。
-        edges = [x for x in edgecounts.values() if x.counts>1]
-        # =====================================================================
+            continue
+
+        new_u = new_u.tolist()
+        new_v = new_v.tolist()
+        mfnm.setUVs(new_u, new_v)
+        edited.append((mfnm, old_u, old_v, new_u, new_v))
+    if not edited:
+        return
+
+    def undo():
+        for fn, old_u, old_v, new_u, new_v in edited:
+            fn.setUVs(old_u, old_v)
 
-        # 端となるUVをどれか一点取得する。=====================================
-        uvs = {}
-        for uv in uvdata:
-            uv.update(edges)
-            # 四角ポリゴン以外を除外。
-            if uv.numEdges > 4:
-                continue
-            uvs[uv] = uv
+    def redo():
+        for fn, old_u, old_v, new_u, new_v in edited:
+            fn.setUVs(new_u, new_v)
 
-        search_and_align(uvs)
+    from gris3 import apiUndo
+    apiUndo.commit(undo, redo)
 
 
 def switchUvForFlipbook(index, numU, numV, moveUvs=None):
@@ -203,7 +203,7 @@ class FileIconManager(
             Returns:
                 QtGui.QIcon:
         """
-        ext = os.path.splitext(filepath)
+        ext = os.path.splitext(filepath)[-1].lower()
         icon = self.__iconlist.get(ext)
         if icon:
             return icon
@@ -16,6 +16,7 @@ r"""
 import os
 import time
 import math
+import threading
 
 from . import context
 from ... import uilib
@@ -24,6 +25,116 @@ from ...fileUtil import fileManager, fileLinker
 from ...uilib import extendedUI
 
 QtWidgets, QtGui, QtCore = uilib.QtWidgets, uilib.QtGui, uilib.QtCore
+# ファイルシステムの変更を検知してから再走査するまでの待ち時間(ミリ秒)。
+UpdateDelay = 300
+
+
+def scanDirectory(dirpath, coordinator, extensions, versionFormat):
+    r"""
+        ディレクトリ内のファイルを取得し、coordinatorでまとめた結果と
+        各ファイルの更新時間を持つ辞書を返す。
+        os.scandirが使用できる場合はその結果のstatを再利用する。
+
+        Args:
+            dirpath (str):ディレクトリパス
+            coordinator (function):ModuleBrowser.setCoordinatorで設定する関数
+            extensions (list):対応拡張子のリスト
+            versionFormat (str):バージョン表記のフォーマット
+
+        Returns:
+            dict:'filedata'と'mtimes'をキーに持つ辞書
+    """
+    mtimes = {}
+    try:
+        scandir = getattr(os, 'scandir', None)
+        if scandir:
+            for entry in scandir(dirpath):
+                try:
+                    mtimes[entry.name] = entry.stat().st_mtime
+                except OSError:
+                    mtimes[entry.name] = None
+        else:
+            for name in os.listdir(dirpath):
+                try:
+                    mtimes[name] = os.path.getmtime(
+                        os.path.join(dirpath, name)
+                    )
+                except OSError:
+                    mtimes[name] = None
+    except OSError as e:
+        print(e)
+        return {'filedata': {}, 'mtimes': {}}
+    filedata = coordinator(
+        [os.path.join(dirpath, x) for x in mtimes], extensions, versionFormat
+    )
+    return {'filedata': filedata or {}, 'mtimes': mtimes}
+
+
+class DirectoryScanner(QtCore.QObject):
+    r"""
+        ディレクトリの走査をバックグラウンドのスレッドで行うクラス。
+        走査結果はdirectoryScannedシグナルでGUIスレッドへ送られる。
+    """
+    directoryScanned = QtCore.Signal(int, str, object)
+
+    def __init__(self, parent=None):
+        r"""
+            Args:
+                parent (QtCore.QObject):
+        """
+        super(DirectoryScanner, self).__init__(parent)
+        self.__lock = threading.Lock()
+        self.__jobs = []
+        self.__thread = None
+
+    def request(
+        self, generation, dirpath, coordinator, extensions, versionFormat
+    ):
+        r"""
+            ディレクトリの走査を依頼する。
+
+            Args:
+                generation (int):走査結果と一緒に返される識別番号
+                dirpath (str):ディレクトリパス
+                coordinator (function):
+                extensions (list):
+                versionFormat (str):
+        """
+        job = (generation, dirpath, coordinator, extensions, versionFormat)
+        with self.__lock:
+            if job in self.__jobs:
+                return
+            self.__jobs.append(job)
+            if self.__thread:
+                return
+            self.__thread = threading.Thread(target=self.__run)
+            self.__thread.daemon = True
+            self.__thread.start()
+
+    def cancel(self):
+        r"""
+            まだ開始されていない走査の依頼を全て破棄する。
+        """
+        with self.__lock:
+            del self.__jobs[:]
+
+    def __run(self):
+        r"""
+            依頼が無くなるまで走査を行うスレッドの処理。
+        """
+        while True:
+            with self.__lock:
+                if not self.__jobs:
+                    self.__thread = None
+                    return
+                job = self.__jobs.pop(0)
+            result = scanDirectory(*job[1:])
+            try:
+                self.directoryScanned.emit(job[0], job[1], result)
+            except RuntimeError:
+                # 受け取り側のウィジェットが既に削除されている。
+                return
+
 
 class ModuleBrowserStyle(QtWidgets.QStyledItemDelegate):
     ExtraColor = QtGui.QColor(45, 164, 255)
@@ -205,7 +316,12 @@ class ModuleBrowserView(QtWidgets.QTreeView):
 class ModuleBrowserModel(QtGui.QStandardItemModel):
     r"""
         ModuleBrowser専用のItemModelを提供するクラス。
+        ディレクトリのアイテムの内容はfetchMoreが呼ばれた時点で
+        ModuleBrowserに読み込みを依頼する。
     """
+    FetchStateRole = QtCore.Qt.UserRole + 4
+    RowKeyRole = QtCore.Qt.UserRole + 5
+    NotFetched, Fetching, Fetched = range(3)
 
     def __init__(self, itemview=None):
         r"""
@@ -235,6 +351,47 @@ class ModuleBrowserModel(QtGui.QStandardItemModel):
         """
         return self.__itemview
 
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        r"""
+            まだ読み込まれていないディレクトリは子を持つものとして扱う。
+
+            Args:
+                parent (QtCore.QModelIndex):
+
+            Returns:
+                bool:
+        """
+        if parent.isValid() and parent.data(self.FetchStateRole) in (
+            self.NotFetched, self.Fetching
+        ):
+            return True
+        return super(ModuleBrowserModel, self).hasChildren(parent)
+
+    def canFetchMore(self, parent):
+        r"""
+            Args:
+                parent (QtCore.QModelIndex):
+
+            Returns:
+                bool:
+        """
+        if not parent.isValid():
+            return False
+        return parent.data(self.FetchStateRole) == self.NotFetched
+
+    def fetchMore(self, parent):
+        r"""
+            ディレクトリのアイテムの内容の読み込みをModuleBrowserに依頼する。
+
+            Args:
+                parent (QtCore.QModelIndex):
+        """
+        if not self.canFetchMore(parent) or not self.__itemview:
+            return
+        item = self.itemFromIndex(parent)
+        item.setData(self.Fetching, self.FetchStateRole)
+        self.__itemview.fetchDirectory(item)
+
     def mimeData(self, indexes):
         r"""
             専用mimeDataを返す
@@ -297,6 +454,21 @@ class ModuleBrowser(extendedUI.FilteredView):
         self.__version_format = ''
         self.setVersionFormat(fileManager.VersionFileReTemplate)
 
+        # バックグラウンドでの走査とファイルシステムの監視。===================
+        self.__generation = 0
+        self.__dir_items = {}
+        self.__changed_dirs = set()
+        self.__folder_icon = None
+        self.__scanner = DirectoryScanner(self)
+        self.__scanner.directoryScanned.connect(self.__applyScanResult)
+        self.__watcher = QtCore.QFileSystemWatcher(self)
+        self.__watcher.directoryChanged.connect(self.__queueChangedDirectory)
+        self.__update_timer = QtCore.QTimer(self)
+        self.__update_timer.setSingleShot(True)
+        self.__update_timer.setInterval(UpdateDelay)
+        self.__update_timer.timeout.connect(self.__updateChangedDirectories)
+        # =====================================================================
+
         view = self.view()
         view.setColumnWidth(0, uilib.hires(220))
         view.model().sourceModel().setItemView(self)
@@ -464,104 +636,269 @@ class ModuleBrowser(extendedUI.FilteredView):
         """
         self.__extra_context = contextOption
 
+    def __directoryKey(self, dirpath):
+        r"""
+            ディレクトリのアイテムを管理するためのキーを返す。
+
+            Args:
+                dirpath (str):
+
+            Returns:
+                str:
+        """
+        return os.path.normcase(os.path.normpath(dirpath))
+
+    def __icon(self, filepath, isDir=False):
+        r"""
+            ファイルのアイコンを返す。
+            ファイルのアイコンはFileIconManagerにより拡張子ごとに
+            キャッシュされる。
+
+            Args:
+                filepath (str):
+                isDir (bool):ディレクトリかどうか
+
+            Returns:
+                QtGui.QIcon:
+        """
+        if not isDir:
+            return uilib.FileIconManager().fileIcon(filepath)
+        if self.__folder_icon is None:
+            self.__folder_icon = uilib.Icon(uilib.IconPath('folder'))
+        return self.__folder_icon
+
+    def __requestScan(self, dirpath):
+        r"""
+            ディレクトリの走査をバックグラウンドのスレッドに依頼する。
+
+            Args:
+                dirpath (str):
+        """
+        entry = self.__dir_items.get(self.__directoryKey(dirpath))
+        if not entry:
+            return
+        self.__scanner.request(
+            self.__generation, dirpath, self.__coordinator,
+            self.__extensions, entry[2]
+        )
+
     def refresh(self):
         r"""
             内容を更新する。
+            ディレクトリの走査はバックグラウンドで行われ、結果が届いた時点で
+            ビューに反映される。サブディレクトリの内容は展開された時点で
+            読み込まれる。
         """
+        model = self.view().model().sourceModel()
+        model.removeRows(0, model.rowCount())
+        self.__generation += 1
+        self.__scanner.cancel()
+        self.__dir_items = {}
+        self.__changed_dirs = set()
+        watched = self.__watcher.directories()
+        if watched:
+            self.__watcher.removePaths(watched)
+        path = self.path()
+        if not path:
+            return
+        self.__dir_items[self.__directoryKey(path)] = (
+            model.invisibleRootItem(), '', self.versionFormat()
+        )
+        self.__requestScan(path)
 
-        def setFiles(dirpath, offset, parentItem, vFormat):
-            r"""
-                ファイルをビューにセットするローカル関数
+    def fetchDirectory(self, item):
+        r"""
+            ディレクトリのアイテムの内容の読み込みを開始する。
+            ModuleBrowserModel.fetchMoreから呼ばれる。
 
-                Args:
-                    dirpath (str):ディレクトリパス
-                    offset (str):ルートパスからのオフセットパス
-                    parentItem (QtGui.QStandardItem): 親アイテム
-            """
-            filedatalist = self.coordinate(
-                [os.path.join(dirpath, x) for x in os.listdir(dirpath)],
-                self.__extensions, vFormat
+            Args:
+                item (QtGui.QStandardItem):ディレクトリのアイテム
+        """
+        offset = item.data()
+        dirpath = os.path.join(self.path(), offset)
+        self.__dir_items[self.__directoryKey(dirpath)] = (item, offset, None)
+        self.__requestScan(dirpath)
+
+    def __forgetDirectory(self, dirpath):
+        r"""
+            ディレクトリとその配下のディレクトリの管理情報と監視を破棄する。
+
+            Args:
+                dirpath (str):
+        """
+        key = self.__directoryKey(dirpath)
+        prefix = key.rstrip(os.sep) + os.sep
+        for k in [
+            x for x in self.__dir_items if x == key or x.startswith(prefix)
+        ]:
+            del self.__dir_items[k]
+        for path in self.__watcher.directories():
+            k = self.__directoryKey(path)
+            if k == key or k.startswith(prefix):
+                self.__watcher.removePath(path)
+
+    def __applyScanResult(self, generation, dirpath, result):
+        r"""
+            バックグラウンドで走査したディレクトリの結果をビューに反映する。
+
+            Args:
+                generation (int):走査を依頼した時点のrefreshの世代
+                dirpath (str):
+                result (dict):scanDirectoryの戻り値
+        """
+        if generation != self.__generation:
+            return
+        entry = self.__dir_items.get(self.__directoryKey(dirpath))
+        if not entry:
+            return
+        item, offset = entry[:2]
+        model = self.view().model().sourceModel()
+        if item is not model.invisibleRootItem():
+            item.setData(
+                ModuleBrowserModel.Fetched, ModuleBrowserModel.FetchStateRole
             )
-            if not filedatalist:
-                return
-            parent_path = dirpath
-            # ディレクトリパスに対する処理。===================================
-            for key in ('dir', 'file'):
-                for d in filedatalist.pop('/'+key, []):
-                    filepath = os.path.join(dirpath, d)
-                    local_dir = os.path.join(offset, d)
-                    if key == 'dir':
-                        icon = uilib.Icon(uilib.IconPath('folder'))
-                    else:
-                        icon = QtGui.QIcon(
-                            provider.icon(QtCore.QFileInfo(filepath))
-                        )
-                    item = QtGui.QStandardItem(d)
-                    item.setIcon(icon)
-                    item.setData(local_dir)
-                    item.setData(key, QtCore.Qt.UserRole+2)
-                    row = parentItem.rowCount()
-                    parentItem.setChild(row, 0, item)
-                    parentItem.setChild(row, 1, QtGui.QStandardItem())
-
-                    if key == 'dir':
-                        setFiles(filepath, local_dir, item, None)
-            # =================================================================
-            # 通常ファイルに対する処理。=======================================
-            keys = list(filedatalist.keys())
-            keys.sort()
-            for filename in keys:
-                filelist = filedatalist[filename]
-                icon = QtGui.QIcon(
-                    provider.icon(
-                        QtCore.QFileInfo(
-                            os.path.join(parent_path, filelist[0]['name'])
-                        )
-                    )
+        self.__populate(item, dirpath, offset, result)
+        if not dirpath in self.__watcher.directories():
+            self.__watcher.addPath(dirpath)
+
+    def __populate(self, parentItem, dirpath, offset, result):
+        r"""
+            走査結果をもとに親アイテムの子を更新する。
+            既に存在する行は残したまま、追加・削除された行のみを反映する。
+
+            Args:
+                parentItem (QtGui.QStandardItem):親アイテム
+                dirpath (str):ディレクトリパス
+                offset (str):ルートパスからのオフセットパス
+                result (dict):scanDirectoryの戻り値
+        """
+        filedatalist = dict(result['filedata'])
+        mtimes = result['mtimes']
+        key_role = ModuleBrowserModel.RowKeyRole
+
+        # 表示する行のリストを作成する。=======================================
+        rows = []
+        for key in ('dir', 'file'):
+            for d in filedatalist.pop('/'+key, []):
+                rows.append(('/{}/{}'.format(key, d), key, d))
+        keys = list(filedatalist.keys())
+        keys.sort()
+        for filename in keys:
+            filelist = filedatalist[filename]
+            if [x for x in filelist if x['ver'] == 'cur']:
+                rows.append(('ver/' + filename, 'ver', filename))
+        row_keys = set([x[0] for x in rows])
+        # =====================================================================
+
+        # 無くなった行を削除する。=============================================
+        existing = {}
+        for row in range(parentItem.rowCount() - 1, -1, -1):
+            child = parentItem.child(row, 0)
+            row_key = child.data(key_role)
+            if row_key in row_keys:
+                existing[row_key] = child
+                continue
+            if row_key.startswith('/dir/'):
+                self.__forgetDirectory(
+                    os.path.join(dirpath, row_key[5:])
                 )
+            parentItem.removeRow(row)
+        # =====================================================================
+
+        # 行を追加・更新する。=================================================
+        for row, (row_key, key, name) in enumerate(rows):
+            item = existing.get(row_key)
+            if item is None:
                 item = QtGui.QStandardItem()
-                item.setIcon(icon)
-                for file in filelist:
-                    if file['ver'] == 'cur':
-                        item.setText(filename)
-                        item.setData(os.path.join(offset, file['name']))
-                        item.setData(file['ext'], QtCore.Qt.UserRole+2)
-                        item.setData(file['isLinker'], QtCore.Qt.UserRole+3)
-                        continue
-                    file_item = QtGui.QStandardItem(file['simpleName'])
-                    file_item.setData(os.path.join(offset, file['name']))
-                    file_item.setIcon(icon)
-                    file_item.setData(file['isLinker'], QtCore.Qt.UserRole+3)
-
-                    try:
-                        t = os.path.getmtime(
-                            os.path.join(parent_path, file['name'])
-                        )
-                        update_time = time.strftime(
-                            '%Y/%m/%d %H:%M:%S', time.localtime(t)
-                        )
-                    except Exception as e:
-                        print(e.args[0])
-                        update_time = 'unknown'
-                    t_item = QtGui.QStandardItem(update_time)
-
-                    row = item.rowCount()
-                    item.setChild(row, 0, file_item)
-                    item.setChild(row, 1, t_item)
-                else:
-                    if item.text():
-                        row = parentItem.rowCount()
-                        parentItem.setChild(row, 0, item)
-                        parentItem.setChild(row, 1, QtGui.QStandardItem())
-            # =================================================================
+                item.setData(row_key, key_role)
+                parentItem.insertRow(row, [item, QtGui.QStandardItem()])
+                if key == 'dir':
+                    item.setData(
+                        ModuleBrowserModel.NotFetched,
+                        ModuleBrowserModel.FetchStateRole
+                    )
+            elif item.row() != row:
+                parentItem.insertRow(row, parentItem.takeRow(item.row()))
 
-        model = self.view().model().sourceModel()
-        model.removeRows(0, model.rowCount())
-        root_item = model.invisibleRootItem()
-        if not os.path.isdir(self.path()):
-            return
-        provider = QtWidgets.QFileIconProvider()
-        setFiles(self.path(), '', root_item, self.versionFormat())
+            if key == 'ver':
+                self.__setVersionItem(
+                    item, name, filedatalist[name], dirpath, offset, mtimes
+                )
+                continue
+            item.setText(name)
+            item.setIcon(
+                self.__icon(os.path.join(dirpath, name), key == 'dir')
+            )
+            item.setData(os.path.join(offset, name))
+            item.setData(key, QtCore.Qt.UserRole+2)
+        # =====================================================================
+
+    def __setVersionItem(
+        self, item, filename, filelist, dirpath, offset, mtimes
+    ):
+        r"""
+            バージョンファイルをまとめるアイテムの内容を設定する。
+            子のアイテムとして各バージョンのファイルが追加される。
+
+            Args:
+                item (QtGui.QStandardItem):
+                filename (str):バージョン表記の無い名前
+                filelist (list):coordinateの戻り値の各ファイルのデータ
+                dirpath (str):ディレクトリパス
+                offset (str):ルートパスからのオフセットパス
+                mtimes (dict):ファイル名と更新時間の辞書
+        """
+        icon = self.__icon(os.path.join(dirpath, filelist[0]['name']))
+        item.setIcon(icon)
+        item.removeRows(0, item.rowCount())
+        for file in filelist:
+            if file['ver'] == 'cur':
+                item.setText(filename)
+                item.setData(os.path.join(offset, file['name']))
+                item.setData(file['ext'], QtCore.Qt.UserRole+2)
+                item.setData(file['isLinker'], QtCore.Qt.UserRole+3)
+                continue
+            file_item = QtGui.QStandardItem(file['simpleName'])
+            file_item.setData(os.path.join(offset, file['name']))
+            file_item.setIcon(icon)
+            file_item.setData(file['isLinker'], QtCore.Qt.UserRole+3)
+
+            t = mtimes.get(file['name'])
+            if t is None and file['isLinker']:
+                t = mtimes.get(file['name'] + fileLinker.FileLinker.Extension)
+            if t is None:
+                update_time = 'unknown'
+            else:
+                update_time = time.strftime(
+                    '%Y/%m/%d %H:%M:%S', time.localtime(t)
+                )
+            t_item = QtGui.QStandardItem(update_time)
+
+            row = item.rowCount()
+            item.setChild(row, 0, file_item)
+            item.setChild(row, 1, t_item)
+
+    def __queueChangedDirectory(self, dirpath):
+        r"""
+            ファイルシステムの監視で変更が検知されたディレクトリを
+            更新待ちに追加する。
+
+            Args:
+                dirpath (str):
+        """
+        self.__changed_dirs.add(dirpath)
+        self.__update_timer.start()
+
+    def __updateChangedDirectories(self):
+        r"""
+            更新待ちのディレクトリを再度走査する。
+        """
+        changed = self.__changed_dirs
+        self.__changed_dirs = set()
+        for dirpath in changed:
+            if not os.path.isdir(dirpath):
+                continue
+            self.__requestScan(dirpath)
 
     def setPath(self, path):
         r"""